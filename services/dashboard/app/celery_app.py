@@ -3,6 +3,7 @@ Celery configuration for Otto AI background tasks
 """
 import os
 from celery import Celery
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_shutdown
 from app.config import settings
 
 # Create Celery instance
@@ -19,7 +20,9 @@ celery_app = Celery(
         "app.tasks.property_intelligence_tasks",
         "app.tasks.recording_session_tasks",
         "app.tasks.shunya_integration_tasks",
-        "app.tasks.shunya_job_polling_tasks"
+        "app.tasks.shunya_job_polling_tasks",
+        "app.tasks.geocoding_tasks",
+        "app.tasks.cleanup_tasks"
     ]
 )
 
@@ -84,6 +87,14 @@ celery_app.conf.update(
             "task": "app.tasks.cleanup_tasks.cleanup_old_tasks",
             "schedule": 3600.0,  # Hourly
         },
+        "cleanup-idempotency-records": {
+            "task": "app.tasks.cleanup_tasks.cleanup_idempotency_records",
+            "schedule": 900.0,  # Every 15 minutes
+        },
+        "cleanup-old-logs": {
+            "task": "app.tasks.cleanup_tasks.cleanup_old_logs",
+            "schedule": 86400.0,  # Daily
+        },
     },
 )
 
@@ -94,3 +105,43 @@ if settings.ENVIRONMENT == "production":
         task_send_sent_event=True,
     )
 
+
+
+# Prometheus: in multiprocess mode each prefork child writes its own sample
+# files; drop a child's live gauges when it exits, and optionally serve the
+# merged view from the worker's main process.
+@worker_process_shutdown.connect
+def _mark_metrics_process_dead(pid=None, **kwargs):
+    from app.obs.metrics import mark_process_dead
+    mark_process_dead(pid)
+
+
+@worker_init.connect
+def _start_worker_metrics_server(**kwargs):
+    if not settings.METRICS_WORKER_PORT:
+        return
+    from prometheus_client import start_http_server
+    from app.obs.metrics import collect_registry
+    # In multiprocess mode the collector re-reads the directory on every scrape
+    start_http_server(settings.METRICS_WORKER_PORT, registry=collect_registry())
+
+
+# SQL profile per task (statement count, DB time, rows; budget warnings)
+_task_query_profiles = {}
+
+
+@task_prerun.connect
+def _start_task_query_profile(task_id=None, task=None, **kwargs):
+    if not settings.DB_PROFILER_ENABLED:
+        return
+    from app.obs.query_profiler import install_query_profiler, start_query_profile
+    install_query_profiler()
+    _task_query_profiles[task_id] = start_query_profile(f"task:{task.name}")
+
+
+@task_postrun.connect
+def _finish_task_query_profile(task_id=None, **kwargs):
+    profile = _task_query_profiles.pop(task_id, None)
+    if profile is not None:
+        from app.obs.query_profiler import finish_query_profile
+        finish_query_profile(*profile)
@@ -43,13 +43,27 @@ class Settings:
         # Multiple keys for rotation: comma-separated or OPENAI_API_KEY_1, OPENAI_API_KEY_2, etc.
         self.OPENAI_API_KEYS = os.getenv("OPENAI_API_KEYS", "")  # Comma-separated list
         self.OPENAI_KEY_ROTATION_STRATEGY = os.getenv("OPENAI_KEY_ROTATION_STRATEGY", "round_robin")  # round_robin, random, least_used
+        self.OPENAI_MAX_CONCURRENCY_PER_KEY = int(os.getenv("OPENAI_MAX_CONCURRENCY_PER_KEY", "8"))  # In-flight async requests per key
+        # Content-addressed LLM response cache (Redis, then local disk)
+        self.LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+        self.LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")  # Empty = no disk tier; must be a private (0700) directory
+        self.LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "10000"))
         
         # Bland AI
         self.BLAND_API_KEY = os.getenv("BLAND_API_KEY", "")
         
         # Google Maps (for geocoding)
         self.GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
-        
+        # Geocoding cache and provider throughput
+        self.GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "5000"))  # In-memory LRU entries
+        self.GEOCODE_GOOGLE_QPS = float(os.getenv("GEOCODE_GOOGLE_QPS", "25"))
+        self.GEOCODE_NOMINATIM_QPS = float(os.getenv("GEOCODE_NOMINATIM_QPS", "1"))  # Nominatim usage policy
+        self.GEOCODE_BATCH_CONCURRENCY = int(os.getenv("GEOCODE_BATCH_CONCURRENCY", "10"))
+        # Batch dispatch drive-time model and optimizer budget
+        self.DISPATCH_AVERAGE_SPEED_KMH = float(os.getenv("DISPATCH_AVERAGE_SPEED_KMH", "40"))
+        self.DISPATCH_ROAD_FACTOR = float(os.getenv("DISPATCH_ROAD_FACTOR", "1.3"))  # Road vs straight-line distance
+        self.DISPATCH_OPTIMIZER_MAX_SECONDS = float(os.getenv("DISPATCH_OPTIMIZER_MAX_SECONDS", "0.5"))
+
         # UWC (Unified Workflow Composer) Integration
         # Default to Shunya mock for local development if not provided
         self.UWC_BASE_URL = os.getenv("UWC_BASE_URL") or "https://otto.shunyalabs.ai"
@@ -116,6 +130,14 @@ class Settings:
         
         # Redis Configuration
         self.REDIS_URL = os.getenv("REDIS_URL") or os.getenv("UPSTASH_REDIS_URL")
+        self.DASHBOARD_METRICS_CACHE_TTL = int(os.getenv("DASHBOARD_METRICS_CACHE_TTL", "30"))  # Seconds, 0 = no caching
+        self.LIST_TOTAL_CACHE_TTL = int(os.getenv("LIST_TOTAL_CACHE_TTL", "60"))  # Seconds to cache list endpoint totals, 0 = always count
+        self.MOBILE_RECORDING_STATE_TTL = int(os.getenv("MOBILE_RECORDING_STATE_TTL", "86400"))  # Seconds a /mobile/audio session stays readable
+        
+        # Realtime event streams (per-tenant replay log for WebSocket resume)
+        self.EVENT_STREAM_ENABLED = os.getenv("EVENT_STREAM_ENABLED", "true").lower() in ("true", "1", "yes")
+        self.EVENT_STREAM_MAXLEN = int(os.getenv("EVENT_STREAM_MAXLEN", "10000"))  # Approximate cap per tenant
+        self.EVENT_STREAM_REPLAY_LIMIT = int(os.getenv("EVENT_STREAM_REPLAY_LIMIT", "500"))  # Max events replayed per subscribe
         
         # Rate Limiting Configuration
         self.ENABLE_RATE_LIMITING = os.getenv("ENABLE_RATE_LIMITING", "true").lower() in ("true", "1", "yes")
@@ -129,12 +151,27 @@ class Settings:
         # Idempotency Configuration
         self.IDEMPOTENCY_TTL_DAYS = int(os.getenv("IDEMPOTENCY_TTL_DAYS", "90"))
         
+        # Retention purge configuration (chunked deletes, see app/services/retention.py)
+        self.RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+        self.RETENTION_BATCH_SLEEP_MS = int(os.getenv("RETENTION_BATCH_SLEEP_MS", "100"))
+        self.RETENTION_MAX_SECONDS = float(os.getenv("RETENTION_MAX_SECONDS", "300"))  # Per-run time budget
+        self.RAG_TELEMETRY_RETENTION_DAYS = int(os.getenv("RAG_TELEMETRY_RETENTION_DAYS", "180"))
+        
         # Observability Configuration
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
         self.OBS_REDACT_PII = os.getenv("OBS_REDACT_PII", "true").lower() in ("true", "1", "yes")
+        self.LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() in ("true", "1", "yes")  # Write logs from a background thread
+        self.LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")  # e.g. "app.realtime=0.1"; DEBUG/INFO only
+        self.DB_PROFILER_ENABLED = os.getenv("DB_PROFILER_ENABLED", "true").lower() in ("true", "1", "yes")
+        self.DB_QUERY_BUDGET_DEFAULT = int(os.getenv("DB_QUERY_BUDGET_DEFAULT", "50"))  # Statements per request/task, 0 = no limit
+        self.DB_QUERY_BUDGETS = os.getenv("DB_QUERY_BUDGETS", "")  # Per route template / "task:<name>", e.g. "/api/v1/calls=10"
+        self.OBS_SPAN_SAMPLE_RATE = float(os.getenv("OBS_SPAN_SAMPLE_RATE", "1.0"))  # Fraction of requests given a span
         self.OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
         self.OTEL_SERVICE_NAME_API = os.getenv("OTEL_SERVICE_NAME_API", "otto-api")
         self.OTEL_SERVICE_NAME_WORKER = os.getenv("OTEL_SERVICE_NAME_WORKER", "otto-worker")
+        # Prometheus (PROMETHEUS_MULTIPROC_DIR itself is read by prometheus_client from the env)
+        self.METRICS_MAX_LABEL_VALUES = int(os.getenv("METRICS_MAX_LABEL_VALUES", "500"))  # Per label, then "__overflow__"
+        self.METRICS_WORKER_PORT = int(os.getenv("METRICS_WORKER_PORT", "0"))  # Celery metrics HTTP port, 0 = disabled
         
         # Development/Testing Configuration
         self.DEV_EMIT_KEY = os.getenv("DEV_EMIT_KEY")
@@ -1,25 +1,52 @@
 """
 Idempotency middleware for Otto AI backend.
 Prevents duplicate processing of mutating requests using Idempotency-Key header.
+
+Keys are reserved in Redis with an atomic ``SET NX`` so concurrent duplicates
+wait on the first request instead of executing twice; the finished response is
+cached in Redis for replay. Postgres (``idempotency_records``) is only the
+durable audit trail and is written off the request path. When Redis is not
+configured the middleware falls back to Postgres lookups.
 """
+import asyncio
 import hashlib
 import json
 import time
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import Request, HTTPException, Response
-from sqlalchemy.orm import Session
+import redis.asyncio as redis
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
 from app.database import SessionLocal
 from app.models.idempotency import IdempotencyRecord
 from app.obs.logging import get_logger
+from app.obs.metrics import record_cache_hit, record_cache_miss, record_idempotency_purged
 
 logger = get_logger(__name__)
 
+# Marker stored while the first request for a key is still executing
+IN_FLIGHT_STATE = "in_flight"
+COMPLETED_STATE = "completed"
+
 
 class IdempotencyMiddleware:
     """Middleware for handling idempotency keys on mutating requests."""
     
-    def __init__(self, ttl_seconds: int = 3600):  # 1 hour default TTL
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,  # 1 hour default TTL
+        in_flight_ttl_seconds: int = 60,
+        wait_timeout_seconds: float = 10.0,
+        poll_interval_seconds: float = 0.1,
+        redis_url: Optional[str] = None,
+    ):
         self.ttl_seconds = ttl_seconds
+        self.in_flight_ttl_seconds = in_flight_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.redis_client = redis.from_url(self.redis_url, decode_responses=True) if self.redis_url else None
     
     async def __call__(self, request: Request, call_next):
         """Process request for idempotency."""
@@ -66,65 +93,228 @@ class IdempotencyMiddleware:
         # Create composite key (tenant + idempotency key)
         composite_key = f"{tenant_id}:{idempotency_key}"
         
-        # Check for existing record
-        db = SessionLocal()
+        if self.redis_client is not None:
+            try:
+                return await self._handle_with_redis(request, call_next, composite_key, tenant_id, idempotency_key)
+            except redis.RedisError as e:
+                # Only raised before the handler ran (see _handle_with_redis)
+                logger.warning(f"Redis unavailable for idempotency, falling back to database: {str(e)}")
+        
+        return await self._handle_with_database(request, call_next, composite_key, tenant_id, idempotency_key)
+    
+    async def _handle_with_redis(
+        self,
+        request: Request,
+        call_next,
+        composite_key: str,
+        tenant_id: str,
+        idempotency_key: str
+    ) -> Response:
+        """Fast path: reserve the key in Redis, replay or wait on duplicates."""
+        redis_key = f"idempotency:{composite_key}"
+        reserved = await self.redis_client.set(
+            redis_key,
+            json.dumps({"state": IN_FLIGHT_STATE}),
+            nx=True,
+            ex=self.in_flight_ttl_seconds,
+        )
+        
+        if not reserved:
+            cached = await self._wait_for_completion(redis_key)
+            if cached is None:
+                # Original request is still running (or its marker expired mid-wait)
+                return Response(
+                    content=json.dumps({"detail": "A request with this Idempotency-Key is already in progress"}),
+                    status_code=409,
+                    headers={"Content-Type": "application/json", "Retry-After": "1"}
+                )
+            record_cache_hit("idempotency")
+            logger.info(f"Returning cached response for idempotency key: {idempotency_key}")
+            return self._replay(cached["status_code"], cached["body"], cached.get("content_type"))
+        
+        record_cache_miss("idempotency")
+        
+        # From here on the handler runs exactly once: Redis errors are logged,
+        # never raised, so __call__ cannot fall back and run it again
         try:
-            existing_record = db.query(IdempotencyRecord).filter_by(
-                composite_key=composite_key
-            ).first()
-            
-            if existing_record:
-                # Check if record is still valid
-                if time.time() - existing_record.created_at.timestamp() < self.ttl_seconds:
-                    # Return cached response
-                    logger.info(f"Returning cached response for idempotency key: {idempotency_key}")
-                    
-                    response_data = json.loads(existing_record.response_body)
-                    status_code = existing_record.status_code
-                    
-                    return Response(
-                        content=json.dumps(response_data),
-                        status_code=status_code,
-                        headers={"Content-Type": "application/json"}
-                    )
-                else:
-                    # Record expired, delete it
-                    db.delete(existing_record)
-                    db.commit()
-            
-            # Process request
             response = await call_next(request)
-            
-            # Store response for future requests
-            response_body = response.body.decode() if response.body else "{}"
-            
-            new_record = IdempotencyRecord(
-                composite_key=composite_key,
-                tenant_id=tenant_id,
-                idempotency_key=idempotency_key,
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                response_body=response_body,
-                created_at=time.time()
+            response, body = await self._buffer_response(response)
+        except Exception:
+            # Let the client retry with the same key
+            await self._release_quietly(redis_key)
+            raise
+        
+        if response.status_code >= 500:
+            await self._release_quietly(redis_key)
+            return response
+        
+        try:
+            await self.redis_client.set(
+                redis_key,
+                json.dumps({
+                    "state": COMPLETED_STATE,
+                    "status_code": response.status_code,
+                    "body": body,
+                    "content_type": response.headers.get("content-type"),
+                }),
+                ex=self.ttl_seconds,
             )
+        except redis.RedisError as e:
+            logger.warning(f"Failed to store idempotent response in Redis for key {idempotency_key}: {str(e)}")
+        
+        # Durable audit trail (and the database fallback's replay source), written off the request path
+        asyncio.get_running_loop().run_in_executor(
+            None,
+            _persist_idempotency_record,
+            composite_key,
+            tenant_id,
+            idempotency_key,
+            request.method,
+            request.url.path,
+            response.status_code,
+            body,
+        )
+        
+        return response
+    
+    async def _release_quietly(self, redis_key: str) -> None:
+        """Drop an in-flight reservation; on Redis errors it simply expires after in_flight_ttl_seconds."""
+        try:
+            await self.redis_client.delete(redis_key)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to release idempotency reservation {redis_key}: {str(e)}")
+    
+    async def _wait_for_completion(self, redis_key: str) -> Optional[Dict[str, Any]]:
+        """Poll a reserved key until the original request stores its response."""
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        
+        while True:
+            raw = await self.redis_client.get(redis_key)
+            if raw is None:
+                # Original request failed and released the key
+                return None
             
-            db.add(new_record)
-            db.commit()
-            
-            logger.info(f"Stored idempotency record for key: {idempotency_key}")
-            
-            return response
+            cached = json.loads(raw)
+            if cached.get("state") == COMPLETED_STATE:
+                return cached
             
-        except Exception as e:
-            logger.error(f"Idempotency processing failed: {str(e)}")
-            db.rollback()
-            raise HTTPException(
-                status_code=500,
-                detail="Idempotency processing failed"
-            )
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval_seconds)
+    
+    async def _handle_with_database(
+        self,
+        request: Request,
+        call_next,
+        composite_key: str,
+        tenant_id: str,
+        idempotency_key: str
+    ) -> Response:
+        """Fallback when Redis is not configured: look up and record in Postgres."""
+        db = SessionLocal()
+        try:
+            existing_record = db.query(IdempotencyRecord).filter_by(
+                composite_key=composite_key
+            ).first()
         finally:
             db.close()
+        
+        if existing_record and _is_fresh(existing_record.created_at, self.ttl_seconds):
+            record_cache_hit("idempotency")
+            logger.info(f"Returning cached response for idempotency key: {idempotency_key}")
+            return self._replay(existing_record.status_code, existing_record.response_body)
+        
+        record_cache_miss("idempotency")
+        
+        # Expired rows are left for cleanup_expired_idempotency_records and overwritten below
+        response = await call_next(request)
+        response, body = await self._buffer_response(response)
+        
+        if response.status_code < 500:
+            _persist_idempotency_record(
+                composite_key,
+                tenant_id,
+                idempotency_key,
+                request.method,
+                request.url.path,
+                response.status_code,
+                body,
+            )
+        
+        return response
+    
+    @staticmethod
+    async def _buffer_response(response: Response):
+        """Read a (possibly streaming) response body so it can be cached and re-sent."""
+        body_iterator = getattr(response, "body_iterator", None)
+        if body_iterator is None:
+            return response, response.body.decode() if response.body else "{}"
+        
+        chunks = [chunk if isinstance(chunk, bytes) else chunk.encode() async for chunk in body_iterator]
+        raw = b"".join(chunks)
+        
+        buffered = Response(
+            content=raw,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            background=response.background,
+        )
+        return buffered, raw.decode() if raw else "{}"
+    
+    @staticmethod
+    def _replay(status_code: int, body: str, content_type: Optional[str] = None) -> Response:
+        """Build the replayed response for a completed idempotency key."""
+        return Response(
+            content=body,
+            status_code=status_code,
+            headers={"Content-Type": content_type or "application/json"}
+        )
+
+
+def _is_fresh(created_at: Optional[datetime], ttl_seconds: int) -> bool:
+    """Check whether a stored record is still inside the replay window."""
+    if created_at is None:
+        return False
+    if created_at.tzinfo is not None:
+        created_at = created_at.replace(tzinfo=None) - created_at.utcoffset()
+    return datetime.utcnow() - created_at < timedelta(seconds=ttl_seconds)
+
+
+def _persist_idempotency_record(
+    composite_key: str,
+    tenant_id: str,
+    idempotency_key: str,
+    method: str,
+    path: str,
+    status_code: int,
+    response_body: str
+) -> None:
+    """Write (or refresh an expired) idempotency record in Postgres."""
+    db = SessionLocal()
+    try:
+        record = db.query(IdempotencyRecord).filter_by(composite_key=composite_key).first()
+        if record is None:
+            record = IdempotencyRecord(composite_key=composite_key)
+            db.add(record)
+        
+        record.tenant_id = tenant_id
+        record.idempotency_key = idempotency_key
+        record.method = method
+        record.path = path
+        record.status_code = status_code
+        record.response_body = response_body
+        record.created_at = datetime.utcnow()
+        db.commit()
+        
+        logger.info(f"Stored idempotency record for key: {idempotency_key}")
+    except IntegrityError:
+        # A concurrent writer already stored this key
+        db.rollback()
+    except Exception as e:
+        logger.error(f"Failed to store idempotency record: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
 
 
 def require_idempotency_key(request: Request) -> str:
@@ -186,21 +376,26 @@ def generate_idempotency_key(tenant_id: str, user_id: str, action: str, data: Di
 
 
 # Cleanup function for expired records
-def cleanup_expired_idempotency_records(ttl_seconds: int = 3600):
-    """Remove expired idempotency records."""
-    db = SessionLocal()
+def cleanup_expired_idempotency_records(ttl_seconds: int = 3600) -> int:
+    """
+    Remove expired idempotency records.
+    
+    Runs from the periodic cleanup task (the middleware itself never deletes)
+    through the chunked retention purge engine.
+    
+    Returns:
+        Number of records deleted
+    """
+    from app.services.retention import get_retention_policy, purge_expired_rows
+    
     try:
-        cutoff_time = time.time() - ttl_seconds
-        expired_count = db.query(IdempotencyRecord).filter(
-            IdempotencyRecord.created_at < cutoff_time
-        ).delete()
-        
-        db.commit()
-        logger.info(f"Cleaned up {expired_count} expired idempotency records")
+        result = purge_expired_rows(
+            get_retention_policy("idempotency_records", retention=timedelta(seconds=ttl_seconds))
+        )
+        record_idempotency_purged("request", result.rows_purged)
+        logger.info(f"Cleaned up {result.rows_purged} expired idempotency records")
+        return result.rows_purged
         
     except Exception as e:
         logger.error(f"Failed to cleanup idempotency records: {str(e)}")
-        db.rollback()
-    finally:
-        db.close()
-
+        return 0
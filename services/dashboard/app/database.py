@@ -168,7 +168,10 @@ def init_db():
         rep_assignment_history,
         event_log,
         sop_compliance_result,
-        onboarding
+        onboarding,
+        geocode_cache,
+        geofence,
+        call_objection
     )
     
     inspector = inspect(engine)
@@ -218,7 +221,11 @@ def init_db():
         ("event_logs", event_log.EventLog),
         ("sop_compliance_results", sop_compliance_result.SopComplianceResult),
         ("documents", onboarding.Document),
-        ("onboarding_events", onboarding.OnboardingEvent)
+        ("onboarding_events", onboarding.OnboardingEvent),
+        ("geocode_cache", geocode_cache.GeocodeCache),
+        ("geofences", geofence.Geofence),
+        ("geofence_events", geofence.GeofenceEvent),
+        ("call_objections", call_objection.CallObjection)
     ]:
         # Check if table exists before trying to get columns
         try:
@@ -22,7 +22,7 @@ from app.config import settings
 
 # Import observability components
 from app.obs.logging import setup_logging, get_logger
-from app.obs.tracing import setup_tracing, instrument_fastapi, instrument_requests, instrument_sqlalchemy
+from app.obs.tracing import setup_tracing, instrument_fastapi, instrument_requests, instrument_sqlalchemy, instrument_query_profiler
 from app.obs.middleware import ObservabilityMiddleware
 from app.obs.errors import register_error_handlers
 from app.obs.metrics import metrics as metrics_collector
@@ -34,6 +34,7 @@ setup_tracing()
 setup_sentry()  # Initialize Sentry for error tracking
 instrument_requests()
 instrument_sqlalchemy()
+instrument_query_profiler()
 
 logger = get_logger(__name__)
 
@@ -89,15 +90,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Observability middleware (must be early in the stack)
-app.add_middleware(ObservabilityMiddleware)
-
 # Tenant context middleware
 app.add_middleware(TenantContextMiddleware)
 
 # Rate limiting middleware
 app.add_middleware(RateLimitMiddleware)
 
+# Observability middleware (added last so it is outermost and sees auth and
+# rate-limit rejections and their stage timings)
+app.add_middleware(ObservabilityMiddleware)
+
 #931980e753b188c6856ffaed726ef00a
 # Include routers
 app.include_router(health.router)  # Health checks first
@@ -235,6 +237,10 @@ async def shutdown_event():
     from app.services.queue_processor import queue_processor
     await queue_processor.stop()
     logger.info("Stopped missed call queue processor")
+    
+    # Drop this worker's live gauge files (multiprocess metrics mode only)
+    from app.obs.metrics import mark_process_dead
+    mark_process_dead()
 
 if __name__ == "__main__":
     import uvicorn
@@ -12,6 +12,7 @@ from fastapi import Request, HTTPException, Response
 from fastapi.responses import JSONResponse
 from functools import wraps
 from app.config import settings
+from app.obs.middleware import record_stage_timing
 
 logger = logging.getLogger(__name__)
 
@@ -360,15 +361,18 @@ class RateLimitMiddleware:
         trace_id = str(uuid.uuid4())
         
         # Apply default rate limits
+        checks_started = time.perf_counter()
         if user_id:
             allowed, retry_after = rate_limiter.check_user_limit(tenant_id, user_id)
             if not allowed:
+                record_stage_timing(scope, "rate_limit", (time.perf_counter() - checks_started) * 1000)
                 _log_rate_limit_hit("user_global", request, tenant_id, user_id)
                 response = create_rate_limit_response(retry_after, trace_id)
                 await response(scope, receive, send)
                 return
         
         allowed, retry_after = rate_limiter.check_tenant_limit(tenant_id)
+        record_stage_timing(scope, "rate_limit", (time.perf_counter() - checks_started) * 1000)
         if not allowed:
             _log_rate_limit_hit("tenant_global", request, tenant_id, user_id)
             response = create_rate_limit_response(retry_after, trace_id)
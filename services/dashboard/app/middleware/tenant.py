@@ -3,6 +3,7 @@ Tenant context middleware for OttoAI backend.
 Extracts and validates tenant_id from Clerk JWT claims.
 """
 import logging
+import time
 from typing import Optional
 import httpx
 
@@ -10,6 +11,7 @@ from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.obs.middleware import record_stage_timing
 from app.routes.dependencies import verify_clerk_jwt
 from jose import jwt, JWTError
 
@@ -39,7 +41,11 @@ class TenantContextMiddleware:
         
         try:
             # Extract tenant context (tenant_id, user_id, user_role)
-            context = await self._extract_tenant_context(request)
+            auth_started = time.perf_counter()
+            try:
+                context = await self._extract_tenant_context(request)
+            finally:
+                record_stage_timing(scope, "auth", (time.perf_counter() - auth_started) * 1000)
             
             # Check if token expired
             if context and context.get("_expired"):
@@ -40,6 +40,11 @@ class Appointment(Base):
             "scheduled_start",
             "assigned_rep_id",
         ),
+        Index("ix_appointments_company_scheduled_start_id", "company_id", "scheduled_start", "id"),  # Keyset pagination
+        # The generated rep_window tstzrange column and the
+        # ex_appointments_rep_window GiST exclusion constraint (no overlapping
+        # scheduled/confirmed appointments per rep) live in migration
+        # 20251218000000 only, since they are PostgreSQL-specific.
     )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
@@ -89,6 +94,10 @@ class Appointment(Base):
     assigned_by = Column(String, nullable=True, comment="User ID who assigned this appointment")
     assigned_at = Column(DateTime, nullable=True, comment="When rep was assigned")
     rep_claimed = Column(Boolean, default=False, comment="Whether rep claimed this lead/appointment")
+    double_booking_allowed = Column(
+        Boolean, nullable=False, default=False,
+        comment="Assigned with allow_double_booking; exempt from the rep overlap constraint",
+    )
     route_position = Column(Integer, nullable=True, comment="Position in rep's route for the day")
     route_group = Column(String, nullable=True, comment="Route group identifier")
     distance_from_previous_stop = Column(Float, nullable=True, comment="Distance in miles/feet from previous stop")
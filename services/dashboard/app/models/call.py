@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, JSON, String, Text, Time, Enum
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, Time, Enum, text
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -47,6 +47,7 @@ class Call(Base):
     bland_call_id = Column(String)  # Store Bland.ai call ID
     homeowner_followup_call_id = Column(String)
     transcript_discrepancies = Column(String)  # Add new field for discrepancies analysis
+    has_discrepancies = Column(Boolean, nullable=True)  # transcript_discrepancies["has_discrepancies"], persisted for counting
     problem = Column(String) 
     still_deciding = Column(Boolean, default=False)  # New field for tracking if customer is still deciding
     reason_for_deciding = Column(String)  # New field for storing why customer is still deciding
@@ -88,4 +89,26 @@ class Call(Base):
     battery_at_geofence_entry = Column(Integer, nullable=True)  # Battery percentage at geofence entry
     charging_at_geofence_entry = Column(Boolean, nullable=True)  # Whether rep was charging at geofence entry
     battery_at_recording_start = Column(Integer, nullable=True)  # Battery percentage at recording start
-    charging_at_recording_start = Column(Boolean, nullable=True)  # Whether rep was charging at recording start 
\ No newline at end of file
+    charging_at_recording_start = Column(Boolean, nullable=True)  # Whether rep was charging at recording start
+
+    __table_args__ = (
+        # Created by 20250130000000_add_csr_dashboard_indexes; declared here so
+        # create_all schemas match migrated ones
+        Index('ix_calls_company_id_created_at', 'company_id', 'created_at'),
+        Index('ix_calls_assigned_rep_id_created_at', 'assigned_rep_id', 'created_at'),
+        # MetricsService rollups: WHERE company_id AND call_type AND created_at range
+        Index('ix_calls_company_call_type_created_at', 'company_id', 'call_type', 'created_at'),
+        # Per-CSR/rep rollups: same plus owner_id
+        Index('ix_calls_company_owner_call_type_created_at', 'company_id', 'owner_id', 'call_type', 'created_at'),
+        # Revenue KPIs: bought calls only, price_if_bought covered for index-only scans
+        Index(
+            'ix_calls_company_created_at_bought', 'company_id', 'created_at',
+            postgresql_where=text('bought = true'),
+            postgresql_include=['price_if_bought'],
+        ),
+        # Active calls counter
+        Index(
+            'ix_calls_company_id_active', 'company_id',
+            postgresql_where=text("status IN ('in_progress', 'ringing')"),
+        ),
+    )
@@ -0,0 +1,49 @@
+"""
+Normalized objection index.
+
+One row per objection occurrence in a CallAnalysis or RecordingAnalysis, so
+objection analytics can filter and GROUP BY on indexed columns instead of
+scanning the JSON `objections` arrays.
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class CallObjection(Base):
+    """
+    An objection raised on a CSR call or sales visit recording.
+
+    Rows are derived data: they are rebuilt from the parent analysis' JSON by
+    app.services.objection_index whenever the analysis is written, and can be
+    backfilled at any time. `owner_id` and `occurred_at` are copied from the
+    call (CSR owner, call time) or appointment (assigned rep, scheduled start)
+    so the common filters don't need a join.
+    """
+    __tablename__ = "call_objections"
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(String, ForeignKey("companies.id"), nullable=False)
+
+    # Source analysis (exactly one of the two is set)
+    call_analysis_id = Column(String, ForeignKey("call_analysis.id", ondelete="CASCADE"), nullable=True, index=True)
+    recording_analysis_id = Column(String, ForeignKey("recording_analyses.id", ondelete="CASCADE"), nullable=True, index=True)
+    call_id = Column(Integer, ForeignKey("calls.call_id"), nullable=True, index=True)
+    recording_session_id = Column(String, ForeignKey("recording_sessions.id"), nullable=True)
+
+    owner_id = Column(String, nullable=True)  # CSR (calls.owner_id) or rep (appointments.assigned_rep_id)
+    objection_key = Column(String, nullable=False)
+    label = Column(String, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Per-user objection rollups: WHERE tenant AND owner AND occurred_at range GROUP BY key
+        Index('ix_call_objections_tenant_owner_occurred', 'tenant_id', 'owner_id', 'occurred_at'),
+        # Drill-down and search by objection: WHERE tenant AND key (AND occurred_at range)
+        Index('ix_call_objections_tenant_key_occurred', 'tenant_id', 'objection_key', 'occurred_at'),
+    )
+
+    def __repr__(self):
+        return f"<CallObjection(key={self.objection_key}, call_id={self.call_id}, recording_session_id={self.recording_session_id})>"
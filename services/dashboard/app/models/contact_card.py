@@ -19,6 +19,9 @@ class ContactCard(Base):
         UniqueConstraint("company_id", "primary_phone", name="uq_contact_cards_company_phone"),
         Index("ix_contact_cards_company_primary", "company_id", "primary_phone"),
         Index("ix_contact_cards_email", "company_id", "email"),
+        # pg_trgm GIN indexes on first_name, last_name, primary_phone and
+        # secondary_phone (lead search) live in migration 20251215000000 only,
+        # since create_all cannot assume the extension is installed.
     )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
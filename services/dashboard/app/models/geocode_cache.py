@@ -0,0 +1,31 @@
+"""
+Geocode cache model for persisting address -> coordinate lookups.
+"""
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class GeocodeCache(Base):
+    """
+    Persistent cache of geocoded addresses.
+
+    Keyed by the normalized address (see GeocodingService.normalize_address) so that
+    formatting differences ("123 Main St." vs "123 main st") share one row. Addresses
+    are not tenant data on their own, so the cache is shared across companies.
+    """
+    __tablename__ = "geocode_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    normalized_address = Column(String(500), unique=True, index=True, nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    provider = Column(String(32), nullable=False)  # google, nominatim
+
+    hit_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<GeocodeCache(address={self.normalized_address[:30]}, provider={self.provider})>"
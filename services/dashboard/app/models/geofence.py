@@ -0,0 +1,89 @@
+"""
+Geofence models: one row per monitored call location, plus the entry/exit log.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from app.database import Base
+
+
+class Geofence(Base):
+    """
+    A circular geofence around a booked call's address.
+
+    Replaces the per-rep SalesRep.active_geofences JSON list: assignment
+    changes update rep_id/active on this row instead of rewriting the rep.
+    min/max lat/lng hold the circle's bounding box so point lookups are an
+    index range scan (plus a GiST box index on PostgreSQL, see migration
+    20251219000000) followed by an exact distance check.
+    """
+    __tablename__ = "geofences"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    company_id = Column(String, ForeignKey("companies.id"), nullable=True, index=True)
+    call_id = Column(Integer, ForeignKey("calls.call_id"), nullable=False, unique=True)
+    rep_id = Column(String, ForeignKey("sales_reps.user_id"), nullable=True)
+
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    radius_m = Column(Float, nullable=False)
+    address = Column(String, nullable=True)
+
+    # Bounding box of the circle
+    min_lat = Column(Float, nullable=False)
+    max_lat = Column(Float, nullable=False)
+    min_lng = Column(Float, nullable=False)
+    max_lng = Column(Float, nullable=False)
+
+    active = Column(Boolean, nullable=False, default=True)  # Booked, not cancelled, not closed
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_geofences_rep_active_bbox", "rep_id", "active", "min_lat", "max_lat"),
+    )
+
+    def to_dict(self):
+        """Shape previously stored in Call.geofence / SalesRep.active_geofences."""
+        return {
+            "id": self.id,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "radius": self.radius_m,
+            "call_id": self.call_id,
+            "address": self.address,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class GeofenceEvent(Base):
+    """
+    An entry or exit of a rep at a geofence.
+
+    source is "client" for transitions detected on the device and "server"
+    for transitions derived from raw location samples.
+    """
+    __tablename__ = "geofence_events"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    company_id = Column(String, ForeignKey("companies.id"), nullable=True, index=True)
+    rep_id = Column(String, ForeignKey("sales_reps.user_id"), nullable=False)
+    geofence_id = Column(String, ForeignKey("geofences.id"), nullable=True)  # None for calls without a geofence row
+    call_id = Column(Integer, ForeignKey("calls.call_id"), nullable=False)
+
+    event_type = Column(String(8), nullable=False)  # entry, exit
+    occurred_at = Column(DateTime, nullable=False)
+    source = Column(String(8), nullable=False, default="client")
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    battery_percentage = Column(Float, nullable=True)
+    is_charging = Column(Boolean, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_geofence_events_rep_geofence_occurred", "rep_id", "geofence_id", "occurred_at"),
+    )
@@ -62,6 +62,7 @@ class Lead(Base):
     __tablename__ = "leads"
     __table_args__ = (
         Index("ix_leads_company_status_contact", "company_id", "status", "contact_card_id"),
+        Index("ix_leads_company_created_at_id", "company_id", "created_at", "id"),  # Keyset pagination
     )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
@@ -25,7 +25,7 @@ class SalesRep(Base):
     user_id = Column(String, ForeignKey("users.id"), primary_key=True)  # This is now the Clerk user ID
     company_id = Column(String, ForeignKey("companies.id"), nullable=False)  # Now references Clerk org ID
     manager_id = Column(String, ForeignKey("sales_managers.user_id"), nullable=True)  # Now references Clerk user ID
-    active_geofences = Column(JSON, nullable=True)  # List of active geofences as (latitude, longitude, radius) tuples
+    active_geofences = Column(JSON, nullable=True)  # Legacy, no longer written: geofences live in the geofences table
     expo_push_token = Column(String, nullable=True)  # Expo Push Token for mobile notifications
     
     # Recording and shift settings
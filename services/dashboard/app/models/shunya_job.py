@@ -31,6 +31,19 @@ class ShunyaJobStatus(str, PyEnum):
     TIMEOUT = "timeout"
 
 
+class ShunyaPipelineStage(str, PyEnum):
+    """
+    Stage of a multi-step CSR call pipeline job.
+
+    Each transition is driven by a Shunya completion (webhook or poll), so a
+    job waits in TRANSCRIBING/ANALYZING without holding a worker or session.
+    """
+    TRANSCRIBING = "transcribing"  # Transcription submitted, waiting on Shunya
+    ANALYZING = "analyzing"  # Transcript stored, analysis submitted
+    PERSISTING = "persisting"  # Analysis ready, writing domain models
+    COMPLETED = "completed"
+
+
 class ShunyaJob(Base):
     """
     Tracks async Shunya API jobs.
@@ -53,6 +66,11 @@ class ShunyaJob(Base):
     job_type = Column(Enum(ShunyaJobType, native_enum=False), nullable=False, index=True)
     job_status = Column(Enum(ShunyaJobStatus, native_enum=False), nullable=False, index=True, default=ShunyaJobStatus.PENDING)
     
+    # Pipeline state (CSR calls only; NULL for single-step jobs)
+    pipeline_stage = Column(Enum(ShunyaPipelineStage, native_enum=False), nullable=True)
+    stage_started_at = Column(DateTime, nullable=True)
+    stage_timings = Column(JSON, nullable=True, comment="Seconds spent in each completed pipeline stage")
+    
     # Shunya job ID (returned by Shunya API)
     shunya_job_id = Column(String, nullable=True, index=True)
     
@@ -62,6 +80,7 @@ class ShunyaJob(Base):
     
     # Idempotency: hash of processed output to prevent duplicate processing
     processed_output_hash = Column(String, nullable=True, index=True, comment="SHA256 hash of output_payload for idempotency")
+    raw_output_hash = Column(String, nullable=True, comment="SHA256 hash of the raw Shunya response output_payload was normalized from")
     
     # Retry management
     num_attempts = Column(Integer, default=0, nullable=False)
@@ -85,7 +85,7 @@ class Task(Base):
     )
     
     # Idempotency: natural key for duplicate detection
-    unique_key = Column(String, nullable=True, index=True, comment="Hash of (source, description, contact_card_id) for duplicate detection")
+    unique_key = Column(String, nullable=True, comment="Hash of (source, description, contact_card_id) for duplicate detection")
     
     # Scheduling
     due_at = Column(DateTime, nullable=True, index=True, comment="When task is due")
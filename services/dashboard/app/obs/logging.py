@@ -2,10 +2,14 @@
 Structured logging configuration for OttoAI backend.
 Provides JSON-formatted logs with correlation IDs and PII redaction.
 """
+import atexit
 import json
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import random
 import re
 import uuid
 from datetime import datetime
@@ -17,52 +21,53 @@ from app.config import settings
 class PIIRedactor:
     """Redacts PII from log messages when enabled."""
     
+    # Phone formats (123-456-7890, (123) 456-7890, international) and emails,
+    # combined so each message is scanned once
+    PII_PATTERN = re.compile(
+        r'(?P<phone>'
+        r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+        r'|\(\d{3}\)\s*\d{3}[-.]?\d{4}'
+        r'|\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{3,4}'
+        r')'
+        r'|(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    )
+    REPLACEMENTS = {'phone': '[REDACTED_PHONE]', 'email': '[REDACTED_EMAIL]'}
+    
+    # Every phone/email match contains a digit or "@"
+    _CANDIDATE = re.compile(r'[\d@]')
+    
     def __init__(self, enabled: bool = True):
         self.enabled = enabled
-        if enabled:
-            # Phone number patterns (various formats)
-            self.phone_patterns = [
-                r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # 123-456-7890
-                r'\(\d{3}\)\s*\d{3}[-.]?\d{4}',    # (123) 456-7890
-                r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{3,4}',  # International
-            ]
-            
-            # Email pattern
-            self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            
-            # Compile patterns
-            self.compiled_patterns = [
-                re.compile(pattern) for pattern in self.phone_patterns
-            ]
-            self.email_pattern_compiled = re.compile(self.email_pattern)
     
     def redact(self, message: str) -> str:
         """Redact PII from a log message."""
-        if not self.enabled:
+        if not self.enabled or not self._CANDIDATE.search(message):
             return message
-        
-        # Redact phone numbers
-        for pattern in self.compiled_patterns:
-            message = pattern.sub('[REDACTED_PHONE]', message)
-        
-        # Redact emails
-        message = self.email_pattern_compiled.sub('[REDACTED_EMAIL]', message)
-        
-        return message
+        return self.PII_PATTERN.sub(self._replace, message)
+    
+    def _replace(self, match: re.Match) -> str:
+        return self.REPLACEMENTS[match.lastgroup]
 
 
 class StructuredFormatter(logging.Formatter):
     """JSON formatter for structured logging with PII redaction."""
     
+    OPTIONAL_FIELDS = (
+        'route', 'method', 'status', 'latency_ms', 'trace_id',
+        'tenant_id', 'user_id', 'ip', 'provider', 'external_id',
+        'task_name', 'task_id', 'error_type', 'stack_trace'
+    )
+    
     def __init__(self, redact_pii: bool = True):
         super().__init__()
         self.redactor = PIIRedactor(redact_pii)
+        self._dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
     
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON with structured fields."""
-        # Base log structure
+        # Timestamp of the event, not of formatting (records may sit in the log queue)
         log_entry = {
-            "ts": datetime.utcnow().isoformat() + "Z",
+            "ts": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "level": record.levelname,
             "service": getattr(record, 'service', 'api'),
             "message": self.redactor.redact(record.getMessage()),
@@ -70,28 +75,102 @@ class StructuredFormatter(logging.Formatter):
         }
         
         # Add optional fields if present
-        optional_fields = [
-            'route', 'method', 'status', 'latency_ms', 'trace_id', 
-            'tenant_id', 'user_id', 'ip', 'provider', 'external_id',
-            'task_name', 'task_id', 'error_type', 'stack_trace'
-        ]
-        
-        for field in optional_fields:
-            if hasattr(record, field):
-                value = getattr(record, field)
-                if value is not None:
-                    log_entry[field] = value
+        fields = record.__dict__
+        for field in self.OPTIONAL_FIELDS:
+            value = fields.get(field)
+            if value is not None:
+                log_entry[field] = value
         
         # Add exception info if present
         if record.exc_info:
             log_entry["error_type"] = record.exc_info[0].__name__ if record.exc_info[0] else None
-            log_entry["stack_trace"] = self.formatException(record.exc_info)
+            log_entry["stack_trace"] = record.exc_text or self.formatException(record.exc_info)
         
-        return json.dumps(log_entry, ensure_ascii=False)
+        return self._dumps(log_entry)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "app.realtime=0.1,app.routes.sms_handler=0.5" into {logger: rate}."""
+    rates = {}
+    for item in (spec or "").split(","):
+        name, sep, rate = item.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class LogSamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of DEBUG/INFO records per logger (and its children).
+    
+    WARNING and above always pass. Rates are looked up by the longest
+    configured logger-name prefix and cached per logger name.
+    """
+    
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: Dict[str, float] = {}
+    
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only resolves the message and traceback text in the
+    caller's thread; JSON formatting and PII redaction happen on the
+    listener thread.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolved in place: args may be mutated by the caller after logging
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        return record
+
+
+_exception_formatter = logging.Formatter()
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_log_listener():
+    """Flush queued records and stop the background log writer."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(stop_log_listener)
 
 
 def setup_logging():
-    """Configure structured logging for the application."""
+    """
+    Configure structured logging for the application.
+    
+    With LOG_ASYNC (default) the root logger only enqueues records; a
+    QueueListener thread formats and writes them.
+    """
+    global _queue_listener
     log_level = getattr(settings, 'LOG_LEVEL', 'INFO').upper()
     redact_pii = getattr(settings, 'OBS_REDACT_PII', True)
     
@@ -102,11 +181,24 @@ def setup_logging():
     # Remove existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    stop_log_listener()
     
     # Create console handler with structured formatter
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(StructuredFormatter(redact_pii))
-    root_logger.addHandler(console_handler)
+    sampling_filter = LogSamplingFilter(parse_sample_rates(getattr(settings, 'LOG_SAMPLE_RATES', '')))
+    
+    if getattr(settings, 'LOG_ASYNC', True):
+        queue_handler = NonBlockingQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(sampling_filter)
+        _queue_listener = logging.handlers.QueueListener(
+            queue_handler.queue, console_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
+        root_logger.addHandler(queue_handler)
+    else:
+        console_handler.addFilter(sampling_filter)
+        root_logger.addHandler(console_handler)
     
     # Configure specific loggers
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
@@ -1,12 +1,125 @@
 """
 Prometheus metrics for OttoAI backend.
 Provides metrics for HTTP requests, Celery tasks, and business operations.
+
+Multiprocess mode: when PROMETHEUS_MULTIPROC_DIR is set (before this module is
+imported), every uvicorn and Celery worker process writes its samples to that
+directory and `collect_registry()` merges them at scrape time. The directory
+must be emptied on deploy/start and shared by all processes on the host.
+
+Label cardinality: labels fed from unbounded values (tenant ids, channel names,
+unmatched paths) go through `label_guard`, which folds values beyond
+METRICS_MAX_LABEL_VALUES per label into OVERFLOW_LABEL.
 """
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
-from typing import Optional, Dict, Any
+import os
+import re
+import threading
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, Gauge, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+)
+from prometheus_client import multiprocess
+from typing import Optional, Dict, Any, Set, Tuple
 from fastapi import Response
 import time
 
+from app.config import settings
+
+OVERFLOW_LABEL = "__overflow__"
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+def is_multiprocess_mode() -> bool:
+    """True when prometheus_client is writing samples to PROMETHEUS_MULTIPROC_DIR."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def collect_registry() -> CollectorRegistry:
+    """
+    Registry to expose on a scrape.
+
+    In multiprocess mode this is a fresh registry aggregating every process's
+    files (prometheus_client requires a new one per scrape); otherwise the
+    default in-process registry.
+    """
+    if not is_multiprocess_mode():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop a finished worker's live gauge files (no-op outside multiprocess mode)."""
+    if is_multiprocess_mode():
+        multiprocess.mark_process_dead(pid if pid is not None else os.getpid())
+
+
+class LabelCardinalityGuard:
+    """
+    Bounds the number of distinct values a label can take.
+
+    The first `max_values` values seen for a (metric, label) pair pass through;
+    later ones are reported as OVERFLOW_LABEL. Tracking is per process, so in
+    multiprocess mode the exported series are bounded by workers x max_values.
+    """
+
+    def __init__(self, max_values: int):
+        self.max_values = max_values
+        self._seen: Dict[Tuple[str, str], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def bound(self, metric: str, label: str, value: Any) -> str:
+        """Return `value` as a label string, or OVERFLOW_LABEL once the label is full."""
+        value = "unknown" if value is None else str(value)
+        seen = self._seen.get((metric, label))
+        if seen is not None and value in seen:
+            return value
+
+        with self._lock:
+            seen = self._seen.setdefault((metric, label), set())
+            if value in seen:
+                return value
+            if len(seen) < self.max_values:
+                seen.add(value)
+                return value
+
+        metric_label_overflow_total.labels(metric=metric, label=label).inc()
+        return OVERFLOW_LABEL
+
+    def reset(self) -> None:
+        with self._lock:
+            self._seen.clear()
+
+
+label_guard = LabelCardinalityGuard(settings.METRICS_MAX_LABEL_VALUES)
+
+# tenant:<id>:events -> tenant:{id}:events (see EventBus.is_valid_channel_format)
+_CHANNEL_ID_SEGMENT = re.compile(r'^(tenant|user|lead):[^:]+:')
+
+
+def channel_template(channel: str) -> str:
+    """Collapse the entity id in a realtime channel name into a placeholder."""
+    return _CHANNEL_ID_SEGMENT.sub(r'\1:{id}:', channel)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Route label for a request: the matched route's path template
+    (e.g. "/api/v1/calls/{call_id}"), or UNMATCHED_ROUTE for 404s.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if not path:
+        return UNMATCHED_ROUTE
+    return scope.get("root_path", "") + path
+
+
+metric_label_overflow_total = Counter(
+    'metric_label_overflow_total',
+    'Label values folded into the overflow bucket by the cardinality guard',
+    ['metric', 'label']
+)
+
 
 # HTTP Request Metrics
 http_requests_total = Counter(
@@ -22,6 +135,41 @@ http_request_duration_ms = Histogram(
     buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
 )
 
+http_request_stage_duration_ms = Histogram(
+    'http_request_stage_duration_ms',
+    'Time spent per request stage (auth, rate_limit, handler, response) in milliseconds',
+    ['route', 'stage'],
+    buckets=(0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+
+# Per-request / per-task SQL profile (see app.obs.query_profiler)
+db_query_count = Histogram(
+    'db_query_count',
+    'SQL statements executed per request or task',
+    ['scope'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+
+db_query_duration_ms = Histogram(
+    'db_query_duration_ms',
+    'Total SQL time per request or task in milliseconds',
+    ['scope'],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+
+db_query_rows = Histogram(
+    'db_query_rows',
+    'Rows returned or affected per request or task',
+    ['scope'],
+    buckets=(1, 10, 100, 1000, 10000, 100000)
+)
+
+db_query_budget_exceeded_total = Counter(
+    'db_query_budget_exceeded_total',
+    'Requests or tasks that ran more SQL statements than their budget',
+    ['scope']
+)
+
 # Ask Otto / RAG Metrics
 rag_queries_total = Counter(
     'rag_queries_total',
@@ -75,6 +223,20 @@ webhook_idempotency_purged_total = Counter(
     ['provider']
 )
 
+# Retention Purge Metrics
+retention_rows_purged_total = Counter(
+    'retention_rows_purged_total',
+    'Total number of rows deleted by retention purges',
+    ['table']
+)
+
+retention_purge_duration_ms = Histogram(
+    'retention_purge_duration_ms',
+    'Retention purge run duration in milliseconds',
+    ['table'],
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 30000, 60000, 300000)
+)
+
 # Business/Cost Metrics (stubs for future implementation)
 asr_minutes_total = Counter(
     'asr_minutes_total',
@@ -88,6 +250,12 @@ llm_tokens_total = Counter(
     ['tenant_id', 'model']
 )
 
+llm_tokens_saved_total = Counter(
+    'llm_tokens_saved_total',
+    'LLM tokens not spent because the response was served from the LLM cache',
+    ['tenant_id', 'model']
+)
+
 sms_sent_total = Counter(
     'sms_sent_total',
     'Total SMS messages sent',
@@ -97,14 +265,16 @@ sms_sent_total = Counter(
 # System Health Metrics
 active_connections = Gauge(
     'active_connections',
-    'Number of active database connections'
+    'Number of active database connections',
+    multiprocess_mode='livesum'
 )
 
 # WebSocket Metrics
 ws_connections = Gauge(
     'ws_connections',
     'Number of active WebSocket connections',
-    ['tenant_id']
+    ['tenant_id'],
+    multiprocess_mode='livesum'
 )
 
 ws_messages_sent_total = Counter(
@@ -176,6 +346,14 @@ shunya_api_errors_total = Counter(
     ['endpoint', 'error_type']
 )
 
+# Time a Shunya job spends in each pipeline stage ("total" = created to completed)
+shunya_pipeline_stage_seconds = Histogram(
+    'shunya_pipeline_stage_seconds',
+    'Time spent per Shunya pipeline stage in seconds',
+    ['job_type', 'stage'],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 14400)
+)
+
 # P0 FIX: Webhook Deduplication Metrics
 webhook_dedupe_hits_total = Counter(
     'webhook_dedupe_hits_total',
@@ -199,22 +377,59 @@ class MetricsCollector:
         self.rag_queries_total = rag_queries_total
         self.rag_query_latency_ms = rag_query_latency_ms
     
+    @property
+    def registry(self) -> CollectorRegistry:
+        """Registry to scrape (aggregated across processes in multiprocess mode)."""
+        return collect_registry()
+    
     def record_http_request(self, route: str, method: str, status_code: int, duration_ms: float):
-        """Record HTTP request metrics."""
-        # Normalize route for metrics (remove dynamic segments)
-        normalized_route = self._normalize_route(route)
+        """
+        Record HTTP request metrics.
+        
+        `route` should be the matched route template (see `route_template`);
+        raw paths are still bounded by the cardinality guard.
+        """
+        route = label_guard.bound('http_requests_total', 'route', route)
         
         http_requests_total.labels(
-            route=normalized_route,
+            route=route,
             method=method,
             status=str(status_code)
         ).inc()
         
         http_request_duration_ms.labels(
-            route=normalized_route,
+            route=route,
             method=method
         ).observe(duration_ms)
     
+    def record_http_stage_timings(self, route: str, timings: Dict[str, float]):
+        """Record per-stage request timings for a route template."""
+        route = label_guard.bound('http_requests_total', 'route', route)
+        for stage, duration_ms in timings.items():
+            http_request_stage_duration_ms.labels(route=route, stage=stage).observe(duration_ms)
+    
+    def record_db_query_profile(self, scope: str, statements: int, duration_ms: float, rows: int, over_budget: bool = False):
+        """Record SQL totals for one request or task."""
+        scope = label_guard.bound('db_query_count', 'scope', scope)
+        db_query_count.labels(scope=scope).observe(statements)
+        db_query_duration_ms.labels(scope=scope).observe(duration_ms)
+        db_query_rows.labels(scope=scope).observe(rows)
+        if over_budget:
+            db_query_budget_exceeded_total.labels(scope=scope).inc()
+    
+    def record_rag_query(self, tenant_id: str, user_role: str, result_count: int, latency_ms: float):
+        """Record Ask Otto query count and latency."""
+        tenant_id = label_guard.bound('rag_queries_total', 'tenant_id', tenant_id)
+        rag_queries_total.labels(
+            tenant_id=tenant_id,
+            user_role=user_role,
+            result_count=str(result_count)
+        ).inc()
+        rag_query_latency_ms.labels(
+            tenant_id=tenant_id,
+            user_role=user_role
+        ).observe(latency_ms)
+    
     def record_worker_task(self, task_name: str, status: str, duration_ms: Optional[float] = None):
         """Record Celery task metrics."""
         worker_task_total.labels(
@@ -244,6 +459,11 @@ class MetricsCollector:
         """Record idempotency key purge metrics."""
         webhook_idempotency_purged_total.labels(provider=provider).inc(count)
     
+    def record_retention_purge(self, table: str, rows: int, duration_ms: float):
+        """Record retention purge metrics."""
+        retention_rows_purged_total.labels(table=table).inc(rows)
+        retention_purge_duration_ms.labels(table=table).observe(duration_ms)
+    
     def record_shunya_job_failure(self, job_type: str, error_type: str = "unknown"):
         """Record Shunya job failure metrics."""
         shunya_job_failures_total.labels(job_type=job_type, error_type=error_type).inc()
@@ -252,6 +472,10 @@ class MetricsCollector:
         """Record Shunya API error metrics."""
         shunya_api_errors_total.labels(endpoint=endpoint, error_type=error_type).inc()
     
+    def record_shunya_pipeline_stage(self, job_type: str, stage: str, seconds: float):
+        """Record how long a Shunya job spent in one pipeline stage."""
+        shunya_pipeline_stage_seconds.labels(job_type=job_type, stage=stage).observe(seconds)
+    
     def record_webhook_dedupe_hit(self, provider: str):
         """Record webhook deduplication hit (duplicate caught)."""
         webhook_dedupe_hits_total.labels(provider=provider).inc()
@@ -262,17 +486,22 @@ class MetricsCollector:
     
     def record_asr_minutes(self, tenant_id: str, minutes: float):
         """Record ASR usage metrics."""
+        tenant_id = label_guard.bound('asr_minutes_total', 'tenant_id', tenant_id)
         asr_minutes_total.labels(tenant_id=tenant_id).inc(minutes)
     
-    def record_llm_tokens(self, tenant_id: str, model: str, tokens: int):
-        """Record LLM token usage metrics."""
-        llm_tokens_total.labels(
-            tenant_id=tenant_id,
+    def record_llm_tokens(self, tenant_id: str, model: str, tokens: int, cached: bool = False):
+        """Record LLM token usage metrics (cached=True counts tokens saved by the LLM cache)."""
+        name, counter = (
+            ('llm_tokens_saved_total', llm_tokens_saved_total) if cached else ('llm_tokens_total', llm_tokens_total)
+        )
+        counter.labels(
+            tenant_id=label_guard.bound(name, 'tenant_id', tenant_id),
             model=model
         ).inc(tokens)
     
     def record_sms_sent(self, tenant_id: str, count: int = 1):
         """Record SMS usage metrics."""
+        tenant_id = label_guard.bound('sms_sent_total', 'tenant_id', tenant_id)
         sms_sent_total.labels(tenant_id=tenant_id).inc(count)
     
     def record_cache_hit(self, cache_type: str):
@@ -312,24 +541,9 @@ class MetricsCollector:
         """Record UWC API request retry."""
         uwc_retries_total.labels(endpoint=endpoint).inc()
     
-    def _normalize_route(self, route: str) -> str:
-        """Normalize route for metrics by replacing dynamic segments."""
-        import re
-        
-        # Replace UUIDs with placeholder
-        route = re.sub(r'/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', '/{uuid}', route)
-        
-        # Replace numeric IDs with placeholder
-        route = re.sub(r'/\d+', '/{id}', route)
-        
-        # Replace other common dynamic segments
-        route = re.sub(r'/[a-zA-Z0-9_-]{20,}', '/{hash}', route)
-        
-        return route
-    
     def get_metrics_response(self) -> Response:
         """Get Prometheus metrics in text format."""
-        metrics_data = generate_latest()
+        metrics_data = generate_latest(collect_registry())
         return Response(
             content=metrics_data,
             media_type=CONTENT_TYPE_LATEST
@@ -346,6 +560,16 @@ def record_http_request(route: str, method: str, status_code: int, duration_ms:
     metrics.record_http_request(route, method, status_code, duration_ms)
 
 
+def record_http_stage_timings(route: str, timings: Dict[str, float]):
+    """Record per-stage request timings."""
+    metrics.record_http_stage_timings(route, timings)
+
+
+def record_db_query_profile(scope: str, statements: int, duration_ms: float, rows: int, over_budget: bool = False):
+    """Record SQL totals for one request or task."""
+    metrics.record_db_query_profile(scope, statements, duration_ms, rows, over_budget)
+
+
 def record_worker_task(task_name: str, status: str, duration_ms: Optional[float] = None):
     """Record Celery task metrics."""
     metrics.record_worker_task(task_name, status, duration_ms)
@@ -371,14 +595,29 @@ def record_idempotency_purged(provider: str, count: int = 1):
     metrics.record_idempotency_purged(provider, count)
 
 
+def record_retention_purge(table: str, rows: int, duration_ms: float):
+    """Record retention purge metrics."""
+    metrics.record_retention_purge(table, rows, duration_ms)
+
+
+def record_shunya_pipeline_stage(job_type: str, stage: str, seconds: float):
+    """Record time spent in a Shunya pipeline stage."""
+    metrics.record_shunya_pipeline_stage(job_type, stage, seconds)
+
+
+def record_rag_query(tenant_id: str, user_role: str, result_count: int, latency_ms: float):
+    """Record Ask Otto query metrics."""
+    metrics.record_rag_query(tenant_id, user_role, result_count, latency_ms)
+
+
 def record_asr_minutes(tenant_id: str, minutes: float):
     """Record ASR usage metrics."""
     metrics.record_asr_minutes(tenant_id, minutes)
 
 
-def record_llm_tokens(tenant_id: str, model: str, tokens: int):
+def record_llm_tokens(tenant_id: str, model: str, tokens: int, cached: bool = False):
     """Record LLM token usage metrics."""
-    metrics.record_llm_tokens(tenant_id, model, tokens)
+    metrics.record_llm_tokens(tenant_id, model, tokens, cached=cached)
 
 
 def record_sms_sent(tenant_id: str, count: int = 1):
@@ -403,27 +642,13 @@ def set_active_connections(count: int):
 
 def record_ws_connection(tenant_id: str, count: int):
     """Record WebSocket connection count for a tenant."""
+    tenant_id = label_guard.bound('ws_connections', 'tenant_id', tenant_id)
     ws_connections.labels(tenant_id=tenant_id).set(count)
 
 
 def record_ws_message_sent(channel: str):
-    """Record WebSocket message sent."""
-    ws_messages_sent_total.labels(channel=channel).inc()
-
-
-def record_ws_message_dropped(reason: str):
-    """Record WebSocket message dropped."""
-    ws_messages_dropped_total.labels(reason=reason).inc()
-
-
-def record_ws_subscription(channel: str):
-    """Record WebSocket channel subscription."""
-    ws_subscriptions_total.labels(channel=channel).inc()
-    ws_connections.labels(tenant_id=tenant_id).set(count)
-
-
-def record_ws_message_sent(channel: str):
-    """Record WebSocket message sent."""
+    """Record WebSocket message sent (labeled by channel template)."""
+    channel = label_guard.bound('ws_messages_sent_total', 'channel', channel_template(channel))
     ws_messages_sent_total.labels(channel=channel).inc()
 
 
@@ -433,23 +658,6 @@ def record_ws_message_dropped(reason: str):
 
 
 def record_ws_subscription(channel: str):
-    """Record WebSocket channel subscription."""
+    """Record WebSocket channel subscription (labeled by channel template)."""
+    channel = label_guard.bound('ws_subscriptions_total', 'channel', channel_template(channel))
     ws_subscriptions_total.labels(channel=channel).inc()
-
-    ws_connections.labels(tenant_id=tenant_id).set(count)
-
-
-def record_ws_message_sent(channel: str):
-    """Record WebSocket message sent."""
-    ws_messages_sent_total.labels(channel=channel).inc()
-
-
-def record_ws_message_dropped(reason: str):
-    """Record WebSocket message dropped."""
-    ws_messages_dropped_total.labels(reason=reason).inc()
-
-
-def record_ws_subscription(channel: str):
-    """Record WebSocket channel subscription."""
-    ws_subscriptions_total.labels(channel=channel).inc()
-
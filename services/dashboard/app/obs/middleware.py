@@ -1,131 +1,171 @@
 """
 Observability middleware for FastAPI.
 Provides request tracing, logging, and metrics collection.
+
+Implemented as a plain ASGI middleware: `send` is wrapped to capture the
+status code and body size as messages pass through, so streaming responses
+are never buffered and no extra task is spawned per request.
+
+Per-stage timings: inner middlewares report their own cost with
+`record_stage_timing(scope, "auth", ms)`; this middleware adds "handler"
+(until the response starts) and "response" (body send/streaming) and
+records all of them in `http_request_stage_duration_ms`.
 """
+import random
 import time
-from typing import Callable
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.obs.logging import get_logger, log_request, extract_trace_id
 from app.obs.tracing import get_tracer, add_span_attributes, add_span_error
-from app.obs.metrics import record_http_request
+from app.obs.metrics import record_http_request, record_http_stage_timings, route_template
+from app.obs.query_profiler import finish_query_profile, start_query_profile
 from app.config import settings
 
 logger = get_logger(__name__)
 tracer = get_tracer(__name__)
 
+STAGE_TIMINGS_KEY = "otto.stage_timings_ms"
+
+
+def record_stage_timing(scope: Scope, stage: str, duration_ms: float) -> None:
+    """Add time spent in a request stage (e.g. "auth", "rate_limit")."""
+    timings = scope.setdefault(STAGE_TIMINGS_KEY, {})
+    timings[stage] = timings.get(stage, 0.0) + duration_ms
 
-class ObservabilityMiddleware(BaseHTTPMiddleware):
+
+class ObservabilityMiddleware:
     """Middleware for request observability (logging, tracing, metrics)."""
     
-    def __init__(self, app, exclude_paths: list = None):
-        super().__init__(app)
-        self.exclude_paths = exclude_paths or ['/health', '/metrics', '/docs', '/openapi.json']
+    def __init__(self, app: ASGIApp, exclude_paths: list = None, span_sample_rate: float = None):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths or ['/health', '/metrics', '/docs', '/openapi.json'])
+        self.span_sample_rate = (
+            settings.OBS_SPAN_SAMPLE_RATE if span_sample_rate is None else span_sample_rate
+        )
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request with observability."""
-        start_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
         
-        # Skip observability for excluded paths
-        if any(request.url.path.startswith(path) for path in self.exclude_paths):
-            return await call_next(request)
+        start_time = time.perf_counter()
+        request = Request(scope)
         
         # Extract or generate trace ID
         trace_id = extract_trace_id(request)
         request.state.trace_id = trace_id
         
-        # Create span for the request
-        with tracer.start_as_current_span(
-            f"{request.method} {request.url.path}",
-            attributes={
-                "http.method": request.method,
-                "http.url": str(request.url),
-                "http.route": request.url.path,
-                "trace_id": trace_id,
-            }
-        ) as span:
-            try:
-                # Add request attributes to span
+        if random.random() < self.span_sample_rate:
+            with tracer.start_as_current_span(
+                f"{request.method} {request.url.path}",
+                attributes={
+                    "http.method": request.method,
+                    "http.url": str(request.url),
+                    "http.route": request.url.path,
+                    "trace_id": trace_id,
+                }
+            ):
                 add_span_attributes({
                     "http.user_agent": request.headers.get("user-agent", ""),
                     "http.host": request.headers.get("host", ""),
                 })
-                
-                # Add client IP if available
                 if request.client:
-                    add_span_attributes({
-                        "http.client_ip": request.client.host,
-                    })
-                
-                # Process request
-                response = await call_next(request)
-                
-                # Calculate duration
-                duration_ms = (time.time() - start_time) * 1000
-                
-                # Add response attributes to span
-                add_span_attributes({
-                    "http.status_code": response.status_code,
-                    "http.response_size": response.headers.get("content-length", 0),
-                })
-                
-                # Add trace ID to response headers
-                response.headers["X-Request-Id"] = trace_id
-                
-                # Record metrics
-                record_http_request(
-                    route=request.url.path,
-                    method=request.method,
-                    status_code=response.status_code,
-                    duration_ms=duration_ms
-                )
-                
-                # Log request
-                log_request(
-                    logger=logger,
-                    request=request,
-                    status_code=response.status_code,
-                    latency_ms=duration_ms,
-                    trace_id=trace_id,
-                    tenant_id=getattr(request.state, 'tenant_id', None),
-                    user_id=getattr(request.state, 'user_id', None),
-                )
-                
-                return response
-                
-            except Exception as e:
-                # Calculate duration for error case
-                duration_ms = (time.time() - start_time) * 1000
-                
-                # Add error to span
-                add_span_error(e, {
-                    "error.route": request.url.path,
-                    "error.method": request.method,
-                })
-                
-                # Record metrics for error
-                record_http_request(
-                    route=request.url.path,
-                    method=request.method,
-                    status_code=500,
-                    duration_ms=duration_ms
-                )
-                
-                # Log error
-                from app.obs.logging import log_error
-                log_error(
-                    logger=logger,
-                    error=e,
-                    trace_id=trace_id,
-                    tenant_id=getattr(request.state, 'tenant_id', None),
-                    user_id=getattr(request.state, 'user_id', None),
-                    route=request.url.path,
-                    method=request.method,
-                )
-                
-                # Re-raise the exception
-                raise
+                    add_span_attributes({"http.client_ip": request.client.host})
+                await self._observe(request, receive, send, trace_id, start_time)
+        else:
+            await self._observe(request, receive, send, trace_id, start_time)
+    
+    async def _observe(
+        self,
+        request: Request,
+        receive: Receive,
+        send: Send,
+        trace_id: str,
+        start_time: float
+    ) -> None:
+        scope = request.scope
+        status_code = 500
+        response_bytes = 0
+        response_started_at = None
+        query_profile = start_query_profile(request.url.path) if settings.DB_PROFILER_ENABLED else None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_bytes, response_started_at
+            if message["type"] == "http.response.start":
+                response_started_at = time.perf_counter()
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-Id", trace_id)
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Add error to span
+            add_span_error(e, {
+                "error.route": request.url.path,
+                "error.method": request.method,
+            })
+            
+            from app.obs.logging import log_error
+            log_error(
+                logger=logger,
+                error=e,
+                trace_id=trace_id,
+                tenant_id=getattr(request.state, 'tenant_id', None),
+                user_id=getattr(request.state, 'user_id', None),
+                route=request.url.path,
+                method=request.method,
+            )
+            if response_started_at is None:
+                status_code = 500
+            raise
+        finally:
+            end_time = time.perf_counter()
+            duration_ms = (end_time - start_time) * 1000
+            route = route_template(scope)
+            if query_profile is not None:
+                finish_query_profile(*query_profile, scope=route)
+            
+            add_span_attributes({
+                "http.status_code": status_code,
+                "http.response_size": response_bytes,
+            })
+            
+            record_http_request(
+                route=route,
+                method=request.method,
+                status_code=status_code,
+                duration_ms=duration_ms
+            )
+            record_http_stage_timings(
+                route,
+                self._stage_timings(scope, start_time, response_started_at, end_time)
+            )
+            
+            log_request(
+                logger=logger,
+                request=request,
+                status_code=status_code,
+                latency_ms=duration_ms,
+                trace_id=trace_id,
+                tenant_id=getattr(request.state, 'tenant_id', None),
+                user_id=getattr(request.state, 'user_id', None),
+                response_bytes=response_bytes,
+            )
+    
+    @staticmethod
+    def _stage_timings(scope: Scope, start: float, response_started_at, end: float) -> Dict[str, float]:
+        """Reported stages plus handler (up to response start) and response (body send)."""
+        timings = dict(scope.get(STAGE_TIMINGS_KEY, {}))
+        handler_end = response_started_at if response_started_at is not None else end
+        timings["handler"] = max((handler_end - start) * 1000 - sum(timings.values()), 0.0)
+        if response_started_at is not None:
+            timings["response"] = (end - response_started_at) * 1000
+        return timings
 
 
 class TenantContextMiddleware:
@@ -0,0 +1,217 @@
+"""
+Per-request / per-task SQL profiling.
+
+SQLAlchemy cursor events count statements, DB time and rows for the unit of
+work active in the current context (an HTTP request or a Celery task). When a
+unit finishes, the totals are attached to the current span, observed in the
+db_query_* histograms, and - if the unit went over its statement budget - the
+most expensive statements are logged.
+
+    stats, token = start_query_profile("/api/v1/calls/{call_id}")
+    ...
+    finish_query_profile(stats, token)
+
+Budgets come from DB_QUERY_BUDGET_DEFAULT and DB_QUERY_BUDGETS
+("/api/v1/metrics/sales/team=10,task:app.tasks.analysis_tasks.generate_daily_reports=500").
+
+`assert_max_queries` is the test-side helper (exposed as the `query_budget`
+pytest fixture): it sees statements from every thread, so it works around a
+TestClient call.
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.obs.logging import get_logger
+from app.obs.metrics import record_db_query_profile
+from app.obs.tracing import add_span_attributes
+
+logger = get_logger(__name__)
+
+TOP_STATEMENTS = 5
+_STATEMENT_PREVIEW = 300
+
+_WHITESPACE = re.compile(r'\s+')
+# Expanded IN lists / VALUES rows: (%(id_1_1)s, %(id_1_2)s, ...) or (?, ?, ...)
+_PARAM_LIST = re.compile(r'\((?:\s*(?:%\(\w+\)s|\?|:\w+|\$\d+)\s*,)+\s*(?:%\(\w+\)s|\?|:\w+|\$\d+)\s*\)')
+
+
+@dataclass
+class StatementStats:
+    """Aggregate for one normalized statement."""
+    count: int = 0
+    duration_ms: float = 0.0
+
+
+@dataclass
+class QueryStats:
+    """SQL totals for one request or task."""
+    scope: str
+    statements: int = 0
+    duration_ms: float = 0.0
+    rows: int = 0
+    by_statement: Dict[str, StatementStats] = field(default_factory=dict)
+
+    def add(self, statement: str, duration_ms: float, rows: int) -> None:
+        self.statements += 1
+        self.duration_ms += duration_ms
+        if rows > 0:
+            self.rows += rows
+        entry = self.by_statement.get(statement)
+        if entry is None:
+            entry = self.by_statement[statement] = StatementStats()
+        entry.count += 1
+        entry.duration_ms += duration_ms
+
+    def top_statements(self, limit: int = TOP_STATEMENTS) -> List[Tuple[str, StatementStats]]:
+        """Statements ordered by total time, then by execution count."""
+        return sorted(
+            self.by_statement.items(),
+            key=lambda item: (item[1].duration_ms, item[1].count),
+            reverse=True,
+        )[:limit]
+
+    def describe(self, limit: int = TOP_STATEMENTS) -> str:
+        lines = [
+            f"{self.statements} statements, {self.duration_ms:.1f}ms, {self.rows} rows in {self.scope}"
+        ]
+        for statement, entry in self.top_statements(limit):
+            lines.append(f"  {entry.count}x {entry.duration_ms:.1f}ms  {statement[:_STATEMENT_PREVIEW]}")
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Thread-agnostic collectors used by assert_max_queries
+_observers: List[QueryStats] = []
+_observers_lock = threading.Lock()
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and expanded parameter lists so repeats group together."""
+    return _PARAM_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_profiler_start")
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current.get()
+    if stats is None and not _observers:
+        return
+    # DB-API rowcount: rows returned for SELECT on psycopg2, affected rows for DML, -1 if unknown
+    rows = getattr(cursor, "rowcount", -1) or 0
+    normalized = normalize_statement(statement)
+    if stats is not None:
+        stats.add(normalized, duration_ms, rows)
+    if _observers:
+        with _observers_lock:
+            for observer in _observers:
+                if observer is not stats:
+                    observer.add(normalized, duration_ms, rows)
+
+
+def install_query_profiler() -> None:
+    """Register the cursor event listeners on all engines (idempotent)."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+def parse_query_budgets(spec: str) -> Dict[str, int]:
+    """Parse "scope=count,..." into {scope: count}."""
+    budgets = {}
+    for item in (spec or "").split(","):
+        scope, sep, count = item.rpartition("=")
+        if sep and scope.strip():
+            budgets[scope.strip()] = int(count)
+    return budgets
+
+
+_budgets = parse_query_budgets(settings.DB_QUERY_BUDGETS)
+
+
+def query_budget_for(scope: str) -> int:
+    """Statement budget for a route template or "task:<name>" scope."""
+    return _budgets.get(scope, settings.DB_QUERY_BUDGET_DEFAULT)
+
+
+def start_query_profile(scope: str) -> Tuple[QueryStats, Token]:
+    """Start collecting SQL stats for the current context."""
+    stats = QueryStats(scope=scope)
+    return stats, _current.set(stats)
+
+
+def finish_query_profile(stats: QueryStats, token: Optional[Token] = None, scope: Optional[str] = None) -> QueryStats:
+    """
+    Stop collecting and report the stats.
+
+    `scope` overrides the one given at start (the route template is only
+    known once routing has run).
+    """
+    if token is not None:
+        _current.reset(token)
+    if scope:
+        stats.scope = scope
+
+    add_span_attributes({
+        "db.statement_count": stats.statements,
+        "db.duration_ms": round(stats.duration_ms, 2),
+        "db.rows": stats.rows,
+    })
+    budget = query_budget_for(stats.scope)
+    over_budget = 0 < budget < stats.statements
+    record_db_query_profile(stats.scope, stats.statements, stats.duration_ms, stats.rows, over_budget)
+
+    if over_budget:
+        logger.warning(
+            f"Query budget exceeded for {stats.scope}: {stats.statements} > {budget}\n{stats.describe()}",
+            extra={
+                "route": stats.scope,
+                "statement_count": stats.statements,
+                "query_budget": budget,
+                "db_duration_ms": round(stats.duration_ms, 2),
+            }
+        )
+    return stats
+
+
+@contextmanager
+def assert_max_queries(max_statements: int, scope: str = "test") -> Iterator[QueryStats]:
+    """
+    Fail if the block runs more than `max_statements` SQL statements.
+
+    Counts statements from any thread (e.g. a FastAPI TestClient request).
+    """
+    install_query_profiler()
+    stats = QueryStats(scope=scope)
+    with _observers_lock:
+        _observers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _observers_lock:
+            _observers.remove(stats)
+    assert stats.statements <= max_statements, (
+        f"Expected at most {max_statements} SQL statements, got {stats.statements}:\n{stats.describe()}"
+    )
@@ -109,6 +109,15 @@ def instrument_sqlalchemy():
     return True
 
 
+def instrument_query_profiler():
+    """Count statements, DB time and rows per request/task (see app.obs.query_profiler)."""
+    if not getattr(settings, 'DB_PROFILER_ENABLED', True):
+        return False
+    from app.obs.query_profiler import install_query_profiler
+    install_query_profiler()
+    return True
+
+
 def get_tracer(name: str):
     """Get a tracer instance."""
     return trace.get_tracer(name)
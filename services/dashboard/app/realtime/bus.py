@@ -2,11 +2,12 @@
 Redis pub/sub event bus for real-time transport.
 Provides standardized event emission and message envelope format.
 """
+import asyncio
 import json
 import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import redis
 from app.config import settings
 from app.obs.logging import get_logger
@@ -18,6 +19,22 @@ logger = get_logger(__name__)
 # Message size limit (32KB)
 MAX_MESSAGE_SIZE = 32 * 1024
 
+def event_stream_key(tenant_id: str) -> str:
+    """Redis Stream holding a tenant's recent events for reconnect replay."""
+    return f"stream:tenant:{tenant_id}:events"
+
+
+def stream_id_key(stream_id: str) -> Tuple[int, int]:
+    """Sortable form of a Redis Stream id ('<ms>-<seq>')."""
+    ms, _, seq = stream_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _with_stream_id(message_json: str, stream_id: str) -> str:
+    """Add ``stream_id`` to a serialized envelope without re-encoding it."""
+    return f'{message_json[:-1]}, "stream_id": {json.dumps(stream_id)}}}'
+
+
 class EventBus:
     """Redis-based event bus for real-time messaging."""
     
@@ -63,6 +80,11 @@ class EventBus:
         """
         Emit an event to appropriate channels.
         
+        All channels for the event (tenant, user, lead) are published in a
+        single pipelined round trip. When event streams are enabled the event
+        is first appended to the tenant's replay stream so reconnecting
+        clients can resume from its ``stream_id``.
+        
         Args:
             event_name: Kebab-case event name (e.g., 'telephony.call.received')
             payload: Event data payload
@@ -76,89 +98,189 @@ class EventBus:
         Returns:
             True if event was emitted successfully, False otherwise
         """
+        results = self.emit_many([{
+            "event_name": event_name,
+            "payload": payload,
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "lead_id": lead_id,
+            "key": key,
+            "severity": severity,
+            "version": version,
+        }])
+        return results[0] if results else False
+    
+    def emit_many(self, events: Iterable[Dict[str, Any]]) -> List[bool]:
+        """
+        Emit a batch of events with one pipelined Redis round trip.
+        
+        Each item takes the same keyword arguments as ``emit`` (event_name,
+        payload, tenant_id, and optionally user_id, lead_id, key, severity,
+        version).
+        
+        Returns:
+            One success flag per event, in input order
+        """
+        events = list(events)
+        if not events:
+            return []
+        
         if not self.redis_client:
             logger.warning("Event bus not available - skipping event emission")
-            return False
+            return [False] * len(events)
         
-        try:
-            # Create message envelope
-            envelope = self._create_envelope(
-                event_name=event_name,
-                payload=payload,
-                tenant_id=tenant_id,
-                user_id=user_id,
-                lead_id=lead_id,
-                key=key,
-                severity=severity,
-                version=version
-            )
-            
-            # Check message size
-            message_json = json.dumps(envelope)
-            if len(message_json.encode('utf-8')) > MAX_MESSAGE_SIZE:
-                # Create pointer message for large payloads
-                envelope = self._create_pointer_message(envelope, payload)
-                message_json = json.dumps(envelope)
-                logger.warning(
-                    f"Large payload truncated for event {event_name}",
+        prepared = []
+        for event in events:
+            try:
+                prepared.append(self._prepare_message(**event))
+            except Exception as e:
+                logger.error(
+                    f"Failed to emit event {event.get('event_name')}: {e}",
                     extra={
-                        "event": event_name,
-                        "tenant_id": tenant_id,
-                        "original_size": len(json.dumps(payload).encode('utf-8')),
-                        "truncated_size": len(message_json.encode('utf-8'))
+                        "event": event.get("event_name"),
+                        "tenant_id": event.get("tenant_id"),
+                        "error": str(e)
                     }
                 )
+                prepared.append(None)
+        
+        if settings.EVENT_STREAM_ENABLED:
+            prepared = self._append_to_streams(events, prepared)
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for item in prepared:
+                if item is None:
+                    continue
+                message_json, channels = item
+                for channel in channels:
+                    pipe.publish(channel, message_json)
+            replies = pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.error(f"Failed to publish {len(events)} events: {e}")
+            record_cache_miss("event_publish")
+            return [False] * len(events)
+        
+        results = []
+        reply_index = 0
+        for event, item in zip(events, prepared):
+            if item is None:
+                results.append(False)
+                continue
             
-            # Determine channels to publish to
-            channels = self._get_channels(tenant_id, user_id, lead_id)
+            channels = item[1]
+            channel_replies = replies[reply_index:reply_index + len(channels)]
+            reply_index += len(channels)
             
-            # Publish to all relevant channels
             published_count = 0
-            for channel in channels:
-                try:
-                    self.redis_client.publish(channel, message_json)
+            for channel, reply in zip(channels, channel_replies):
+                if isinstance(reply, Exception):
+                    logger.error(f"Failed to publish to channel {channel}: {reply}")
+                    record_cache_miss("event_publish")
+                else:
                     published_count += 1
                     record_cache_hit("event_publish")
-                    logger.debug(
-                        f"Published event to channel {channel}",
-                        extra={
-                            "event": event_name,
-                            "channel": channel,
-                            "tenant_id": tenant_id,
-                            "trace_id": envelope.get("trace_id")
-                        }
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to publish to channel {channel}: {e}")
-                    record_cache_miss("event_publish")
             
             if published_count > 0:
-                logger.info(
-                    f"Event {event_name} published to {published_count} channels",
+                logger.debug(
+                    f"Event {event['event_name']} published to {published_count} channels",
                     extra={
-                        "event": event_name,
+                        "event": event["event_name"],
                         "channels": channels,
-                        "tenant_id": tenant_id,
-                        "user_id": user_id,
-                        "lead_id": lead_id,
-                        "trace_id": envelope.get("trace_id")
+                        "tenant_id": event.get("tenant_id"),
                     }
                 )
-                return True
+                results.append(True)
             else:
-                logger.error(f"Failed to publish event {event_name} to any channels")
-                return False
-                
+                logger.error(f"Failed to publish event {event['event_name']} to any channels")
+                results.append(False)
+        
+        return results
+    
+    def _append_to_streams(
+        self,
+        events: List[Dict[str, Any]],
+        prepared: List[Optional[Tuple[str, List[str]]]]
+    ) -> List[Optional[Tuple[str, List[str]]]]:
+        """
+        Append prepared events to their tenant's replay stream.
+        
+        Returns the prepared messages with the assigned ``stream_id`` added to
+        each envelope, so live subscribers can use it as a resume cursor. If
+        the stream write fails, events are still published live without an id.
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            appended = []
+            for index, (event, item) in enumerate(zip(events, prepared)):
+                if item is None:
+                    continue
+                message_json, channels = item
+                pipe.xadd(
+                    event_stream_key(event["tenant_id"]),
+                    {"channels": ",".join(channels), "message": message_json},
+                    maxlen=settings.EVENT_STREAM_MAXLEN,
+                    approximate=True
+                )
+                appended.append(index)
+            if not appended:
+                return prepared
+            replies = pipe.execute(raise_on_error=False)
         except Exception as e:
-            logger.error(
-                f"Failed to emit event {event_name}: {e}",
+            logger.warning(f"Failed to append {len(events)} events to replay streams: {e}")
+            return prepared
+        
+        prepared = list(prepared)
+        for index, stream_id in zip(appended, replies):
+            if isinstance(stream_id, bytes):
+                stream_id = stream_id.decode()
+            if isinstance(stream_id, str):
+                message_json, channels = prepared[index]
+                prepared[index] = (_with_stream_id(message_json, stream_id), channels)
+            else:
+                logger.warning(f"Failed to append event {events[index]['event_name']} to replay stream: {stream_id}")
+        return prepared
+    
+    def _prepare_message(
+        self,
+        event_name: str,
+        payload: Dict[str, Any],
+        tenant_id: str,
+        user_id: Optional[str] = None,
+        lead_id: Optional[str] = None,
+        key: Optional[str] = None,
+        severity: str = "info",
+        version: str = "1"
+    ) -> Tuple[str, List[str]]:
+        """Build the serialized envelope and its target channels for one event."""
+        envelope = self._create_envelope(
+            event_name=event_name,
+            payload=payload,
+            tenant_id=tenant_id,
+            user_id=user_id,
+            lead_id=lead_id,
+            key=key,
+            severity=severity,
+            version=version
+        )
+        
+        # Check message size (UTF-8 is at most 4 bytes per char, so short messages skip the encode)
+        message_json = json.dumps(envelope)
+        if len(message_json) * 4 > MAX_MESSAGE_SIZE and len(message_json.encode('utf-8')) > MAX_MESSAGE_SIZE:
+            # Create pointer message for large payloads
+            envelope = self._create_pointer_message(envelope, payload)
+            message_json = json.dumps(envelope)
+            logger.warning(
+                f"Large payload truncated for event {event_name}",
                 extra={
                     "event": event_name,
                     "tenant_id": tenant_id,
-                    "error": str(e)
+                    "original_size": envelope["data"]["_original_size_bytes"],
+                    "truncated_size": len(message_json.encode('utf-8'))
                 }
             )
-            return False
+        
+        return message_json, self._get_channels(tenant_id, user_id, lead_id)
     
     def _create_envelope(
         self,
@@ -347,3 +469,99 @@ def emit(
         severity=severity,
         version=version
     )
+
+
+def emit_many(events: Iterable[Dict[str, Any]]) -> List[bool]:
+    """
+    Convenience function to emit a batch of events using the global event bus.
+    
+    See EventBus.emit_many() for parameter documentation.
+    """
+    return event_bus.emit_many(events)
+
+
+class BufferedEventEmitter:
+    """
+    Async buffer in front of EventBus.emit_many.
+    
+    Events queued with ``emit`` are published together once ``max_batch_size``
+    events are pending or ``flush_interval`` seconds have passed, whichever
+    comes first. Publishing runs in a worker thread so the event loop is never
+    blocked on Redis.
+    """
+    
+    def __init__(
+        self,
+        bus: Optional[EventBus] = None,
+        max_batch_size: int = 100,
+        flush_interval: float = 0.05
+    ):
+        self.bus = bus or event_bus
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._stopping = False
+    
+    async def start(self):
+        """Start the periodic flush loop."""
+        if self._flusher_task is None:
+            self._stopping = False
+            self._flusher_task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self):
+        """Stop the flush loop and publish anything still pending."""
+        self._stopping = True
+        if self._flusher_task:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        await self.flush()
+    
+    async def emit(
+        self,
+        event_name: str,
+        payload: Dict[str, Any],
+        *,
+        tenant_id: str,
+        user_id: Optional[str] = None,
+        lead_id: Optional[str] = None,
+        key: Optional[str] = None,
+        severity: str = "info",
+        version: str = "1"
+    ) -> None:
+        """Queue an event; flushes immediately when the batch is full."""
+        self._pending.append({
+            "event_name": event_name,
+            "payload": payload,
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "lead_id": lead_id,
+            "key": key,
+            "severity": severity,
+            "version": version,
+        })
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+    
+    async def flush(self) -> List[bool]:
+        """Publish all pending events in one pipelined batch."""
+        async with self._flush_lock:
+            if not self._pending:
+                return []
+            batch, self._pending = self._pending, []
+            try:
+                return await asyncio.to_thread(self.bus.emit_many, batch)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} buffered events: {e}")
+                return [False] * len(batch)
+    
+    async def _flush_loop(self):
+        """Flush pending events every ``flush_interval`` seconds."""
+        while not self._stopping:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -5,13 +5,13 @@ import json
 import time
 import asyncio
 import uuid
-from typing import Dict, Set, Optional, Any
+from typing import Dict, List, Set, Optional, Any
 from fastapi import WebSocket, WebSocketDisconnect
 import redis.asyncio as redis
 from app.config import settings
 from app.obs.logging import get_logger
 from app.obs.metrics import record_cache_hit, record_cache_miss
-from app.realtime.bus import event_bus
+from app.realtime.bus import event_bus, event_stream_key, stream_id_key
 
 logger = get_logger(__name__)
 
@@ -19,6 +19,7 @@ logger = get_logger(__name__)
 HEARTBEAT_INTERVAL = 20  # Send ping every 20 seconds
 HEARTBEAT_TIMEOUT = 40   # Disconnect if no pong within 40 seconds
 MAX_QUEUE_SIZE = 100     # Maximum queued messages per connection
+REPLAY_SEND_TIMEOUT = 5  # Give up replaying if the client can't drain its queue
 
 class WebSocketConnection:
     """Represents a single WebSocket connection with its state."""
@@ -37,6 +38,7 @@ class WebSocketConnection:
         self.user_id = user_id
         self.trace_id = trace_id
         self.subscribed_channels: Set[str] = set()
+        self.replay_buffers: Dict[str, List[Dict[str, Any]]] = {}  # channel -> live messages held during replay
         self.last_pong = time.time()
         self.message_queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
         self.connected = True
@@ -78,6 +80,21 @@ class WebSocketConnection:
             logger.error(f"Failed to queue message for connection {self.connection_id}: {e}")
             return False
     
+    async def send_replay_message(self, message: Dict[str, Any]) -> bool:
+        """
+        Queue a replayed message, waiting for room instead of dropping.
+        
+        Replays can exceed MAX_QUEUE_SIZE, so they apply backpressure rather
+        than the drop-oldest behaviour used for live messages.
+        """
+        if not self.connected:
+            return False
+        try:
+            await asyncio.wait_for(self.message_queue.put(message), timeout=REPLAY_SEND_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
     async def send_ping(self):
         """Send a ping message to the client."""
         await self.send_message({"type": "ping", "ts": time.time()})
@@ -102,6 +119,7 @@ class WebSocketHub:
         self.connections: Dict[str, WebSocketConnection] = {}
         self.channel_subscriptions: Dict[str, Set[str]] = {}  # channel -> set of connection_ids
         self._redis_pubsub = None
+        self._redis_client = None
         self._pubsub_task = None
         self._heartbeat_task = None
         self._running = False
@@ -116,8 +134,8 @@ class WebSocketHub:
         # Set up Redis pub/sub
         if settings.REDIS_URL:
             try:
-                redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-                self._redis_pubsub = redis_client.pubsub()
+                self._redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+                self._redis_pubsub = self._redis_client.pubsub()
                 
                 # Start pub/sub listener
                 self._pubsub_task = asyncio.create_task(self._pubsub_listener())
@@ -196,9 +214,15 @@ class WebSocketHub:
     async def subscribe_to_channel(
         self,
         connection_id: str,
-        channel: str
+        channel: str,
+        resume_from: Optional[str] = None
     ) -> bool:
-        """Subscribe a connection to a channel."""
+        """
+        Subscribe a connection to a channel.
+        
+        When ``resume_from`` is given, live messages for the channel are held
+        back until ``replay_channel`` has sent what the client missed.
+        """
         connection = self.connections.get(connection_id)
         if not connection:
             return False
@@ -226,6 +250,8 @@ class WebSocketHub:
         
         # Add to connection's subscriptions
         connection.subscribed_channels.add(channel)
+        if resume_from:
+            connection.replay_buffers[channel] = []
         
         # Add to hub's channel mapping
         if channel not in self.channel_subscriptions:
@@ -260,6 +286,7 @@ class WebSocketHub:
         
         # Remove from connection's subscriptions
         connection.subscribed_channels.discard(channel)
+        connection.replay_buffers.pop(channel, None)
         
         # Remove from hub's channel mapping
         if channel in self.channel_subscriptions:
@@ -282,6 +309,100 @@ class WebSocketHub:
         
         return True
     
+    async def replay_channel(
+        self,
+        connection_id: str,
+        channel: str,
+        resume_from: str
+    ) -> Dict[str, Any]:
+        """
+        Replay events a connection missed on a channel since ``resume_from``.
+        
+        Reads the tenant's event stream after the given stream id, sends the
+        entries addressed to ``channel``, then releases live messages that
+        were held back during the replay (skipping any already replayed).
+        Finishes with a ``replay_result`` message; ``truncated`` tells the
+        client that events may be missing and it should refetch instead.
+        """
+        connection = self.connections.get(connection_id)
+        if not connection:
+            return {}
+        
+        replayed = 0
+        truncated = False
+        last_id = None
+        try:
+            ms, seq = stream_id_key(resume_from)
+            last_id = resume_from
+            if not self._redis_client:
+                truncated = True
+            else:
+                stream_key = event_stream_key(connection.tenant_id)
+                limit = settings.EVENT_STREAM_REPLAY_LIMIT
+                
+                # Entries older than the cursor's successor were trimmed by MAXLEN
+                oldest = await self._redis_client.xrange(stream_key, "-", "+", count=1)
+                if oldest and stream_id_key(oldest[0][0]) > (ms, seq + 1):
+                    truncated = True
+                
+                entries = await self._redis_client.xrange(stream_key, f"{ms}-{seq + 1}", "+", count=limit + 1)
+                if len(entries) > limit:
+                    truncated = True
+                    entries = entries[:limit]
+                
+                for entry_id, fields in entries:
+                    if channel not in fields.get("channels", "").split(","):
+                        continue
+                    message = json.loads(fields["message"])
+                    message["stream_id"] = entry_id
+                    if not await connection.send_replay_message(message):
+                        truncated = True
+                        break
+                    replayed += 1
+                    last_id = entry_id
+                else:
+                    if entries:
+                        last_id = entries[-1][0]
+        except ValueError:
+            logger.warning(
+                f"Invalid resume_from cursor: {resume_from}",
+                extra={"connection_id": connection_id, "channel": channel}
+            )
+            truncated = True
+        except Exception as e:
+            logger.error(f"Failed to replay {channel} for connection {connection_id}: {e}")
+            truncated = True
+        finally:
+            held = connection.replay_buffers.pop(channel, [])
+        
+        for message in held:
+            stream_id = message.get("stream_id")
+            if last_id and stream_id and stream_id_key(stream_id) <= stream_id_key(last_id):
+                continue
+            await connection.send_message(message)
+        
+        result = {
+            "type": "replay_result",
+            "channel": channel,
+            "replayed": replayed,
+            "truncated": truncated,
+            "stream_id": last_id,
+            "ts": time.time()
+        }
+        await connection.send_message(result)
+        
+        logger.info(
+            f"Replayed {replayed} events on {channel} for connection {connection_id}",
+            extra={
+                "connection_id": connection_id,
+                "channel": channel,
+                "tenant_id": connection.tenant_id,
+                "replayed": replayed,
+                "truncated": truncated
+            }
+        )
+        return result
+    
     async def handle_client_message(
         self,
         connection_id: str,
@@ -300,14 +421,17 @@ class WebSocketHub:
             
         elif message_type == "subscribe":
             channel = message.get("channel")
+            resume_from = message.get("resume_from")
             if channel:
-                success = await self.subscribe_to_channel(connection_id, channel)
+                success = await self.subscribe_to_channel(connection_id, channel, resume_from)
                 await connection.send_message({
                     "type": "subscribe_result",
                     "channel": channel,
                     "success": success,
                     "ts": time.time()
                 })
+                if success and resume_from:
+                    await self.replay_channel(connection_id, channel, resume_from)
             
         elif message_type == "unsubscribe":
             channel = message.get("channel")
@@ -388,6 +512,11 @@ class WebSocketHub:
         for connection_id in connection_ids:
             connection = self.connections.get(connection_id)
             if connection and connection.connected:
+                held = connection.replay_buffers.get(channel)
+                if held is not None:
+                    held.append(message)
+                    distributed_count += 1
+                    continue
                 success = await connection.send_message(message)
                 if success:
                     distributed_count += 1
@@ -9,7 +9,7 @@ import json
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc, cast, String
+from sqlalchemy import and_, or_, func, desc, asc
 
 from app.database import get_db
 from app.deps.ai_internal_auth import get_ai_internal_context, AIInternalContext
@@ -21,6 +21,7 @@ from app.schemas.ai_search import (
 )
 from app.models.call import Call
 from app.models.call_analysis import CallAnalysis
+from app.models.call_objection import CallObjection
 from app.models.lead import Lead
 from app.models.appointment import Appointment
 from app.models.recording_analysis import RecordingAnalysis
@@ -81,6 +82,18 @@ def _derive_outcome(
     return None
 
 
+def _has_objection_labels(db: Session, company_id: str, labels: List[str]):
+    """EXISTS clause: the call has an indexed objection whose key or label is in labels."""
+    return db.query(CallObjection.id).filter(
+        CallObjection.call_id == Call.call_id,
+        CallObjection.tenant_id == company_id,
+        or_(
+            CallObjection.objection_key.in_(labels),
+            CallObjection.label.in_(labels)
+        )
+    ).exists()
+
+
 def _get_main_objection_label(objections: Optional[List]) -> Optional[str]:
     """Extract the first/main objection label from objections list."""
     if not objections:
@@ -189,17 +202,7 @@ def search_calls(
     
     # Filter by objection_labels
     if filters.objection_labels:
-        # Check if any of the objection labels appear in the objections JSON array
-        # Convert JSON to string and check if escaped label appears (works for both PostgreSQL and SQLite)
-        objection_conditions = []
-        for label in filters.objection_labels:
-            # Escape label as JSON string and check if it appears in the JSON array
-            label_escaped = json.dumps(label)  # e.g., "price" -> "\"price\""
-            objection_conditions.append(
-                cast(CallAnalysis.objections, String).contains(label_escaped)
-            )
-        if objection_conditions:
-            query = query.filter(or_(*objection_conditions))
+        query = query.filter(_has_objection_labels(db, company_id, filters.objection_labels))
     
     # Filter by sentiment range
     if filters.sentiment_min is not None:
@@ -241,18 +244,8 @@ def search_calls(
     call_items = []
     if options.include_calls:
         for call, analysis, lead, appointment, recording_analysis in results:
-            # Get appointment_id (use first appointment if multiple)
-            appointment_id = None
-            if appointment:
-                appointment_id = appointment.id
-            elif call.lead_id:
-                # Try to get first appointment for this lead
-                first_appt = db.query(Appointment).filter(
-                    Appointment.lead_id == call.lead_id,
-                    Appointment.company_id == company_id
-                ).order_by(Appointment.scheduled_start.desc()).first()
-                if first_appt:
-                    appointment_id = first_appt.id
+            # The outer join already matched any appointment for the lead
+            appointment_id = appointment.id if appointment else None
             
             # Parse objections JSON
             objections_list = None
@@ -272,7 +265,7 @@ def search_calls(
             main_objection = _get_main_objection_label(objections_list)
             
             call_item = AISearchCallItem(
-                call_id=call.call_id,
+                call_id=str(call.call_id),
                 rep_id=call.assigned_rep_id or (appointment.assigned_rep_id if appointment else None),
                 lead_id=call.lead_id,
                 appointment_id=appointment_id,
@@ -355,14 +348,7 @@ def search_calls(
                     )
                 )
         if filters.objection_labels:
-            objection_conditions = []
-            for label in filters.objection_labels:
-                label_escaped = json.dumps(label)
-                objection_conditions.append(
-                    cast(CallAnalysis.objections, String).contains(label_escaped)
-                )
-            if objection_conditions:
-                agg_query = agg_query.filter(or_(*objection_conditions))
+            agg_query = agg_query.filter(_has_objection_labels(db, company_id, filters.objection_labels))
         if filters.sentiment_min is not None:
             agg_query = agg_query.filter(CallAnalysis.sentiment_score >= filters.sentiment_min)
         if filters.sentiment_max is not None:
@@ -14,6 +14,7 @@ from app.middleware.rbac import require_role
 from app.config import settings
 from app.services.uwc_client import get_uwc_client
 from app.services.audit_logger import AuditLogger
+from app.services.objection_index import index_call_analysis
 from app.models.call import Call
 from app.models.call_transcript import CallTranscript
 from app.models.call_analysis import CallAnalysis
@@ -593,6 +594,7 @@ async def process_mock_analysis(db: Session, call_id: int, tenant_id: str, job_i
             conversion_probability=0.70
         )
         db.add(analysis)
+        index_call_analysis(db, analysis)
         db.commit()
         
         logger.info(f"Mock analysis completed",
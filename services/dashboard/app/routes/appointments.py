@@ -16,11 +16,28 @@ from app.models.task import Task, TaskStatus
 from app.schemas.domain import AppointmentDetail, AppointmentResponse, ContactCardBase, LeadSummary
 from app.schemas.appointments import AppointmentListItem, AppointmentListResponse
 from app.schemas.responses import APIResponse, ErrorCodes, create_error_response
+from app.services.appointment_dispatch_service import AppointmentDispatchService, DoubleBookingError
 from app.services.domain_events import emit_domain_event
 
 router = APIRouter(prefix="/api/v1/appointments", tags=["appointments"])
 
 
+def _commit_schedule(request: Request, db: Session, appointment: Appointment) -> None:
+    """Commit an appointment write, or 409 if it double-books the assigned rep."""
+    try:
+        AppointmentDispatchService(db).commit_schedule(appointment.company_id, appointment)
+    except DoubleBookingError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=create_error_response(
+                error_code=ErrorCodes.RESOURCE_CONFLICT,
+                message=str(e),
+                details={"rep_id": e.rep_id, "conflicting_appointment_id": e.conflicting_appointment_id},
+                request_id=getattr(request.state, "trace_id", None),
+            ).dict(),
+        )
+
+
 @router.get("/{appointment_id}", response_model=APIResponse[AppointmentResponse])
 @require_role("manager", "csr", "sales_rep")
 async def get_appointment(
@@ -304,14 +321,14 @@ async def create_appointment(
     )
 
     db.add(appointment)
-    db.commit()
+    _commit_schedule(request, db, appointment)
     db.refresh(appointment)
     db.refresh(lead)
     
     # Auto-geocode address if location is provided
     if appointment.location and not (appointment.geo_lat and appointment.geo_lng):
         from app.services.geocoding_service import geocoding_service
-        coordinates = geocoding_service.geocode_address(
+        coordinates = await geocoding_service.geocode_address_async(
             appointment.location,
             company_id=lead.company_id
         )
@@ -419,7 +436,7 @@ async def update_appointment(
     # Auto-geocode address if location changed and coordinates are missing
     if payload.location and (not appointment.geo_lat or not appointment.geo_lng):
         from app.services.geocoding_service import geocoding_service
-        coordinates = geocoding_service.geocode_address(
+        coordinates = await geocoding_service.geocode_address_async(
             appointment.location,
             company_id=appointment.company_id
         )
@@ -429,7 +446,7 @@ async def update_appointment(
             change_log["geo_lng"] = coordinates[1]
 
     appointment.updated_at = datetime.utcnow()
-    db.commit()
+    _commit_schedule(request, db, appointment)
     db.refresh(appointment)
 
     response = AppointmentResponse(
@@ -464,19 +481,120 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, or_, func
 
+from app.core.pagination import apply_keyset, cached_count, keyset_page
 from app.database import get_db
 from app.middleware.rbac import require_role
 from app.models.appointment import Appointment, AppointmentOutcome, AppointmentStatus
 from app.models.lead import Lead
 from app.models.task import Task, TaskStatus
 from app.schemas.domain import AppointmentDetail, AppointmentResponse, ContactCardBase, LeadSummary
-from app.schemas.appointments import AppointmentListItem, AppointmentListResponse
+from app.schemas.appointments import (
+    AppointmentListItem,
+    AppointmentListResponse,
+    DispatchPreviewResponse,
+    RepAvailabilityResponse,
+)
 from app.schemas.responses import APIResponse, ErrorCodes, create_error_response
+from app.services.appointment_dispatch_service import (
+    AppointmentDispatchError,
+    AppointmentDispatchService,
+    DoubleBookingError,
+)
 from app.services.domain_events import emit_domain_event
 
 router = APIRouter(prefix="/api/v1/appointments", tags=["appointments"])
 
 
+def _commit_schedule(request: Request, db: Session, appointment: Appointment) -> None:
+    """Commit an appointment write, or 409 if it double-books the assigned rep."""
+    try:
+        AppointmentDispatchService(db).commit_schedule(appointment.company_id, appointment)
+    except DoubleBookingError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=create_error_response(
+                error_code=ErrorCodes.RESOURCE_CONFLICT,
+                message=str(e),
+                details={"rep_id": e.rep_id, "conflicting_appointment_id": e.conflicting_appointment_id},
+                request_id=getattr(request.state, "trace_id", None),
+            ).dict(),
+        )
+
+
+# Registered before /{appointment_id} so "availability" is not read as an ID
+@router.get("/availability", response_model=APIResponse[RepAvailabilityResponse])
+@require_role("csr", "manager")
+async def get_rep_availability(
+    request: Request,
+    date: str = Query(..., description="Day (ISO format YYYY-MM-DD, company timezone)"),
+    rep_id: Optional[List[str]] = Query(None, description="Restrict to these reps (repeatable)"),
+    min_window_minutes: int = Query(0, ge=0, le=24 * 60, description="Hide free windows shorter than this"),
+    db: Session = Depends(get_db),
+) -> APIResponse[RepAvailabilityResponse]:
+    """
+    Free windows for every sales rep on a day, for the dispatcher board.
+    
+    **Roles**: csr, manager
+    
+    Each rep's working window is their shift for the day (reps marked off get
+    no windows), else their default shift hours, else 07:00-20:00. Busy time is
+    every scheduled/confirmed appointment assigned to them.
+    """
+    tenant_id = getattr(request.state, "tenant_id", None)
+    day = _parse_day(request, date)
+
+    reps = AppointmentDispatchService(db).get_rep_availability(
+        tenant_id=tenant_id,
+        day=day,
+        rep_ids=rep_id,
+        min_window_minutes=min_window_minutes,
+    )
+    return APIResponse(data=RepAvailabilityResponse(date=day.isoformat(), reps=reps))
+
+
+@router.get("/dispatch/preview", response_model=APIResponse[DispatchPreviewResponse])
+@require_role("csr", "manager")
+async def preview_batch_dispatch(
+    request: Request,
+    date: str = Query(..., description="Day (ISO format YYYY-MM-DD, company timezone)"),
+    rep_id: Optional[List[str]] = Query(None, description="Only dispatch to these reps (repeatable)"),
+    db: Session = Depends(get_db),
+) -> APIResponse[DispatchPreviewResponse]:
+    """
+    Propose reps for all of a day's unassigned booked appointments.
+    
+    **Roles**: csr, manager
+    
+    Minimizes total estimated drive time within each rep's working window and
+    around their existing bookings. Nothing is assigned: apply the proposal
+    with POST /{appointment_id}/assign, which re-checks each assignment.
+    """
+    tenant_id = getattr(request.state, "tenant_id", None)
+    day = _parse_day(request, date)
+
+    preview = await AppointmentDispatchService(db).preview_batch_dispatch(
+        tenant_id=tenant_id,
+        day=day,
+        rep_ids=rep_id,
+    )
+    return APIResponse(data=DispatchPreviewResponse(date=day.isoformat(), **preview))
+
+
+def _parse_day(request: Request, value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=400,
+            detail=create_error_response(
+                error_code=ErrorCodes.INVALID_INPUT,
+                message="Invalid date format. Use YYYY-MM-DD",
+                details={"date": value},
+                request_id=getattr(request.state, "trace_id", None),
+            ).dict(),
+        )
+
+
 @router.get("/{appointment_id}", response_model=APIResponse[AppointmentResponse])
 @require_role("manager", "csr", "sales_rep")
 async def get_appointment(
@@ -559,6 +677,8 @@ async def list_appointments(
     date: Optional[str] = Query(None, description="Date filter (ISO format YYYY-MM-DD, defaults to today)"),
     status: Optional[str] = Query(None, description="Filter by status (scheduled, confirmed, completed, cancelled, no_show)"),
     outcome: Optional[str] = Query(None, description="Filter by outcome (pending, won, lost, no_show, rescheduled)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (default: the whole day)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db),
 ) -> APIResponse[AppointmentListResponse]:
     """
@@ -566,6 +686,8 @@ async def list_appointments(
     
     For reps: defaults to authenticated user's appointments for today.
     For managers: can view all appointments, optionally filtered by rep_id.
+    With limit, pages are ordered by (scheduled_start, id) and continued
+    with the returned next_cursor.
     """
     tenant_id = getattr(request.state, "tenant_id", None)
     user_id = getattr(request.state, "user_id", None)
@@ -645,14 +767,55 @@ async def list_appointments(
                 ).dict(),
             )
     
-    # Order by scheduled_start
-    query = query.order_by(Appointment.scheduled_start.asc())
+    # Total for the day (cached), counted before paging
+    if limit:
+        total = cached_count(
+            query,
+            tenant_id=tenant_id,
+            scope="appointments",
+            filters={"rep_id": rep_id, "date": filter_date, "status": status, "outcome": outcome},
+        )
+    
+    # Order by scheduled_start, id (keyset)
+    try:
+        query = apply_keyset(query, Appointment.scheduled_start, Appointment.id, cursor, descending=False)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=create_error_response(
+                error_code=ErrorCodes.INVALID_INPUT,
+                message=str(e),
+                details={"cursor": cursor},
+                request_id=getattr(request.state, "trace_id", None),
+            ).dict(),
+        )
+    if limit:
+        query = query.limit(limit + 1)
     
     # Eager load relationships
     appointments = query.options(
         selectinload(Appointment.contact_card),
         selectinload(Appointment.lead),
     ).all()
+    next_cursor = None
+    if limit:
+        appointments, next_cursor = keyset_page(
+            appointments, limit, key=lambda appointment: (appointment.scheduled_start, appointment.id)
+        )
+    else:
+        total = len(appointments)
+    
+    # Pending task counts for the whole page in one grouped query
+    pending_by_appointment = {}
+    appointment_ids = [appointment.id for appointment in appointments]
+    if appointment_ids:
+        pending_by_appointment = dict(
+            db.query(Task.appointment_id, func.count(Task.id)).filter(
+                Task.appointment_id.in_(appointment_ids),
+                Task.company_id == tenant_id,
+                Task.status.in_([TaskStatus.OPEN, TaskStatus.OVERDUE])
+            ).group_by(Task.appointment_id).all()
+        )
     
     # Build response items
     appointment_items = []
@@ -667,15 +830,7 @@ async def list_appointments(
                 name_parts.append(appointment.contact_card.last_name)
             customer_name = " ".join(name_parts) if name_parts else None
         
-        # Count pending tasks (cheap query)
-        pending_tasks_count = None
-        if appointment.id:
-            pending_count = db.query(func.count(Task.id)).filter(
-                Task.appointment_id == appointment.id,
-                Task.company_id == tenant_id,
-                Task.status.in_([TaskStatus.OPEN, TaskStatus.OVERDUE])
-            ).scalar()
-            pending_tasks_count = pending_count or 0
+        pending_tasks_count = pending_by_appointment.get(appointment.id, 0)
         
         # Determine if assigned to requesting user
         is_assigned_to_me = appointment.assigned_rep_id == user_id if user_id else False
@@ -699,8 +854,9 @@ async def list_appointments(
     
     response = AppointmentListResponse(
         appointments=appointment_items,
-        total=len(appointment_items),
+        total=total,
         date=filter_date.isoformat(),
+        next_cursor=next_cursor,
     )
     
     return APIResponse(data=response)
@@ -760,14 +916,14 @@ async def create_appointment(
     )
 
     db.add(appointment)
-    db.commit()
+    _commit_schedule(request, db, appointment)
     db.refresh(appointment)
     db.refresh(lead)
     
     # Auto-geocode address if location is provided
     if appointment.location and not (appointment.geo_lat and appointment.geo_lng):
         from app.services.geocoding_service import geocoding_service
-        coordinates = geocoding_service.geocode_address(
+        coordinates = await geocoding_service.geocode_address_async(
             appointment.location,
             company_id=lead.company_id
         )
@@ -875,7 +1031,7 @@ async def update_appointment(
     # Auto-geocode address if location changed and coordinates are missing
     if payload.location and (not appointment.geo_lat or not appointment.geo_lng):
         from app.services.geocoding_service import geocoding_service
-        coordinates = geocoding_service.geocode_address(
+        coordinates = await geocoding_service.geocode_address_async(
             appointment.location,
             company_id=appointment.company_id
         )
@@ -885,7 +1041,7 @@ async def update_appointment(
             change_log["geo_lng"] = coordinates[1]
 
     appointment.updated_at = datetime.utcnow()
-    db.commit()
+    _commit_schedule(request, db, appointment)
     db.refresh(appointment)
 
     response = AppointmentResponse(
@@ -6,7 +6,7 @@ from app.models.appointment import Appointment
 from app.models.lead import Lead
 from sqlalchemy.orm import Session, selectinload, joinedload
 import json
-from sqlalchemy import func, text, and_, or_, cast, Date
+from sqlalchemy import func, text, and_, or_, case, cast, Date
 from datetime import datetime, timedelta
 from typing import List, Optional
 from pydantic import BaseModel, Field
@@ -14,9 +14,13 @@ from app.services.bland_ai import BlandAI
 from app.middleware.rbac import require_role
 from app.middleware.tenant import get_tenant_id
 from app.schemas.responses import APIResponse
+from app.services.redis_service import redis_service
+from app.config import settings
 
 router = APIRouter(prefix="/api/v1")
 
+DASHBOARD_METRICS_CACHE_KEY = "dashboard_metrics"
+
 @router.post("/add-company")
 @require_role("manager")  # Only managers can create companies
 async def add_company(request: Request, db: Session = Depends(get_db)):
@@ -90,78 +94,61 @@ async def get_dashboard_metrics(
             status_code=403,
             detail="Access denied: company_id does not match your organization"
         )
-    # Get base query for company's calls
-    base_query = db.query(call.Call).filter_by(company_id=company_id)
-    
-    # Calculate total value lost from price_if_bought for lost sales
-    value_lost = db.query(func.coalesce(func.sum(call.Call.price_if_bought), 0))\
-        .filter(
-            call.Call.company_id == company_id,
-            call.Call.booked == True,
-            call.Call.bought == False,
-            call.Call.reason_for_lost_sale.isnot(None),
-            call.Call.price_if_bought.isnot(None)
-        ).scalar()
-    
-    # Add still deciding count
-    still_deciding_count = db.query(call.Call).filter(
-        call.Call.company_id == company_id,
-        call.Call.still_deciding == True
-    ).count()
+    # Counters are cached per tenant for a few seconds; dashboards poll this
+    use_cache = settings.DASHBOARD_METRICS_CACHE_TTL > 0
+    if use_cache:
+        cached = redis_service.get_cache(DASHBOARD_METRICS_CACHE_KEY, tenant_id=company_id)
+        if cached is not None:
+            return cached
 
-    # Count calls with transcript discrepancies defined
-    calls_with_discrepancies = db.query(call.Call).filter(
-        call.Call.company_id == company_id,
-        call.Call.transcript_discrepancies.isnot(None)
-    ).all()
-    
-    # Count calls where has_discrepancies is true
-    discrepancies_count = 0
-    for c in calls_with_discrepancies:
-        try:
-            discrepancy_data = json.loads(c.transcript_discrepancies)
-            if discrepancy_data.get("has_discrepancies") == True:
-                discrepancies_count += 1
-        except (json.JSONDecodeError, TypeError):
-            # Skip if JSON is invalid or transcript_discrepancies is not a string
-            pass
+    metrics = _dashboard_counters(db, company_id)
+
+    if use_cache:
+        redis_service.set_cache(
+            DASHBOARD_METRICS_CACHE_KEY, metrics,
+            ttl=settings.DASHBOARD_METRICS_CACHE_TTL, tenant_id=company_id
+        )
+    return metrics
+
+
+def _dashboard_counters(db: Session, company_id: str) -> dict:
+    """All dashboard counters for a company in one pass over its calls."""
+    Call = call.Call
+    lost_quote = and_(Call.booked == True, Call.bought == False, Call.reason_for_lost_sale.isnot(None))
+
+    def count_where(*conditions):
+        return func.count(case((and_(*conditions), 1)))
 
-    metrics = {
-        "still_deciding": base_query.filter_by(booked=True, still_deciding=True).count(),
-        "awaiting_quote": base_query.filter_by(booked=True, bought=False, still_deciding=False, cancelled=False, reason_for_lost_sale=None).count(),
-        "purchased_service": base_query.filter_by(bought=True, cancelled=False).count(),
-        "missed_calls": base_query.filter_by(missed_call=True, cancelled=False).count(),
-        "cancelled_appointments": base_query.filter_by(cancelled=True).count(),
-        "discrepancies": discrepancies_count,
+    row = db.query(
+        count_where(Call.booked == True, Call.still_deciding == True).label("still_deciding"),
+        count_where(
+            Call.booked == True, Call.bought == False, Call.still_deciding == False,
+            Call.cancelled == False, Call.reason_for_lost_sale.is_(None)
+        ).label("awaiting_quote"),
+        count_where(Call.bought == True, Call.cancelled == False).label("purchased_service"),
+        count_where(Call.missed_call == True, Call.cancelled == False).label("missed_calls"),
+        count_where(Call.cancelled == True).label("cancelled_appointments"),
+        count_where(Call.has_discrepancies == True).label("discrepancies"),
+        count_where(lost_quote).label("lost_quotes"),
+        func.coalesce(
+            func.sum(case((and_(lost_quote, Call.price_if_bought.isnot(None)), Call.price_if_bought))), 0
+        ).label("value_lost"),
+        count_where(Call.still_deciding == True).label("still_deciding_count"),
+    ).filter(Call.company_id == company_id).one()
+
+    return {
+        "still_deciding": row.still_deciding,
+        "awaiting_quote": row.awaiting_quote,
+        "purchased_service": row.purchased_service,
+        "missed_calls": row.missed_calls,
+        "cancelled_appointments": row.cancelled_appointments,
+        "discrepancies": row.discrepancies,
         "lost_quotes": {
-            "total": base_query.filter(
-                call.Call.booked == True,
-                call.Call.bought == False,
-                call.Call.reason_for_lost_sale.isnot(None)
-            ).count(),
-            "value_lost": float(value_lost or 0),  # Convert to float and handle None
-            # "reasons": {
-            #     "budget_constraints": base_query.filter(
-            #         call.Call.reason_for_lost_sale.ilike('%budget%')
-            #     ).count(),
-            #     "changed_mind": base_query.filter(
-            #         call.Call.reason_for_lost_sale.ilike('%changed mind%')
-            #     ).count(),
-            #     "chose_competitor": base_query.filter(
-            #         call.Call.reason_for_lost_sale.ilike('%competitor%')
-            #     ).count(),
-            #     "decided_to_postpone": base_query.filter(
-            #         call.Call.reason_for_lost_sale.ilike('%postpone%')
-            #     ).count(),
-            #     "insurance_denied": base_query.filter(
-            #         call.Call.reason_for_lost_sale.ilike('%insurance%')
-            #     ).count(),
-            # }
+            "total": row.lost_quotes,
+            "value_lost": float(row.value_lost or 0),
         },
-        "still_deciding_count": still_deciding_count
+        "still_deciding_count": row.still_deciding_count,
     }
-    
-    return metrics
 
 
 class BookingRateDataPoint(BaseModel):
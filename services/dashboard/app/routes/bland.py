@@ -291,6 +291,7 @@ async def bland_callback(
                         # Parse the response and store the analysis
                         analysis = json.loads(response.choices[0].message.content.replace("```json","").replace("```","").strip())
                         call_record.transcript_discrepancies = json.dumps(analysis)
+                        call_record.has_discrepancies = isinstance(analysis, dict) and analysis.get("has_discrepancies") is True
                         print(f"Stored transcript discrepancy analysis for call {original_call_id}")
 
                     except Exception as e:
@@ -14,6 +14,9 @@ from app.middleware.rate_limiter import limits
 from app.services.idempotency import with_idempotency
 from app.realtime.bus import emit
 from app.services.domain_entities import ensure_contact_card_and_lead
+from app.obs.logging import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -22,7 +25,7 @@ router = APIRouter()
 async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
     # Get query parameters
     params = dict(request.query_params)
-    print(params)
+    logger.debug(f"CallRail pre-call params: {params}")
     
     # Extract tenant_id from middleware
     tenant_id = getattr(request.state, 'tenant_id', None)
@@ -40,8 +43,7 @@ async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
         if not company_record:
             raise HTTPException(status_code=404, detail=f"No company found for tracking number {tracking_number}")
         
-        print(f"Company found: {company_record.name} with ID: {company_record.id}")
-        
+        logger.debug(f"Company found: {company_record.name} with ID: {company_record.id}")
         # Check if caller exists in leads or customers DB by phone number
         caller_phone = params.get("callernum")
         existing_call = db.query(call.Call).filter_by(
@@ -56,7 +58,7 @@ async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
         )
 
         if existing_call:
-            print(f"Existing call found for {caller_phone}, updating...")
+            logger.debug(f"Existing call found for {caller_phone}, updating...")
             # Update existing call record
             existing_call.missed_call = params.get("answered", "true").lower() != "true"
             existing_call.updated_at = datetime.utcnow()
@@ -65,7 +67,7 @@ async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
             db.commit()
             call_id = existing_call.call_id
         else:
-            print(f"New caller {caller_phone}, creating new call record...")
+            logger.debug(f"New caller {caller_phone}, creating new call record...")
             # Create new call record (auto-creates lead)
             new_call = call.Call(
                 phone_number=caller_phone,
@@ -79,12 +81,11 @@ async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
             db.commit()
             db.refresh(new_call)
             call_id = new_call.call_id
-            print(f"New call created: {call_id}")
-        
+            logger.debug(f"New call created: {call_id}")
         # Handle missed call SMS if call was not answered
         is_answered = params.get("answered", "true").lower() == "true"
         if not is_answered:
-            print(f"Missed call detected for {caller_phone}, sending auto-SMS...")
+            logger.debug(f"Missed call detected for {caller_phone}, sending auto-SMS...")
             try:
                 from app.services.twilio_service import twilio_service
                 sms_result = twilio_service.send_sms(
@@ -93,12 +94,11 @@ async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
                     from_number=company_record.phone_number
                 )
                 if sms_result.get("success"):
-                    print(f"Auto-SMS sent successfully to {caller_phone}")
+                    logger.debug(f"Auto-SMS sent successfully to {caller_phone}")
                 else:
-                    print(f"Failed to send auto-SMS: {sms_result.get('error')}")
+                    logger.error(f"Failed to send auto-SMS: {sms_result.get('error')}")
             except Exception as e:
-                print(f"Error sending missed call SMS: {str(e)}")
-        
+                logger.error(f"Error sending missed call SMS: {str(e)}")
         # Emit real-time event
         emit(
             event_name="telephony.call.received",
@@ -128,18 +128,14 @@ async def pre_call_webhook(request: Request, db: Session = Depends(get_db)):
 @limits(tenant="30/minute")  # Stricter limit for CallRail webhooks
 async def call_complete_webhook(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Handle CallRail Post-Call webhook - can be JSON body or query params"""
-    print("================= CALL COMPLETE WEBHOOK ==================")
-    
     # Try to get data from JSON body first, then query params
     try:
         call_data = await request.json()
-        print(f"Received JSON body: {call_data}")
+        logger.debug(f"CallRail call-complete JSON body: {call_data}")
     except:
         # Fallback to query params if no JSON body
         call_data = dict(request.query_params)
-        print(f"Received query params: {call_data}")
-    
-    print(f"Full call_data: {call_data}")
+        logger.debug(f"CallRail call-complete query params: {call_data}")
     
     # Extract tenant_id from middleware (for webhooks, we may need to derive from call_data)
     tenant_id = "webhook_tenant"  # TODO: Implement proper tenant resolution for webhooks
@@ -165,7 +161,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
     
     if not call_record:
         raise HTTPException(status_code=404, detail="Call not found")
-    print(f"Call record: {call_record.call_id}")
+    logger.debug(f"Call record: {call_record.call_id}")
     # Ensure contact + lead context is attached
     contact_card, lead = ensure_contact_card_and_lead(
         db,
@@ -183,11 +179,10 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
     
     # Route missed calls to missed call queue service
     if not is_answered:
-        print(f"⚠️⚠️⚠️ MISSED CALL DETECTED ⚠️⚠️⚠️")
-        print(f"Call ID: {call_record.call_id}")
-        print(f"Phone: {call_record.phone_number}")
-        print(f"Company ID: {call_record.company_id}")
-        print(f"Routing to missed call queue...")
+        logger.info(
+            f"Missed call detected, routing to missed call queue: {call_record.call_id}",
+            extra={"company_id": call_record.company_id}
+        )
         from app.services.missed_call_queue_service import MissedCallQueueService
         missed_call_service = MissedCallQueueService()
         background_tasks.add_task(
@@ -199,9 +194,9 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
         )
         # Update status
         call_record.status = "missed"
-        print(f"✅ Missed call queued successfully")
+        logger.debug(f"Missed call queued: {call_record.call_id}")
     else:
-        print(f"✅ Call was answered - not a missed call")
+        logger.debug(f"Call was answered - not a missed call: {call_record.call_id}")
         call_record.status = "completed"
     
     # Extract information using LLM
@@ -227,7 +222,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
             )
             
             is_sales_call = json.loads(sales_check_response.choices[0].message.content.replace("```json","").replace("```","").strip())['is_sales_call'] == True
-            print(is_sales_call)
+            logger.debug(f"Sales call check for {call_record.call_id}: {is_sales_call}")
             
             # Only proceed with information extraction if it's a sales call
             if is_sales_call:
@@ -306,8 +301,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                             call.Call.company_id==company_record.id)\
                         .order_by(call.Call.created_at.desc())\
                         .first()
-                    print("previous call id: ", previous_call.call_id)
-                    print("current call id: ", call_record.call_id)
+                    logger.debug(f"Previous call id: {previous_call.call_id}, current call id: {call_record.call_id}")
                     if previous_call:
                        
                         # Calculate the new date using the same logic
@@ -336,10 +330,9 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                                             f"{bland_ai.BASE_URL}/calls/{call_info['call_id']}/stop",
                                             headers=bland_ai.headers
                                         )
-                                        print(f"Stopped call {call_info['call_id']}: {stop_response.json()}")
+                                        logger.debug(f"Stopped call {call_info['call_id']}: {stop_response.json()}")
                                     except Exception as e:
-                                        print(f"Error stopping call {call_info['call_id']}: {str(e)}")
-                        
+                                        logger.error(f"Error stopping call {call_info['call_id']}: {str(e)}")
                         # Schedule new follow-up call for the new date if available
                         if calculated_date:
                             calculated_date = calculated_date + timedelta(hours=2)
@@ -347,8 +340,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                         # Update all relevant fields from the new conversation
                         if calculated_date:
                             previous_call.quote_date = calculated_date
-                            print(f"Updated previous call {previous_call.call_id} quote date to {calculated_date}")
-                        
+                            logger.debug(f"Updated previous call {previous_call.call_id} quote date to {calculated_date}")
                         # Update all extracted information
                         if extracted_info.get("address"):
                             previous_call.address = extracted_info["address"]
@@ -364,7 +356,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                         previous_call.still_deciding = extracted_info.get("still_deciding", previous_call.still_deciding)
                         previous_call.reason_for_deciding = extracted_info.get("reason_for_deciding")
                         
-                        print(f"Successfully updated all relevant data for rescheduled call {previous_call.call_id}")
+                        logger.debug(f"Successfully updated all relevant data for rescheduled call {previous_call.call_id}")
                         db.delete(call_record)
                 if call_record.cancelled:
                     previous_call = db.query(call.Call)\
@@ -399,10 +391,9 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                                             f"{bland_ai.BASE_URL}/calls/{call_info['call_id']}/stop",
                                             headers=bland_ai.headers
                                         )
-                                        print(f"Stopped call {call_info['call_id']}: {stop_response.json()}")
+                                        logger.debug(f"Stopped call {call_info['call_id']}: {stop_response.json()}")
                                     except Exception as e:
-                                        print(f"Error stopping call {call_info['call_id']}: {str(e)}")
-                    
+                                        logger.error(f"Error stopping call {call_info['call_id']}: {str(e)}")
                     # Update status flags
                     previous_call.cancelled = True
                     previous_call.rescheduled = False
@@ -411,7 +402,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                     previous_call.still_deciding = extracted_info.get("still_deciding", previous_call.still_deciding)
                     previous_call.reason_for_deciding = extracted_info.get("reason_for_deciding")
                     
-                    print(f"Successfully updated all relevant data for cancelled call {previous_call.call_id}")
+                    logger.debug(f"Successfully updated all relevant data for cancelled call {previous_call.call_id}")
                     db.delete(call_record)
                 else:            
                     # Calculate the actual date using DateCalculator
@@ -427,7 +418,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                         # Update contact card address
                         if contact_card:
                             contact_card.address = extracted_info["address"]
-                        print(f"Address: {call_record.address}")
+                        logger.debug(f"Address: {call_record.address}")
                     if extracted_info.get("name"):
                         call_record.name = extracted_info["name"]
                         # Update contact card name if not already set
@@ -438,16 +429,15 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                                 contact_card.last_name = name_parts[1]
                             else:
                                 contact_card.first_name = name_parts[0]
-                        print(f"Name: {call_record.name}")
+                        logger.debug(f"Name: {call_record.name}")
                     if extracted_info.get("quote_date"):
                         try:
                             call_record.quote_date = datetime.strptime(extracted_info["quote_date"], "%Y-%m-%d %H:%M:%S")
                         except ValueError:
-                            print(f"Error parsing date: {extracted_info['quote_date']}")
+                            logger.warning(f"Error parsing date: {extracted_info['quote_date']}")
                     if extracted_info.get("problem"):
                         call_record.problem = extracted_info["problem"]
-                        print(f"Problem: {call_record.problem}")
-                    
+                        logger.debug(f"Problem: {call_record.problem}")
                     # Update booking status
                     if extracted_info.get("is_booked"):
                         call_record.booked = True
@@ -458,8 +448,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
                             background_tasks.add_task(create_geofence_for_call, call_record.call_id, db)
 
         except Exception as e:
-            print(f"Error processing transcript with LLM: {str(e)}")
-
+            logger.error(f"Error processing transcript with LLM: {str(e)}")
     # After extracting information and before committing...
     # Continue with existing commit
     db.commit()
@@ -489,21 +478,20 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
     )
     
     # Add detailed logging for debugging
-    print(f"=== CALL COMPLETE SUMMARY ===")
-    print(f"Call ID: {call_record.call_id}")
-    print(f"Name: {call_record.name}")
-    print(f"Phone: {call_record.phone_number}")
-    print(f"Address: {call_record.address}")
-    print(f"Company ID: {call_record.company_id}")
-    print(f"Quote Date: {call_record.quote_date}")
-    print(f"Booked: {call_record.booked}")
-    print(f"Cancelled: {call_record.cancelled}")
-    print(f"Rescheduled: {call_record.rescheduled}")
-    print(f"Missed Call: {call_record.missed_call}")
-    print(f"Still Deciding: {call_record.still_deciding}")
-    print(f"Bought: {call_record.bought}")
-    print(f"Assigned Rep ID: {call_record.assigned_rep_id}")
-    print(f"========================")
+    logger.debug(
+        f"Call complete summary for {call_record.call_id}",
+        extra={
+            "company_id": call_record.company_id,
+            "quote_date": str(call_record.quote_date),
+            "booked": call_record.booked,
+            "cancelled": call_record.cancelled,
+            "rescheduled": call_record.rescheduled,
+            "missed_call": call_record.missed_call,
+            "still_deciding": call_record.still_deciding,
+            "bought": call_record.bought,
+            "assigned_rep_id": call_record.assigned_rep_id,
+        }
+    )
     
     return {"status": "processed", "call_id": call_record.call_id}
     
@@ -520,8 +508,7 @@ async def call_complete_webhook(request: Request, background_tasks: BackgroundTa
 @router.post("/call-modified")
 async def call_modified_webhook(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     params = dict(request.query_params)
-    print(f"=================== CALL MODIFIED WEBHOOK ===================")
-    print(f"Call modified params: {params}")
+    logger.debug(f"CallRail call-modified params: {params}")
     
     # Extract tenant_id from middleware
     tenant_id = "webhook_tenant"  # TODO: Implement proper tenant resolution for webhooks
@@ -532,23 +519,22 @@ async def call_modified_webhook(request: Request, background_tasks: BackgroundTa
     def process_webhook():
         # If params are empty, just return success (all data already processed in call-complete)
         if not params:
-            print("No parameters provided in call-modified webhook - this is normal")
+            logger.debug("No parameters provided in call-modified webhook - this is normal")
             return {"status": "processed", "message": "No parameters provided"}
     
     # Use tracking number to identify relevant company (same as call-complete)
     tracking_number = params.get("trackingnum")
     if not tracking_number:
-        print(f"Error: Missing tracking number in request params: {params}")
+        logger.warning(f"Missing tracking number in request params: {params}")
         return {"status": "success", "message": "Missing tracking number but continuing"}
     
     # Continue with the rest of the processing
     company_record = db.query(company.Company).filter_by(phone_number=tracking_number).first()
     if not company_record:
-        print(f"Error: No company found for tracking number: {tracking_number}")
+        logger.warning(f"No company found for tracking number: {tracking_number}")
         return {"status": "success", "message": f"No company found for tracking number {tracking_number}"}
     
-    print(f"Company found: {company_record.name} with ID: {company_record.id}")
-    
+    logger.debug(f"Company found: {company_record.name} with ID: {company_record.id}")
     call_record = db.query(call.Call)\
         .filter_by(
             phone_number=params.get("customer_phone_number"),
@@ -558,11 +544,10 @@ async def call_modified_webhook(request: Request, background_tasks: BackgroundTa
         .first()
     
     if not call_record:
-        print(f"Error: No call found for phone: {params.get('customer_phone_number')} and company: {company_record.id}")
+        logger.warning(f"No call found for phone: {params.get('customer_phone_number')} and company: {company_record.id}")
         return {"status": "success", "message": "Call not found but continuing"}
     
-    print(f"Call record found: {call_record.call_id}")
-    
+    logger.debug(f"Call record found: {call_record.call_id}")
     # Only update transcript if it's not already present
     if not call_record.transcript and params.get("transcription"):
         call_record.transcript = params.get("transcription")
@@ -653,15 +638,15 @@ async def call_modified_webhook(request: Request, background_tasks: BackgroundTa
                     # Update call record with extracted information
                     if extracted_info.get("address"):
                         call_record.address = extracted_info["address"]
-                        print(f"Address: {call_record.address}")
+                        logger.debug(f"Address: {call_record.address}")
                     if extracted_info.get("name"):
                         call_record.name = extracted_info["name"]
-                        print(f"Name: {call_record.name}")
+                        logger.debug(f"Name: {call_record.name}")
                     if extracted_info.get("quote_date"):
                         try:
                             call_record.quote_date = datetime.strptime(extracted_info["quote_date"], "%Y-%m-%d %H:%M:%S")
                         except ValueError:
-                            print(f"Error parsing date: {extracted_info['quote_date']}")
+                            logger.warning(f"Error parsing date: {extracted_info['quote_date']}")
                             pass
                     
                     # Update booking status
@@ -677,8 +662,7 @@ async def call_modified_webhook(request: Request, background_tasks: BackgroundTa
 
             except Exception as e:
                 # Log the error but don't fail the request
-                print(f"Error processing transcript with LLM: {str(e)}")
-
+                logger.error(f"Error processing transcript with LLM: {str(e)}")
         db.commit()
         return {"status": "processed", "message": "Call modified successfully"}
     
@@ -261,28 +261,13 @@ async def update_call_status(request: Request, background_tasks: BackgroundTasks
     
     # Remove geofence if needed
     if should_remove_geofence and call_record.assigned_rep_id:
-        # If a call has assigned rep and geofence needs to be removed
-        from app.models.sales_rep import SalesRep
+        from app.services.geofence_service import GeofenceService
         
-        sales_rep = db.query(SalesRep).filter(SalesRep.user_id == call_record.assigned_rep_id).first()
-        if sales_rep and sales_rep.active_geofences:
-            # If rep has active geofences, filter out this call's geofence
-            active_geofences = sales_rep.active_geofences
-            if isinstance(active_geofences, list):
-                # Check if we actually have a geofence for this call
-                had_geofence = any(g.get("call_id") == call_record.call_id for g in active_geofences)
-                
-                if had_geofence:
-                    # Remove geofence for this call
-                    active_geofences = [g for g in active_geofences if g.get("call_id") != call_record.call_id]
-                    
-                    # Update sales rep
-                    sales_rep.active_geofences = active_geofences
-                    
-                    # Clear geofence data from the call
-                    call_record.geofence = None
-                    
-                    print(f"Removed geofence for call {call_record.call_id} from rep {sales_rep.user_id}")
+        if GeofenceService(db).deactivate_call(call_record.call_id):
+            # Clear geofence data from the call
+            call_record.geofence = None
+            
+            logger.info(f"Removed geofence for call {call_record.call_id} from rep {call_record.assigned_rep_id}")
     
     # Save changes
     db.commit()
@@ -99,7 +99,7 @@ async def handle_call_incoming(
     """
     try:
         data = await request.json()
-        logger.info(f"CallRail call.incoming webhook: {data}")
+        logger.debug(f"CallRail call.incoming webhook: {data}")
         
         # Extract call data
         call_id = data.get("call_id")
@@ -187,7 +187,7 @@ async def handle_call_answered(
     """
     try:
         data = await request.json()
-        logger.info(f"CallRail call.answered webhook: {data}")
+        logger.debug(f"CallRail call.answered webhook: {data}")
         
         # Extract call data
         customer_phone = data.get("customer_phone_number") or data.get("callernum") or data.get("caller_number")
@@ -256,7 +256,7 @@ async def handle_call_missed(
     """
     try:
         data = await request.json()
-        logger.info(f"CallRail call.missed webhook: {data}")
+        logger.debug(f"CallRail call.missed webhook: {data}")
         
         # Extract call data
         customer_phone = data.get("customer_phone_number") or data.get("callernum") or data.get("caller_number")
@@ -329,7 +329,7 @@ async def handle_call_completed(
     """
     try:
         data = await request.json()
-        logger.info(f"CallRail call.completed webhook: {data}")
+        logger.debug(f"CallRail call.completed webhook: {data}")
         
         # Extract call data from webhook
         resource_id = data.get("resource_id")  # CallRail call ID (e.g., "CAL019a4be69ef4764db2d8ac1d6b21ee00")
@@ -1,4 +1,5 @@
 import enum
+import re
 from datetime import datetime
 from typing import Optional, Literal
 
@@ -405,6 +406,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_
 
+from app.core.pagination import apply_keyset, cached_count, keyset_page
 from app.database import get_db
 from app.middleware.rbac import require_role
 from app.models.contact_card import ContactCard
@@ -677,11 +679,17 @@ async def list_leads(
     date_to: Optional[datetime] = Query(None, description="Filter leads created before this date"),
     search: Optional[str] = Query(None, description="Search by name or phone number"),
     limit: int = Query(50, ge=1, le=200, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (ignored when cursor is given)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(True, description="Include the (cached) total count"),
     db: Session = Depends(get_db),
 ) -> APIResponse[dict]:
     """
     List leads with optional filters.
+
+    Pages are ordered by (created_at, id) newest first. Pass the returned
+    next_cursor to fetch the following page; offset is kept for older
+    clients but gets slower the deeper the page.
     """
     tenant_id = getattr(request.state, "tenant_id", None)
     
@@ -731,26 +739,42 @@ async def list_leads(
     if date_to:
         query = query.filter(Lead.created_at <= date_to)
     
-    # Search by name or phone
+    # Search by name or phone (trigram-indexed on PostgreSQL)
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                ContactCard.first_name.ilike(search_term),
-                ContactCard.last_name.ilike(search_term),
-                ContactCard.primary_phone.ilike(search_term),
-                ContactCard.secondary_phone.ilike(search_term),
-            )
-        )
+        query = query.filter(_lead_search_filter(search))
     
     # Get total count before pagination
-    total_count = query.count()
+    total_count = None
+    if include_total:
+        total_count = cached_count(
+            query,
+            tenant_id=tenant_id,
+            scope="leads",
+            filters={
+                "status": status, "rep_id": rep_id, "source": source,
+                "date_from": date_from, "date_to": date_to, "search": search,
+            },
+        )
     
-    # Apply pagination
-    query = query.order_by(Lead.created_at.desc()).offset(offset).limit(limit)
+    # Apply pagination: keyset on (created_at, id), fetching one extra row to detect a next page
+    try:
+        query = apply_keyset(query, Lead.created_at, Lead.id, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=create_error_response(
+                error_code=ErrorCodes.INVALID_INPUT,
+                message=str(e),
+                details={"cursor": cursor},
+                request_id=getattr(request.state, "trace_id", None),
+            ).dict(),
+        )
+    if not cursor and offset:
+        query = query.offset(offset)
     
     # Eager load contact cards
-    leads = query.options(selectinload(Lead.contact_card)).all()
+    rows = query.limit(limit + 1).options(selectinload(Lead.contact_card)).all()
+    leads, next_cursor = keyset_page(rows, limit, key=lambda lead: (lead.created_at, lead.id))
     
     # Build response items
     lead_items = []
@@ -786,13 +810,34 @@ async def list_leads(
         "total": total_count,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
     }
     
     return APIResponse(data=response)
 
 
+def _lead_search_filter(search: str):
+    """
+    Name/phone search predicate.
 
-
+    Names match case-insensitively anywhere; phones are stored normalized, so
+    the term is reduced to its digits ("(555) 123-45" -> "55512345") before
+    matching phone columns. Both shapes are served by the pg_trgm GIN indexes
+    on contact_cards.
+    """
+    name_term = f"%{search.strip()}%"
+    conditions = [
+        ContactCard.first_name.ilike(name_term),
+        ContactCard.last_name.ilike(name_term),
+    ]
+    digits = re.sub(r"\D", "", search)
+    if digits:
+        phone_term = f"%{digits}%"
+        conditions += [
+            ContactCard.primary_phone.like(phone_term),
+            ContactCard.secondary_phone.like(phone_term),
+        ]
+    return or_(*conditions)
 
 
 def parse_date_param(date_str: Optional[str]) -> Optional[datetime]:
@@ -69,15 +69,8 @@ async def get_metrics():
     
     This endpoint is scraped by Prometheus/Grafana every 15-60 seconds.
     """
-    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-    
-    # Generate metrics in Prometheus format
-    metrics_output = generate_latest(metrics.registry)
-    
-    return Response(
-        content=metrics_output,
-        media_type=CONTENT_TYPE_LATEST
-    )
+    # Aggregated across worker processes when PROMETHEUS_MULTIPROC_DIR is set
+    return metrics.get_metrics_response()
 
 
 
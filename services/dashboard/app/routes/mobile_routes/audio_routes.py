@@ -1,4 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any
 import os
@@ -15,6 +15,9 @@ from app.models.transcript_analysis import TranscriptAnalysis
 from app.services.transcript_analysis import TranscriptAnalyzer
 from app.middleware.rate_limiter import limits
 from app.middleware.rbac import require_role
+from app.services import mobile_recording_store
+from app.services.storage import StorageException, storage_service
+from app.tasks.asr_tasks import process_recording_audio
 import logging
 
 router = APIRouter(prefix="/audio", tags=["audio"])
@@ -22,25 +25,12 @@ router = APIRouter(prefix="/audio", tags=["audio"])
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Initialize UWC client lazily (only when needed)
 from app.config import settings
-from app.services.uwc_client import UWCClient
-# Initialize UWC client lazily (only when needed)
-uwc_client = None
-
-def get_uwc_client():
-    """Get UWC client, creating it if needed."""
-    global uwc_client
-    if uwc_client is None:
-        uwc_client = UWCClient()
-    return uwc_client
-
-# In-memory storage for transcripts (replace with database in production)
-transcripts = {}
 
 @router.post("/start-recording")
 @require_role("sales_rep")
 async def start_recording(
+    request: Request,
     trigger_type: str,  # "location", "time", "both", or "manual"
     call_id: int,
     scheduled_time: Optional[datetime] = None,
@@ -56,15 +46,16 @@ async def start_recording(
     
     logger.info(f"Starting recording with trigger_type={trigger_type}, call_id={call_id}")
     
-    # Store recording info in memory
-    transcripts[recording_id] = {
+    # Session state lives in the shared store so any worker can serve the follow-up requests
+    mobile_recording_store.create_session(recording_id, {
         "status": "pending",
         "trigger_type": trigger_type,
         "scheduled_time": scheduled_time,
         "location_trigger": location_trigger,
         "call_id": call_id,
+        "company_id": getattr(request.state, "tenant_id", None),
         "created_at": datetime.utcnow()
-    }
+    })
     
     # Update the call record to track recording started
     try:
@@ -95,49 +86,66 @@ async def start_recording(
 @router.post("/upload/{recording_id}")
 @require_role("sales_rep")
 async def upload_audio(
+    request: Request,
     recording_id: str,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
     """
-    Upload audio file and process it with UWC ASR
+    Upload audio file and queue it for UWC ASR processing
     """
-    if recording_id not in transcripts:
-        raise HTTPException(status_code=404, detail="Recording session not found")
+    session_state = _get_session_or_404(request, recording_id)
+    
+    if not settings.ENABLE_UWC_ASR:
+        logger.warning("UWC ASR is disabled - no transcription available")
+        mobile_recording_store.update_session(recording_id, status="error", error="Transcription service not configured")
+        raise HTTPException(status_code=503, detail="Transcription service not configured")
     
-    # Save the uploaded file temporarily
-    temp_path = f"/tmp/{recording_id}_{file.filename}"
+    # Upload to S3 so the processing task can run on any worker
     try:
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Process audio in background
-        background_tasks.add_task(process_audio, recording_id, temp_path, db)
-        
-        # Update call with recording stopped timestamp
-        try:
-            call_id = transcripts[recording_id].get("call_id")
-            if call_id:
-                call = db.query(Call).filter(Call.call_id == call_id).first()
-                if call:
-                    now = datetime.utcnow()
-                    call.recording_stopped_ts = now
+        audio_url = await storage_service.upload_file(
+            file.file,
+            f"{recording_id}_{file.filename}",
+            tenant_id=session_state["company_id"],
+            file_type="audio",
+            content_type=file.content_type
+        )
+    except StorageException as e:
+        logger.error(f"Audio upload failed for recording {recording_id}: {e}")
+        mobile_recording_store.update_session(recording_id, status="error", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    mobile_recording_store.update_session(recording_id, status="processing", audio_url=audio_url)
+    process_recording_audio.delay(recording_id, audio_url)
+    
+    # Update call with recording stopped timestamp
+    try:
+        call_id = session_state.get("call_id")
+        if call_id:
+            call = db.query(Call).filter(Call.call_id == call_id).first()
+            if call:
+                now = datetime.utcnow()
+                call.recording_stopped_ts = now
+                
+                # Calculate recording duration if we have a start time
+                if call.recording_started_ts:
+                    duration_seconds = (now - call.recording_started_ts).total_seconds()
+                    call.recording_duration_s = int(duration_seconds)
                     
-                    # Calculate recording duration if we have a start time
-                    if call.recording_started_ts:
-                        duration_seconds = (now - call.recording_started_ts).total_seconds()
-                        call.recording_duration_s = int(duration_seconds)
-                        
-                    db.commit()
-                    logger.info(f"Updated call {call_id} with recording stop info")
-        except Exception as e:
-            logger.error(f"Error updating call record on upload: {e}")
-        
-        return {"status": "processing", "recording_id": recording_id}
+                db.commit()
+                logger.info(f"Updated call {call_id} with recording stop info")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error updating call record on upload: {e}")
+    
+    return {"status": "processing", "recording_id": recording_id}
+
+def _get_session_or_404(request: Request, recording_id: str) -> dict:
+    """Load a recording session from the shared store, hiding other tenants' (and unowned) sessions."""
+    session_state = mobile_recording_store.get_session(recording_id)
+    tenant_id = getattr(request.state, "tenant_id", None)
+    if session_state is None or tenant_id is None or session_state.get("company_id") != tenant_id:
+        raise HTTPException(status_code=404, detail="Recording session not found")
+    return session_state
 
 def format_transcript_for_llm(transcript: dict) -> str:
     """
@@ -222,153 +230,28 @@ def format_timestamp(seconds: float) -> str:
     seconds = int(seconds % 60)
     return f"{minutes:02d}:{seconds:02d}"
 
-async def process_audio(recording_id: str, audio_path: str, db: Session):
-    """
-    Process audio with UWC ASR and store results
-    """
-    try:
-        response = None
-        
-        # Use UWC ASR for transcription
-        if settings.ENABLE_UWC_ASR:
-            try:
-                # Upload audio to S3 first for UWC to access
-                from app.services.s3_service import s3_service
-                audio_url = await s3_service.upload_audio_file(audio_path, f"transcriptions/{recording_id}.wav")
-                
-                # Get company_id from recording session or use default
-                company_id = transcripts.get(recording_id, {}).get("company_id", "default")
-                request_id = f"mobile-{recording_id}"
-                
-                logger.info(f"Attempting UWC ASR transcription for recording {recording_id}")
-                uwc_response = await get_uwc_client().transcribe_audio(
-                    company_id=company_id,
-                    request_id=request_id,
-                    audio_url=audio_url,
-                    language="en-US",
-                    model="nova-2"
-                )
-                
-                if uwc_response and "results" in uwc_response:
-                    response = uwc_response
-                    logger.info(f"UWC ASR transcription successful for recording {recording_id}")
-                else:
-                    raise Exception("UWC ASR returned invalid response format")
-                    
-            except Exception as e:
-                logger.error(f"UWC ASR failed for recording {recording_id}: {str(e)}")
-                # No fallback - UWC is the only transcription service
-                return {"error": f"Transcription failed: {str(e)}"}
-        else:
-            logger.warning("UWC ASR is disabled - no transcription available")
-            return {"error": "Transcription service not configured"}
-        
-        # Store raw transcript
-        transcripts[recording_id]["transcript"] = response
-        
-        # Extract the formatted transcript with speaker information
-        transcript_text = ""
-        if 'results' in response and 'channels' in response['results']:
-            alternatives = response['results']['channels'][0]['alternatives']
-            if alternatives and 'paragraphs' in alternatives[0]:
-                # Get the nicely formatted transcript with speaker information
-                transcript_text = alternatives[0]['paragraphs']['transcript']
-            else:
-                # Fall back to regular transcript
-                transcript_text = alternatives[0].get('transcript', '')
-        else:
-            transcript_text = "Could not extract transcript text"
-        
-        transcripts[recording_id]["formatted_transcript"] = transcript_text
-        
-        # Log the transcript
-        logger.info(f"Transcript for recording {recording_id}: {transcript_text}")
-        
-        # Update status
-        transcripts[recording_id]["status"] = "completed"
-        
-        # If this recording is associated with a call, store it in the database
-        call_id = transcripts[recording_id].get("call_id")
-        logger.info(f"Looking for call with ID: {call_id}")
-        
-        if call_id:
-            try:
-                # Find the call record
-                logger.info(f"Attempting to find call with ID {call_id} in the database")
-                call = db.query(Call).filter(Call.call_id == call_id).first()
-                
-                if call:
-                    logger.info(f"Found call with ID {call_id}, updating with transcript")
-                    # Update existing call record with in-person transcript
-                    call.in_person_transcript = transcript_text
-                    call.updated_at = datetime.utcnow()
-                    
-                    db.commit()
-                    logger.info(f"Database updated successfully for call ID {call_id}")
-                    transcripts[recording_id]["call_id"] = call.call_id
-                    
-                    # Automatically analyze the transcript and update call fields
-                    try:
-                        logger.info(f"Automatically analyzing transcript and updating call fields for call ID {call_id}")
-                        
-                        # Initialize the analyzer with the default process
-                        analyzer = TranscriptAnalyzer(process_name="v0")
-                        
-                        # Run the analysis
-                        analysis_result = analyzer.analyze_and_store(call_id, db)
-                        
-                        if "error" not in analysis_result:
-                            logger.info(f"Successfully analyzed transcript for call ID {call_id}")
-                        else:
-                            logger.error(f"Error analyzing transcript: {analysis_result['error']}")
-                            
-                    except Exception as e:
-                        logger.error(f"Error in automatic transcript analysis: {e}", exc_info=True)
-                else:
-                    logger.warning(f"Call with ID {call_id} not found in database")
-                    transcripts[recording_id]["error"] = f"Call with ID {call_id} not found"
-            except Exception as db_error:
-                logger.error(f"Database error for call ID {call_id}: {db_error}", exc_info=True)
-                transcripts[recording_id]["db_error"] = str(db_error)
-        else:
-            logger.warning(f"No call_id provided for recording {recording_id}")
-        
-        # TODO: Add LLM processing for fraud detection/summarization
-            
-    except Exception as e:
-        transcripts[recording_id]["status"] = "error"
-        transcripts[recording_id]["error"] = str(e)
-    finally:
-        # Clean up temporary file
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
-
 @router.get("/status/{recording_id}")
-async def get_status(recording_id: str):
+async def get_status(request: Request, recording_id: str):
     """
     Get the status and transcript of a recording
     """
-    if recording_id not in transcripts:
-        raise HTTPException(status_code=404, detail="Recording session not found")
-    
-    return transcripts[recording_id]
+    return _get_session_or_404(request, recording_id)
 
 @router.get("/raw-data/{recording_id}")
-async def get_raw_transcript(recording_id: str):
+async def get_raw_transcript(request: Request, recording_id: str):
     """
     Get the raw UWC ASR transcript data for debugging purposes
     """
-    if recording_id not in transcripts:
-        raise HTTPException(status_code=404, detail="Recording session not found")
+    session_state = _get_session_or_404(request, recording_id)
     
-    if "transcript" not in transcripts[recording_id]:
+    if "transcript" not in session_state:
         return {"status": "no_transcript", "message": "No transcript data available yet"}
     
     # Return the raw transcript data
     return {
-        "raw_transcript": transcripts[recording_id]["transcript"],
-        "formatted_transcript": transcripts[recording_id].get("formatted_transcript"),
-        "status": transcripts[recording_id]["status"]
+        "raw_transcript": session_state["transcript"],
+        "formatted_transcript": session_state.get("formatted_transcript"),
+        "status": session_state["status"]
     }
 
 @router.post("/analyze-transcript/{call_id}")
@@ -7,41 +7,43 @@ from app.models.sales_rep import SalesRep
 from app.models.call import Call
 import logging
 import json
-from datetime import datetime, timedelta
-import httpx
+from datetime import datetime, timedelta, timezone
 import os
 from sqlalchemy import desc
+from pydantic import BaseModel, Field, model_validator
+from app.celery_app import celery_app
+from app.core.tenant import get_tenant_id
+from app.models.geofence import Geofence
+from app.services.geocoding_service import geocoding_service
+from app.services.geofence_service import GeofenceService
+from app.tasks.geocoding_tasks import bulk_geocode_calls as bulk_geocode_calls_task
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/location", tags=["location"])
 
+def _authorize_rep(request: Request, rep_id: str) -> None:
+    """Sales reps may only read or report geofence activity for themselves."""
+    if getattr(request.state, "user_role", None) == "sales_rep" and getattr(request.state, "user_id", None) != rep_id:
+        raise HTTPException(status_code=403, detail="Cannot access another rep's geofences")
+
+def _naive_utc(value: datetime) -> datetime:
+    """Naive UTC like the rest of the call timestamps."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 # Function to handle geocoding addresses to coordinates
 async def geocode_address(address: str) -> Optional[Dict[str, float]]:
-    """Convert address to coordinates using a geocoding service"""
+    """Convert address to coordinates using the cached geocoding service"""
     try:
-        # Using Nominatim, a free geocoding service (can be replaced with Google Maps or other service)
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://nominatim.openstreetmap.org/search",
-                params={
-                    "q": address,
-                    "format": "json",
-                    "limit": 1
-                },
-                headers={"User-Agent": "TrueView-App"}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    lat = float(data[0]["lat"])
-                    lon = float(data[0]["lon"])
-                    return {"latitude": lat, "longitude": lon}
-            
-            logger.warning(f"Failed to geocode address: {address}")
-            return None
+        coordinates = await geocoding_service.geocode_address_async(address)
+        if coordinates:
+            return {"latitude": coordinates[0], "longitude": coordinates[1]}
+        
+        logger.warning(f"Failed to geocode address: {address}")
+        return None
     except Exception as e:
         logger.error(f"Error geocoding address: {e}")
         return None
@@ -72,27 +74,18 @@ async def create_geofence_for_call(call_id: int, db: Session):
         return None
     
     # Create geofence with default radius of 250 meters
-    geofence = {
-        "latitude": coordinates["latitude"],
-        "longitude": coordinates["longitude"],
-        "radius": 250,  # Default radius in meters
-        "call_id": call_id,
-        "address": call.address,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    # Update call's geofence information
-    call.geofence = geofence
+    GeofenceService(db).upsert_call_geofences([(call, coordinates["latitude"], coordinates["longitude"])])
     db.commit()
     
     logger.info(f"Created geofence for call {call_id}")
-    return geofence
+    return call.geofence
 
 async def sync_rep_geofences(rep_id: str, db: Session):
     """
-    Sync a sales rep's active_geofences based on all their assigned calls.
+    Sync a sales rep's geofences with all their assigned calls.
     
-    This ensures the rep has all the geofences they should be monitoring.
+    Geocodes booked calls that have no geofence yet, then re-points the
+    geofences table at the rep's active calls. The SalesRep row is not touched.
     """
     # Get the sales rep
     sales_rep = db.query(SalesRep).filter(SalesRep.user_id == rep_id).first()
@@ -100,57 +93,33 @@ async def sync_rep_geofences(rep_id: str, db: Session):
         logger.warning(f"Sales rep with ID {rep_id} not found")
         return False
     
-    # Get all active calls assigned to this rep
-    active_calls = db.query(Call).filter(
+    # Active calls with an address but no geofence row yet
+    missing = db.query(Call).outerjoin(Geofence, Geofence.call_id == Call.call_id).filter(
         Call.assigned_rep_id == rep_id,
         Call.booked.is_(True),
-        Call.cancelled.is_(False)
+        Call.cancelled.is_(False),
+        Call.address.isnot(None),
+        Geofence.id.is_(None),
     ).all()
     
-    if not active_calls:
-        logger.info(f"No active calls found for rep {rep_id}")
-        # Clear active geofences if there are no active calls
-        sales_rep.active_geofences = []
-        db.commit()
-        return True
-    
-    # Create a new list of geofences from scratch
-    new_geofences = []
-    
-    # Process each call
-    for call in active_calls:
-        # Skip if no address
-        if not call.address:
-            continue
-        
-        # If call has a geofence, add it to the list
-        if call.geofence:
-            new_geofences.append(call.geofence)
-        else:
-            # Try to create a geofence if needed
-            try:
-                geofence = await create_geofence_for_call(call.call_id, db)
-                if geofence:
-                    new_geofences.append(geofence)
-            except Exception as e:
-                logger.error(f"Error creating geofence for call {call.call_id}: {e}")
-    
-    # Update sales rep with new list of geofences
-    sales_rep.active_geofences = new_geofences
+    geofence_service = GeofenceService(db)
+    if missing:
+        try:
+            coordinates = await geocoding_service.geocode_batch(
+                [call.address for call in missing], company_id=sales_rep.company_id
+            )
+            geofence_service.upsert_call_geofences(
+                (call, *coordinates[call.address]) for call in missing if coordinates.get(call.address)
+            )
+        except Exception as e:
+            logger.error(f"Error creating geofences for rep {rep_id}: {e}")
+    
+    active_count = geofence_service.sync_rep(rep_id)
     db.commit()
     
-    logger.info(f"Synced {len(new_geofences)} geofences for rep {rep_id}")
+    logger.info(f"Synced {active_count} geofences for rep {rep_id}")
     return True
 
-# Calculate time difference in minutes
-def calculate_time_difference_minutes(start_time: datetime, end_time: datetime) -> int:
-    """Calculate the time difference in minutes between two timestamps"""
-    if not start_time or not end_time:
-        return 0
-    
-    diff = end_time - start_time
-    return int(diff.total_seconds() / 60)
-
 @router.post("/update-geofences")
 async def update_geofences(
     data: Dict[str, Any],
@@ -158,8 +127,7 @@ async def update_geofences(
 ):
     """
     Update active geofences for a sales rep
-    When a new call is assigned, convert the address to coordinates and add to active geofences
-    Maintains max number of active geofences by removing oldest if necessary
+    When a new call is assigned, convert the address to coordinates and add a geofence for it
     """
     rep_id = data.get("rep_id")
     call_id = data.get("call_id")
@@ -187,50 +155,28 @@ async def update_geofences(
     if not coordinates:
         raise HTTPException(status_code=400, detail=f"Could not geocode address: {address}")
     
-    # Create geofence with default radius of 250 meters
-    geofence = {
-        "latitude": coordinates["latitude"],
-        "longitude": coordinates["longitude"],
-        "radius": 250,  # Default radius in meters
-        "call_id": call_id,
-        "address": address,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    # Update call's geofence information
-    call.geofence = geofence
-    
-    # Update sales rep's active geofences
-    active_geofences = sales_rep.active_geofences or []
-    
-    # If not a list, initialize as empty list
-    if not isinstance(active_geofences, list):
-        active_geofences = []
-    
-    # Add new geofence
-    active_geofences.append(geofence)
-    
-    # Keep only the most recent geofences (max 20)
-    if len(active_geofences) > 20:
-        active_geofences = sorted(active_geofences, key=lambda g: g.get("created_at", ""), reverse=True)[:20]
-    
-    # Update sales rep
-    sales_rep.active_geofences = active_geofences
+    # Create geofence with default radius of 250 meters, monitored by this rep
+    geofences = GeofenceService(db).upsert_call_geofences([(call, coordinates["latitude"], coordinates["longitude"])])
+    geofences[call.call_id].rep_id = rep_id
     
     # Commit changes
     db.commit()
     
-    return {"message": "Geofence added successfully", "geofence": geofence}
+    return {"message": "Geofence added successfully", "geofence": call.geofence}
 
 @router.post("/geofence-event")
 async def log_geofence_event(
+    request: Request,
     data: Dict[str, Any],
     background_tasks: BackgroundTasks,
+    tenant_id: str = Depends(get_tenant_id),
     db: Session = Depends(get_db)
 ):
     """
     Log geofence entry/exit events
     Track first two entries/exits, time spent in geofence, battery status, etc.
+    
+    Single-event form of /geofence-events.
     """
     event_type = data.get("event_type")  # "entry" or "exit"
     call_id = data.get("call_id")
@@ -245,73 +191,31 @@ async def log_geofence_event(
     
     if event_type not in ["entry", "exit"]:
         raise HTTPException(status_code=400, detail="Event type must be 'entry' or 'exit'")
+    _authorize_rep(request, rep_id)
     
     # Get the call
-    call = db.query(Call).filter(Call.call_id == call_id).first()
+    call = db.query(Call).filter(Call.call_id == call_id, Call.company_id == tenant_id).first()
     if not call:
         raise HTTPException(status_code=404, detail=f"Call with ID {call_id} not found")
     
     # Parse timestamp if it's a string
     if isinstance(timestamp, str):
         try:
-            event_timestamp = datetime.fromisoformat(timestamp)
+            event_timestamp = _naive_utc(datetime.fromisoformat(timestamp))
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid timestamp format. Use ISO format.")
     else:
         event_timestamp = datetime.utcnow()
     
-    # Process entry event
-    if event_type == "entry":
-        # Increment entry count
-        call.geofence_entry_count = (call.geofence_entry_count or 0) + 1
-        
-        # Check if this is first or second entry
-        if not call.geofence_entry_1_ts:
-            # First entry
-            call.geofence_entry_1_ts = event_timestamp
-            call.battery_at_geofence_entry = battery_percentage
-            call.charging_at_geofence_entry = is_charging
-        elif not call.geofence_entry_2_ts and call.geofence_exit_1_ts:
-            # Second entry (only log if there was a first exit)
-            call.geofence_entry_2_ts = event_timestamp
-        
-        # Multiple entries flag
-        if call.geofence_entry_count > 1:
-            call.geofence_multiple_entries = True
-    
-    # Process exit event
-    elif event_type == "exit":
-        # Check if this is first or second exit
-        if call.geofence_entry_1_ts and not call.geofence_exit_1_ts:
-            # First exit
-            call.geofence_exit_1_ts = event_timestamp
-            # Calculate time spent in geofence
-            call.geofence_time_1_m = calculate_time_difference_minutes(
-                call.geofence_entry_1_ts, event_timestamp
-            )
-            
-            # If recording is still running, stop it
-            if call.recording_started_ts and not call.recording_stopped_ts:
-                call.recording_stopped_ts = event_timestamp
-                if call.recording_started_ts:
-                    call.recording_duration_s = int((event_timestamp - call.recording_started_ts).total_seconds())
-                
-        elif call.geofence_entry_2_ts and not call.geofence_exit_2_ts:
-            # Second exit
-            call.geofence_exit_2_ts = event_timestamp
-            # Calculate time spent in geofence for second visit
-            call.geofence_time_2_m = calculate_time_difference_minutes(
-                call.geofence_entry_2_ts, event_timestamp
-            )
-            
-            # If recording is still running, stop it
-            if call.recording_started_ts and not call.recording_stopped_ts:
-                call.recording_stopped_ts = event_timestamp
-                if call.recording_started_ts:
-                    call.recording_duration_s = int((event_timestamp - call.recording_started_ts).total_seconds())
-    
-    # Commit changes
-    db.commit()
+    result = GeofenceService(db).ingest_events(tenant_id, rep_id, [{
+        "event_type": event_type,
+        "call_id": call_id,
+        "timestamp": event_timestamp,
+        "battery_percentage": battery_percentage,
+        "is_charging": is_charging,
+    }])
+    if not result["events"]:
+        raise HTTPException(status_code=404, detail=f"Call {call_id} has no geofence for rep {rep_id}")
     
     return {
         "message": f"Geofence {event_type} logged successfully",
@@ -320,6 +224,65 @@ async def log_geofence_event(
         "timestamp": event_timestamp.isoformat()
     }
 
+class LocationItem(BaseModel):
+    """A location sample, or an entry/exit the device already detected."""
+    timestamp: datetime
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    event_type: Optional[str] = Field(None, pattern="^(entry|exit)$")
+    call_id: Optional[int] = None
+    battery_percentage: Optional[float] = None
+    is_charging: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def _sample_or_event(self):
+        if self.event_type:
+            if self.call_id is None:
+                raise ValueError("call_id is required with event_type")
+        elif self.latitude is None or self.longitude is None:
+            raise ValueError("latitude and longitude are required for location samples")
+        return self
+
+class GeofenceEventBatch(BaseModel):
+    rep_id: str
+    events: List[LocationItem] = Field(..., max_length=1000)
+
+@router.post("/geofence-events")
+async def ingest_geofence_events(
+    request: Request,
+    batch: GeofenceEventBatch,
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Ingest a batch of location samples and geofence events from a device.
+    
+    Samples (timestamp + latitude/longitude) are resolved against the rep's
+    active geofences on the server and turned into entry/exit events; items
+    with event_type + call_id are taken as detected on the device. Events are
+    applied in timestamp order and recorded like /geofence-event.
+    """
+    _authorize_rep(request, batch.rep_id)
+    
+    items = [{**item.model_dump(), "timestamp": _naive_utc(item.timestamp)} for item in batch.events]
+    
+    result = GeofenceService(db).ingest_events(tenant_id, batch.rep_id, items)
+    return {"message": f"Processed {result['received']} location items", **result}
+
+@router.get("/geofences")
+async def get_active_geofences(
+    request: Request,
+    rep_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Geofences a sales rep's device should monitor (booked, not cancelled calls).
+    """
+    _authorize_rep(request, rep_id)
+    geofences = GeofenceService(db).active_for_rep(rep_id, tenant_id=tenant_id)
+    return {"rep_id": rep_id, "geofences": [geofence.to_dict() for geofence in geofences]}
+
 @router.post("/recording-event")
 async def record_audio_event(
     data: Dict[str, Any],
@@ -424,20 +387,9 @@ async def remove_geofence(
     if not call.bought and data.get("reason_not_bought_homeowner"):
         call.reason_not_bought_homeowner = data.get("reason_not_bought_homeowner")
         
-    # Remove the geofence from the sales rep's active list
-    active_geofences = sales_rep.active_geofences or []
-    
-    if not isinstance(active_geofences, list):
-        active_geofences = []
-    
-    # Check if we have a geofence for this call before removing
-    had_geofence = any(g.get("call_id") == call_id for g in active_geofences)
-        
-    # Filter out the geofence for this call
-    active_geofences = [g for g in active_geofences if g.get("call_id") != call_id]
-    
-    # Update sales rep
-    sales_rep.active_geofences = active_geofences
+    # Stop monitoring the call's geofence
+    geofence_service = GeofenceService(db)
+    had_geofence = geofence_service.deactivate_call(call_id)
     
     # Clear geofence data from the call
     call.geofence = None
@@ -448,104 +400,55 @@ async def remove_geofence(
     return {
         "message": f"Geofence for call {call_id} removed successfully",
         "had_geofence": had_geofence,
-        "active_geofences_count": len(active_geofences)
+        "active_geofences_count": len(geofence_service.active_for_rep(rep_id))
     }
 
 @router.post("/bulk-geocode-calls")
 async def bulk_geocode_calls(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
     company_id: Optional[str] = None,
     limit: int = 100
 ):
     """
     Admin endpoint to geocode all existing calls with addresses that don't have geofences yet.
     Can be filtered by company_id and limited to a specific number of calls.
+    
+    Geocoding runs as a Celery job; poll /location/bulk-geocode-calls/{task_id} for progress.
     """
     try:
-        # Build the query
-        query = db.query(Call).filter(
-            Call.address.isnot(None),  # Has address
-            Call.geofence.is_(None),   # Doesn't have geofence
-            Call.booked.is_(True),     # Is booked
-            Call.cancelled.is_(False)  # Not cancelled
-        )
-        
-        # Add company filter if provided
-        if company_id:
-            query = query.filter(Call.company_id == company_id)
-        
-        # Get calls to geocode
-        calls_to_geocode = query.limit(limit).all()
-        
-        if not calls_to_geocode:
-            return {
-                "status": "success",
-                "message": "No calls found that need geocoding",
-                "geocoded_count": 0
-            }
-        
-        # Queue the geocoding tasks in the background
-        geocoded_count = 0
-        
-        # For immediate feedback, geocode the first 10 synchronously
-        immediate_count = min(10, len(calls_to_geocode))
-        immediate_calls = calls_to_geocode[:immediate_count]
-        
-        for call_record in immediate_calls:
-            result = await create_geofence_for_call(call_record.call_id, db)
-            if result:
-                geocoded_count += 1
-                
-                # Also add the geofence to the assigned rep if one exists
-                if call_record.assigned_rep_id:
-                    try:
-                        # Get the sales rep
-                        sales_rep = db.query(SalesRep).filter(SalesRep.user_id == call_record.assigned_rep_id).first()
-                        if sales_rep:
-                            # Update sales rep's active geofences
-                            active_geofences = sales_rep.active_geofences or []
-                            
-                            # If not a list, initialize as empty list
-                            if not isinstance(active_geofences, list):
-                                active_geofences = []
-                            
-                            # Add new geofence if not already in the list
-                            if not any(g.get("call_id") == str(call_record.call_id) for g in active_geofences):
-                                active_geofences.append(result)
-                                
-                                # Keep only the most recent geofences (max 20)
-                                if len(active_geofences) > 20:
-                                    active_geofences = sorted(active_geofences, key=lambda g: g.get("created_at", ""), reverse=True)[:20]
-                                
-                                # Update sales rep
-                                sales_rep.active_geofences = active_geofences
-                                db.commit()
-                    except Exception as rep_error:
-                        logger.error(f"Error updating rep geofences for call {call_record.call_id}: {rep_error}")
-        
-        # Process the rest in the background
-        remaining_calls = calls_to_geocode[immediate_count:]
-        for call_record in remaining_calls:
-            background_tasks.add_task(create_geofence_for_call, call_record.call_id, db)
+        task = bulk_geocode_calls_task.delay(company_id=company_id, limit=limit)
         
         return {
-            "status": "success",
-            "message": f"Geocoding {len(calls_to_geocode)} calls ({immediate_count} immediate, {len(remaining_calls)} in background)",
-            "immediate_geocoded_count": geocoded_count,
-            "total_queued": len(calls_to_geocode)
+            "status": "queued",
+            "message": f"Queued geocoding of up to {limit} calls",
+            "task_id": task.id
         }
     except Exception as e:
         logger.error(f"Error in bulk geocoding: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing bulk geocoding: {str(e)}")
 
+@router.get("/bulk-geocode-calls/{task_id}")
+async def get_bulk_geocode_status(task_id: str):
+    """
+    Get progress of a bulk geocoding job.
+    
+    Returns the Celery task state plus total/processed/geocoded/failed counts
+    once the job has started.
+    """
+    result = celery_app.AsyncResult(task_id)
+    
+    if result.state == "FAILURE":
+        return {"task_id": task_id, "state": result.state, "error": str(result.result)}
+    
+    progress = result.result if isinstance(result.result, dict) else {}
+    return {"task_id": task_id, "state": result.state, **progress}
+
 @router.post("/sync-rep-geofences")
 async def sync_sales_rep_geofences(
     data: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
     """
-    Sync a sales rep's active_geofences list to match all their assigned calls.
+    Sync a sales rep's geofences to match all their assigned calls.
     
     This ensures a rep has all the geofences they should be monitoring and no extras.
     """
@@ -558,9 +461,7 @@ async def sync_sales_rep_geofences(
         if not success:
             raise HTTPException(status_code=404, detail=f"Failed to sync geofences for rep {rep_id}")
         
-        # Get updated sales rep to return current geofence count
-        sales_rep = db.query(SalesRep).filter(SalesRep.user_id == rep_id).first()
-        geofence_count = len(sales_rep.active_geofences) if sales_rep.active_geofences else 0
+        geofence_count = len(GeofenceService(db).active_for_rep(rep_id))
         
         return {
             "status": "success",
@@ -580,7 +481,7 @@ async def sync_all_reps_geofences(
     company_id: Optional[str] = None
 ):
     """
-    Sync active_geofences for all sales reps based on their assigned calls.
+    Sync geofences for all sales reps based on their assigned calls.
     
     This ensures all reps have the correct geofences they should be monitoring.
     """
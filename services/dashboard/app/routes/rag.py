@@ -263,16 +263,7 @@ async def query_ask_otto(
         )
         
         # Record metrics
-        metrics.rag_queries_total.labels(
-            tenant_id=tenant_id,
-            user_role=user_role,
-            result_count=len(citations)
-        ).inc()
-        
-        metrics.rag_query_latency_ms.labels(
-            tenant_id=tenant_id,
-            user_role=user_role
-        ).observe(latency_ms)
+        metrics.record_rag_query(tenant_id, user_role, len(citations), latency_ms)
         
         # Build response
         response = RAGQueryResponse(
@@ -60,22 +60,24 @@ async def notify_managers(managers: List[sales_manager.SalesManager], call_count
     
     logger.info(f"Notifying {len(managers)} managers about {call_count} unassigned calls")
     
-    success_count = 0
+    # Managers' phone numbers live on their user record
+    reachable = [m for m in managers if m.user and m.user.phone_number]
     for manager in managers:
-        try:
-            result = twilio_service.notify_sales_manager(
-                manager_phone=manager.phone_number,
-                unassigned_calls_count=call_count
-            )
-            
-            if result["status"] == "success":
-                success_count += 1
-                logger.info(f"Successfully notified manager {manager.name} (ID: {manager.id})")
-            else:
-                logger.error(f"Failed to notify manager {manager.name} (ID: {manager.id}): {result.get('error')}")
-                
-        except Exception as e:
-            logger.error(f"Error notifying manager {manager.name} (ID: {manager.id}): {str(e)}")
+        if manager not in reachable:
+            logger.warning(f"Manager {manager.user_id} has no phone number, skipping SMS")
+    
+    success_count = 0
+    async for result in twilio_service.stream_batch(
+        [m.user.phone_number for m in reachable],
+        twilio_service.unassigned_calls_message(call_count),
+        tenant_id=reachable[0].company_id if reachable else None,
+    ):
+        manager = reachable[result["index"]]
+        if result["status"] == "success":
+            success_count += 1
+            logger.info(f"Successfully notified manager {manager.user.name} (ID: {manager.user_id})")
+        else:
+            logger.error(f"Failed to notify manager {manager.user.name} (ID: {manager.user_id}): {result.get('error')}")
     
     logger.info(f"Notification summary: {success_count}/{len(managers)} successful")
     return {
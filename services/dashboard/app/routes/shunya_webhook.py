@@ -193,6 +193,14 @@ async def shunya_webhook(
             extra={"job_id": job.id, "shunya_job_id": shunya_job_id}
         )
         
+        if job.pipeline_stage is not None:
+            # Staged CSR pipeline: this completion only advances the current step.
+            # Release the request session so it isn't held across Shunya calls.
+            job_id = job.id
+            db.close()
+            outcome = await ShunyaIntegrationService().advance_csr_call(job_id, result=payload.get("result"))
+            return APIResponse(data={"job_id": job_id, **outcome})
+        
         try:
             # Get result from payload or fetch from Shunya
             result = payload.get("result")
@@ -227,9 +235,10 @@ async def shunya_webhook(
             
             # Normalize result
             if job.job_type.value == "segmentation":
-                normalized_result = shunya_normalizer.normalize_meeting_segmentation(result)
+                normalize = shunya_normalizer.normalize_meeting_segmentation
             else:
-                normalized_result = shunya_normalizer.normalize_complete_analysis(result)
+                normalize = shunya_normalizer.normalize_complete_analysis
+            normalized_result, raw_output_hash = shunya_job_service.normalize_output(job, result, normalize)
             
             # P0 FIX: Acquire distributed lock to prevent webhook vs polling race condition
             from app.services.redis_lock_service import redis_lock_service
@@ -251,7 +260,7 @@ async def shunya_webhook(
                     return APIResponse(data={"status": "processing_by_another", "job_id": job.id})
                 
                 # Check idempotency before processing (inside lock to prevent race)
-                if not shunya_job_service.should_process(db, job, normalized_result):
+                if not shunya_job_service.should_process(db, job, normalized_result, raw_output_hash):
                     logger.info(
                         f"Shunya job {job.id} already processed via webhook, skipping",
                         extra={"job_id": job.id, "shunya_job_id": shunya_job_id}
@@ -259,7 +268,7 @@ async def shunya_webhook(
                     return APIResponse(data={"status": "already_processed", "job_id": job.id})
                 
                 # Mark job as succeeded (idempotent)
-                shunya_job_service.mark_succeeded(db, job, normalized_result)
+                shunya_job_service.mark_succeeded(db, job, normalized_result, raw_output_hash=raw_output_hash)
                 db.refresh(job)  # Refresh to get updated processed_output_hash
                 
                 # Process result and persist to domain models (idempotent)
@@ -59,7 +59,7 @@ async def handle_callrail_sms_webhook(
     try:
         # Parse CallRail SMS webhook data
         data = await request.json()
-        logger.info(f"CallRail SMS webhook received: {data}")
+        logger.debug(f"CallRail SMS webhook received: {data}")
         
         # Extract SMS data from CallRail webhook
         from_number = data.get("from_number") or data.get("caller_number")
@@ -132,7 +132,7 @@ async def handle_twilio_sms_webhook(
         message_body = form_data.get("Body")
         message_sid = form_data.get("MessageSid")
         
-        logger.info(f"Twilio SMS webhook received from {from_number}: {message_body}")
+        logger.debug(f"Twilio SMS webhook received from {from_number}: {message_body}")
         
         if not all([from_number, to_number, message_body]):
             raise HTTPException(status_code=400, detail="Missing required SMS data")
@@ -86,6 +86,8 @@ async def websocket_endpoint(websocket: WebSocket):
     
     Clients must provide a valid JWT token in the Authorization header.
     After connection, clients can subscribe/unsubscribe to channels.
+    A subscribe message may include ``resume_from`` (the last ``stream_id``
+    the client saw) to replay events missed while disconnected.
     """
     connection_id = None
     tenant_id = None
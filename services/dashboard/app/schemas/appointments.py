@@ -30,8 +30,74 @@ class AppointmentListResponse(BaseModel):
     appointments: List[AppointmentListItem] = Field(..., description="List of appointments")
     total: int = Field(..., description="Total number of appointments")
     date: str = Field(..., description="Filter date in ISO format")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page when limit is used")
     
     class Config:
         from_attributes = True
 
 
+
+
+class TimeWindow(BaseModel):
+    """A [start, end) time window."""
+    
+    start: datetime = Field(..., description="Window start (UTC)")
+    end: datetime = Field(..., description="Window end (UTC)")
+
+
+class BusyWindow(TimeWindow):
+    """Time blocked by a scheduled/confirmed appointment."""
+    
+    appointment_id: str = Field(..., description="Appointment occupying the window")
+
+
+class RepAvailability(BaseModel):
+    """Free and busy windows for one sales rep on a day."""
+    
+    rep_id: str = Field(..., description="Sales rep user ID")
+    shift_start: Optional[datetime] = Field(None, description="Working window start (UTC); null if the rep is off")
+    shift_end: Optional[datetime] = Field(None, description="Working window end (UTC); null if the rep is off")
+    busy: List[BusyWindow] = Field(default_factory=list, description="Booked appointments overlapping the day")
+    free_windows: List[TimeWindow] = Field(default_factory=list, description="Unbooked time within the working window")
+
+
+class RepAvailabilityResponse(BaseModel):
+    """Response schema for the dispatcher availability board."""
+    
+    date: str = Field(..., description="Day in ISO format (company timezone)")
+    reps: List[RepAvailability] = Field(..., description="Availability per rep")
+
+
+class ProposedAssignment(BaseModel):
+    """A rep proposed for an unassigned appointment."""
+    
+    appointment_id: str = Field(..., description="Appointment ID")
+    rep_id: str = Field(..., description="Proposed sales rep user ID")
+    scheduled_start: datetime = Field(..., description="Scheduled start (UTC)")
+    scheduled_end: datetime = Field(..., description="Scheduled end, or start + 1h if unset (UTC)")
+
+
+class ProposedRoute(BaseModel):
+    """A rep's day under the proposal."""
+    
+    rep_id: str = Field(..., description="Sales rep user ID")
+    appointment_ids: List[str] = Field(..., description="Existing and proposed appointments in visiting order")
+    drive_minutes: float = Field(..., description="Estimated drive time for the route")
+
+
+class UnassignedAppointment(BaseModel):
+    """An appointment the optimizer could not place."""
+    
+    appointment_id: str = Field(..., description="Appointment ID")
+    reason: str = Field(..., description="not_booked, no_location or no_available_rep")
+
+
+class DispatchPreviewResponse(BaseModel):
+    """Response schema for the batch dispatch preview."""
+    
+    date: str = Field(..., description="Day in ISO format (company timezone)")
+    assignments: List[ProposedAssignment] = Field(..., description="Proposed assignments")
+    routes: List[ProposedRoute] = Field(..., description="Resulting route per working rep")
+    unassigned: List[UnassignedAppointment] = Field(default_factory=list, description="Appointments left unassigned")
+    total_drive_minutes: float = Field(..., description="Estimated drive time across all routes")
+    greedy_drive_minutes: float = Field(..., description="Drive time of the greedy pass, before local search")
@@ -5,25 +5,61 @@ Handles:
 - Assignment of appointments to sales reps
 - Double-booking conflict detection
 - Shunya booking semantics enforcement
+- Per-rep free windows for the dispatcher board
+
+On PostgreSQL, double-booking is enforced by the ex_appointments_rep_window
+exclusion constraint (GiST over assigned_rep_id and the generated
+appointments.rep_window tstzrange, migration 20251218000000), so concurrent
+assignments cannot both succeed and no distributed lock is needed. Other
+dialects fall back to an overlap query before the write.
 """
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import pytz
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_, text
 
+from app.config import settings
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.call_analysis import CallAnalysis
+from app.models.company import Company
 from app.models.enums import BookingStatus
+from app.models.rep_shift import RepShift, ShiftStatus
+from app.models.sales_rep import SalesRep
 from app.core.pii_masking import PIISafeLogger
 
 logger = PIISafeLogger(__name__)
 
+# Appointments without scheduled_end block this long (matches rep_window in the migration)
+DEFAULT_APPOINTMENT_DURATION = timedelta(hours=1)
+
+# Statuses that occupy a rep's calendar (matches the exclusion constraint predicate)
+BLOCKING_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+
+# Shift window when a rep has neither a shift row nor defaults (as in rep_shifts routes)
+DEFAULT_SHIFT_START = time(7, 0)
+DEFAULT_SHIFT_END = time(20, 0)
+
+EXCLUSION_VIOLATION = "23P01"
+
 
 class AppointmentDispatchError(Exception):
     """Raised when appointment dispatch fails."""
     pass
 
 
+class DoubleBookingError(AppointmentDispatchError):
+    """Raised when a write would overlap another blocking appointment of the same rep."""
+
+    def __init__(self, message: str, rep_id: str, conflicting_appointment_id: Optional[str] = None):
+        super().__init__(message)
+        self.rep_id = rep_id
+        self.conflicting_appointment_id = conflicting_appointment_id
+
+
 class AppointmentDispatchService:
     """Service for dispatching appointments to sales reps."""
     
@@ -55,11 +91,12 @@ class AppointmentDispatchService:
         Raises:
             AppointmentDispatchError: If assignment fails (not booked, double-booking, etc.)
         """
-        # Fetch appointment
+        # Fetch appointment. The row lock (instead of a distributed lock)
+        # serializes concurrent assignments of this appointment; no-op on SQLite.
         appointment = self.db.query(Appointment).filter(
             Appointment.id == appointment_id,
             Appointment.company_id == tenant_id
-        ).first()
+        ).with_for_update().first()
         
         if not appointment:
             raise AppointmentDispatchError(f"Appointment {appointment_id} not found")
@@ -89,73 +126,15 @@ class AppointmentDispatchService:
                             f"Appointment cannot be assigned: booking_status is '{booking_status}', expected 'booked'"
                         )
         
-        # P0 FIX: Acquire distributed lock to prevent concurrent assignment requests
-        from app.services.redis_lock_service import redis_lock_service
-        import asyncio
-        lock_key = f"appointment:assign:{appointment_id}"
-        lock_token = None
+        # Update assignment fields
+        appointment.assigned_rep_id = rep_id
+        appointment.assigned_by_csr_id = actor_id
+        appointment.assigned_by = actor_id  # Also update legacy field
+        appointment.assigned_at = datetime.utcnow()
+        appointment.double_booking_allowed = allow_double_booking
         
-        try:
-            lock_token = asyncio.run(
-                redis_lock_service.acquire_lock(
-                    lock_key=lock_key,
-                    tenant_id=tenant_id,
-                    timeout=60  # 1 minute
-                )
-            )
-            
-            if not lock_token:
-                raise AppointmentDispatchError(
-                    f"Could not acquire lock for assigning appointment {appointment_id}"
-                )
-            
-            # Refresh appointment from DB to get latest state (inside lock)
-            self.db.refresh(appointment)
-            
-            # Double-booking check (unless allowed) - inside lock
-            if not allow_double_booking:
-                # Check for overlapping appointments for the same rep
-                # Overlap: same rep, scheduled_start within appointment window
-                appointment_start = appointment.scheduled_start
-                appointment_end = appointment.scheduled_end or (appointment_start + timedelta(hours=1))  # Default 1 hour
-                
-                overlapping = self.db.query(Appointment).filter(
-                    Appointment.company_id == tenant_id,
-                    Appointment.assigned_rep_id == rep_id,
-                    Appointment.id != appointment_id,  # Exclude current appointment
-                    Appointment.status.in_([AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED]),
-                    # Overlap condition: other appointment starts before this one ends AND ends after this one starts
-                    Appointment.scheduled_start < appointment_end,
-                    or_(
-                        Appointment.scheduled_end.is_(None),
-                        Appointment.scheduled_end > appointment_start
-                    )
-                ).first()
-                
-                if overlapping:
-                    raise AppointmentDispatchError(
-                        f"Double-booking conflict: Rep {rep_id} already has appointment {overlapping.id} "
-                        f"scheduled at {overlapping.scheduled_start} (overlaps with {appointment_start})"
-                    )
-            
-            # Update assignment fields
-            appointment.assigned_rep_id = rep_id
-            appointment.assigned_by_csr_id = actor_id
-            appointment.assigned_by = actor_id  # Also update legacy field
-            appointment.assigned_at = datetime.utcnow()
-            
-            self.db.commit()
-            self.db.refresh(appointment)
-        finally:
-            # Always release lock
-            if lock_token:
-                asyncio.run(
-                    redis_lock_service.release_lock(
-                        lock_key=lock_key,
-                        tenant_id=tenant_id,
-                        lock_token=lock_token
-                    )
-                )
+        self.commit_schedule(tenant_id, appointment)
+        self.db.refresh(appointment)
         
         logger.info(
             f"Assigned appointment {appointment_id} to rep {rep_id} by CSR {actor_id}",
@@ -168,4 +147,407 @@ class AppointmentDispatchService:
         )
         
         return appointment
+    
+    def commit_schedule(self, tenant_id: str, appointment: Appointment) -> None:
+        """
+        Commit pending changes to an appointment's rep, window or status.
+        
+        A blocking appointment may not overlap another blocking appointment of
+        the same rep unless double_booking_allowed is set. On PostgreSQL the
+        rep_window exclusion constraint rejects the commit, race-free; other
+        dialects run the overlap query first.
+        
+        Raises:
+            DoubleBookingError: If the rep is not free (the session is rolled back)
+        """
+        # Rollback expires pending values, so keep the window for the error message
+        window = SimpleNamespace(
+            id=appointment.id,
+            scheduled_start=appointment.scheduled_start,
+            scheduled_end=appointment.scheduled_end,
+        )
+        rep_id = appointment.assigned_rep_id
+        try:
+            self.db.flush()
+            if not self._has_rep_window_constraint() and self._occupies_rep(appointment):
+                overlapping = self._find_overlapping(tenant_id, rep_id, appointment)
+                if overlapping:
+                    raise self._double_booking_error(rep_id, appointment, overlapping)
+            self.db.commit()
+        except DoubleBookingError:
+            self.db.rollback()
+            raise
+        except IntegrityError as e:
+            self.db.rollback()
+            if not _is_exclusion_violation(e):
+                raise
+            overlapping = self._find_overlapping(tenant_id, rep_id, window)
+            if overlapping:
+                raise self._double_booking_error(rep_id, window, overlapping) from e
+            raise DoubleBookingError(
+                f"Double-booking conflict: Rep {rep_id} is not free at {window.scheduled_start}", rep_id
+            ) from e
+    
+    def get_rep_availability(
+        self,
+        *,
+        tenant_id: str,
+        day: date,
+        rep_ids: Optional[Sequence[str]] = None,
+        min_window_minutes: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Free windows for every rep on a day, for the dispatcher board.
+        
+        Each rep's working window is their shift for the day (no windows if
+        marked off), else their default shift hours, else 07:00-20:00, in the
+        company's timezone. All reps' booked appointments come back in a
+        single query (served by the rep_window GiST index on PostgreSQL).
+        
+        Args:
+            tenant_id: Company/tenant ID
+            day: Day to report, in the company's timezone
+            rep_ids: Restrict to these reps (default: all reps in the company)
+            min_window_minutes: Drop free windows shorter than this
+        
+        Returns:
+            One entry per rep: rep_id, shift_start, shift_end (naive UTC),
+            busy (appointment id/start/end) and free_windows (start/end),
+            all times naive UTC like the rest of the API.
+        """
+        _, shifts = self._rep_windows(tenant_id, day, rep_ids)
+        
+        windows = [window for window in shifts.values() if window]
+        busy: Dict[str, List[Tuple[str, datetime, datetime]]] = {rep_id: [] for rep_id in shifts}
+        if windows:
+            window_start = min(start for start, _ in windows)
+            window_end = max(end for _, end in windows)
+            rows = self.db.query(
+                Appointment.id,
+                Appointment.assigned_rep_id,
+                Appointment.scheduled_start,
+                Appointment.scheduled_end,
+            ).filter(
+                Appointment.company_id == tenant_id,
+                Appointment.assigned_rep_id.in_([rep_id for rep_id, window in shifts.items() if window]),
+                *self._overlap_clauses(window_start, window_end),
+            ).order_by(Appointment.assigned_rep_id, Appointment.scheduled_start)
+            for appointment_id, rep_id, start, end in rows:
+                busy[rep_id].append((appointment_id, start, _blocked_until(start, end)))
+        
+        min_window = timedelta(minutes=min_window_minutes)
+        availability = []
+        for rep_id, window in shifts.items():
+            entry: Dict[str, Any] = {
+                "rep_id": rep_id,
+                "shift_start": window[0] if window else None,
+                "shift_end": window[1] if window else None,
+                "busy": [
+                    {"appointment_id": appointment_id, "start": start, "end": end}
+                    for appointment_id, start, end in busy[rep_id]
+                ],
+                "free_windows": [],
+            }
+            if window:
+                entry["free_windows"] = [
+                    {"start": start, "end": end}
+                    for start, end in _free_windows(window, busy[rep_id])
+                    if end - start >= min_window
+                ]
+            availability.append(entry)
+        return availability
+    
+    async def preview_batch_dispatch(
+        self,
+        *,
+        tenant_id: str,
+        day: date,
+        rep_ids: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Propose reps for all of a day's unassigned booked appointments.
+        
+        Nothing is written: the proposal is applied through
+        assign_appointment_to_rep, which re-checks every assignment. Drive
+        time is estimated from coordinates (appointments without any are
+        geocoded via GeocodingService.geocode_batch); a rep's route starts
+        where their last recording session ended, or at their first stop.
+        See app.services.dispatch_optimizer for the heuristic.
+        
+        Args:
+            tenant_id: Company/tenant ID
+            day: Day to dispatch, in the company's timezone
+            rep_ids: Restrict to these reps (default: all reps in the company)
+        
+        Returns:
+            Dict with assignments, per-rep routes, unassigned appointments
+            (with a reason) and drive-time totals
+        """
+        from app.services.dispatch_optimizer import DispatchRep, DispatchStop, optimize_dispatch
+        from app.services.geocoding_service import geocoding_service
+        
+        tz, shifts = self._rep_windows(tenant_id, day, rep_ids)
+        working = {rep_id: window for rep_id, window in shifts.items() if window}
+        day_start = tz.localize(datetime.combine(day, time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+        day_end = tz.localize(datetime.combine(day + timedelta(days=1), time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+        
+        appointments = self.db.query(Appointment).filter(
+            Appointment.company_id == tenant_id,
+            or_(Appointment.assigned_rep_id.is_(None), Appointment.assigned_rep_id.in_(list(working))),
+            *self._overlap_clauses(day_start, day_end),
+        ).order_by(Appointment.scheduled_start).all()
+        
+        candidates = [
+            appt for appt in appointments
+            if appt.assigned_rep_id is None and day_start <= appt.scheduled_start < day_end
+        ]
+        unassigned: Dict[str, str] = {}
+        not_booked = self._leads_not_booked(tenant_id, {appt.lead_id for appt in candidates if appt.lead_id})
+        for appt in candidates:
+            if appt.lead_id in not_booked:
+                unassigned[appt.id] = "not_booked"
+        
+        missing = [
+            appt.location for appt in appointments
+            if _coordinates(appt) is None and appt.location and appt.id not in unassigned
+        ]
+        geocoded = await geocoding_service.geocode_batch(missing, company_id=tenant_id) if missing else {}
+        
+        def to_stop(appt: Appointment) -> DispatchStop:
+            lat, lng = _coordinates(appt) or geocoded.get(appt.location) or (None, None)
+            return DispatchStop(
+                id=appt.id,
+                start=appt.scheduled_start,
+                end=_blocked_until(appt.scheduled_start, appt.scheduled_end),
+                lat=lat,
+                lng=lng,
+            )
+        
+        stops = []
+        for appt in candidates:
+            if appt.id in unassigned:
+                continue
+            stop = to_stop(appt)
+            if stop.lat is None:
+                unassigned[appt.id] = "no_location"
+            else:
+                stops.append(stop)
+        
+        origins = self._last_known_locations(tenant_id, list(working))
+        reps = {
+            rep_id: DispatchRep(rep_id=rep_id, shift_start=window[0], shift_end=window[1], origin=origins.get(rep_id))
+            for rep_id, window in working.items()
+        }
+        for appt in appointments:
+            if appt.assigned_rep_id is not None:
+                reps[appt.assigned_rep_id].booked.append(to_stop(appt))
+        
+        plan = optimize_dispatch(
+            stops,
+            list(reps.values()),
+            speed_kmh=settings.DISPATCH_AVERAGE_SPEED_KMH,
+            road_factor=settings.DISPATCH_ROAD_FACTOR,
+            max_seconds=settings.DISPATCH_OPTIMIZER_MAX_SECONDS,
+        )
+        unassigned.update(plan.unassigned)
+        
+        logger.info(
+            f"Batch dispatch preview for {day}: {len(plan.assignments)}/{len(candidates)} appointments "
+            f"placed, {plan.total_drive_minutes:.0f} drive minutes "
+            f"(greedy {plan.greedy_drive_minutes:.0f}) in {plan.elapsed_ms:.0f}ms",
+            extra={"tenant_id": tenant_id}
+        )
+        
+        stops_by_id = {stop.id: stop for stop in stops}
+        return {
+            "assignments": [
+                {
+                    "appointment_id": appointment_id,
+                    "rep_id": rep_id,
+                    "scheduled_start": stops_by_id[appointment_id].start,
+                    "scheduled_end": stops_by_id[appointment_id].end,
+                }
+                for appointment_id, rep_id in plan.assignments.items()
+            ],
+            "routes": [
+                {"rep_id": rep_id, "appointment_ids": plan.routes[rep_id], "drive_minutes": round(plan.drive_minutes[rep_id], 1)}
+                for rep_id in reps
+            ],
+            "unassigned": [
+                {"appointment_id": appt.id, "reason": unassigned[appt.id]}
+                for appt in candidates if appt.id in unassigned
+            ],
+            "total_drive_minutes": round(plan.total_drive_minutes, 1),
+            "greedy_drive_minutes": round(plan.greedy_drive_minutes, 1),
+        }
+    
+    def _leads_not_booked(self, tenant_id: str, lead_ids: Set[str]) -> Set[str]:
+        """
+        Leads whose latest call has a Shunya analysis that is not booked (the
+        check assign_appointment_to_rep applies), in one query.
+        """
+        if not lead_ids:
+            return set()
+        from app.models.call import Call
+        rows = self.db.query(Call.lead_id, CallAnalysis.booking_status).outerjoin(
+            CallAnalysis,
+            and_(CallAnalysis.call_id == Call.call_id, CallAnalysis.tenant_id == tenant_id),
+        ).filter(
+            Call.company_id == tenant_id,
+            Call.lead_id.in_(list(lead_ids)),
+        ).order_by(Call.lead_id, Call.created_at.desc())
+        latest: Dict[str, Optional[str]] = {}
+        for lead_id, booking_status in rows:
+            latest.setdefault(lead_id, booking_status)
+        return {
+            lead_id for lead_id, booking_status in latest.items()
+            if booking_status is not None and booking_status != BookingStatus.BOOKED.value
+        }
+    
+    def _last_known_locations(self, tenant_id: str, rep_ids: List[str]) -> Dict[str, Tuple[float, float]]:
+        """Where each rep's most recent recording session ended, in one query."""
+        if not rep_ids:
+            return {}
+        from app.models.recording_session import RecordingSession
+        latest = self.db.query(
+            RecordingSession.rep_id,
+            func.max(RecordingSession.started_at).label("started_at"),
+        ).filter(
+            RecordingSession.company_id == tenant_id,
+            RecordingSession.rep_id.in_(rep_ids),
+            RecordingSession.end_lat.isnot(None),
+            RecordingSession.end_lng.isnot(None),
+        ).group_by(RecordingSession.rep_id).subquery()
+        rows = self.db.query(RecordingSession.rep_id, RecordingSession.end_lat, RecordingSession.end_lng).join(
+            latest,
+            and_(RecordingSession.rep_id == latest.c.rep_id, RecordingSession.started_at == latest.c.started_at),
+        ).filter(RecordingSession.company_id == tenant_id)
+        return {rep_id: (lat, lng) for rep_id, lat, lng in rows}
+    
+    def _rep_windows(
+        self,
+        tenant_id: str,
+        day: date,
+        rep_ids: Optional[Sequence[str]],
+    ) -> Tuple[Any, Dict[str, Optional[Tuple[datetime, datetime]]]]:
+        """
+        Company timezone and each rep's working window on ``day`` (naive UTC,
+        None for reps who are off). Two queries.
+        """
+        tz_name = self.db.query(Company.timezone).filter(Company.id == tenant_id).scalar()
+        tz = pytz.timezone(tz_name or "America/New_York")
+        
+        rep_query = self.db.query(SalesRep, RepShift).outerjoin(
+            RepShift,
+            and_(
+                RepShift.rep_id == SalesRep.user_id,
+                RepShift.company_id == tenant_id,
+                RepShift.shift_date == day,
+            ),
+        ).filter(SalesRep.company_id == tenant_id)
+        if rep_ids is not None:
+            rep_query = rep_query.filter(SalesRep.user_id.in_(list(rep_ids)))
+        
+        return tz, {
+            rep.user_id: _shift_window(rep, shift, day, tz)
+            for rep, shift in rep_query.order_by(SalesRep.user_id)
+        }
+    
+    def _overlap_clauses(self, start: datetime, end: datetime) -> list:
+        """Filter for blocking appointments overlapping [start, end)."""
+        clauses = [
+            Appointment.status.in_(BLOCKING_STATUSES),
+            Appointment.scheduled_start < end,
+            or_(
+                and_(Appointment.scheduled_end.is_(None), Appointment.scheduled_start > start - DEFAULT_APPOINTMENT_DURATION),
+                Appointment.scheduled_end > start,
+            ),
+        ]
+        if self._has_rep_window_constraint():
+            # Same predicate on the indexed range column
+            clauses.append(
+                text("appointments.rep_window && tstzrange(:overlap_start, :overlap_end, '[)')").bindparams(
+                    overlap_start=pytz.utc.localize(start), overlap_end=pytz.utc.localize(end)
+                )
+            )
+        return clauses
+    
+    @staticmethod
+    def _occupies_rep(appointment: Appointment) -> bool:
+        """Whether the exclusion constraint covers this appointment."""
+        return bool(
+            appointment.assigned_rep_id
+            and appointment.scheduled_start
+            and appointment.status in BLOCKING_STATUSES
+            and not appointment.double_booking_allowed
+        )
+    
+    def _find_overlapping(self, tenant_id: str, rep_id: str, appointment: Appointment) -> Optional[Appointment]:
+        """Another blocking appointment of this rep overlapping the given one."""
+        start = appointment.scheduled_start
+        end = _blocked_until(start, appointment.scheduled_end)
+        return self.db.query(Appointment).filter(
+            Appointment.company_id == tenant_id,
+            Appointment.assigned_rep_id == rep_id,
+            Appointment.id != appointment.id,
+            Appointment.double_booking_allowed.isnot(True),
+            *self._overlap_clauses(start, end),
+        ).first()
+    
+    def _has_rep_window_constraint(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+    
+    @staticmethod
+    def _double_booking_error(rep_id: str, appointment: Appointment, overlapping: Appointment) -> DoubleBookingError:
+        return DoubleBookingError(
+            f"Double-booking conflict: Rep {rep_id} already has appointment {overlapping.id} "
+            f"scheduled at {overlapping.scheduled_start} (overlaps with {appointment.scheduled_start})",
+            rep_id,
+            overlapping.id,
+        )
+
+
+def _is_exclusion_violation(error: IntegrityError) -> bool:
+    orig = getattr(error, "orig", None)
+    return (getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)) == EXCLUSION_VIOLATION
+
+
+def _coordinates(appointment: Appointment) -> Optional[Tuple[float, float]]:
+    lat = appointment.location_lat if appointment.location_lat is not None else appointment.geo_lat
+    lng = appointment.location_lng if appointment.location_lng is not None else appointment.geo_lng
+    return (lat, lng) if lat is not None and lng is not None else None
+
+
+def _blocked_until(start: datetime, end: Optional[datetime]) -> datetime:
+    return end if end is not None else start + DEFAULT_APPOINTMENT_DURATION
+
+
+def _shift_window(rep: SalesRep, shift: Optional[RepShift], day: date, tz) -> Optional[Tuple[datetime, datetime]]:
+    """A rep's working window on ``day`` as naive UTC, or None if they are off."""
+    if shift is not None and shift.status == ShiftStatus.OFF:
+        return None
+    start = (shift.scheduled_start if shift else None) or rep.default_shift_start or DEFAULT_SHIFT_START
+    end = (shift.scheduled_end if shift else None) or rep.default_shift_end or DEFAULT_SHIFT_END
+    
+    def to_utc(local: time) -> datetime:
+        return tz.localize(datetime.combine(day, local)).astimezone(pytz.utc).replace(tzinfo=None)
+    
+    return to_utc(start), to_utc(end)
+
 
+def _free_windows(
+    window: Tuple[datetime, datetime],
+    busy: List[Tuple[str, datetime, datetime]],
+) -> List[Tuple[datetime, datetime]]:
+    """Gaps in ``window`` not covered by ``busy`` (sorted by start)."""
+    free = []
+    cursor, window_end = window
+    for _, start, end in busy:
+        if start > cursor:
+            free.append((cursor, min(start, window_end)))
+        cursor = max(cursor, end)
+        if cursor >= window_end:
+            break
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
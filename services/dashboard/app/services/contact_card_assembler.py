@@ -54,6 +54,17 @@ import json
 logger = PIISafeLogger(__name__)
 
 
+def _first_by(db: Session, model, column, values) -> Dict[Any, Any]:
+    """One row of `model` per distinct `column` value, loaded in a single query."""
+    values = {value for value in values if value is not None}
+    if not values:
+        return {}
+    rows: Dict[Any, Any] = {}
+    for row in db.query(model).filter(column.in_(values)).all():
+        rows.setdefault(getattr(row, column.key), row)
+    return rows
+
+
 class ContactCardAssembler:
     """
     Assembles complete Contact Card Detail from all related entities.
@@ -299,10 +310,13 @@ class ContactCardAssembler:
                 .limit(20)
                 .all()
             )
+            reps = _first_by(
+                db, SalesRep, SalesRep.user_id, (entry.rep_id for entry in assignment_history_entries)
+            )
             for entry in assignment_history_entries:
                 rep_name = None
                 if entry.rep_id:
-                    rep = db.query(SalesRep).filter(SalesRep.user_id == entry.rep_id).first()
+                    rep = reps.get(entry.rep_id)
                     if rep:
                         rep_name = getattr(rep, 'name', None) or entry.rep_id
                 rep_assignment_history.append(RepAssignmentHistoryEntry(
@@ -441,14 +455,14 @@ class ContactCardAssembler:
             .order_by(RecordingSession.started_at.desc())
             .all()
         )
+        session_analyses = _first_by(
+            db, RecordingAnalysis, RecordingAnalysis.recording_session_id,
+            (session.id for session in recording_sessions),
+        )
         session_summaries = []
         for session in recording_sessions:
             # Get analysis for outcome/sentiment
-            analysis = (
-                db.query(RecordingAnalysis)
-                .filter(RecordingAnalysis.recording_session_id == session.id)
-                .first()
-            )
+            analysis = session_analyses.get(session.id)
             
             session_summary = RecordingSessionSummary(
                 id=session.id,
@@ -525,11 +539,7 @@ class ContactCardAssembler:
         if recording_sessions:
             # Get most recent analysis
             for session in recording_sessions:
-                analysis = (
-                    db.query(RecordingAnalysis)
-                    .filter(RecordingAnalysis.recording_session_id == session.id)
-                    .first()
-                )
+                analysis = session_analyses.get(session.id)
                 if analysis:
                     transcript_intelligence = CallAnalysisSummary.model_validate(analysis)
                     break
@@ -571,14 +581,13 @@ class ContactCardAssembler:
             .limit(20)
             .all()
         )
+        call_ids = [call_obj.call_id for call_obj in calls]
+        transcripts = _first_by(db, CallTranscript, CallTranscript.call_id, call_ids)
+        analyses = _first_by(db, CallAnalysis, CallAnalysis.call_id, call_ids)
         call_summaries = []
         for call_obj in calls:
             # Get transcript
-            transcript = (
-                db.query(CallTranscript)
-                .filter(CallTranscript.call_id == call_obj.call_id)
-                .first()
-            )
+            transcript = transcripts.get(call_obj.call_id)
             transcript_summary = None
             if transcript:
                 transcript_summary = CallTranscriptSummary(
@@ -590,11 +599,7 @@ class ContactCardAssembler:
                 )
             
             # Get analysis
-            analysis = (
-                db.query(CallAnalysis)
-                .filter(CallAnalysis.call_id == call_obj.call_id)
-                .first()
-            )
+            analysis = analyses.get(call_obj.call_id)
             analysis_summary = None
             if analysis:
                 analysis_summary = CallAnalysisSummary.model_validate(analysis)
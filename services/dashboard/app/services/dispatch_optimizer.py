@@ -0,0 +1,344 @@
+"""
+Batch dispatch optimizer.
+
+Proposes rep assignments for a day's unassigned appointments, minimizing
+total drive time while respecting each rep's working window and existing
+bookings. Appointment times are fixed, so a rep's day is the time-ordered
+sequence of their stops; assigning an appointment means inserting it where it
+fits, with enough drive time from the previous stop and to the next one.
+
+1. A drive-time matrix over every stop and rep origin is computed up front
+   (great-circle distance scaled by a road factor and an average speed).
+2. Greedy: appointments are placed in start-time order, each with the rep
+   whose route gets the smallest added drive time.
+3. Local search: relocate one appointment to another rep, or swap two
+   time-overlapping appointments between reps, whenever it lowers the total;
+   repeated until nothing improves or the time budget is spent.
+
+Pure computation with no database access; AppointmentDispatchService loads
+the inputs and shapes the result.
+"""
+import math
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Moves must improve the total by more than this (minutes) to be applied
+_EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class DispatchStop:
+    """An appointment to route: fixed time window and location."""
+    id: str
+    start: datetime
+    end: datetime
+    lat: Optional[float]  # None only for existing bookings: they hold their slot at no drive time
+    lng: Optional[float]
+
+
+@dataclass
+class DispatchRep:
+    """A rep's working window, existing bookings and starting point."""
+    rep_id: str
+    shift_start: datetime
+    shift_end: datetime
+    booked: List[DispatchStop] = field(default_factory=list)
+    origin: Optional[Tuple[float, float]] = None  # None: the day starts at the first stop
+
+
+@dataclass
+class DispatchPlan:
+    """Proposed assignments and their drive time."""
+    assignments: Dict[str, str]  # appointment ID -> rep ID
+    routes: Dict[str, List[str]]  # rep ID -> appointment IDs in visiting order (booked included)
+    drive_minutes: Dict[str, float]  # rep ID -> drive time of the whole route
+    unassigned: Dict[str, str]  # appointment ID -> reason
+    total_drive_minutes: float
+    greedy_drive_minutes: float  # total before local search
+    moves: int
+    elapsed_ms: float
+
+
+def haversine_matrix(
+    origins: Sequence[Tuple[float, float]],
+    destinations: Sequence[Tuple[float, float]],
+) -> List[List[float]]:
+    """
+    Great-circle distances in km between every origin and destination.
+
+    Points are converted to unit vectors once, so each pair costs a chord
+    length and an asin (the haversine formula rearranged) instead of four
+    trig calls.
+    """
+    dest_vectors = [_unit_vector(lat, lng) for lat, lng in destinations]
+    diameter = 2 * EARTH_RADIUS_KM
+    rows = []
+    for lat, lng in origins:
+        x, y, z = _unit_vector(lat, lng)
+        rows.append([
+            diameter * math.asin(min(1.0, math.sqrt((x - dx) ** 2 + (y - dy) ** 2 + (z - dz) ** 2) / 2))
+            for dx, dy, dz in dest_vectors
+        ])
+    return rows
+
+
+def _unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lng)
+    cos_phi = math.cos(phi)
+    return cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi)
+
+
+def optimize_dispatch(
+    stops: Sequence[DispatchStop],
+    reps: Sequence[DispatchRep],
+    *,
+    speed_kmh: float,
+    road_factor: float,
+    max_seconds: float,
+) -> DispatchPlan:
+    """
+    Assign ``stops`` to ``reps`` minimizing total drive time.
+
+    Args:
+        stops: Unassigned appointments to place
+        reps: Candidate reps with their windows and existing bookings
+        speed_kmh: Average driving speed
+        road_factor: Road distance per straight-line distance
+        max_seconds: Time budget for local search (the greedy pass always runs)
+
+    Returns:
+        DispatchPlan; appointments that fit no rep are reported in ``unassigned``
+    """
+    started = time.perf_counter()
+    return _Solver(stops, reps, speed_kmh, road_factor).solve(started, started + max_seconds)
+
+
+class _Solver:
+    """Index-based route state shared by the greedy and local search passes."""
+
+    def __init__(self, stops, reps, speed_kmh, road_factor):
+        self.stops = list(stops)
+        self.reps = list(reps)
+
+        # Points: candidate stops, then booked stops, then rep origins
+        points = list(self.stops)
+        for rep in self.reps:
+            points.extend(rep.booked)
+        origin_of: List[Optional[int]] = []
+        unlocated = [i for i, stop in enumerate(points) if stop.lat is None or stop.lng is None]
+        coordinates = [(stop.lat or 0.0, stop.lng or 0.0) for stop in points]
+        for rep in self.reps:
+            if rep.origin is None:
+                origin_of.append(None)
+            else:
+                origin_of.append(len(coordinates))
+                coordinates.append(rep.origin)
+
+        epoch = min([stop.start for stop in points] + [rep.shift_start for rep in self.reps], default=datetime.utcnow())
+
+        def minutes(moment: datetime) -> float:
+            return (moment - epoch).total_seconds() / 60
+
+        self.ids = [stop.id for stop in points]
+        self.start = [minutes(stop.start) for stop in points]
+        self.end = [minutes(stop.end) for stop in points]
+        self.shift = [(minutes(rep.shift_start), minutes(rep.shift_end)) for rep in self.reps]
+        self.origin = origin_of
+
+        minutes_per_km = road_factor / speed_kmh * 60
+        self.travel = [
+            [km * minutes_per_km for km in row]
+            for row in haversine_matrix(coordinates, coordinates)
+        ]
+        for i in unlocated:
+            self.travel[i] = [0.0] * len(coordinates)
+            for row in self.travel:
+                row[i] = 0.0
+
+        # Routes hold point indices sorted by start; booked stops are pinned
+        self.routes: List[List[int]] = []
+        self.starts: List[List[float]] = []
+        offset = len(self.stops)
+        for rep in self.reps:
+            pinned = sorted(range(offset, offset + len(rep.booked)), key=self.start.__getitem__)
+            offset += len(rep.booked)
+            self.routes.append(pinned)
+            self.starts.append([self.start[i] for i in pinned])
+        self.assigned_to: Dict[int, int] = {}
+        self.moves = 0
+
+    # Route primitives
+
+    def _leg_before(self, r: int, pos: int, stop: int) -> Optional[float]:
+        """Drive time into ``stop`` at ``pos`` of route ``r``, or None if it cannot make it."""
+        route = self.routes[r]
+        if pos:
+            prev = route[pos - 1]
+            leg = self.travel[prev][stop]
+            ready = self.end[prev] + leg
+        else:
+            origin = self.origin[r]
+            leg = self.travel[origin][stop] if origin is not None else 0.0
+            ready = self.shift[r][0] + leg
+        return leg if ready <= self.start[stop] else None
+
+    def _bridge(self, r: int, pos: int) -> float:
+        """Drive time of the leg ending at ``pos`` (what an insertion there replaces)."""
+        route = self.routes[r]
+        if pos >= len(route):
+            return 0.0
+        nxt = route[pos]
+        if pos:
+            return self.travel[route[pos - 1]][nxt]
+        origin = self.origin[r]
+        return self.travel[origin][nxt] if origin is not None else 0.0
+
+    def insertion_cost(self, r: int, stop: int) -> Tuple[Optional[float], int]:
+        """Added drive time for inserting ``stop`` into route ``r`` (None if infeasible)."""
+        shift_start, shift_end = self.shift[r]
+        if self.start[stop] < shift_start or self.end[stop] > shift_end:
+            return None, 0
+        pos = bisect_left(self.starts[r], self.start[stop])
+        leg_in = self._leg_before(r, pos, stop)
+        if leg_in is None:
+            return None, pos
+        route = self.routes[r]
+        leg_out = 0.0
+        if pos < len(route):
+            nxt = route[pos]
+            leg_out = self.travel[stop][nxt]
+            if self.end[stop] + leg_out > self.start[nxt]:
+                return None, pos
+        return leg_in + leg_out - self._bridge(r, pos), pos
+
+    def insert(self, r: int, stop: int, pos: int) -> None:
+        self.routes[r].insert(pos, stop)
+        self.starts[r].insert(pos, self.start[stop])
+        self.assigned_to[stop] = r
+
+    def remove(self, stop: int) -> Tuple[int, int, float]:
+        """Take ``stop`` out of its route; returns (route, position, drive time saved)."""
+        r = self.assigned_to.pop(stop)
+        route = self.routes[r]
+        pos = route.index(stop)
+        with_stop = self._bridge(r, pos) + self._bridge(r, pos + 1)
+        del route[pos]
+        del self.starts[r][pos]
+        # Dropping a stop never breaks feasibility: drive times obey the triangle inequality
+        return r, pos, with_stop - self._bridge(r, pos)
+
+    def route_minutes(self, r: int) -> float:
+        return sum(self._bridge(r, pos) for pos in range(len(self.routes[r])))
+
+    # Passes
+
+    def solve(self, started: float, deadline: float) -> DispatchPlan:
+        unplaced = self.greedy()
+        greedy_total = sum(self.route_minutes(r) for r in range(len(self.reps)))
+        self.local_search(deadline)
+        # Moves may have opened room for appointments that did not fit before
+        unplaced = [stop for stop in unplaced if not self._place(stop)]
+
+        routes, drive_minutes = {}, {}
+        for r, rep in enumerate(self.reps):
+            routes[rep.rep_id] = [self.ids[i] for i in self.routes[r]]
+            drive_minutes[rep.rep_id] = self.route_minutes(r)
+        return DispatchPlan(
+            assignments={self.ids[stop]: self.reps[r].rep_id for stop, r in sorted(self.assigned_to.items())},
+            routes=routes,
+            drive_minutes=drive_minutes,
+            unassigned={self.ids[stop]: "no_available_rep" for stop in unplaced},
+            total_drive_minutes=sum(drive_minutes.values()),
+            greedy_drive_minutes=greedy_total,
+            moves=self.moves,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    def _place(self, stop: int) -> bool:
+        best_cost, best = None, None
+        for r in range(len(self.reps)):
+            cost, pos = self.insertion_cost(r, stop)
+            # Ties go to the shorter route to spread work across reps
+            if cost is not None and (
+                best_cost is None
+                or cost < best_cost - _EPSILON
+                or (cost < best_cost + _EPSILON and len(self.routes[r]) < len(self.routes[best[0]]))
+            ):
+                best_cost, best = cost, (r, pos)
+        if best is None:
+            return False
+        self.insert(best[0], stop, best[1])
+        return True
+
+    def greedy(self) -> List[int]:
+        order = sorted(range(len(self.stops)), key=lambda i: (self.start[i], self.end[i]))
+        return [stop for stop in order if not self._place(stop)]
+
+    def local_search(self, deadline: float) -> None:
+        candidates = sorted(range(len(self.stops)), key=self.start.__getitem__)
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = self._relocate_pass(candidates, deadline)
+            improved = self._swap_pass(candidates, deadline) or improved
+
+    def _relocate_pass(self, candidates: List[int], deadline: float) -> bool:
+        improved = False
+        for stop in candidates:
+            if stop not in self.assigned_to:
+                continue
+            if time.perf_counter() >= deadline:
+                break
+            home, home_pos, saved = self.remove(stop)
+            best_gain, best = _EPSILON, None
+            for r in range(len(self.reps)):
+                if r == home:
+                    continue
+                cost, pos = self.insertion_cost(r, stop)
+                if cost is not None and saved - cost > best_gain:
+                    best_gain, best = saved - cost, (r, pos)
+            if best is None:
+                self.insert(home, stop, home_pos)
+            else:
+                self.insert(best[0], stop, best[1])
+                self.moves += 1
+                improved = True
+        return improved
+
+    def _swap_pass(self, candidates: List[int], deadline: float) -> bool:
+        # Only time-overlapping pairs: those are the ones relocation cannot
+        # improve because each appointment blocks the other's slot
+        improved = False
+        for i, first in enumerate(candidates):
+            if time.perf_counter() >= deadline:
+                break
+            for second in candidates[i + 1:]:
+                if self.start[second] >= self.end[first]:
+                    break
+                if first not in self.assigned_to or second not in self.assigned_to:
+                    continue
+                if self.assigned_to[first] == self.assigned_to[second]:
+                    continue
+                if self._try_swap(first, second):
+                    self.moves += 1
+                    improved = True
+        return improved
+
+    def _try_swap(self, first: int, second: int) -> bool:
+        r1, pos1, saved1 = self.remove(first)
+        r2, pos2, saved2 = self.remove(second)
+        cost2, new_pos2 = self.insertion_cost(r1, second)
+        if cost2 is not None:
+            self.insert(r1, second, new_pos2)
+            cost1, new_pos1 = self.insertion_cost(r2, first)
+            if cost1 is not None and saved1 + saved2 - cost1 - cost2 > _EPSILON:
+                self.insert(r2, first, new_pos1)
+                return True
+            self.remove(second)
+        self.insert(r2, second, pos2)
+        self.insert(r1, first, pos1)
+        return False
@@ -1,16 +1,104 @@
 """
 Geocoding service for converting addresses to geographic coordinates.
+
+Lookups go through two cache tiers before hitting a provider:
+an in-process LRU keyed by normalized address, then the shared
+``geocode_cache`` table. Bulk callers should use ``geocode_batch`` which
+resolves cache hits in one query and fans the misses out concurrently
+while respecting each provider's QPS limit.
 """
-from typing import Optional, Tuple
+import asyncio
 import re
-from urllib.parse import quote
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import httpx
 import requests
+from sqlalchemy.exc import IntegrityError
+
 from app.config import settings
 from app.core.pii_masking import PIISafeLogger
+from app.obs.metrics import record_cache_hit, record_cache_miss
 
 logger = PIISafeLogger(__name__)
 
+GOOGLE_GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+NOMINATIM_HEADERS = {"User-Agent": "OttoAI-Geocoding-Service/1.0"}  # Required by Nominatim
+
+# Retry budget for provider throttling (HTTP 429 / OVER_QUERY_LIMIT)
+MAX_THROTTLE_RETRIES = 3
+
+# Pending geocode_cache hit counts written without a database lookup to piggyback on
+HIT_COUNT_FLUSH_SIZE = 100
+
+Coordinates = Tuple[float, float]
+
+
+class _LRUCache:
+    """Small thread-safe LRU used as the in-memory front of the geocode cache."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Coordinates]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Coordinates]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Coordinates) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _RateLimiter:
+    """
+    Spaces out provider requests to at most ``qps`` per second.
+
+    ``reserve()`` hands out the next free slot and returns how long the caller
+    must wait for it, so the same limiter works for both the sync path
+    (``time.sleep``) and the async batch path (``asyncio.sleep``).
+    """
+
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    def wait(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 
 class GeocodingService:
     """
@@ -22,6 +110,30 @@ class GeocodingService:
     def __init__(self):
         self.google_api_key = getattr(settings, 'GOOGLE_MAPS_API_KEY', None)
         self.use_google = bool(self.google_api_key)
+        self._memory_cache = _LRUCache(settings.GEOCODE_CACHE_SIZE)
+        self._pending_hits: Counter = Counter()
+        self._hits_lock = threading.Lock()
+        self._limiters = {
+            "google": _RateLimiter(settings.GEOCODE_GOOGLE_QPS),
+            "nominatim": _RateLimiter(settings.GEOCODE_NOMINATIM_QPS),
+        }
+    
+    @staticmethod
+    def normalize_address(address: Optional[str]) -> str:
+        """
+        Normalize an address into a cache key.
+        
+        Lowercases, drops punctuation that does not change meaning and
+        collapses whitespace so "123 Main St., Austin TX" and
+        "123  main st, austin tx" share a cache entry.
+        """
+        if not address:
+            return ""
+        normalized = address.lower().strip()
+        normalized = re.sub(r"[.#]", "", normalized)
+        normalized = re.sub(r"\s*,\s*", ", ", normalized)
+        normalized = re.sub(r"\s+", " ", normalized)
+        return normalized.strip(" ,")[:500]
     
     def geocode_address(
         self,
@@ -38,25 +150,36 @@ class GeocodingService:
         Returns:
             Tuple of (latitude, longitude) or None if geocoding fails
         """
-        if not address or not address.strip():
+        key = self.normalize_address(address)
+        if not key:
             logger.warning(f"Empty address provided for geocoding (company: {company_id})")
             return None
         
+        cached = self._lookup_cached([key]).get(key)
+        if cached:
+            return cached
+        
+        record_cache_miss("geocode")
+        
         # Try Google Maps first
         if self.use_google:
             try:
+                self._limiters["google"].wait()
                 result = self._geocode_google(address)
                 if result:
                     logger.info(f"Geocoded address via Google Maps: {address[:50]}... -> {result}")
+                    self._store_cached({key: (result, "google")})
                     return result
             except Exception as e:
                 logger.warning(f"Google Maps geocoding failed: {str(e)}, trying fallback")
         
         # Fallback: Use Nominatim (OpenStreetMap) - free, no API key needed
         try:
+            self._limiters["nominatim"].wait()
             result = self._geocode_nominatim(address)
             if result:
                 logger.info(f"Geocoded address via Nominatim: {address[:50]}... -> {result}")
+                self._store_cached({key: (result, "nominatim")})
                 return result
         except Exception as e:
             logger.error(f"Geocoding failed for address {address[:50]}...: {str(e)}")
@@ -64,9 +187,285 @@ class GeocodingService:
         
         return None
     
+    async def geocode_address_async(
+        self,
+        address: str,
+        company_id: Optional[str] = None
+    ) -> Optional[Tuple[float, float]]:
+        """Async variant of geocode_address for use inside request handlers."""
+        results = await self.geocode_batch([address], company_id=company_id)
+        return results.get(address)
+    
+    async def geocode_batch(
+        self,
+        addresses: Iterable[str],
+        company_id: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Geocode many addresses at once.
+        
+        Cache hits are resolved with a single query (run in a worker
+        thread, as is the write of new results); misses are geocoded
+        concurrently (bounded by ``concurrency``) while each provider's
+        rate limiter keeps us under its QPS. New results are persisted in
+        one write.
+        
+        Args:
+            addresses: Address strings (duplicates are geocoded once)
+            company_id: Optional tenant ID for logging
+            concurrency: Max in-flight provider requests
+        
+        Returns:
+            Dict mapping each input address to (latitude, longitude) or None
+        """
+        keys_by_address = {address: self.normalize_address(address) for address in addresses}
+        unique_keys: Dict[str, str] = {}
+        for address, key in keys_by_address.items():
+            if key and key not in unique_keys:
+                unique_keys[key] = address
+        
+        # The cache tiers use a sync session; keep that work off the event loop
+        resolved: Dict[str, Optional[Coordinates]] = dict(
+            await asyncio.to_thread(self._lookup_cached, list(unique_keys))
+        )
+        misses = [key for key in unique_keys if key not in resolved]
+        
+        if misses:
+            for _ in misses:
+                record_cache_miss("geocode")
+            
+            semaphore = asyncio.Semaphore(concurrency or settings.GEOCODE_BATCH_CONCURRENCY)
+            
+            async with httpx.AsyncClient(timeout=10) as client:
+                async def _geocode_one(key: str):
+                    async with semaphore:
+                        return key, await self._geocode_uncached_async(client, unique_keys[key])
+                
+                outcomes = await asyncio.gather(*(_geocode_one(key) for key in misses))
+            
+            to_store = {}
+            for key, outcome in outcomes:
+                if outcome:
+                    resolved[key] = outcome[0]
+                    to_store[key] = outcome
+                else:
+                    resolved[key] = None
+            
+            if to_store:
+                await asyncio.to_thread(self._store_cached, to_store)
+            
+            logger.info(
+                f"Batch geocoded {len(unique_keys)} addresses "
+                f"({len(unique_keys) - len(misses)} cached, {len(to_store)} new, "
+                f"{len(misses) - len(to_store)} failed) (company: {company_id})"
+            )
+        
+        return {address: resolved.get(key) if key else None for address, key in keys_by_address.items()}
+    
+    async def _geocode_uncached_async(
+        self,
+        client: httpx.AsyncClient,
+        address: str
+    ) -> Optional[Tuple[Coordinates, str]]:
+        """Geocode one address against the providers, returning (coords, provider)."""
+        if self.use_google:
+            try:
+                result = await self._geocode_google_async(client, address)
+                if result:
+                    return result, "google"
+            except Exception as e:
+                logger.warning(f"Google Maps geocoding failed: {str(e)}, trying fallback")
+        
+        try:
+            result = await self._geocode_nominatim_async(client, address)
+            if result:
+                return result, "nominatim"
+        except Exception as e:
+            logger.error(f"Geocoding failed for address {address[:50]}...: {str(e)}")
+        
+        return None
+    
+    async def _geocode_google_async(
+        self,
+        client: httpx.AsyncClient,
+        address: str
+    ) -> Optional[Coordinates]:
+        """Geocode using Google Maps API, backing off when throttled."""
+        params = {"address": address, "key": self.google_api_key}
+        
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await self._limiters["google"].wait_async()
+            response = await client.get(GOOGLE_GEOCODE_URL, params=params)
+            if response.status_code != 429:
+                response.raise_for_status()
+                data = response.json()
+                if data.get("status") != "OVER_QUERY_LIMIT":
+                    break
+            if attempt == MAX_THROTTLE_RETRIES:
+                logger.warning("Google Maps geocoding still throttled after retries")
+                return None
+            await asyncio.sleep(2 ** attempt)
+        
+        if data.get("status") != "OK" or not data.get("results"):
+            logger.warning(f"Google Maps geocoding returned status: {data.get('status')}")
+            return None
+        
+        location = data["results"][0]["geometry"]["location"]
+        return (location["lat"], location["lng"])
+    
+    async def _geocode_nominatim_async(
+        self,
+        client: httpx.AsyncClient,
+        address: str
+    ) -> Optional[Coordinates]:
+        """Geocode using Nominatim, backing off when throttled."""
+        params = {"q": address, "format": "json", "limit": 1}
+        
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await self._limiters["nominatim"].wait_async()
+            response = await client.get(NOMINATIM_SEARCH_URL, params=params, headers=NOMINATIM_HEADERS)
+            if response.status_code != 429:
+                break
+            if attempt == MAX_THROTTLE_RETRIES:
+                logger.warning("Nominatim geocoding still throttled after retries")
+                return None
+            await asyncio.sleep(2 ** attempt)
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        if not data:
+            logger.warning(f"Nominatim geocoding returned no results for: {address[:50]}...")
+            return None
+        
+        return (float(data[0]["lat"]), float(data[0]["lon"]))
+    
+    def _lookup_cached(self, keys: List[str]) -> Dict[str, Coordinates]:
+        """
+        Resolve normalized addresses from the LRU, then the geocode_cache table.
+        
+        Hits (memory and database) are counted in _pending_hits and written
+        back in one UPDATE per distinct increment whenever this goes to the
+        database anyway, or once HIT_COUNT_FLUSH_SIZE hits have accumulated.
+        Database errors are logged and treated as misses; the cache must
+        never make geocoding fail. Blocking: async callers run it in a thread.
+        """
+        found: Dict[str, Coordinates] = {}
+        db_keys = []
+        for key in keys:
+            cached = self._memory_cache.get(key)
+            if cached:
+                record_cache_hit("geocode_memory")
+                found[key] = cached
+            else:
+                db_keys.append(key)
+        self._note_hits(list(found))
+        
+        with self._hits_lock:
+            pending = sum(self._pending_hits.values())
+        if not db_keys and pending < HIT_COUNT_FLUSH_SIZE:
+            return found
+        
+        from app.database import SessionLocal
+        from app.models.geocode_cache import GeocodeCache
+        
+        db = SessionLocal()
+        try:
+            if db_keys:
+                rows = db.query(GeocodeCache).filter(
+                    GeocodeCache.normalized_address.in_(db_keys)
+                ).all()
+                for row in rows:
+                    coords = (row.latitude, row.longitude)
+                    self._memory_cache.set(row.normalized_address, coords)
+                    found[row.normalized_address] = coords
+                    record_cache_hit("geocode_db")
+                self._note_hits(row.normalized_address for row in rows)
+            
+            self._flush_hits(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Geocode cache lookup failed: {str(e)}")
+        finally:
+            db.close()
+        
+        return found
+    
+    def _note_hits(self, keys: Iterable[str]) -> None:
+        with self._hits_lock:
+            self._pending_hits.update(keys)
+    
+    def _flush_hits(self, db) -> None:
+        """Write pending hit counts: one UPDATE per distinct increment (normally just +1)."""
+        from app.models.geocode_cache import GeocodeCache
+        
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, Counter()
+        if not pending:
+            return
+        
+        keys_by_increment: Dict[int, List[str]] = defaultdict(list)
+        for key, increment in pending.items():
+            keys_by_increment[increment].append(key)
+        
+        now = datetime.utcnow()
+        try:
+            for increment, keys in keys_by_increment.items():
+                db.query(GeocodeCache).filter(
+                    GeocodeCache.normalized_address.in_(keys)
+                ).update(
+                    {
+                        GeocodeCache.hit_count: GeocodeCache.hit_count + increment,
+                        GeocodeCache.last_used_at: now,
+                    },
+                    synchronize_session=False
+                )
+            db.commit()
+        except Exception:
+            # Counts are best effort; put them back for the next flush
+            with self._hits_lock:
+                self._pending_hits.update(pending)
+            raise
+    
+    def _store_cached(self, results: Dict[str, Tuple[Coordinates, str]]) -> None:
+        """Write newly geocoded addresses to the LRU and the geocode_cache table."""
+        for key, (coords, _provider) in results.items():
+            self._memory_cache.set(key, coords)
+        
+        from app.database import SessionLocal
+        from app.models.geocode_cache import GeocodeCache
+        
+        db = SessionLocal()
+        try:
+            existing = {
+                row[0] for row in db.query(GeocodeCache.normalized_address).filter(
+                    GeocodeCache.normalized_address.in_(list(results))
+                ).all()
+            }
+            db.add_all([
+                GeocodeCache(
+                    normalized_address=key,
+                    latitude=coords[0],
+                    longitude=coords[1],
+                    provider=provider,
+                )
+                for key, (coords, provider) in results.items()
+                if key not in existing
+            ])
+            db.commit()
+        except IntegrityError:
+            # Another worker cached the same address concurrently
+            db.rollback()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to persist geocode cache entries: {str(e)}")
+        finally:
+            db.close()
+    
     def _geocode_google(self, address: str) -> Optional[Tuple[float, float]]:
         """Geocode using Google Maps API."""
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
+        url = GOOGLE_GEOCODE_URL
         params = {
             "address": address,
             "key": self.google_api_key
@@ -91,17 +490,14 @@ class GeocodingService:
         Note: Nominatim has rate limits (1 request/second recommended).
         Use for development/testing or when Google Maps API key is not available.
         """
-        url = "https://nominatim.openstreetmap.org/search"
+        url = NOMINATIM_SEARCH_URL
         params = {
             "q": address,
             "format": "json",
             "limit": 1
         }
-        headers = {
-            "User-Agent": "OttoAI-Geocoding-Service/1.0"  # Required by Nominatim
-        }
         
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = requests.get(url, params=params, headers=NOMINATIM_HEADERS, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -184,12 +580,3 @@ class GeocodingService:
 
 # Global geocoding service instance
 geocoding_service = GeocodingService()
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,347 @@
+"""
+Geofence storage, point-in-geofence resolution and batched event ingestion.
+
+Geofences live in the geofences table (one row per booked call) instead of
+each rep's SalesRep.active_geofences JSON list, so assignment changes and
+high-frequency location updates never rewrite rep rows. Lookups filter on
+the bounding-box columns (GiST box index on PostgreSQL) and then check the
+exact great-circle distance.
+
+Mobile clients post batches of location samples and/or entry/exit events;
+samples are resolved server-side against the rep's active geofences and
+turned into entry/exit transitions, which are logged to geofence_events and
+applied to the call's visit fields. A batch costs a fixed number of queries
+regardless of its size.
+"""
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, text
+from sqlalchemy.orm import Session
+
+from app.core.pii_masking import PIISafeLogger
+from app.models.call import Call
+from app.models.geofence import Geofence, GeofenceEvent
+from app.services.dispatch_optimizer import haversine_matrix
+
+logger = PIISafeLogger(__name__)
+
+# Default geofence radius in meters
+DEFAULT_GEOFENCE_RADIUS_M = 250
+
+METERS_PER_DEGREE_LAT = 111320.0
+
+ENTRY = "entry"
+EXIT = "exit"
+
+
+def bounding_box(latitude: float, longitude: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle."""
+    dlat = radius_m / METERS_PER_DEGREE_LAT
+    dlng = radius_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 1e-6))
+    return latitude - dlat, latitude + dlat, longitude - dlng, longitude + dlng
+
+
+def calculate_time_difference_minutes(start_time: datetime, end_time: datetime) -> int:
+    """Calculate the time difference in minutes between two timestamps"""
+    if not start_time or not end_time:
+        return 0
+
+    diff = end_time - start_time
+    return int(diff.total_seconds() / 60)
+
+
+def apply_geofence_event(
+    call: Call,
+    event_type: str,
+    event_timestamp: datetime,
+    battery_percentage: Optional[float] = None,
+    is_charging: Optional[bool] = None,
+) -> None:
+    """
+    Record an entry/exit on the call's visit fields.
+
+    Tracks the first two entries/exits, time spent in the geofence, battery
+    at first entry, and stops a running recording on exit.
+    """
+    if event_type == ENTRY:
+        call.geofence_entry_count = (call.geofence_entry_count or 0) + 1
+
+        if not call.geofence_entry_1_ts:
+            call.geofence_entry_1_ts = event_timestamp
+            call.battery_at_geofence_entry = battery_percentage
+            call.charging_at_geofence_entry = is_charging
+        elif not call.geofence_entry_2_ts and call.geofence_exit_1_ts:
+            # Second entry (only log if there was a first exit)
+            call.geofence_entry_2_ts = event_timestamp
+
+        if call.geofence_entry_count > 1:
+            call.geofence_multiple_entries = True
+        return
+
+    if call.geofence_entry_1_ts and not call.geofence_exit_1_ts:
+        call.geofence_exit_1_ts = event_timestamp
+        call.geofence_time_1_m = calculate_time_difference_minutes(call.geofence_entry_1_ts, event_timestamp)
+    elif call.geofence_entry_2_ts and not call.geofence_exit_2_ts:
+        call.geofence_exit_2_ts = event_timestamp
+        call.geofence_time_2_m = calculate_time_difference_minutes(call.geofence_entry_2_ts, event_timestamp)
+    else:
+        return
+
+    # If recording is still running, stop it
+    if call.recording_started_ts and not call.recording_stopped_ts:
+        call.recording_stopped_ts = event_timestamp
+        call.recording_duration_s = int((event_timestamp - call.recording_started_ts).total_seconds())
+
+
+class GeofenceService:
+    """Geofence rows, lookups and event ingestion for one DB session."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_call_geofences(
+        self,
+        located_calls: Iterable[Tuple[Call, float, float]],
+        radius_m: float = DEFAULT_GEOFENCE_RADIUS_M,
+    ) -> Dict[int, Geofence]:
+        """
+        Create or move the geofences of geocoded calls (one existence query).
+
+        Also refreshes Call.geofence, which mobile payloads still return.
+        Does not commit.
+        """
+        located = {call.call_id: (call, lat, lng) for call, lat, lng in located_calls}
+        if not located:
+            return {}
+        existing = {
+            geofence.call_id: geofence
+            for geofence in self.db.query(Geofence).filter(Geofence.call_id.in_(list(located)))
+        }
+
+        geofences = {}
+        for call_id, (call, lat, lng) in located.items():
+            geofence = existing.get(call_id)
+            if geofence is None:
+                geofence = Geofence(call_id=call_id, created_at=datetime.utcnow())
+                self.db.add(geofence)
+            min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_m)
+            geofence.company_id = call.company_id
+            geofence.rep_id = call.assigned_rep_id
+            geofence.latitude, geofence.longitude, geofence.radius_m = lat, lng, radius_m
+            geofence.min_lat, geofence.max_lat, geofence.min_lng, geofence.max_lng = min_lat, max_lat, min_lng, max_lng
+            geofence.address = call.address
+            geofence.active = bool(call.booked) and not call.cancelled
+            call.geofence = geofence.to_dict()
+            geofences[call_id] = geofence
+        return geofences
+
+    def sync_rep(self, rep_id: str) -> int:
+        """
+        Point the rep's geofences at their booked, non-cancelled calls.
+
+        Two set-based UPDATEs; calls reassigned to another rep are picked up
+        by that rep's sync. Does not commit.
+
+        Returns:
+            Number of active geofences the rep now has
+        """
+        active_calls = self.db.query(Call.call_id).filter(
+            Call.assigned_rep_id == rep_id,
+            Call.booked.is_(True),
+            Call.cancelled.isnot(True),
+        ).scalar_subquery()
+
+        activated = self.db.query(Geofence).filter(Geofence.call_id.in_(active_calls)).update(
+            {Geofence.rep_id: rep_id, Geofence.active: True, Geofence.updated_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+        self.db.query(Geofence).filter(
+            Geofence.rep_id == rep_id,
+            Geofence.active.is_(True),
+            Geofence.call_id.notin_(active_calls),
+        ).update({Geofence.active: False, Geofence.updated_at: datetime.utcnow()}, synchronize_session=False)
+        return activated
+
+    def deactivate_call(self, call_id: int) -> bool:
+        """Stop monitoring a call's geofence (sale closed or cancelled). Does not commit."""
+        return bool(self.db.query(Geofence).filter(
+            Geofence.call_id == call_id,
+            Geofence.active.is_(True),
+        ).update({Geofence.active: False, Geofence.updated_at: datetime.utcnow()}, synchronize_session=False))
+
+    def active_for_rep(self, rep_id: str, tenant_id: Optional[str] = None) -> List[Geofence]:
+        return self._rep_geofences(rep_id, tenant_id).filter(
+            Geofence.active.is_(True),
+        ).order_by(Geofence.created_at.desc()).all()
+
+    def _rep_geofences(self, rep_id: str, tenant_id: Optional[str]):
+        """Query over the rep's geofences, within the tenant when one is given."""
+        query = self.db.query(Geofence).filter(Geofence.rep_id == rep_id)
+        if tenant_id is not None:
+            query = query.filter(Geofence.company_id == tenant_id)
+        return query
+
+    def resolve(
+        self, rep_id: str, points: Sequence[Tuple[float, float]], tenant_id: Optional[str] = None
+    ) -> List[List[Geofence]]:
+        """
+        Active geofences of the rep containing each point, in one query.
+
+        Candidates are those whose bounding box intersects the points'
+        envelope; membership is then the exact distance to the center.
+        """
+        if not points:
+            return []
+        lats = [lat for lat, _ in points]
+        lngs = [lng for _, lng in points]
+        south, north, west, east = min(lats), max(lats), min(lngs), max(lngs)
+
+        query = self._rep_geofences(rep_id, tenant_id).filter(
+            Geofence.active.is_(True),
+            Geofence.min_lat <= north,
+            Geofence.max_lat >= south,
+            Geofence.min_lng <= east,
+            Geofence.max_lng >= west,
+        )
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Same predicate on the GiST box index
+            query = query.filter(text(
+                "box(point(geofences.min_lng, geofences.min_lat), point(geofences.max_lng, geofences.max_lat)) "
+                "&& box(point(:west, :south), point(:east, :north))"
+            ).bindparams(west=west, south=south, east=east, north=north))
+        candidates = query.all()
+        if not candidates:
+            return [[] for _ in points]
+
+        distances_km = haversine_matrix(points, [(g.latitude, g.longitude) for g in candidates])
+        return [
+            [g for g, km in zip(candidates, row) if km * 1000 <= g.radius_m]
+            for row in distances_km
+        ]
+
+    def ingest_events(self, tenant_id: str, rep_id: str, events: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Ingest a batch of location samples and client-detected events for a rep.
+
+        Each item has ``timestamp`` and either ``latitude``/``longitude`` (a
+        sample, resolved server-side) or ``event_type`` + ``call_id`` (an
+        entry/exit the device already detected). Items are processed in
+        timestamp order against the rep's current inside/outside state, taken
+        from their latest logged events. Only the rep's own geofences in the
+        tenant are considered; client events for any other call are dropped.
+        Commits.
+
+        Returns:
+            Dict with ``received`` and the ``events`` that were recorded
+        """
+        items = sorted(events, key=lambda item: item["timestamp"])
+        samples = [item for item in items if not item.get("event_type") and item.get("latitude") is not None]
+        client_call_ids = {item["call_id"] for item in items if item.get("event_type") and item.get("call_id")}
+
+        containing = iter(self.resolve(
+            rep_id, [(item["latitude"], item["longitude"]) for item in samples], tenant_id=tenant_id
+        ))
+        geofence_by_call = {
+            geofence.call_id: geofence
+            for geofence in (
+                self._rep_geofences(rep_id, tenant_id).filter(Geofence.call_id.in_(list(client_call_ids)))
+                if client_call_ids else ()
+            )
+        }
+        inside = self._inside(rep_id)  # geofence_id -> call_id
+
+        recorded: List[GeofenceEvent] = []
+
+        def record(event_type, call_id, geofence_id, item, source):
+            recorded.append(GeofenceEvent(
+                rep_id=rep_id,
+                geofence_id=geofence_id,
+                call_id=call_id,
+                event_type=event_type,
+                occurred_at=item["timestamp"],
+                source=source,
+                latitude=item.get("latitude"),
+                longitude=item.get("longitude"),
+                battery_percentage=item.get("battery_percentage"),
+                is_charging=item.get("is_charging"),
+            ))
+
+        for item in items:
+            event_type = item.get("event_type")
+            if event_type:
+                geofence = geofence_by_call.get(item.get("call_id"))
+                if geofence is None:
+                    continue
+                if event_type == ENTRY:
+                    inside[geofence.id] = geofence.call_id
+                else:
+                    inside.pop(geofence.id, None)
+                record(event_type, geofence.call_id, geofence.id, item, "client")
+            elif item.get("latitude") is not None:
+                now_inside = {geofence.id: geofence.call_id for geofence in next(containing)}
+                for geofence_id, call_id in inside.items():
+                    if geofence_id not in now_inside:
+                        record(EXIT, call_id, geofence_id, item, "server")
+                for geofence_id, call_id in now_inside.items():
+                    if geofence_id not in inside:
+                        record(ENTRY, call_id, geofence_id, item, "server")
+                inside = now_inside
+
+        if recorded:
+            calls = {
+                call.call_id: call
+                for call in self.db.query(Call).filter(
+                    Call.call_id.in_({event.call_id for event in recorded}),
+                    Call.company_id == tenant_id,
+                )
+            }
+            for event in recorded:
+                call = calls.get(event.call_id)
+                if call is None:
+                    continue
+                event.company_id = call.company_id
+                apply_geofence_event(
+                    call, event.event_type, event.occurred_at, event.battery_percentage, event.is_charging
+                )
+            recorded = [event for event in recorded if event.call_id in calls]
+            self.db.add_all(recorded)
+
+        # Built before commit expires the new rows
+        result = {
+            "received": len(items),
+            "events": [
+                {
+                    "call_id": event.call_id,
+                    "geofence_id": event.geofence_id,
+                    "event_type": event.event_type,
+                    "timestamp": event.occurred_at.isoformat(),
+                    "source": event.source,
+                }
+                for event in recorded
+            ],
+        }
+        self.db.commit()
+
+        logger.info(f"Ingested {len(items)} location items for rep {rep_id}: {len(recorded)} geofence events")
+        return result
+
+    def _inside(self, rep_id: str) -> Dict[str, int]:
+        """Geofences (-> call ID) whose latest event for the rep is an entry, in one query."""
+        latest = self.db.query(
+            GeofenceEvent.geofence_id,
+            func.max(GeofenceEvent.occurred_at).label("occurred_at"),
+        ).filter(
+            GeofenceEvent.rep_id == rep_id,
+            GeofenceEvent.geofence_id.isnot(None),
+        ).group_by(GeofenceEvent.geofence_id).subquery()
+
+        rows = self.db.query(GeofenceEvent.geofence_id, GeofenceEvent.call_id, GeofenceEvent.event_type).join(
+            latest,
+            and_(
+                GeofenceEvent.geofence_id == latest.c.geofence_id,
+                GeofenceEvent.occurred_at == latest.c.occurred_at,
+            ),
+        ).filter(GeofenceEvent.rep_id == rep_id)
+        return {geofence_id: call_id for geofence_id, call_id, event_type in rows if event_type == ENTRY}
@@ -196,28 +196,29 @@ def cleanup_old_idempotency_keys():
     """
     Cleanup task to remove old idempotency keys.
     Should be run periodically (e.g., via Celery).
+    
+    Deletes in primary-key batches via the retention purge engine so a large
+    backlog doesn't run as one long DELETE.
     """
-    ttl_days = int(os.getenv('IDEMPOTENCY_TTL_DAYS', '90'))
-    cutoff_date = datetime.utcnow() - timedelta(days=ttl_days)
+    from app.services.retention import get_retention_policy, purge_expired_rows
+    from app.obs.metrics import record_idempotency_purged
     
-    db = next(get_db())
+    ttl_days = int(os.getenv('IDEMPOTENCY_TTL_DAYS', '90'))
     
     try:
-        delete_query = text("""
-            DELETE FROM idempotency_keys 
-            WHERE last_seen_at < :cutoff_date
-        """)
-        
-        result = db.execute(delete_query, {'cutoff_date': cutoff_date})
-        deleted_count = result.rowcount
-        
-        db.commit()
+        result = purge_expired_rows(
+            get_retention_policy("idempotency_keys", retention=timedelta(days=ttl_days))
+        )
+        deleted_count = result.rows_purged
         
         logger.info(
             f"Cleaned up {deleted_count} old idempotency keys older than {ttl_days} days",
             extra={
                 'deleted_count': deleted_count,
                 'ttl_days': ttl_days,
+                'batches': result.batches,
+                'duration_ms': result.duration_ms,
+                'completed': result.completed,
                 'task': 'cleanup_old_idempotency_keys'
             }
         )
@@ -225,16 +226,13 @@ def cleanup_old_idempotency_keys():
         # Increment purge metrics
         global webhook_idempotency_purged_total
         webhook_idempotency_purged_total += deleted_count
+        record_idempotency_purged("webhook", deleted_count)
         
         return deleted_count
         
     except Exception as e:
-        db.rollback()
         logger.error(f"Failed to cleanup old idempotency keys: {e}")
         raise
-    
-    finally:
-        db.close()
 
 
 def get_idempotency_stats() -> Dict[str, int]:
@@ -4,7 +4,7 @@ Provides real-time metrics for revenue, calls, leads, and CSR performance
 """
 import asyncio
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, time as dt_time, timedelta
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func, and_, or_
@@ -98,21 +98,25 @@ class LiveMetricsService:
         """Calculate metrics for a specific tenant."""
         try:
             now = datetime.utcnow()
-            today = now.date()
+            # Half-open [start, end) datetime bounds keep the created_at
+            # predicates sargable (DATE(created_at) = :today cannot use
+            # the (company_id, created_at) indexes).
+            today = datetime.combine(now.date(), dt_time.min)
+            tomorrow = today + timedelta(days=1)
             week_start = today - timedelta(days=today.weekday())
             month_start = today.replace(day=1)
             
             # Revenue metrics
-            revenue_metrics = await self._calculate_revenue_metrics(db, tenant_id, today, week_start, month_start)
+            revenue_metrics = await self._calculate_revenue_metrics(db, tenant_id, today, tomorrow, week_start, month_start)
             
             # Call metrics
-            call_metrics = await self._calculate_call_metrics(db, tenant_id, today)
+            call_metrics = await self._calculate_call_metrics(db, tenant_id, today, tomorrow)
             
             # Lead metrics
-            lead_metrics = await self._calculate_lead_metrics(db, tenant_id, today)
+            lead_metrics = await self._calculate_lead_metrics(db, tenant_id, today, tomorrow)
             
             # CSR performance metrics
-            csr_metrics = await self._calculate_csr_metrics(db, tenant_id, today)
+            csr_metrics = await self._calculate_csr_metrics(db, tenant_id, today, tomorrow)
             
             return {
                 "timestamp": now.isoformat(),
@@ -129,7 +133,7 @@ class LiveMetricsService:
                 "error": str(e)
             }
     
-    async def _calculate_revenue_metrics(self, db: Session, tenant_id: str, today, week_start, month_start) -> Dict[str, Any]:
+    async def _calculate_revenue_metrics(self, db: Session, tenant_id: str, today: datetime, tomorrow: datetime, week_start: datetime, month_start: datetime) -> Dict[str, Any]:
         """Calculate revenue metrics."""
         try:
             # Today's revenue (from calls where bought = True)
@@ -137,17 +141,17 @@ class LiveMetricsService:
                 SELECT COALESCE(SUM(price_if_bought), 0) as revenue
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
+                AND created_at >= :today AND created_at < :tomorrow
                 AND bought = true
                 AND price_if_bought IS NOT NULL
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             # This week's revenue
             week_revenue = db.execute(text("""
                 SELECT COALESCE(SUM(price_if_bought), 0) as revenue
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) >= :week_start
+                AND created_at >= :week_start
                 AND bought = true
                 AND price_if_bought IS NOT NULL
             """), {"tenant_id": tenant_id, "week_start": week_start}).scalar() or 0
@@ -157,7 +161,7 @@ class LiveMetricsService:
                 SELECT COALESCE(SUM(price_if_bought), 0) as revenue
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) >= :month_start
+                AND created_at >= :month_start
                 AND bought = true
                 AND price_if_bought IS NOT NULL
             """), {"tenant_id": tenant_id, "month_start": month_start}).scalar() or 0
@@ -167,7 +171,7 @@ class LiveMetricsService:
                 SELECT COALESCE(AVG(price_if_bought), 0) as avg_deal
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) >= :week_start
+                AND created_at >= :week_start
                 AND bought = true
                 AND price_if_bought IS NOT NULL
                 AND price_if_bought > 0
@@ -184,7 +188,7 @@ class LiveMetricsService:
             logger.error(f"Error calculating revenue metrics: {e}")
             return {"error": str(e)}
     
-    async def _calculate_call_metrics(self, db: Session, tenant_id: str, today) -> Dict[str, Any]:
+    async def _calculate_call_metrics(self, db: Session, tenant_id: str, today: datetime, tomorrow: datetime) -> Dict[str, Any]:
         """Calculate call metrics."""
         try:
             # Active calls (calls in progress)
@@ -200,17 +204,17 @@ class LiveMetricsService:
                 SELECT COUNT(*) as count
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+                AND created_at >= :today AND created_at < :tomorrow
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             # Successful calls today
             successful_calls = db.execute(text("""
                 SELECT COUNT(*) as count
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
+                AND created_at >= :today AND created_at < :tomorrow
                 AND status = 'completed'
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             # Success rate
             success_rate = (successful_calls / calls_today * 100) if calls_today > 0 else 0
@@ -220,11 +224,11 @@ class LiveMetricsService:
                 SELECT COALESCE(AVG(last_call_duration), 0) as avg_duration
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
+                AND created_at >= :today AND created_at < :tomorrow
                 AND status = 'completed'
                 AND last_call_duration IS NOT NULL
                 AND last_call_duration > 0
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             return {
                 "active_calls": int(active_calls),
@@ -238,7 +242,7 @@ class LiveMetricsService:
             logger.error(f"Error calculating call metrics: {e}")
             return {"error": str(e)}
     
-    async def _calculate_lead_metrics(self, db: Session, tenant_id: str, today) -> Dict[str, Any]:
+    async def _calculate_lead_metrics(self, db: Session, tenant_id: str, today: datetime, tomorrow: datetime) -> Dict[str, Any]:
         """Calculate lead metrics."""
         try:
             # Active leads (calls created today, treating all as potential leads)
@@ -246,26 +250,26 @@ class LiveMetricsService:
                 SELECT COUNT(*) as count
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+                AND created_at >= :today AND created_at < :tomorrow
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             # New leads today (unique phone numbers)
             new_leads = db.execute(text("""
                 SELECT COUNT(DISTINCT phone_number) as count
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
+                AND created_at >= :today AND created_at < :tomorrow
                 AND phone_number IS NOT NULL
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             # Lead conversion rate (calls that resulted in bookings)
             converted_leads = db.execute(text("""
                 SELECT COUNT(*) as count
                 FROM calls 
                 WHERE company_id = :tenant_id 
-                AND DATE(created_at) = :today
+                AND created_at >= :today AND created_at < :tomorrow
                 AND booked = true
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             conversion_rate = (converted_leads / new_leads * 100) if new_leads > 0 else 0
             
@@ -280,7 +284,7 @@ class LiveMetricsService:
             logger.error(f"Error calculating lead metrics: {e}")
             return {"error": str(e)}
     
-    async def _calculate_csr_metrics(self, db: Session, tenant_id: str, today) -> Dict[str, Any]:
+    async def _calculate_csr_metrics(self, db: Session, tenant_id: str, today: datetime, tomorrow: datetime) -> Dict[str, Any]:
         """Calculate CSR performance metrics."""
         try:
             # Get top performing CSR
@@ -292,12 +296,12 @@ class LiveMetricsService:
                 FROM sales_reps sr
                 LEFT JOIN users u ON sr.user_id = u.id
                 LEFT JOIN calls c ON sr.user_id = c.assigned_rep_id 
-                AND DATE(c.created_at) = :today
+                AND c.created_at >= :today AND c.created_at < :tomorrow
                 WHERE sr.company_id = :tenant_id
                 GROUP BY sr.user_id, u.name
                 ORDER BY calls_handled DESC, success_rate DESC
                 LIMIT 1
-            """), {"tenant_id": tenant_id, "today": today}).fetchone()
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).fetchone()
             
             # Overall CSR performance
             total_csr_calls = db.execute(text("""
@@ -305,17 +309,17 @@ class LiveMetricsService:
                 FROM calls c
                 JOIN sales_reps sr ON c.assigned_rep_id = sr.user_id
                 WHERE sr.company_id = :tenant_id
-                AND DATE(c.created_at) = :today
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+                AND c.created_at >= :today AND c.created_at < :tomorrow
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             total_successful_calls = db.execute(text("""
                 SELECT COUNT(*) as count
                 FROM calls c
                 JOIN sales_reps sr ON c.assigned_rep_id = sr.user_id
                 WHERE sr.company_id = :tenant_id
-                AND DATE(c.created_at) = :today
+                AND c.created_at >= :today AND c.created_at < :tomorrow
                 AND c.status = 'completed'
-            """), {"tenant_id": tenant_id, "today": today}).scalar() or 0
+            """), {"tenant_id": tenant_id, "today": today, "tomorrow": tomorrow}).scalar() or 0
             
             overall_success_rate = (total_successful_calls / total_csr_calls * 100) if total_csr_calls > 0 else 0
             
@@ -0,0 +1,255 @@
+"""
+Content-addressed cache for LLM chat completions.
+
+Keys are a SHA-256 of the use case, model, messages and remaining request
+parameters, so retries and re-runs over identical inputs reuse the earlier
+response instead of paying for it again. Entries are stored in Redis (shared
+across processes) and, when LLM_CACHE_DIR is set, in a local disk directory
+(survives restarts and Redis outages), both expiring after the use case's TTL.
+The directory holds prompt outputs, so it must be owner-only (0700); one
+that other users can read is ignored.
+
+Callers pass the request dict and a function that sends it; prompts whose
+output should differ between calls opt out with cache=False.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.core.pii_masking import PIISafeLogger
+from app.obs.metrics import record_cache_hit, record_cache_miss, record_llm_tokens
+from app.services.openai_client_manager import request_fingerprint
+
+logger = PIISafeLogger(__name__)
+
+# Seconds a cached response stays valid, per use case (0 disables caching)
+LLM_CACHE_TTLS: Dict[str, int] = {
+    "transcript_analysis": 30 * 86400,  # Transcripts don't change once stored
+    "property_intelligence": 7 * 86400,  # Shorter than PROPERTY_SNAPSHOT_REFRESH_DAYS so refreshes re-query
+    "call_insights": 86400,
+    "missed_call_sms": 86400,
+}
+DEFAULT_TTL_SECONDS = 86400
+
+# Disk entries are pruned (expired first, then oldest) in a background thread every this many writes
+DISK_PRUNE_EVERY = 100
+
+
+class LLMResponseCache:
+    """Two-tier (Redis, disk) cache of chat completion content and token usage."""
+
+    def __init__(self, disk_dir: Optional[str] = None, disk_max_entries: Optional[int] = None):
+        self.enabled = settings.LLM_CACHE_ENABLED
+        self.disk_dir = settings.LLM_CACHE_DIR if disk_dir is None else disk_dir
+        self.disk_max_entries = disk_max_entries or settings.LLM_CACHE_DISK_MAX_ENTRIES
+        self._disk_writes = 0
+        self._disk_private: Optional[bool] = None
+        self._pruning = threading.Lock()
+
+    @staticmethod
+    def key(use_case: str, request: Dict[str, Any]) -> str:
+        return f"llm:{use_case}:{request_fingerprint(request)}"
+
+    # Tiers
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for key, backfilling Redis from disk."""
+        from app.services.redis_service import redis_service
+
+        if redis_service.is_available():
+            entry = redis_service.get_cache(key)
+            if entry is not None:
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None and redis_service.is_available():
+            remaining = int(entry["expires_at"] - time.time())
+            if remaining > 0:
+                redis_service.set_cache(key, entry, ttl=remaining)
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any], ttl: int) -> None:
+        from app.services.redis_service import redis_service
+
+        entry = {**entry, "expires_at": time.time() + ttl}
+        if redis_service.is_available():
+            redis_service.set_cache(key, entry, ttl=ttl)
+        self._write_disk(key, entry)
+
+    def invalidate(self, use_case: str, request: Dict[str, Any]) -> None:
+        """Drop a cached response, e.g. when the caller could not parse it."""
+        from app.services.redis_service import redis_service
+
+        key = self.key(use_case, request)
+        if redis_service.is_available():
+            redis_service.delete_cache(key)
+        path = self._path(key)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.disk_dir or not self._ensure_private_dir():
+            return None
+        return os.path.join(self.disk_dir, key.replace(":", "_") + ".json")
+
+    def _ensure_private_dir(self) -> bool:
+        """Create disk_dir as 0700 if missing; disable the disk tier if it is not ours alone."""
+        if self._disk_private is None:
+            try:
+                os.makedirs(self.disk_dir, mode=0o700, exist_ok=True)
+                st = os.stat(self.disk_dir)
+                self._disk_private = st.st_uid == os.getuid() and not st.st_mode & 0o077
+            except OSError as e:
+                logger.warning(f"LLM cache directory {self.disk_dir} unavailable: {e}")
+                self._disk_private = False
+            else:
+                if not self._disk_private:
+                    logger.warning(f"LLM cache directory {self.disk_dir} is not private (0700); disk tier disabled")
+        return self._disk_private
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not path:
+            return None
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable LLM cache entry {path}: {e}")
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {path}: {e}")
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % DISK_PRUNE_EVERY == 0 and not self._pruning.locked():
+            threading.Thread(target=self.prune_disk, name="llm-cache-prune", daemon=True).start()
+
+    def prune_disk(self) -> int:
+        """Delete expired disk entries, then the oldest beyond disk_max_entries. Returns the number removed."""
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return 0
+        with self._pruning:
+            return self._prune_disk()
+
+    def _prune_disk(self) -> int:
+        now = time.time()
+        live = []
+        removed = 0
+        for entry in os.scandir(self.disk_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path) as f:
+                    expired = json.load(f).get("expires_at", 0) <= now
+                if expired:
+                    os.remove(entry.path)
+                    removed += 1
+                else:
+                    live.append((entry.stat().st_mtime, entry.path))
+            except (OSError, ValueError):
+                continue
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.disk_max_entries)]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    # Completion helpers
+
+    def _lookup(self, use_case: str, request: Dict[str, Any], cache: bool, tenant_id: Optional[str]):
+        ttl = LLM_CACHE_TTLS.get(use_case, DEFAULT_TTL_SECONDS)
+        if not (self.enabled and cache and ttl > 0):
+            return None, None, ttl
+
+        key = self.key(use_case, request)
+        entry = self.get(key)
+        if entry is None:
+            record_cache_miss("llm")
+            return key, None, ttl
+
+        record_cache_hit("llm")
+        record_llm_tokens(tenant_id, request.get("model", "unknown"), entry.get("total_tokens") or 0, cached=True)
+        logger.debug(f"LLM cache hit for {use_case}")
+        return key, entry, ttl
+
+    def _store(self, key: Optional[str], ttl: int, request: Dict[str, Any], response: Any, tenant_id: Optional[str]) -> str:
+        content = response.choices[0].message.content
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None) or 0
+        record_llm_tokens(tenant_id, request.get("model", "unknown"), total_tokens)
+        if key and content is not None:
+            self.set(key, {"content": content, "total_tokens": total_tokens}, ttl)
+        return content
+
+    def complete(
+        self,
+        use_case: str,
+        request: Dict[str, Any],
+        send: Callable[[Dict[str, Any]], Any],
+        tenant_id: Optional[str] = None,
+        cache: bool = True,
+    ) -> str:
+        """
+        Return the message content for a chat completion request, from cache if possible.
+
+        Args:
+            use_case: Key into LLM_CACHE_TTLS; also namespaces the cache key
+            request: chat.completions.create parameters (model, messages, ...)
+            send: Sends the request and returns a ChatCompletion
+            tenant_id: Tenant for token metrics
+            cache: False for prompts that must not reuse earlier output
+        """
+        key, entry, ttl = self._lookup(use_case, request, cache, tenant_id)
+        if entry is not None:
+            return entry["content"]
+        return self._store(key, ttl, request, send(request), tenant_id)
+
+    async def acomplete(
+        self,
+        use_case: str,
+        request: Dict[str, Any],
+        send: Callable[[Dict[str, Any]], Awaitable[Any]],
+        tenant_id: Optional[str] = None,
+        cache: bool = True,
+    ) -> str:
+        """
+        Async counterpart of complete(); send is awaited (e.g. OpenAIClientManager.achat_completion).
+
+        Redis and disk I/O run in a worker thread so they don't block the event loop.
+        """
+        key, entry, ttl = await asyncio.to_thread(self._lookup, use_case, request, cache, tenant_id)
+        if entry is not None:
+            return entry["content"]
+        response = await send(request)
+        return await asyncio.to_thread(self._store, key, ttl, request, response, tenant_id)
+
+
+# Global instance
+llm_cache = LLMResponseCache()
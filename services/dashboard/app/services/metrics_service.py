@@ -8,11 +8,12 @@ Supports:
 """
 from datetime import datetime, timedelta
 from typing import Optional, List, Literal
-from sqlalchemy import func, and_, or_, distinct
+from sqlalchemy import func, and_, or_, distinct, case, literal
 from sqlalchemy.orm import Session
 
 from app.models.call import Call
 from app.models.call_analysis import CallAnalysis
+from app.models.call_objection import CallObjection
 from app.models.appointment import Appointment, AppointmentStatus, AppointmentOutcome
 from app.models.recording_analysis import RecordingAnalysis
 from app.models.recording_session import RecordingSession
@@ -946,7 +947,9 @@ class MetricsService:
         """
         Compute aggregate sales team metrics for all reps in a company.
         
-        Returns team-wide aggregates plus per-rep summaries.
+        Returns team-wide aggregates plus per-rep summaries. Per-rep figures
+        come from a single grouped query and team totals are rolled up from
+        those rows, so the query count doesn't grow with team size.
         
         Args:
             tenant_id: Company/tenant ID
@@ -961,95 +964,116 @@ class MetricsService:
         if date_from is None:
             date_from = date_to - timedelta(days=30)
         
-        # Get all sales reps for this company
-        reps = self.db.query(SalesRep).filter(
+        # Per-rep aggregates in one grouped query. Appointments are outer-joined to
+        # their analyses, so appointment counts use DISTINCT ids.
+        completed = Appointment.status == AppointmentStatus.COMPLETED
+        won = and_(completed, func.lower(func.trim(RecordingAnalysis.outcome)) == "won")
+        rep_aggregates = self.db.query(
+            Appointment.assigned_rep_id.label("rep_id"),
+            func.count(distinct(Appointment.id)).label("total_appointments"),
+            func.count(distinct(case((completed, Appointment.id)))).label("completed_appointments"),
+            func.count(distinct(case((won, Appointment.id)))).label("won_appointments"),
+            func.sum(RecordingAnalysis.sop_compliance_score).label("compliance_sum"),
+            func.count(RecordingAnalysis.sop_compliance_score).label("compliance_count"),
+            func.sum(RecordingAnalysis.sentiment_score).label("sentiment_sum"),
+            func.count(RecordingAnalysis.sentiment_score).label("sentiment_count"),
+        ).outerjoin(
+            RecordingAnalysis,
+            and_(
+                RecordingAnalysis.appointment_id == Appointment.id,
+                RecordingAnalysis.company_id == tenant_id
+            )
+        ).filter(
+            Appointment.company_id == tenant_id,
+            Appointment.assigned_rep_id.isnot(None),
+            Appointment.scheduled_start >= date_from,
+            Appointment.scheduled_start <= date_to
+        ).group_by(Appointment.assigned_rep_id).subquery()
+        
+        rep_rows = self.db.query(
+            SalesRep.user_id,
+            User.name,
+            rep_aggregates.c.total_appointments,
+            rep_aggregates.c.completed_appointments,
+            rep_aggregates.c.won_appointments,
+            rep_aggregates.c.compliance_sum,
+            rep_aggregates.c.compliance_count,
+            rep_aggregates.c.sentiment_sum,
+            rep_aggregates.c.sentiment_count,
+        ).outerjoin(
+            User, User.id == SalesRep.user_id
+        ).outerjoin(
+            rep_aggregates, rep_aggregates.c.rep_id == SalesRep.user_id
+        ).filter(
             SalesRep.company_id == tenant_id
-        ).all()
+        ).order_by(SalesRep.user_id).all()
         
-        # Aggregate metrics across all reps
+        # Team totals come from the same per-rep rows
         total_appointments = 0
         completed_appointments = 0
         won_appointments = 0
-        total_objections = 0
-        compliance_scores = []
-        meeting_structure_scores = []
-        sentiment_scores = []
+        compliance_sum = 0.0
+        compliance_count = 0
+        sentiment_sum = 0.0
+        sentiment_count = 0
         
-        # Per-rep summaries
         rep_summaries: List[SalesRepSummary] = []
-        
-        for rep in reps:
-            # Get rep metrics
-            rep_metrics = await self.get_sales_rep_overview_metrics(
-                tenant_id=tenant_id,
-                rep_id=rep.user_id,
-                date_from=date_from,
-                date_to=date_to
-            )
+        for row in rep_rows:
+            rep_total = row.total_appointments or 0
+            rep_completed = row.completed_appointments or 0
+            rep_won = row.won_appointments or 0
+            
+            total_appointments += rep_total
+            completed_appointments += rep_completed
+            won_appointments += rep_won
+            compliance_sum += row.compliance_sum or 0.0
+            compliance_count += row.compliance_count or 0
+            sentiment_sum += row.sentiment_sum or 0.0
+            sentiment_count += row.sentiment_count or 0
             
-            # Accumulate team totals
-            total_appointments += rep_metrics.total_appointments
-            completed_appointments += rep_metrics.completed_appointments
-            won_appointments += rep_metrics.won_appointments
-            
-            # For averages, we need to collect individual scores
-            # (we'll recompute from appointments below)
-            
-            # Get rep name from User
-            rep_name = None
-            user = self.db.query(User).filter(User.id == rep.user_id).first()
-            if user:
-                rep_name = user.name
-            
-            # Create rep summary
             rep_summaries.append(SalesRepSummary(
-                rep_id=rep.user_id,
-                rep_name=rep_name,
-                total_appointments=rep_metrics.total_appointments,
-                completed_appointments=rep_metrics.completed_appointments,
-                won_appointments=rep_metrics.won_appointments,
-                win_rate=rep_metrics.win_rate,
-                avg_compliance_score=rep_metrics.avg_compliance_score,
+                rep_id=row.user_id,
+                rep_name=row.name,
+                total_appointments=rep_total,
+                completed_appointments=rep_completed,
+                won_appointments=rep_won,
+                win_rate=rep_won / rep_completed if rep_completed > 0 else None,
+                avg_compliance_score=row.compliance_sum / row.compliance_count if row.compliance_count else None,
                 auto_usage_rate=None  # Placeholder
             ))
         
-        # Recompute team averages from all appointments
-        all_appointments = self.db.query(Appointment).filter(
+        # Objections and meeting structure live in JSON columns, so fetch just
+        # those two columns for the team's analyses and score them in Python
+        total_objections = 0
+        meeting_structure_scores = []
+        analysis_rows = self.db.query(
+            RecordingAnalysis.objections,
+            RecordingAnalysis.meeting_segments
+        ).join(
+            Appointment, Appointment.id == RecordingAnalysis.appointment_id
+        ).join(
+            SalesRep, SalesRep.user_id == Appointment.assigned_rep_id
+        ).filter(
+            RecordingAnalysis.company_id == tenant_id,
             Appointment.company_id == tenant_id,
+            SalesRep.company_id == tenant_id,
             Appointment.scheduled_start >= date_from,
             Appointment.scheduled_start <= date_to
         ).all()
         
-        appointment_ids = [apt.id for apt in all_appointments]
-        all_analyses = self.db.query(RecordingAnalysis).filter(
-            RecordingAnalysis.appointment_id.in_(appointment_ids),
-            RecordingAnalysis.company_id == tenant_id
-        ).all()
-        
-        for analysis in all_analyses:
-            # Objections
-            if analysis.objections and isinstance(analysis.objections, list):
-                total_objections += len(analysis.objections)
-            
-            # Compliance
-            if analysis.sop_compliance_score is not None:
-                compliance_scores.append(analysis.sop_compliance_score)
-            
-            # Meeting structure
-            structure_score = self._compute_meeting_structure_score(analysis.meeting_segments)
+        for objections, meeting_segments in analysis_rows:
+            if objections and isinstance(objections, list):
+                total_objections += len(objections)
+            structure_score = self._compute_meeting_structure_score(meeting_segments)
             if structure_score is not None:
                 meeting_structure_scores.append(structure_score)
-            
-            # Sentiment
-            if analysis.sentiment_score is not None:
-                sentiment_scores.append(analysis.sentiment_score)
         
         # Compute team rates
         team_win_rate = won_appointments / completed_appointments if completed_appointments > 0 else None
         avg_objections = total_objections / total_appointments if total_appointments > 0 else None
-        avg_compliance = sum(compliance_scores) / len(compliance_scores) if compliance_scores else None
+        avg_compliance = compliance_sum / compliance_count if compliance_count else None
         avg_meeting_structure = sum(meeting_structure_scores) / len(meeting_structure_scores) if meeting_structure_scores else None
-        avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else None
+        avg_sentiment = sentiment_sum / sentiment_count if sentiment_count else None
         
         return SalesTeamMetrics(
             total_appointments=total_appointments,
@@ -1510,67 +1534,46 @@ class MetricsService:
         if date_from is None:
             date_from = date_to - timedelta(days=30)
         
-        # Query CSR calls
-        calls_query = self.db.query(Call).filter(
+        # Denominator: analyzed CSR calls for this CSR in range
+        calls_with_analysis = self.db.query(func.count(CallAnalysis.id)).join(
+            Call, Call.call_id == CallAnalysis.call_id
+        ).filter(
+            CallAnalysis.tenant_id == tenant_id,
             Call.company_id == tenant_id,
             Call.call_type == CallType.CSR_CALL.value,
             Call.owner_id == csr_user_id,
             Call.created_at >= date_from,
             Call.created_at <= date_to
-        )
+        ).scalar() or 0
         
-        all_calls = calls_query.all()
-        call_ids = [call.call_id for call in all_calls]
-        
-        # Get analyses
-        analyses = self.db.query(CallAnalysis).filter(
-            CallAnalysis.call_id.in_(call_ids),
-            CallAnalysis.tenant_id == tenant_id
-        ).all()
-        
-        # Count objections
-        objection_counts: dict[str, int] = {}
-        calls_with_analysis = 0
-        
-        for analysis in analyses:
-            calls_with_analysis += 1
-            if analysis.objections and isinstance(analysis.objections, list):
-                for obj in analysis.objections:
-                    if isinstance(obj, str):
-                        key = obj
-                        label = obj.replace("_", " ").title()
-                    elif isinstance(obj, dict):
-                        key = obj.get("type", "unknown")
-                        label = obj.get("label", key.replace("_", " ").title())
-                    else:
-                        continue
-                    
-                    objection_counts[key] = objection_counts.get(key, 0) + 1
-        
-        # Sort by count and take top N
-        sorted_objections = sorted(objection_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
-        
-        top_objections: List[CSRObjectionMetric] = []
-        for key, count in sorted_objections:
-            # Find label from first occurrence
-            label = key.replace("_", " ").title()
-            for analysis in analyses:
-                if analysis.objections and isinstance(analysis.objections, list):
-                    for obj in analysis.objections:
-                        if isinstance(obj, dict) and obj.get("type") == key:
-                            label = obj.get("label", label)
-                            break
-                    if label != key.replace("_", " ").title():
-                        break
-            
-            occurrence_rate = count / calls_with_analysis if calls_with_analysis > 0 else 0.0
-            
-            top_objections.append(CSRObjectionMetric(
-                objection_key=key,
-                label=label,
-                occurrence_count=count,
-                occurrence_rate=occurrence_rate
-            ))
+        # Count objections from the normalized index
+        objection_rows = self.db.query(
+            CallObjection.objection_key,
+            func.count(CallObjection.id).label("occurrences"),
+            func.max(CallObjection.label).label("label")
+        ).join(
+            Call, Call.call_id == CallObjection.call_id
+        ).filter(
+            CallObjection.tenant_id == tenant_id,
+            CallObjection.owner_id == csr_user_id,
+            CallObjection.occurred_at >= date_from,
+            CallObjection.occurred_at <= date_to,
+            Call.call_type == CallType.CSR_CALL.value
+        ).group_by(
+            CallObjection.objection_key
+        ).order_by(
+            func.count(CallObjection.id).desc(), CallObjection.objection_key
+        ).limit(limit).all()
+        
+        top_objections: List[CSRObjectionMetric] = [
+            CSRObjectionMetric(
+                objection_key=row.objection_key,
+                label=row.label,
+                occurrence_count=row.occurrences,
+                occurrence_rate=row.occurrences / calls_with_analysis if calls_with_analysis > 0 else 0.0
+            )
+            for row in objection_rows
+        ]
         
         return CSRTopObjectionsResponse(
             top_objections=top_objections,
@@ -1604,71 +1607,51 @@ class MetricsService:
         if date_from is None:
             date_from = date_to - timedelta(days=30)
         
-        # Query CSR calls
-        calls_query = self.db.query(Call).join(
+        # Calls for this CSR where the objection was raised (objection index)
+        matching_call_ids = self.db.query(CallObjection.call_id).filter(
+            CallObjection.tenant_id == tenant_id,
+            CallObjection.objection_key == objection_key,
+            CallObjection.owner_id == csr_user_id,
+            CallObjection.occurred_at >= date_from,
+            CallObjection.occurred_at <= date_to
+        )
+        
+        matching_calls = self.db.query(Call).join(
             ContactCard, Call.contact_card_id == ContactCard.id, isouter=True
         ).filter(
+            Call.call_id.in_(matching_call_ids),
             Call.company_id == tenant_id,
             Call.call_type == CallType.CSR_CALL.value,
-            Call.owner_id == csr_user_id,
-            Call.created_at >= date_from,
-            Call.created_at <= date_to
-        )
-        
-        all_calls = calls_query.all()
-        call_ids = [call.call_id for call in all_calls]
-        
-        # Get analyses
-        analyses = self.db.query(CallAnalysis).filter(
-            CallAnalysis.call_id.in_(call_ids),
-            CallAnalysis.tenant_id == tenant_id
-        ).all()
-        
-        analysis_by_call_id = {analysis.call_id: analysis for analysis in analyses}
+            Call.owner_id == csr_user_id
+        ).order_by(Call.created_at.desc()).all()
         
-        # Filter calls with this objection
         items: List[CSRObjectionCallItem] = []
         
-        for call in all_calls:
-            analysis = analysis_by_call_id.get(call.call_id)
-            if not analysis or not analysis.objections:
-                continue
+        for call in matching_calls:
+            # Get customer info
+            customer_name = None
+            phone = None
+            if call.contact_card:
+                customer_name = f"{call.contact_card.first_name or ''} {call.contact_card.last_name or ''}".strip() or None
+                phone = call.contact_card.primary_phone
             
-            # Check if this objection exists
-            has_objection = False
-            for obj in analysis.objections:
-                if isinstance(obj, str) and obj == objection_key:
-                    has_objection = True
-                    break
-                elif isinstance(obj, dict) and obj.get("type") == objection_key:
-                    has_objection = True
-                    break
-            
-            if has_objection:
-                # Get customer info
-                customer_name = None
-                phone = None
-                if call.contact_card:
-                    customer_name = f"{call.contact_card.first_name or ''} {call.contact_card.last_name or ''}".strip() or None
-                    phone = call.contact_card.primary_phone
-                
-                # Get transcript snippet (first 200 chars)
-                transcript_snippet = None
-                if call.transcript:
-                    transcript_snippet = call.transcript[:200] + "..." if len(call.transcript) > 200 else call.transcript
-                
-                # Audio URL (if available from call record)
-                audio_url = None  # TODO: Wire audio URL from call/recording if available
-                
-                items.append(CSRObjectionCallItem(
-                    call_id=call.call_id,
-                    lead_id=call.lead_id,
-                    customer_name=customer_name,
-                    phone=phone,
-                    created_at=call.created_at,
-                    audio_url=audio_url,
-                    transcript_snippet=transcript_snippet
-                ))
+            # Get transcript snippet (first 200 chars)
+            transcript_snippet = None
+            if call.transcript:
+                transcript_snippet = call.transcript[:200] + "..." if len(call.transcript) > 200 else call.transcript
+            
+            # Audio URL (if available from call record)
+            audio_url = None  # TODO: Wire audio URL from call/recording if available
+            
+            items.append(CSRObjectionCallItem(
+                call_id=call.call_id,
+                lead_id=call.lead_id,
+                customer_name=customer_name,
+                phone=phone,
+                created_at=call.created_at,
+                audio_url=audio_url,
+                transcript_snippet=transcript_snippet
+            ))
         
         return CSRObjectionCallsResponse(
             objection_key=objection_key,
@@ -3207,43 +3190,47 @@ class MetricsService:
         if date_from is None:
             date_from = date_to - timedelta(days=30)
         
-        # Get CSR calls
-        calls = self.db.query(Call).filter(
+        # Matching calls from the objection index (Shunya objection keys that
+        # contain, or are contained in, the requested objection)
+        objection_lower = objection.lower()
+        objection_key_lower = func.lower(CallObjection.objection_key)
+        # LIKE-escaped key for the "key contained in objection" direction
+        objection_key_pattern = func.replace(func.replace(func.replace(
+            objection_key_lower, "/", "//"), "%", "/%"), "_", "/_")
+        matching_call_ids = self.db.query(CallObjection.call_id).filter(
+            CallObjection.tenant_id == tenant_id,
+            CallObjection.owner_id == csr_user_id,
+            CallObjection.occurred_at >= date_from,
+            CallObjection.occurred_at <= date_to,
+            or_(
+                objection_key_lower.contains(objection_lower, autoescape=True),
+                literal(objection_lower).contains(objection_key_pattern, escape="/")
+            )
+        )
+        
+        calls_query = self.db.query(Call).filter(
+            Call.call_id.in_(matching_call_ids),
             Call.company_id == tenant_id,
             Call.call_type == CallType.CSR_CALL.value,
-            Call.owner_id == csr_user_id,  # TODO: If owner_id not available, use fallback
-            Call.created_at >= date_from,
-            Call.created_at <= date_to
-        ).all()
-        
-        call_ids = [call.call_id for call in calls]
-        analyses = self.db.query(CallAnalysis).filter(
-            CallAnalysis.call_id.in_(call_ids),
-            CallAnalysis.tenant_id == tenant_id
-        ).all()
-        
-        # Filter calls that have this objection (from Shunya)
-        matching_call_ids = set()
-        for analysis in analyses:
-            if analysis.objections and isinstance(analysis.objections, list):
-                for obj in analysis.objections:
-                    obj_key = obj if isinstance(obj, str) else obj.get("type", "")
-                    if objection.lower() in obj_key.lower() or obj_key.lower() in objection.lower():
-                        matching_call_ids.add(analysis.call_id)
-                        break
-        
-        # Get matching calls
-        matching_calls = [c for c in calls if c.call_id in matching_call_ids]
+            Call.owner_id == csr_user_id  # TODO: If owner_id not available, use fallback
+        )
         
         # Get total
-        total = len(matching_calls)
+        total = calls_query.count()
         
         # Paginate
-        paginated_calls = matching_calls[(page - 1) * page_size:page * page_size]
+        paginated_calls = calls_query.order_by(Call.created_at.desc()).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
         
         # Get analyses for paginated calls
         paginated_call_ids = [call.call_id for call in paginated_calls]
-        paginated_analyses = {a.call_id: a for a in analyses if a.call_id in paginated_call_ids}
+        paginated_analyses = {
+            a.call_id: a for a in self.db.query(CallAnalysis).filter(
+                CallAnalysis.call_id.in_(paginated_call_ids),
+                CallAnalysis.tenant_id == tenant_id
+            ).all()
+        } if paginated_call_ids else {}
         
         items: List[CallByObjectionItem] = []
         for call in paginated_calls:
@@ -3255,12 +3242,10 @@ class MetricsService:
                 customer_name = f"{call.contact_card.first_name or ''} {call.contact_card.last_name or ''}".strip() or None
             
             # Get duration (from Call model - non-Shunya)
-            duration_seconds = None
-            if call.duration:
-                duration_seconds = int(call.duration.total_seconds())
+            duration_seconds = call.recording_duration_s or call.last_call_duration
             
-            # Get audio URL (from Call model - non-Shunya)
-            audio_url = call.audio_url
+            # Audio URL (if available from call record)
+            audio_url = None  # TODO: Wire audio URL from call/recording if available
             
             items.append(CallByObjectionItem(
                 call_id=call.call_id,
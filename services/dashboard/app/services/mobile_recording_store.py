@@ -0,0 +1,81 @@
+"""
+Shared state for mobile audio recording sessions (/audio routes).
+
+Sessions are stored in Redis under a TTL so that start-recording, upload,
+the processing task and status reads can run on different processes. When
+Redis is unavailable a process-local dict with the same TTL is used, which
+only works for single-process deployments.
+"""
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.pii_masking import PIISafeLogger
+
+logger = PIISafeLogger(__name__)
+
+# recording_id -> (expires_at, state); fallback when Redis is unavailable
+_local_sessions: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _key(recording_id: str) -> str:
+    return f"mobile_recording:{recording_id}"
+
+
+def _serializable(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _prune_local(now: float) -> None:
+    for recording_id in [rid for rid, (expires_at, _) in _local_sessions.items() if expires_at <= now]:
+        _local_sessions.pop(recording_id, None)
+
+
+def create_session(recording_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a new recording session and return its serialized state."""
+    return _save(recording_id, {k: _serializable(v) for k, v in state.items()})
+
+
+def get_session(recording_id: str) -> Optional[Dict[str, Any]]:
+    """Return the session state, or None if it never existed or has expired."""
+    from app.services.redis_service import redis_service
+
+    if redis_service.is_available():
+        return redis_service.get_cache(_key(recording_id))
+
+    now = time.monotonic()
+    entry = _local_sessions.get(recording_id)
+    if entry is None or entry[0] <= now:
+        _local_sessions.pop(recording_id, None)
+        return None
+    return dict(entry[1])
+
+
+def update_session(recording_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+    """
+    Merge fields into an existing session and refresh its TTL.
+
+    Returns the updated state, or None if the session has expired. Each
+    session has a single writer at a time (the request handler, then the
+    processing task), so read-modify-write is sufficient here.
+    """
+    state = get_session(recording_id)
+    if state is None:
+        logger.warning(f"Recording session {recording_id} expired before update")
+        return None
+    state.update({k: _serializable(v) for k, v in fields.items()})
+    return _save(recording_id, state)
+
+
+def _save(recording_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.redis_service import redis_service
+
+    ttl = settings.MOBILE_RECORDING_STATE_TTL
+    if redis_service.is_available():
+        redis_service.set_cache(_key(recording_id), state, ttl=ttl)
+    else:
+        now = time.monotonic()
+        _prune_local(now)
+        _local_sessions[recording_id] = (now + ttl, state)
+    return state
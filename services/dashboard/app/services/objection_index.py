@@ -0,0 +1,185 @@
+"""
+Objection index maintenance.
+
+Keeps the `call_objections` table in sync with the JSON `objections` arrays on
+CallAnalysis and RecordingAnalysis. Writers call `index_call_analysis` /
+`index_recording_analysis` right after adding an analysis; existing data is
+loaded with `backfill_objection_index`.
+
+Objection entries are either plain strings ("price") or dicts with a "type"
+and optional "label"; `normalize_objection` maps both to (key, label) the same
+way the metrics queries always have.
+"""
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.call_analysis import CallAnalysis
+from app.models.call_objection import CallObjection
+from app.models.recording_analysis import RecordingAnalysis
+from app.obs.logging import get_logger
+
+logger = get_logger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def default_label(key: str) -> str:
+    """Human label for an objection key ("need_spouse" -> "Need Spouse")."""
+    return key.replace("_", " ").title()
+
+
+def normalize_objection(objection: Any) -> Optional[Tuple[str, str]]:
+    """Map one objection entry to (key, label), or None if unusable."""
+    if isinstance(objection, str):
+        return objection, default_label(objection)
+    if isinstance(objection, dict):
+        key = objection.get("type", "unknown")
+        return key, objection.get("label") or default_label(key)
+    return None
+
+
+def extract_objections(objections: Any) -> List[Tuple[str, str]]:
+    """(key, label) for every usable entry of an objections JSON array."""
+    if isinstance(objections, str):
+        # Some writers stored json.dumps(list) in the JSON column
+        try:
+            objections = json.loads(objections)
+        except ValueError:
+            return []
+    if not objections or not isinstance(objections, list):
+        return []
+    return [pair for pair in map(normalize_objection, objections) if pair is not None]
+
+
+def _call_rows(analysis: CallAnalysis, call: Optional[Call]) -> List[Dict[str, Any]]:
+    occurred_at = (call.created_at if call else None) or analysis.created_at or datetime.utcnow()
+    return [
+        {
+            "tenant_id": analysis.tenant_id,
+            "call_analysis_id": analysis.id,
+            "call_id": analysis.call_id,
+            "owner_id": call.owner_id if call else None,
+            "objection_key": key,
+            "label": label,
+            "occurred_at": occurred_at,
+        }
+        for key, label in extract_objections(analysis.objections)
+    ]
+
+
+def _recording_rows(analysis: RecordingAnalysis, appointment: Optional[Appointment]) -> List[Dict[str, Any]]:
+    occurred_at = (appointment.scheduled_start if appointment else None) or analysis.analyzed_at or datetime.utcnow()
+    return [
+        {
+            "tenant_id": analysis.company_id,
+            "recording_analysis_id": analysis.id,
+            "recording_session_id": analysis.recording_session_id,
+            "owner_id": appointment.assigned_rep_id if appointment else None,
+            "objection_key": key,
+            "label": label,
+            "occurred_at": occurred_at,
+        }
+        for key, label in extract_objections(analysis.objections)
+    ]
+
+
+def index_call_analysis(db: Session, analysis: CallAnalysis, call: Optional[Call] = None) -> int:
+    """
+    Replace the index rows for a CallAnalysis. Runs in the caller's transaction.
+
+    Returns:
+        Number of objection rows written
+    """
+    if call is None:
+        call = db.query(Call).filter(Call.call_id == analysis.call_id).first()
+    db.query(CallObjection).filter(
+        CallObjection.call_analysis_id == analysis.id
+    ).delete(synchronize_session=False)
+    rows = _call_rows(analysis, call)
+    if rows:
+        db.bulk_insert_mappings(CallObjection, rows)
+    return len(rows)
+
+
+def index_recording_analysis(
+    db: Session,
+    analysis: RecordingAnalysis,
+    appointment: Optional[Appointment] = None
+) -> int:
+    """
+    Replace the index rows for a RecordingAnalysis. Runs in the caller's transaction.
+
+    Returns:
+        Number of objection rows written
+    """
+    if appointment is None and analysis.appointment_id:
+        appointment = db.query(Appointment).filter(Appointment.id == analysis.appointment_id).first()
+    db.query(CallObjection).filter(
+        CallObjection.recording_analysis_id == analysis.id
+    ).delete(synchronize_session=False)
+    rows = _recording_rows(analysis, appointment)
+    if rows:
+        db.bulk_insert_mappings(CallObjection, rows)
+    return len(rows)
+
+
+def backfill_objection_index(
+    session_factory: Optional[Callable[[], Session]] = None,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Rebuild call_objections from every analysis with objections.
+
+    Walks each analysis table in primary-key order, committing once per batch;
+    safe to re-run since each batch replaces its analyses' rows.
+
+    Returns:
+        Counts of analyses scanned and rows written per source
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+
+    totals = {"call_analyses": 0, "call_rows": 0, "recording_analyses": 0, "recording_rows": 0}
+    db = session_factory()
+    try:
+        for model, join_model, join_on, build_rows, fk, prefix in (
+            (CallAnalysis, Call, Call.call_id == CallAnalysis.call_id,
+             _call_rows, CallObjection.call_analysis_id, "call"),
+            (RecordingAnalysis, Appointment, Appointment.id == RecordingAnalysis.appointment_id,
+             _recording_rows, CallObjection.recording_analysis_id, "recording"),
+        ):
+            last_id = None
+            while True:
+                query = db.query(model, join_model).outerjoin(join_model, join_on).filter(
+                    model.objections.isnot(None)
+                )
+                if last_id is not None:
+                    query = query.filter(model.id > last_id)
+                batch = query.order_by(model.id).limit(batch_size).all()
+                if not batch:
+                    break
+
+                analysis_ids = [analysis.id for analysis, _ in batch]
+                rows = [row for analysis, parent in batch for row in build_rows(analysis, parent)]
+                db.query(CallObjection).filter(fk.in_(analysis_ids)).delete(synchronize_session=False)
+                if rows:
+                    db.bulk_insert_mappings(CallObjection, rows)
+                db.commit()
+
+                totals[f"{prefix}_analyses"] += len(batch)
+                totals[f"{prefix}_rows"] += len(rows)
+                last_id = analysis_ids[-1]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info("Objection index backfill complete", extra=totals)
+    return totals
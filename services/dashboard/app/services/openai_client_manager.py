@@ -7,15 +7,22 @@ Supports:
 - Circuit breaker for failed keys
 - Rate limit handling per key
 - Automatic fallback to healthy keys
+- Async execution (AsyncOpenAI) with per-key concurrency limits, token
+  buckets fed by the x-ratelimit-* response headers, and coalescing of
+  identical in-flight requests
 """
+import asyncio
+import hashlib
+import json
 import random
+import re
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Awaitable, Callable
 from enum import Enum
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from openai import RateLimitError, APIError, APIConnectionError, APITimeoutError
 
 from app.config import settings
@@ -31,6 +38,101 @@ class KeyRotationStrategy(str, Enum):
     LEAST_USED = "least_used"
 
 
+# OpenAI rate limits are per minute; buckets refill continuously at limit / 60 per second
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* header ("1s", "6m0s", "120ms") into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+def estimate_request_tokens(params: Dict[str, Any]) -> int:
+    """Rough token cost of a chat request (about 4 characters per token plus the completion budget)."""
+    chars = sum(len(str(m.get("content") or "")) for m in params.get("messages", []))
+    return chars // 4 + int(params.get("max_tokens") or 0)
+
+
+def request_fingerprint(params: Dict[str, Any]) -> str:
+    """Stable hash of a request's parameters, used to coalesce identical in-flight requests."""
+    payload = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TokenBucket:
+    """
+    Continuously refilling budget for one per-key limit (requests or tokens).
+
+    The bucket is unlimited until a response reports the limit, after which
+    every response re-syncs it to the server's remaining count.
+    """
+
+    def __init__(self):
+        self.capacity: Optional[float] = None
+        self.available = 0.0
+        self.refill_per_second = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.capacity is not None:
+            self.available = min(self.capacity, self.available + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def observe(self, limit: Optional[float], remaining: Optional[float], reset_seconds: Optional[float] = None):
+        """Sync the bucket from a response's limit/remaining/reset headers."""
+        if limit is None or remaining is None or limit <= 0:
+            return
+        now = time.monotonic()
+        self.capacity = limit
+        self.available = min(limit, max(0.0, remaining))
+        # Prefer the server's reset time for the missing budget; fall back to the per-minute rate
+        if reset_seconds and limit > remaining:
+            self.refill_per_second = (limit - remaining) / reset_seconds
+        else:
+            self.refill_per_second = limit / RATE_LIMIT_WINDOW_SECONDS
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken (0 if available now)."""
+        if self.capacity is None:
+            return 0.0
+        self._refill(time.monotonic())
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return RATE_LIMIT_WINDOW_SECONDS
+        return (amount - self.available) / self.refill_per_second
+
+    def take(self, amount: float):
+        if self.capacity is not None:
+            self.available -= min(amount, self.capacity)
+
+    async def acquire(self, amount: float):
+        """Wait until amount is available, then take it."""
+        delay = self.wait_time(amount)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.wait_time(amount)
+        self.take(amount)
+
+
+class _InflightRequest:
+    """A coalesced request's task and how many callers are still awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
 class OpenAIClientManager:
     """
     Manages multiple OpenAI API keys with rotation, circuit breaking, and rate limit handling.
@@ -47,6 +149,7 @@ class OpenAIClientManager:
         circuit_breaker_threshold: int = 3,
         circuit_breaker_timeout: int = 300,  # 5 minutes
         rate_limit_backoff: int = 60,  # 1 minute
+        max_concurrency_per_key: Optional[int] = None,
     ):
         """
         Initialize the OpenAI client manager.
@@ -56,11 +159,14 @@ class OpenAIClientManager:
             circuit_breaker_threshold: Number of failures before disabling a key
             circuit_breaker_timeout: Seconds before retrying a failed key
             rate_limit_backoff: Seconds to wait after rate limit error
+            max_concurrency_per_key: In-flight async requests allowed per key
+                (default: settings.OPENAI_MAX_CONCURRENCY_PER_KEY)
         """
         self.rotation_strategy = rotation_strategy
         self.circuit_breaker_threshold = circuit_breaker_threshold
         self.circuit_breaker_timeout = circuit_breaker_timeout
         self.rate_limit_backoff = rate_limit_backoff
+        self.max_concurrency_per_key = max_concurrency_per_key or settings.OPENAI_MAX_CONCURRENCY_PER_KEY
         
         # Load API keys from environment
         self.keys = self._load_api_keys()
@@ -85,6 +191,16 @@ class OpenAIClientManager:
         self._round_robin_index = 0
         self._current_key_id: Optional[str] = None  # Track which key we're using
         
+        # Per-key rate limit buckets, synced from async response headers
+        self.request_buckets: Dict[str, TokenBucket] = {key_id: TokenBucket() for key_id in self.keys}
+        self.token_buckets: Dict[str, TokenBucket] = {key_id: TokenBucket() for key_id in self.keys}
+        
+        # Async state is bound to one event loop (Celery tasks run a fresh loop per asyncio.run)
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_clients: Dict[str, AsyncOpenAI] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, _InflightRequest] = {}
+        
         logger.info(
             f"Initialized OpenAI client manager with {len(self.keys)} key(s), strategy: {rotation_strategy.value}"
         )
@@ -319,6 +435,202 @@ class OpenAIClientManager:
             raise last_error
         raise RuntimeError("OpenAI API call failed after retries")
     
+    def _ensure_async_state(self):
+        """Rebind clients, semaphores and in-flight requests to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_clients = {}
+            self._semaphores = {}
+            self._inflight = {}
+    
+    def get_async_client(self, key_id: str) -> AsyncOpenAI:
+        """Pooled AsyncOpenAI client for a key (one HTTP connection pool per key per event loop)."""
+        self._ensure_async_state()
+        client = self._async_clients.get(key_id)
+        if client is None:
+            client = self._async_clients[key_id] = AsyncOpenAI(api_key=key_id)
+        return client
+    
+    def observe_rate_limit_headers(self, key_id: str, headers) -> None:
+        """Sync a key's request and token buckets from x-ratelimit-* response headers."""
+        def header(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+        
+        self.request_buckets[key_id].observe(
+            header("x-ratelimit-limit-requests"),
+            header("x-ratelimit-remaining-requests"),
+            parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+        )
+        self.token_buckets[key_id].observe(
+            header("x-ratelimit-limit-tokens"),
+            header("x-ratelimit-remaining-tokens"),
+            parse_reset_duration(headers.get("x-ratelimit-reset-tokens")),
+        )
+    
+    def _select_async_key(self, estimated_tokens: int) -> Optional[str]:
+        """Rotate as usual, but skip to another healthy key if the chosen one would have to wait for budget."""
+        key_id = self._select_key()
+        if not key_id:
+            return None
+        
+        def wait(k: str) -> float:
+            return max(self.request_buckets[k].wait_time(1), self.token_buckets[k].wait_time(estimated_tokens))
+        
+        if wait(key_id) > 0:
+            healthy_keys = [k for k in self.keys if self._is_key_healthy(k)] or [key_id]
+            key_id = min(healthy_keys, key=wait)
+        return key_id
+    
+    async def aexecute_with_retry(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        max_retries: int = 3,
+        *args,
+        coalesce_key: Optional[str] = None,
+        estimated_tokens: int = 0,
+        **kwargs
+    ) -> Any:
+        """
+        Async counterpart of execute_with_retry for use from the event loop.
+        
+        Uses the same key rotation and circuit breaker state. Each attempt
+        holds the key's concurrency semaphore and waits for request/token
+        budget in the key's buckets; responses exposing ``headers`` (raw
+        responses) re-sync those buckets. Retry backoff uses asyncio.sleep.
+        
+        Args:
+            func: Coroutine function taking an AsyncOpenAI client
+            max_retries: Maximum number of attempts across keys
+            coalesce_key: Requests sharing this key while one is in flight
+                await that request's result instead of issuing their own. The
+                request runs in its own task and is cancelled only once every
+                caller awaiting it has been cancelled
+            estimated_tokens: Token budget to reserve per attempt
+            *args, **kwargs: Arguments to pass to func
+            
+        Returns:
+            Result from func
+            
+        Raises:
+            Exception: If all keys fail after retries
+        """
+        self._ensure_async_state()
+        if coalesce_key is None:
+            return await self._aexecute(func, max_retries, estimated_tokens, args, kwargs)
+        
+        inflight = self._inflight.get(coalesce_key)
+        if inflight is not None:
+            logger.debug("Coalescing identical OpenAI request with one already in flight")
+        else:
+            task = self._async_loop.create_task(self._aexecute(func, max_retries, estimated_tokens, args, kwargs))
+            inflight = self._inflight[coalesce_key] = _InflightRequest(task)
+            
+            def forget(_task, inflight=inflight):
+                if self._inflight.get(coalesce_key) is inflight:
+                    del self._inflight[coalesce_key]
+            
+            task.add_done_callback(forget)
+        
+        # A cancelled caller only stops waiting; the others keep the request alive
+        inflight.waiters += 1
+        try:
+            return await asyncio.shield(inflight.task)
+        finally:
+            inflight.waiters -= 1
+            if inflight.waiters == 0 and not inflight.task.done():
+                inflight.task.cancel()
+    
+    async def _aexecute(self, func, max_retries: int, estimated_tokens: int, args, kwargs) -> Any:
+        last_error = None
+        
+        for attempt in range(max_retries):
+            key_id = self._select_async_key(estimated_tokens)
+            if not key_id:
+                raise RuntimeError("No healthy OpenAI API keys available")
+            
+            semaphore = self._semaphores.get(key_id)
+            if semaphore is None:
+                semaphore = self._semaphores[key_id] = asyncio.Semaphore(self.max_concurrency_per_key)
+            
+            async with semaphore:
+                await self.request_buckets[key_id].acquire(1)
+                await self.token_buckets[key_id].acquire(estimated_tokens)
+                try:
+                    result = await func(self.get_async_client(key_id), *args, **kwargs)
+                
+                except RateLimitError as e:
+                    self._record_failure(key_id, e)
+                    response = getattr(e, "response", None)
+                    if response is not None:
+                        self.observe_rate_limit_headers(key_id, response.headers)
+                    last_error = e
+                    delay = 1
+                    
+                except (APIConnectionError, APITimeoutError) as e:
+                    self._record_failure(key_id, e)
+                    last_error = e
+                    delay = 2
+                    
+                except APIError as e:
+                    self._record_failure(key_id, e)
+                    last_error = e
+                    if attempt >= max_retries - 1:
+                        raise
+                    delay = 1
+                    
+                except Exception as e:
+                    # Unexpected error - don't retry
+                    self._record_failure(key_id, e)
+                    logger.error(f"Unexpected error in OpenAI API call: {str(e)}")
+                    raise
+                
+                else:
+                    headers = getattr(result, "headers", None)
+                    if headers is not None:
+                        self.observe_rate_limit_headers(key_id, headers)
+                    self._record_success(key_id)
+                    return result
+            
+            logger.warning(
+                f"{type(last_error).__name__} on attempt {attempt + 1}/{max_retries}. "
+                f"Retrying with different key..."
+            )
+            await asyncio.sleep(delay)
+        
+        # All retries exhausted
+        logger.error(f"All OpenAI API keys failed after {max_retries} retries")
+        if last_error:
+            raise last_error
+        raise RuntimeError("OpenAI API call failed after retries")
+    
+    async def achat_completion(self, coalesce: bool = True, max_retries: Optional[int] = None, **params) -> Any:
+        """
+        Async chat completion through the pooled, rate-limited path.
+        
+        Args:
+            coalesce: Share the result with identical concurrent requests
+                (disable for prompts that should sample independently)
+            max_retries: Attempts across keys (default: one per key, plus one)
+            **params: chat.completions.create parameters (model, messages, ...)
+            
+        Returns:
+            The parsed ChatCompletion
+        """
+        async def make_request(client: AsyncOpenAI):
+            return await client.chat.completions.with_raw_response.create(**params)
+        
+        raw_response = await self.aexecute_with_retry(
+            make_request,
+            max_retries or len(self.keys) + 1,
+            coalesce_key=request_fingerprint(params) if coalesce else None,
+            estimated_tokens=estimate_request_tokens(params),
+        )
+        return raw_response.parse()
+    
     def _get_key_for_client(self, client: OpenAI) -> str:
         """Get the key ID for a client instance."""
         # Return the key we're currently using
@@ -351,6 +663,10 @@ class OpenAIClientManager:
                     state["rate_limited_until"] and datetime.utcnow() < state["rate_limited_until"]
                 ),
                 "last_used": state["last_used"].isoformat() if state["last_used"] else None,
+                "requests_available": self.request_buckets[key_id].available
+                if self.request_buckets[key_id].capacity is not None else None,
+                "tokens_available": self.token_buckets[key_id].available
+                if self.token_buckets[key_id].capacity is not None else None,
             }
         
         return stats
@@ -0,0 +1,213 @@
+"""
+Chunked retention purge engine.
+
+Deletes expired rows in primary-key batches instead of one unbounded
+``DELETE ... WHERE ts < cutoff``, so large backlogs don't hold long locks or
+bloat WAL. Each batch commits separately, batches are spaced by a short sleep,
+and a run stops once its batch/time budget is spent. The last deleted primary
+key is saved as a cursor so the next run resumes where this one stopped.
+
+All periodic retention tasks go through ``purge_expired_rows`` with a policy
+from ``RETENTION_POLICIES``.
+"""
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.obs.logging import get_logger
+from app.obs.metrics import record_retention_purge
+
+logger = get_logger(__name__)
+
+# Fallback cursor storage when Redis is unavailable (per process)
+_local_cursors: Dict[str, Any] = {}
+
+CURSOR_TTL_SECONDS = 7 * 86400
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Retention settings for one table."""
+    name: str
+    table: str
+    timestamp_column: str
+    retention: timedelta
+    primary_key: str = "id"
+    batch_size: int = settings.RETENTION_BATCH_SIZE
+    sleep_seconds: float = settings.RETENTION_BATCH_SLEEP_MS / 1000.0
+    max_batches: Optional[int] = None
+    max_seconds: Optional[float] = settings.RETENTION_MAX_SECONDS
+
+
+@dataclass
+class PurgeResult:
+    """Outcome of a single purge run."""
+    name: str
+    rows_purged: int = 0
+    batches: int = 0
+    duration_ms: float = 0.0
+    completed: bool = False  # False when the run stopped on its budget
+    cursor: Any = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "rows_purged": self.rows_purged,
+            "batches": self.batches,
+            "duration_ms": round(self.duration_ms, 2),
+            "completed": self.completed,
+        }
+
+
+RETENTION_POLICIES: Dict[str, RetentionPolicy] = {
+    # Webhook dedupe keys (app.services.idempotency)
+    "idempotency_keys": RetentionPolicy(
+        name="idempotency_keys",
+        table="idempotency_keys",
+        timestamp_column="last_seen_at",
+        retention=timedelta(days=settings.IDEMPOTENCY_TTL_DAYS),
+    ),
+    # Request idempotency audit trail (app.core.idempotency)
+    "idempotency_records": RetentionPolicy(
+        name="idempotency_records",
+        table="idempotency_records",
+        timestamp_column="created_at",
+        retention=timedelta(seconds=3600),
+    ),
+    # Ask Otto query telemetry
+    "rag_telemetry": RetentionPolicy(
+        name="rag_telemetry",
+        table="rag_telemetry",
+        timestamp_column="created_at",
+        retention=timedelta(days=settings.RAG_TELEMETRY_RETENTION_DAYS),
+    ),
+}
+
+
+def get_retention_policy(name: str, **overrides) -> RetentionPolicy:
+    """Look up a registered policy, optionally overriding fields (e.g. retention)."""
+    policy = RETENTION_POLICIES[name]
+    return replace(policy, **overrides) if overrides else policy
+
+
+def _cursor_key(policy: RetentionPolicy) -> str:
+    return f"retention_cursor:{policy.name}"
+
+
+def _load_cursor(policy: RetentionPolicy) -> Any:
+    from app.services.redis_service import redis_service
+
+    if redis_service.is_available():
+        return redis_service.get_cache(_cursor_key(policy))
+    return _local_cursors.get(policy.name)
+
+
+def _save_cursor(policy: RetentionPolicy, cursor: Any) -> None:
+    from app.services.redis_service import redis_service
+
+    if redis_service.is_available():
+        if cursor is None:
+            redis_service.delete_cache(_cursor_key(policy))
+        else:
+            redis_service.set_cache(_cursor_key(policy), cursor, ttl=CURSOR_TTL_SECONDS)
+    elif cursor is None:
+        _local_cursors.pop(policy.name, None)
+    else:
+        _local_cursors[policy.name] = cursor
+
+
+def purge_expired_rows(
+    policy: RetentionPolicy,
+    session_factory: Optional[Callable[[], Session]] = None,
+    now: Optional[datetime] = None,
+) -> PurgeResult:
+    """
+    Delete rows older than the policy's retention window in primary-key batches.
+
+    Args:
+        policy: Table and budget settings
+        session_factory: Session constructor (defaults to SessionLocal)
+        now: Reference time for the cutoff (defaults to utcnow)
+
+    Returns:
+        PurgeResult with rows purged, batch count, duration and whether the
+        table was fully caught up
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+
+    cutoff = (now or datetime.utcnow()) - policy.retention
+    result = PurgeResult(name=policy.name)
+    started = time.monotonic()
+
+    select_sql = (
+        f"SELECT {policy.primary_key} FROM {policy.table} "
+        f"WHERE {policy.timestamp_column} < :cutoff {{cursor_filter}}"
+        f"ORDER BY {policy.primary_key} LIMIT :batch_size"
+    )
+    select_first = text(select_sql.format(cursor_filter=""))
+    select_next = text(select_sql.format(cursor_filter=f"AND {policy.primary_key} > :cursor "))
+    delete_ids = text(
+        f"DELETE FROM {policy.table} WHERE {policy.primary_key} IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    cursor = _load_cursor(policy)
+    db = session_factory()
+    try:
+        while True:
+            ids = [
+                row[0] for row in db.execute(
+                    select_first if cursor is None else select_next,
+                    {"cutoff": cutoff, "cursor": cursor, "batch_size": policy.batch_size}
+                )
+            ]
+            if not ids:
+                result.completed = True
+                cursor = None
+                break
+
+            deleted = db.execute(delete_ids, {"ids": ids}).rowcount
+            db.commit()
+
+            result.rows_purged += deleted
+            result.batches += 1
+            cursor = ids[-1]
+            _save_cursor(policy, cursor)
+
+            if len(ids) < policy.batch_size:
+                result.completed = True
+                cursor = None
+                break
+            if policy.max_batches is not None and result.batches >= policy.max_batches:
+                break
+            if policy.max_seconds is not None and time.monotonic() - started >= policy.max_seconds:
+                break
+            if policy.sleep_seconds > 0:
+                time.sleep(policy.sleep_seconds)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        result.duration_ms = (time.monotonic() - started) * 1000
+        result.cursor = cursor
+        _save_cursor(policy, cursor)
+        record_retention_purge(policy.name, result.rows_purged, result.duration_ms)
+
+    logger.info(
+        f"Retention purge for {policy.table}: {result.rows_purged} rows in {result.batches} batches",
+        extra={
+            "retention_policy": policy.name,
+            "rows_purged": result.rows_purged,
+            "batches": result.batches,
+            "duration_ms": result.duration_ms,
+            "completed": result.completed,
+        }
+    )
+    return result
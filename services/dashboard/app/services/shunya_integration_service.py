@@ -21,6 +21,7 @@ from sqlalchemy import and_
 
 from app.services.uwc_client import UWCClient, get_uwc_client
 from app.services.property_intelligence_service import maybe_trigger_property_scrape, update_contact_address
+from app.services.objection_index import index_call_analysis, index_recording_analysis
 from app.models.call import Call
 from app.models.lead import Lead, LeadStatus
 from app.models.appointment import Appointment, AppointmentOutcome, AppointmentStatus
@@ -34,6 +35,10 @@ from app.models.task import Task, TaskSource, TaskAssignee, TaskStatus
 from app.models.lead_status_history import LeadStatusHistory
 from app.models.event_log import EventLog, EventType
 from app.models.key_signal import KeySignal, SignalType, SignalSeverity
+from app.models.shunya_job import ShunyaJob, ShunyaJobStatus, ShunyaJobType, ShunyaPipelineStage
+from app.services.shunya_job_service import shunya_job_service
+from app.services.shunya_response_normalizer import shunya_normalizer
+from app.utils.shunya_job_utils import extract_shunya_job_id
 from app.database import SessionLocal
 from app.realtime.bus import emit
 from app.core.pii_masking import PIISafeLogger
@@ -66,18 +71,19 @@ class ShunyaIntegrationService:
         call_type: str = "csr_call"
     ) -> Dict[str, Any]:
         """
-        Process a CSR call through Shunya pipeline.
+        Start a CSR call through the Shunya pipeline.
         
-        Flow:
-        1. Transcribe audio via Shunya
-        2. Start analysis pipeline
-        3. Poll for complete analysis (or wait for webhook)
-        4. Persist transcript and analysis
-        5. Update Lead status from Shunya classification
-        6. Create Appointment if booked
-        7. Create Tasks from pending actions
-        8. Trigger property intelligence if address extracted
-        9. Emit events
+        The call is tracked by a CSR_CALL ShunyaJob that moves one stage per
+        Shunya completion (webhook, or poll_shunya_job_status as a fallback),
+        see advance_csr_call:
+        
+        1. TRANSCRIBING: transcription submitted here
+        2. ANALYZING: transcript stored, analysis started
+        3. PERSISTING: analysis fetched; Lead status, Appointment, Tasks,
+           property intelligence and events are written from it
+        4. COMPLETED
+        
+        No DB session is held while waiting on Shunya, and nothing sleeps.
         
         Args:
             call_id: Call ID
@@ -86,130 +92,382 @@ class ShunyaIntegrationService:
             call_type: "csr_call" or "sales_call"
             
         Returns:
-            Dict with processing status and results
+            Dict with processing status and the ShunyaJob ID
         """
-        db = SessionLocal()
         request_id = str(uuid4())
+        input_payload = {
+            "call_id": call_id,
+            "audio_url": audio_url,
+            "call_type": call_type
+        }
         
+        db = SessionLocal()
         try:
-            # Get call record
             call = db.query(Call).filter(Call.call_id == call_id).first()
             if not call:
                 logger.error(f"Call {call_id} not found")
                 return {"success": False, "error": "Call not found"}
             
-            # Step 1: Transcribe audio
-            logger.info(f"Transcribing call {call_id} via Shunya")
-            # Use the existing transcribe_audio method
-            transcript_request_payload = {
-                "call_id": call_id,
-                "audio_url": audio_url,
-                "call_type": call_type
-            }
+            # One pipeline per call: a re-trigger joins the job in flight
+            existing = db.query(ShunyaJob).filter(
+                ShunyaJob.call_id == call_id,
+                ShunyaJob.job_type == ShunyaJobType.CSR_CALL,
+                ShunyaJob.job_status.in_([ShunyaJobStatus.PENDING, ShunyaJobStatus.RUNNING]),
+            ).first()
+            if existing:
+                logger.info(f"CSR call {call_id} already in Shunya pipeline (job {existing.id})")
+                return {
+                    "success": True,
+                    "call_id": call_id,
+                    "job_id": existing.id,
+                    "stage": existing.pipeline_stage.value if existing.pipeline_stage else None,
+                    "already_running": True,
+                }
             
-            # Call Shunya transcription endpoint
+            job = shunya_job_service.create_job(
+                db,
+                company_id=company_id,
+                job_type=ShunyaJobType.CSR_CALL,
+                input_payload=input_payload,
+                contact_card_id=call.contact_card_id,
+                lead_id=call.lead_id,
+                call_id=call_id,
+            )
+            shunya_job_service.enter_stage(db, job, ShunyaPipelineStage.TRANSCRIBING)
+            job_id = job.id
+        finally:
+            db.close()
+        
+        # Step 1: Submit transcription (result arrives via webhook/poll)
+        logger.info(f"Transcribing call {call_id} via Shunya")
+        try:
             transcript_result = await self.uwc_client._make_request(
                 "POST",
                 "/api/v1/transcription/transcribe",
                 company_id,
                 request_id,
-                transcript_request_payload
+                input_payload
             )
+        except Exception as e:
+            logger.error(f"Shunya transcription request failed for call {call_id}: {str(e)}", exc_info=True)
+            return self._fail_csr_job(job_id, f"Transcription request failed: {str(e)}")
+        
+        if not transcript_result.get("success"):
+            logger.error(f"Shunya transcription failed for call {call_id}: {transcript_result.get('message')}")
+            return self._fail_csr_job(job_id, "Transcription failed", transcript_result)
+        
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            shunya_job_service.mark_running(db, job, extract_shunya_job_id(transcript_result))
+            poll_delay = shunya_job_service.next_retry_delay(job)
+        finally:
+            db.close()
+        
+        self._schedule_poll(job_id, poll_delay)
+        
+        return {
+            "success": True,
+            "call_id": call_id,
+            "job_id": job_id,
+            "stage": ShunyaPipelineStage.TRANSCRIBING.value,
+        }
+    
+    async def advance_csr_call(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Advance a CSR pipeline job once Shunya reports its current step done.
+        
+        Called by the Shunya webhook and poll_shunya_job_status. `result` is
+        the finished step's result if the webhook carried one; otherwise it
+        is fetched. Steps hold the same per-job lock as the webhook/poller,
+        so a duplicate completion finds the job already moved on.
+        
+        Args:
+            job_id: Otto ShunyaJob ID
+            result: Optional transcript/analysis payload from the webhook
             
-            if not transcript_result.get("success"):
-                logger.error(f"Shunya transcription failed for call {call_id}: {transcript_result.get('message')}")
-                return {"success": False, "error": "Transcription failed"}
-            
-            transcript_id = transcript_result.get("transcript_id")
-            task_id = transcript_result.get("task_id")
+        Returns:
+            Dict with the step outcome
+        """
+        from app.services.redis_lock_service import redis_lock_service
+        
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            if not job:
+                logger.error(f"Shunya job {job_id} not found")
+                return {"success": False, "error": "Job not found"}
+            company_id = job.company_id
+        finally:
+            db.close()
+        
+        lock_key = f"shunya_job:{job_id}"
+        lock_token = await redis_lock_service.acquire_lock(
+            lock_key=lock_key,
+            tenant_id=company_id,
+            timeout=300
+        )
+        if not lock_token:
+            logger.warning(
+                f"Could not acquire lock for Shunya job {job_id}, another process may be handling it",
+                extra={"job_id": job_id}
+            )
+            return {"success": False, "status": "processing_by_another"}
+        
+        try:
+            db = SessionLocal()
+            try:
+                job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+                stage = job.pipeline_stage
+                call_id = job.call_id
+                finished = job.job_status in (
+                    ShunyaJobStatus.SUCCEEDED, ShunyaJobStatus.FAILED, ShunyaJobStatus.TIMEOUT
+                )
+            finally:
+                db.close()
             
-            # Poll for transcription to complete (or wait for webhook)
-            # For now, wait a bit then fetch
-            await asyncio.sleep(5)
+            if finished or stage in (None, ShunyaPipelineStage.COMPLETED):
+                return {"success": True, "status": "already_complete", "stage": stage.value if stage else None}
             
-            # Get actual transcript
+            if stage == ShunyaPipelineStage.TRANSCRIBING:
+                return await self._complete_csr_transcription(job_id, company_id, call_id, result)
+            return await self._complete_csr_analysis(job_id, company_id, call_id, result)
+        
+        except Exception as e:
+            logger.error(f"Error advancing CSR pipeline job {job_id}: {str(e)}", exc_info=True)
+            return self._fail_csr_job(
+                job_id,
+                f"Pipeline step failed: {str(e)}",
+                {"exception": type(e).__name__},
+                should_retry=True,
+            )
+        finally:
+            await redis_lock_service.release_lock(
+                lock_key=lock_key,
+                tenant_id=company_id,
+                lock_token=lock_token
+            )
+    
+    async def _complete_csr_transcription(
+        self,
+        job_id: str,
+        company_id: str,
+        call_id: int,
+        transcript_response: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """TRANSCRIBING -> ANALYZING: store the transcript and start analysis."""
+        request_id = f"csr-{job_id}"
+        
+        if not transcript_response:
             transcript_response = await self.uwc_client.get_transcript(
                 company_id=company_id,
                 request_id=request_id,
                 call_id=call_id
             )
+        
+        normalized_transcript = shunya_normalizer.normalize_transcript_response(transcript_response)
+        transcript_text = normalized_transcript["transcript_text"]
+        confidence_score = normalized_transcript["confidence_score"] or 0.0
+        
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            call = db.query(Call).filter(Call.call_id == call_id).first()
             
-            # Normalize transcript response
-            from app.services.shunya_response_normalizer import shunya_normalizer
-            normalized_transcript = shunya_normalizer.normalize_transcript_response(transcript_response)
-            transcript_text = normalized_transcript["transcript_text"]
-            speaker_labels = normalized_transcript["speaker_labels"]
-            confidence_score = normalized_transcript["confidence_score"] or 0.0
-            
-            # Step 2: Store transcript
             await self._store_call_transcript(
                 db=db,
                 call_id=call_id,
                 company_id=company_id,
                 transcript_text=transcript_text,
-                speaker_labels=speaker_labels,
+                speaker_labels=normalized_transcript["speaker_labels"],
                 confidence_score=confidence_score,
-                uwc_job_id=task_id or str(transcript_id)
+                uwc_job_id=normalized_transcript["task_id"] or job.shunya_job_id or job_id
             )
             
             # Also update Call model transcript field (for backward compatibility)
-            call.transcript = transcript_text
-            
-            # Step 3: Start analysis pipeline
-            logger.info(f"Starting Shunya analysis for call {call_id}")
-            analysis_result = await self.uwc_client.start_analysis(
+            if call:
+                call.transcript = transcript_text
+            lead_id = call.lead_id if call else None
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        
+        emit(
+            event_name="call.transcribed",
+            payload={
+                "call_id": call_id,
+                "transcript_id": normalized_transcript["transcript_id"],
+                "confidence_score": confidence_score,
+                "word_count": len(transcript_text.split()) if transcript_text else 0
+            },
+            tenant_id=company_id,
+            lead_id=str(lead_id) if lead_id else None
+        )
+        
+        # Step 2: Start analysis (result arrives via webhook/poll)
+        logger.info(f"Starting Shunya analysis for call {call_id}")
+        try:
+            analysis_start = await self.uwc_client.start_analysis(
                 company_id=company_id,
                 request_id=request_id,
                 call_id=call_id
             )
-            
-            # Analysis may be async - poll or wait for webhook
-            # For now, immediately fetch complete analysis (may need polling)
-            await asyncio.sleep(2)  # Brief delay for processing
-            
+        except Exception as e:
+            logger.error(f"Shunya analysis request failed for call {call_id}: {str(e)}", exc_info=True)
+            return self._fail_csr_job(job_id, f"Analysis request failed: {str(e)}", should_retry=True)
+
+        # The job stays in TRANSCRIBING, so a retry re-runs this step
+        if not analysis_start or not analysis_start.get("success"):
+            message = analysis_start.get("message") if analysis_start else None
+            logger.error(f"Shunya analysis failed to start for call {call_id}: {message}")
+            return self._fail_csr_job(job_id, "Analysis start failed", analysis_start, should_retry=True)
+
+        # Without the analysis job id the transcription's id would stay on the
+        # job and a redelivered transcription webhook would pass as the analysis
+        analysis_job_id = extract_shunya_job_id(analysis_start)
+        if not analysis_job_id:
+            logger.error(f"Shunya analysis start for call {call_id} returned no job id")
+            return self._fail_csr_job(job_id, "Analysis start returned no job id", analysis_start, should_retry=True)
+
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            job.shunya_job_id = analysis_job_id
+            shunya_job_service.enter_stage(db, job, ShunyaPipelineStage.ANALYZING)
+            poll_delay = shunya_job_service.next_retry_delay(job)
+        finally:
+            db.close()
+        
+        self._schedule_poll(job_id, poll_delay)
+        return {"success": True, "status": ShunyaPipelineStage.ANALYZING.value}
+    
+    async def _complete_csr_analysis(
+        self,
+        job_id: str,
+        company_id: str,
+        call_id: int,
+        complete_analysis: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """ANALYZING -> PERSISTING -> COMPLETED: write the analysis into Otto models."""
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            if job.pipeline_stage == ShunyaPipelineStage.ANALYZING:
+                shunya_job_service.enter_stage(db, job, ShunyaPipelineStage.PERSISTING)
+            analysis_job_id = job.shunya_job_id or job_id
+        finally:
+            db.close()
+        
+        if not complete_analysis:
             complete_analysis = await self.uwc_client.get_complete_analysis(
                 company_id=company_id,
-                request_id=request_id,
+                request_id=f"csr-{job_id}",
                 call_id=call_id
             )
-            
-            # Step 4: Normalize analysis response
-            from app.services.shunya_response_normalizer import shunya_normalizer
-            normalized_analysis = shunya_normalizer.normalize_complete_analysis(complete_analysis)
-            
-            # Step 5: Persist analysis and update domain models
-            await self._process_shunya_analysis_for_call(
-                db=db,
-                call=call,
-                company_id=company_id,
-                complete_analysis=normalized_analysis,
-                transcript_text=transcript_text
-            )
-            
-            db.commit()
-            
-            # Step 5: Emit events
-            emit(
-                event_name="call.transcribed",
-                payload={
-                    "call_id": call_id,
-                    "transcript_id": transcript_id,
-                    "confidence_score": confidence_score,
-                    "word_count": len(transcript_text.split()) if transcript_text else 0
-                },
-                tenant_id=company_id,
-                lead_id=str(call.lead_id) if call.lead_id else None
+        
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            normalized_analysis, raw_output_hash = shunya_job_service.normalize_output(
+                job, complete_analysis, shunya_normalizer.normalize_complete_analysis
             )
+            if not normalized_analysis.get("job_id"):
+                # CallAnalysis.uwc_job_id is required; complete-analysis responses may omit it.
+                # Copy: the dict may be the job's stored output_payload
+                normalized_analysis = {**normalized_analysis, "job_id": analysis_job_id}
+            if not shunya_job_service.should_process(db, job, normalized_analysis, raw_output_hash):
+                return {"success": True, "status": "already_processed"}
             
-            logger.info(f"Successfully processed CSR call {call_id} via Shunya")
-            return {"success": True, "call_id": call_id, "transcript_id": transcript_id}
+            call = db.query(Call).filter(Call.call_id == call_id).first()
+            if call:
+                await self._process_shunya_analysis_for_call(
+                    db=db,
+                    call=call,
+                    company_id=company_id,
+                    complete_analysis=normalized_analysis,
+                    transcript_text=call.transcript or "",
+                    shunya_job=job,
+                )
             
-        except Exception as e:
-            logger.error(f"Error processing CSR call {call_id}: {str(e)}", exc_info=True)
+            # Domain writes, stage and job result commit together
+            shunya_job_service.enter_stage(db, job, ShunyaPipelineStage.COMPLETED, commit=False)
+            shunya_job_service.mark_succeeded(db, job, normalized_analysis, raw_output_hash=raw_output_hash)
+            lead_id = job.lead_id
+            stage_timings = job.stage_timings
+        except Exception:
             db.rollback()
-            return {"success": False, "error": str(e)}
+            raise
+        finally:
+            db.close()
+        
+        emit(
+            "shunya.job.succeeded",
+            {
+                "job_id": job_id,
+                "job_type": ShunyaJobType.CSR_CALL.value,
+                "call_id": call_id,
+                "stage_timings": stage_timings,
+            },
+            tenant_id=company_id,
+            lead_id=lead_id,
+        )
+        
+        logger.info(
+            f"Successfully processed CSR call {call_id} via Shunya",
+            extra={"call_id": call_id, "job_id": job_id, "stage_timings": stage_timings}
+        )
+        return {"success": True, "status": "succeeded", "stage_timings": stage_timings}
+    
+    def _fail_csr_job(
+        self,
+        job_id: str,
+        error_message: str,
+        error_details: Optional[Dict[str, Any]] = None,
+        should_retry: bool = False
+    ) -> Dict[str, Any]:
+        """Record a pipeline failure; retryable failures are re-polled."""
+        db = SessionLocal()
+        try:
+            job = db.query(ShunyaJob).filter(ShunyaJob.id == job_id).first()
+            if not job:
+                return {"success": False, "error": error_message}
+            job = shunya_job_service.mark_failed(
+                db,
+                job,
+                error_message,
+                error_details=error_details,
+                should_retry=should_retry,
+            )
+            retrying = job.job_status == ShunyaJobStatus.PENDING
+            retry_delay = shunya_job_service.next_retry_delay(job)
+            job_type = job.job_type.value
+            company_id = job.company_id
         finally:
             db.close()
+        
+        if retrying:
+            self._schedule_poll(job_id, retry_delay)
+            return {"success": False, "status": "retrying", "error": error_message, "retry_in": retry_delay}
+        
+        emit(
+            "shunya.job.failed",
+            {"job_id": job_id, "job_type": job_type, "error": error_message},
+            tenant_id=company_id,
+        )
+        return {"success": False, "status": "failed", "error": error_message}
+    
+    def _schedule_poll(self, job_id: str, countdown: int):
+        """Queue a status poll as the fallback for a missed webhook."""
+        from app.tasks.shunya_job_polling_tasks import poll_shunya_job_status
+        
+        poll_shunya_job_status.apply_async(args=[job_id], countdown=countdown)
     
     async def process_sales_visit(
         self,
@@ -497,8 +755,7 @@ class ShunyaIntegrationService:
             generate_output_payload_hash,
             generate_task_unique_key,
             generate_signal_unique_key,
-            task_exists_by_unique_key,
-            signal_exists_by_unique_key,
+            insert_missing_by_unique_key,
         )
         from app.models.shunya_job import ShunyaJobStatus
         
@@ -580,6 +837,7 @@ class ShunyaIntegrationService:
         )
         db.add(call_analysis)
         db.flush()  # Flush to get ID before fetching follow-up recommendations
+        index_call_analysis(db, call_analysis, call)
         
         # Fetch follow-up recommendations from Shunya (non-blocking)
         # Only if feature flag is enabled
@@ -804,44 +1062,37 @@ class ShunyaIntegrationService:
                         lead_id=str(call.lead_id)
                     )
         
-        # Create Tasks from pending actions (idempotent: use unique keys)
+        # Create Tasks from pending actions (idempotent: one unique-key lookup, one insert)
+        created_task_ids = []
         if pending_actions and call.contact_card_id:
+            task_rows = []
             for action in pending_actions:
                 action_text = action.get("action") if isinstance(action, dict) else str(action)
                 due_at = action.get("due_at") if isinstance(action, dict) else None
-                
-                # Generate unique key for this task
-                task_unique_key = generate_task_unique_key(
-                    source=TaskSource.SHUNYA,
-                    description=action_text,
-                    contact_card_id=call.contact_card_id,
-                )
-                
-                # Check if task already exists (idempotency)
-                if not task_exists_by_unique_key(db, company_id, task_unique_key):
-                    task = Task(
-                        id=str(uuid4()),
-                        company_id=company_id,
-                        contact_card_id=call.contact_card_id,
-                        lead_id=call.lead_id,
-                        call_id=call.call_id,
-                        description=action_text,
-                        assigned_to=TaskAssignee.CSR,  # Default to CSR
+                task_rows.append({
+                    "id": str(uuid4()),
+                    "company_id": company_id,
+                    "contact_card_id": call.contact_card_id,
+                    "lead_id": call.lead_id,
+                    "call_id": call.call_id,
+                    "description": action_text,
+                    "assigned_to": TaskAssignee.CSR,  # Default to CSR
+                    "source": TaskSource.SHUNYA,
+                    "unique_key": generate_task_unique_key(
                         source=TaskSource.SHUNYA,
-                        unique_key=task_unique_key,
-                        due_at=datetime.fromisoformat(due_at) if due_at and isinstance(due_at, str) else None,
-                        status=TaskStatus.OPEN
-                    )
-                    db.add(task)
-                    logger.debug(
-                        f"Created task from Shunya action for call {call.call_id}",
-                        extra={"call_id": call.call_id, "task_description": action_text[:50]}
-                    )
-                else:
-                    logger.debug(
-                        f"Task already exists for call {call.call_id}, skipping duplicate",
-                        extra={"call_id": call.call_id, "task_description": action_text[:50]}
-                    )
+                        description=action_text,
+                        contact_card_id=call.contact_card_id,
+                    ),
+                    "due_at": datetime.fromisoformat(due_at) if due_at and isinstance(due_at, str) else None,
+                    "status": TaskStatus.OPEN,
+                })
+            
+            created_tasks = insert_missing_by_unique_key(db, Task, company_id, task_rows)
+            created_task_ids = [row["id"] for row in created_tasks]
+            logger.debug(
+                f"Created {len(created_tasks)} of {len(task_rows)} tasks from Shunya actions for call {call.call_id}",
+                extra={"call_id": call.call_id}
+            )
         
         # Extract and update address (trigger property intelligence)
         # Use normalized entities
@@ -862,13 +1113,21 @@ class ShunyaIntegrationService:
                 # maybe_trigger_property_scrape is called inside update_contact_address
         
         # Create key signals
-        await self._create_key_signals_from_analysis(
+        created_signal_ids = await self._create_key_signals_from_analysis(
             db=db,
             call=call,
             company_id=company_id,
             complete_analysis=complete_analysis
         )
         
+        self._emit_actions_created(
+            company_id=company_id,
+            lead_id=call.lead_id,
+            task_ids=created_task_ids,
+            signal_ids=created_signal_ids,
+            call_id=call.call_id,
+        )
+        
         # Emit lead.updated event (only if status changed)
         if call.lead_id and lead_status_changed:
             emit(
@@ -912,8 +1171,7 @@ class ShunyaIntegrationService:
             generate_output_payload_hash,
             generate_task_unique_key,
             generate_signal_unique_key,
-            task_exists_by_unique_key,
-            signal_exists_by_unique_key,
+            insert_missing_by_unique_key,
         )
         from app.models.shunya_job import ShunyaJobStatus
         
@@ -1108,55 +1366,58 @@ class ShunyaIntegrationService:
             analyzed_at=datetime.utcnow()
         )
         db.add(recording_analysis)
+        index_recording_analysis(db, recording_analysis, appointment)
         
-        # Create tasks from visit actions (idempotent: use unique keys)
+        # Create tasks from visit actions (idempotent: one unique-key lookup, one insert)
         # Visit actions may be in pending_actions or visit_actions
         visit_actions = complete_analysis.get("visit_actions", []) or complete_analysis.get("pending_actions", [])
+        created_task_ids = []
         if visit_actions and appointment.contact_card_id:
+            task_rows = []
             for action in visit_actions:
                 action_text = action.get("action") if isinstance(action, dict) else str(action)
-                
-                # Generate unique key for this task
-                task_unique_key = generate_task_unique_key(
-                    source=TaskSource.SHUNYA,
-                    description=action_text,
-                    contact_card_id=appointment.contact_card_id,
-                )
-                
-                # Check if task already exists (idempotency)
-                if not task_exists_by_unique_key(db, company_id, task_unique_key):
-                    task = Task(
-                        id=str(uuid4()),
-                        company_id=company_id,
-                        contact_card_id=appointment.contact_card_id,
-                        lead_id=appointment.lead_id,
-                        appointment_id=appointment.id,
-                        description=action_text,
-                        assigned_to=TaskAssignee.REP,
+                task_rows.append({
+                    "id": str(uuid4()),
+                    "company_id": company_id,
+                    "contact_card_id": appointment.contact_card_id,
+                    "lead_id": appointment.lead_id,
+                    "appointment_id": appointment.id,
+                    "description": action_text,
+                    "assigned_to": TaskAssignee.REP,
+                    "source": TaskSource.SHUNYA,
+                    "unique_key": generate_task_unique_key(
                         source=TaskSource.SHUNYA,
-                        unique_key=task_unique_key,
-                        status=TaskStatus.OPEN
-                    )
-                    db.add(task)
-                    logger.debug(
-                        f"Created task from Shunya visit action for appointment {appointment.id}",
-                        extra={"appointment_id": appointment.id, "task_description": action_text[:50]}
-                    )
-                else:
-                    logger.debug(
-                        f"Task already exists for appointment {appointment.id}, skipping duplicate",
-                        extra={"appointment_id": appointment.id, "task_description": action_text[:50]}
-                    )
+                        description=action_text,
+                        contact_card_id=appointment.contact_card_id,
+                    ),
+                    "status": TaskStatus.OPEN,
+                })
+            
+            created_tasks = insert_missing_by_unique_key(db, Task, company_id, task_rows)
+            created_task_ids = [row["id"] for row in created_tasks]
+            logger.debug(
+                f"Created {len(created_tasks)} of {len(task_rows)} tasks from Shunya visit actions for appointment {appointment.id}",
+                extra={"appointment_id": appointment.id}
+            )
         
         # Create key signals from visit analysis (idempotent: use unique keys)
+        created_signal_ids = []
         if appointment.contact_card_id:
-            await self._create_key_signals_from_visit_analysis(
+            created_signal_ids = await self._create_key_signals_from_visit_analysis(
                 db=db,
                 appointment=appointment,
                 company_id=company_id,
                 complete_analysis=complete_analysis
             )
         
+        self._emit_actions_created(
+            company_id=company_id,
+            lead_id=appointment.lead_id,
+            task_ids=created_task_ids,
+            signal_ids=created_signal_ids,
+            appointment_id=appointment.id,
+        )
+        
         # Emit appointment outcome event (only if outcome changed)
         if outcome_changed:
             emit(
@@ -1297,15 +1558,16 @@ class ShunyaIntegrationService:
         Create KeySignal entries from Shunya CSR call analysis.
         
         Idempotent: Uses unique keys to prevent duplicate signals.
+        Returns the IDs of the signals created.
         """
         from uuid import uuid4
         from app.utils.idempotency import (
             generate_signal_unique_key,
-            signal_exists_by_unique_key,
+            insert_missing_by_unique_key,
         )
         
         if not call.contact_card_id:
-            return  # Cannot create signals without contact card
+            return []  # Cannot create signals without contact card
         
         signals = []
         
@@ -1339,39 +1601,32 @@ class ShunyaIntegrationService:
                 "description": "Customer qualified but service was not offered during call"
             })
         
-        # Create signal records (idempotent: use unique keys)
-        for signal_data in signals:
-            # Generate unique key for this signal
-            signal_unique_key = generate_signal_unique_key(
-                signal_type=signal_data["type"],
-                title=signal_data["title"],
-                contact_card_id=call.contact_card_id,
-            )
-            
-            # Check if signal already exists (idempotency)
-            if not signal_exists_by_unique_key(db, company_id, signal_unique_key):
-                signal = KeySignal(
-                    id=str(uuid4()),
-                    company_id=company_id,
-                    contact_card_id=call.contact_card_id,
-                    lead_id=call.lead_id,
+        # Create signal records (idempotent: one unique-key lookup, one insert)
+        signal_rows = [
+            {
+                "id": str(uuid4()),
+                "company_id": company_id,
+                "contact_card_id": call.contact_card_id,
+                "lead_id": call.lead_id,
+                "signal_type": signal_data["type"],
+                "severity": signal_data["severity"],
+                "title": signal_data["title"],
+                "description": signal_data.get("description"),
+                "unique_key": generate_signal_unique_key(
                     signal_type=signal_data["type"],
-                    severity=signal_data["severity"],
                     title=signal_data["title"],
-                    description=signal_data.get("description"),
-                    unique_key=signal_unique_key,
-                    acknowledged=False
-                )
-                db.add(signal)
-                logger.debug(
-                    f"Created key signal for call {call.call_id}",
-                    extra={"call_id": call.call_id, "signal_title": signal_data["title"]}
-                )
-            else:
-                logger.debug(
-                    f"Key signal already exists for call {call.call_id}, skipping duplicate",
-                    extra={"call_id": call.call_id, "signal_title": signal_data["title"]}
-                )
+                    contact_card_id=call.contact_card_id,
+                ),
+                "acknowledged": False,
+            }
+            for signal_data in signals
+        ]
+        created = insert_missing_by_unique_key(db, KeySignal, company_id, signal_rows)
+        logger.debug(
+            f"Created {len(created)} of {len(signal_rows)} key signals for call {call.call_id}",
+            extra={"call_id": call.call_id}
+        )
+        return [row["id"] for row in created]
     
     async def _create_key_signals_from_visit_analysis(
         self,
@@ -1384,15 +1639,16 @@ class ShunyaIntegrationService:
         Create KeySignal entries from Shunya sales visit analysis.
         
         Idempotent: Uses unique keys to prevent duplicate signals.
+        Returns the IDs of the signals created.
         """
         from uuid import uuid4
         from app.utils.idempotency import (
             generate_signal_unique_key,
-            signal_exists_by_unique_key,
+            insert_missing_by_unique_key,
         )
         
         if not appointment.contact_card_id:
-            return  # Cannot create signals without contact card
+            return []  # Cannot create signals without contact card
         
         signals = []
         
@@ -1408,40 +1664,57 @@ class ShunyaIntegrationService:
                     "description": opp_text_str
                 })
         
-        # Create signal records (idempotent: use unique keys)
-        for signal_data in signals:
-            # Generate unique key for this signal
-            signal_unique_key = generate_signal_unique_key(
-                signal_type=signal_data["type"],
-                title=signal_data["title"],
-                contact_card_id=appointment.contact_card_id,
-            )
-            
-            # Check if signal already exists (idempotency)
-            if not signal_exists_by_unique_key(db, company_id, signal_unique_key):
-                signal = KeySignal(
-                    id=str(uuid4()),
-                    company_id=company_id,
-                    contact_card_id=appointment.contact_card_id,
-                    lead_id=appointment.lead_id,
-                    appointment_id=appointment.id,
+        # Create signal records (idempotent: one unique-key lookup, one insert)
+        signal_rows = [
+            {
+                "id": str(uuid4()),
+                "company_id": company_id,
+                "contact_card_id": appointment.contact_card_id,
+                "lead_id": appointment.lead_id,
+                "appointment_id": appointment.id,
+                "signal_type": signal_data["type"],
+                "severity": signal_data["severity"],
+                "title": signal_data["title"],
+                "description": signal_data.get("description"),
+                "unique_key": generate_signal_unique_key(
                     signal_type=signal_data["type"],
-                    severity=signal_data["severity"],
                     title=signal_data["title"],
-                    description=signal_data.get("description"),
-                    unique_key=signal_unique_key,
-                    acknowledged=False
-                )
-                db.add(signal)
-                logger.debug(
-                    f"Created key signal for visit appointment {appointment.id}",
-                    extra={"appointment_id": appointment.id, "signal_title": signal_data["title"]}
-                )
-            else:
-                logger.debug(
-                    f"Key signal already exists for visit appointment {appointment.id}, skipping duplicate",
-                    extra={"appointment_id": appointment.id, "signal_title": signal_data["title"]}
-                )
+                    contact_card_id=appointment.contact_card_id,
+                ),
+                "acknowledged": False,
+            }
+            for signal_data in signals
+        ]
+        created = insert_missing_by_unique_key(db, KeySignal, company_id, signal_rows)
+        logger.debug(
+            f"Created {len(created)} of {len(signal_rows)} key signals for visit appointment {appointment.id}",
+            extra={"appointment_id": appointment.id}
+        )
+        return [row["id"] for row in created]
+    
+    def _emit_actions_created(
+        self,
+        company_id: str,
+        lead_id: Optional[str],
+        task_ids: List[str],
+        signal_ids: List[str],
+        call_id: Optional[int] = None,
+        appointment_id: Optional[str] = None
+    ):
+        """Emit one shunya.actions.created event for all Tasks/KeySignals an analysis created."""
+        if not task_ids and not signal_ids:
+            return
+        emit(
+            event_name="shunya.actions.created",
+            payload={
+                "call_id": call_id,
+                "appointment_id": appointment_id,
+                "task_ids": task_ids,
+                "signal_ids": signal_ids,
+            },
+            tenant_id=company_id,
+            lead_id=str(lead_id) if lead_id else None
+        )
 
 
 # Global service instance
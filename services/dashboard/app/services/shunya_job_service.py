@@ -4,11 +4,12 @@ Shunya Job Service for managing async Shunya API jobs.
 Handles job creation, status tracking, retry logic, and idempotency.
 """
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 from sqlalchemy.orm import Session
 
-from app.models.shunya_job import ShunyaJob, ShunyaJobType, ShunyaJobStatus
+from app.models.shunya_job import ShunyaJob, ShunyaJobType, ShunyaJobStatus, ShunyaPipelineStage
 from app.core.pii_masking import PIISafeLogger
+from app.obs.metrics import record_shunya_pipeline_stage
 
 logger = PIISafeLogger(__name__)
 
@@ -134,6 +135,7 @@ class ShunyaJobService:
         db: Session,
         job: ShunyaJob,
         output_payload: Dict[str, Any],
+        raw_output_hash: Optional[str] = None,
     ) -> ShunyaJob:
         """
         Mark job as succeeded and store normalized output.
@@ -142,6 +144,8 @@ class ShunyaJobService:
             db: Database session
             job: ShunyaJob instance
             output_payload: Normalized Shunya output
+            raw_output_hash: Hash of the raw response (from normalize_output),
+                so a re-delivery of it can reuse output_payload
         
         Returns:
             Updated ShunyaJob instance
@@ -163,6 +167,7 @@ class ShunyaJobService:
         job.job_status = ShunyaJobStatus.SUCCEEDED
         job.output_payload = output_payload
         job.processed_output_hash = output_hash  # Store hash for idempotency
+        job.raw_output_hash = raw_output_hash
         job.completed_at = datetime.utcnow()
         job.next_retry_at = None
         job.error_message = None
@@ -274,6 +279,60 @@ class ShunyaJobService:
         
         return job
     
+    def enter_stage(
+        self,
+        db: Session,
+        job: ShunyaJob,
+        stage: ShunyaPipelineStage,
+        commit: bool = True,
+    ) -> ShunyaJob:
+        """
+        Move a pipeline job to `stage`, recording time spent in the previous one.
+        
+        Stage durations accumulate in job.stage_timings (seconds) and the
+        shunya_pipeline_stage_seconds histogram. Reaching COMPLETED also
+        records the end-to-end "total" from job creation.
+        
+        Args:
+            db: Database session
+            job: ShunyaJob instance
+            stage: Stage being entered
+            commit: Commit now; pass False to commit with the caller's writes
+        
+        Returns:
+            Updated ShunyaJob instance
+        """
+        now = datetime.utcnow()
+        job_type = job.job_type.value
+        timings = dict(job.stage_timings or {})
+        
+        if job.pipeline_stage and job.stage_started_at:
+            elapsed = (now - job.stage_started_at).total_seconds()
+            previous = job.pipeline_stage.value
+            timings[previous] = round(timings.get(previous, 0) + elapsed, 3)
+            record_shunya_pipeline_stage(job_type, previous, elapsed)
+        
+        if stage == ShunyaPipelineStage.COMPLETED and job.created_at:
+            total = (now - job.created_at).total_seconds()
+            timings["total"] = round(total, 3)
+            record_shunya_pipeline_stage(job_type, "total", total)
+        
+        job.pipeline_stage = stage
+        job.stage_started_at = now
+        job.stage_timings = timings
+        job.updated_at = now
+        
+        if commit:
+            db.commit()
+            db.refresh(job)
+        
+        logger.info(
+            f"Shunya job {job.id} entered stage {stage.value}",
+            extra={"job_id": job.id, "stage": stage.value, "stage_timings": timings}
+        )
+        
+        return job
+    
     def record_attempt(
         self,
         db: Session,
@@ -472,11 +531,40 @@ class ShunyaJobService:
         
         return query.order_by(ShunyaJob.created_at).limit(limit).all()
     
+    def normalize_output(
+        self,
+        job: ShunyaJob,
+        raw_output: Dict[str, Any],
+        normalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Normalize a raw Shunya result for a job, reusing the stored output.
+        
+        Webhook and poller often both deliver the same result for a job; if
+        the raw response hashes to the job's raw_output_hash, output_payload
+        already is its normalization and is returned as-is.
+        
+        Args:
+            job: ShunyaJob the result belongs to
+            raw_output: Raw Shunya response
+            normalize: Normalizer for the job type (e.g. shunya_normalizer.normalize_complete_analysis)
+        
+        Returns:
+            (normalized output, raw output hash to pass to mark_succeeded)
+        """
+        from app.utils.idempotency import generate_output_payload_hash
+        
+        raw_hash = generate_output_payload_hash(raw_output)
+        if job.output_payload is not None and job.raw_output_hash == raw_hash:
+            return job.output_payload, raw_hash
+        return normalize(raw_output), raw_hash
+    
     def should_process(
         self,
         db: Session,
         job: ShunyaJob,
         output_payload: Dict[str, Any],
+        raw_output_hash: Optional[str] = None,
     ) -> bool:
         """
         Check if a job should be processed based on idempotency rules.
@@ -485,6 +573,7 @@ class ShunyaJobService:
             db: Database session
             job: ShunyaJob instance
             output_payload: Normalized Shunya output payload
+            raw_output_hash: Hash of the raw response (from normalize_output)
         
         Returns:
             True if job should be processed, False if already processed
@@ -493,6 +582,12 @@ class ShunyaJobService:
         
         # If job already succeeded, check output hash
         if job.job_status == ShunyaJobStatus.SUCCEEDED:
+            if raw_output_hash and job.raw_output_hash == raw_output_hash:
+                logger.info(
+                    f"Job {job.id} already processed this raw output",
+                    extra={"job_id": job.id, "hash": raw_output_hash[:8]}
+                )
+                return False
             new_hash = generate_output_payload_hash(output_payload)
             if job.processed_output_hash == new_hash:
                 logger.info(
@@ -4,8 +4,16 @@ Shunya Response Normalizer
 Provides defensive parsing and normalization for Shunya API responses.
 Handles variations in response format and provides consistent output structure.
 Maps Shunya enum values to Otto canonical enums.
+
+Field extraction is compiled once at import from the contracts in
+app/schemas/shunya_contracts.py: each output field is a precomputed tuple
+of its source keys (contract name plus legacy aliases) and a coercion, so
+a response is normalized in a single pass. Compilation fails if a contract
+gains a field the normalizer neither maps nor explicitly ignores.
 """
-from typing import Dict, Any, List, Optional
+import logging
+from functools import lru_cache
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 from app.core.pii_masking import PIISafeLogger
 from app.models.enums import (
     normalize_booking_status,
@@ -16,9 +24,212 @@ from app.models.enums import (
     normalize_missed_opportunity_type,
     compute_call_outcome_category,
 )
+from app.schemas.shunya_contracts import (
+    ShunyaComplianceResponse,
+    ShunyaCSRCallAnalysis,
+    ShunyaEntities,
+    ShunyaMissedOpportunity,
+    ShunyaObjection,
+    ShunyaPendingAction,
+    ShunyaQualificationResponse,
+    ShunyaSummaryResponse,
+)
 
 logger = PIISafeLogger(__name__)
 
+FieldSpec = Tuple[str, Tuple[str, ...], Callable[[Any], Any]]
+
+
+def _compile_record(
+    contract: Any,
+    fields: List[FieldSpec],
+    ignored: Iterable[str] = (),
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile field specs into a single-pass dict -> dict extractor.
+
+    Each field takes its first truthy source key (else the last key's value)
+    and applies its coercion; the specs are validated and frozen here so
+    normalization only walks a tuple.
+
+    Args:
+        contract: Pydantic contract the source dict follows (None if there is none)
+        fields: (output_key, source_keys, coerce) for each output field
+        ignored: Contract fields deliberately not carried into the output
+
+    Raises:
+        RuntimeError: If a contract field is neither a source key nor ignored,
+            or a field has no source keys
+    """
+    if contract is not None:
+        mapped = {key for _, keys, _ in fields for key in keys} | set(ignored)
+        unmapped = set(contract.model_fields) - mapped
+        if unmapped:
+            raise RuntimeError(
+                f"{contract.__name__} fields not handled by the Shunya normalizer: {sorted(unmapped)}"
+            )
+
+    empty = [output_key for output_key, keys, _ in fields if not keys]
+    if empty:
+        raise RuntimeError(f"Shunya normalizer fields without source keys: {empty}")
+    # (output_key, primary key, legacy aliases, coerce); most fields have no aliases
+    specs = tuple((output_key, keys[0], tuple(keys[1:]), coerce) for output_key, keys, coerce in fields)
+
+    def extract(data: Dict[str, Any]) -> Dict[str, Any]:
+        record = {}
+        get = data.get
+        for output_key, key, aliases, coerce in specs:
+            value = get(key)
+            if not value:
+                for alias in aliases:
+                    value = get(alias)
+                    if value:
+                        break
+            record[output_key] = coerce(value)
+        return record
+
+    return extract
+
+
+def _as_is(value: Any) -> Any:
+    return value
+
+
+def _as_dict(value: Any) -> Any:
+    return value or {}
+
+
+def _as_text(value: Any) -> Any:
+    return value or ""
+
+
+def _as_severity(value: Any) -> Any:
+    return (value or "medium").lower()
+
+
+def _as_float(value: Any) -> Optional[float]:
+    """Safely convert to float."""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            return float(value.strip())
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def _as_list(value: Any) -> List:
+    """Safely convert to list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (str, int, float)):
+        return [value]
+    return []
+
+
+def _as_status(value: Any) -> Any:
+    return value.lower().strip() if isinstance(value, str) else value
+
+
+def _cached_enum(normalize: Callable[[Any], Any], maxsize: int) -> Callable[[Any], Any]:
+    """
+    Memoize an enum normalizer for string input.
+
+    The normalizers raise and catch ValueError on every unknown label, and
+    Shunya repeats the same labels constantly. Non-string input (unhashable,
+    or an error the caller should still see) bypasses the cache.
+    """
+    cached = lru_cache(maxsize=maxsize)(normalize)
+
+    def lookup(value: Any) -> Any:
+        if value is None or isinstance(value, str):
+            return cached(value)
+        return normalize(value)
+
+    return lookup
+
+
+_booking_status = _cached_enum(normalize_booking_status, 256)
+_action_type = _cached_enum(normalize_action_type, 1024)
+_missed_opportunity_type = _cached_enum(normalize_missed_opportunity_type, 1024)
+
+
+_extract_qualification = _compile_record(ShunyaQualificationResponse, [
+    ("qualification_status", ("qualification_status", "status", "classification"), _as_status),
+    ("booking_status", ("booking_status", "appointment_status"), _booking_status),
+    ("bant_scores", ("bant_scores",), _as_dict),
+    ("overall_score", ("overall_score",), _as_float),
+    ("confidence_score", ("confidence_score",), _as_float),
+    ("decision_makers", ("decision_makers",), _as_list),
+    ("urgency_signals", ("urgency_signals",), _as_list),
+    ("budget_indicators", ("budget_indicators",), _as_list),
+])
+
+_extract_objection = _compile_record(ShunyaObjection, [
+    ("objection_text", ("objection_text", "text", "objection"), _as_text),
+    ("category_id", ("category_id",), _as_is),
+    ("category_text", ("category_text", "category", "objection_label"), _as_is),
+    ("severity", ("severity",), _as_severity),
+    ("overcome", ("overcome",), bool),
+    ("timestamp", ("timestamp",), _as_is),
+    ("speaker_id", ("speaker_id",), _as_is),
+    ("response_suggestions", ("response_suggestions",), _as_list),
+    ("confidence_score", ("confidence_score",), _as_float),
+])
+
+_extract_compliance = _compile_record(ShunyaComplianceResponse, [
+    ("compliance_score", ("compliance_score",), _as_float),
+    ("stages_followed", ("stages_followed", "stages_completed"), _as_list),
+    ("stages_missed", ("stages_missed", "stages_not_completed"), _as_list),
+    ("violations", ("violations",), _as_list),
+    ("positive_behaviors", ("positive_behaviors",), _as_list),
+    ("recommendations", ("recommendations",), _as_list),
+], ignored=("stage_details",))
+
+_extract_summary = _compile_record(ShunyaSummaryResponse, [
+    ("summary", ("summary", "text"), _as_text),
+    ("key_points", ("key_points", "main_points"), _as_list),
+    ("action_items", ("action_items", "actions"), _as_list),
+    ("next_steps", ("next_steps", "follow_ups"), _as_list),
+    ("confidence_score", ("confidence_score", "confidence"), _as_float),
+], ignored=("sentiment",))
+
+_extract_pending_action = _compile_record(ShunyaPendingAction, [
+    ("action", ("action", "text", "description"), _as_text),
+    ("action_type", ("action_type", "type"), _as_is),  # normalized after, falls back to the action text
+    ("due_at", ("due_at", "due_date"), _as_is),
+    ("priority", ("priority",), _as_severity),
+], ignored=("assignee_type", "context"))
+
+_extract_missed_opportunity = _compile_record(ShunyaMissedOpportunity, [
+    ("opportunity", ("opportunity", "text", "description", "opportunity_text"), _as_text),
+    ("missed_opportunity_type", ("missed_opportunity_type", "type", "opportunity_type"), _as_is),
+    ("severity", ("severity",), _as_severity),
+    ("timestamp", ("timestamp",), _as_is),
+], ignored=("context",))
+
+_extract_entities = _compile_record(ShunyaEntities, [
+    ("address", ("address", "property_address"), _as_is),
+    ("appointment_date", ("appointment_date", "scheduled_time", "date"), _as_is),
+    ("scheduled_time", ("scheduled_time", "time"), _as_is),
+    ("name", ("name", "customer_name", "person_name"), _as_is),
+    ("phone", ("phone", "phone_number"), _as_is),
+    ("email", ("email",), _as_is),
+], ignored=("company_name", "budget", "other"))
+
+_extract_transcript = _compile_record(None, [
+    ("transcript_text", ("transcript_text", "transcript", "text"), _as_text),
+    ("speaker_labels", ("speaker_labels", "speakers", "diarization"), _as_list),
+    ("confidence_score", ("confidence_score", "confidence"), _as_float),
+    ("transcript_id", ("transcript_id",), _as_is),
+    ("task_id", ("task_id", "job_id"), _as_is),
+])
+
 
 class ShunyaResponseNormalizer:
     """
@@ -47,35 +258,7 @@ class ShunyaResponseNormalizer:
             logger.warning(f"Expected dict, got {type(response)}")
             return ShunyaResponseNormalizer._empty_analysis()
         
-        normalized = {
-            "qualification": ShunyaResponseNormalizer._normalize_qualification(
-                response.get("qualification") or response.get("lead_qualification") or {}
-            ),
-            "objections": ShunyaResponseNormalizer._normalize_objections(
-                response.get("objections") or {}
-            ),
-            "compliance": ShunyaResponseNormalizer._normalize_compliance(
-                response.get("compliance") or response.get("sop_compliance") or {}
-            ),
-            "summary": ShunyaResponseNormalizer._normalize_summary(
-                response.get("summary") or response.get("call_summary") or {}
-            ),
-            "sentiment_score": ShunyaResponseNormalizer._normalize_float(
-                response.get("sentiment_score") or response.get("sentiment") or response.get("sentiment_analysis", {}).get("score")
-            ),
-            "pending_actions": ShunyaResponseNormalizer._normalize_pending_actions(
-                response.get("pending_actions") or response.get("action_items") or response.get("next_steps") or []
-            ),
-            "missed_opportunities": ShunyaResponseNormalizer._normalize_missed_opportunities(
-                response.get("missed_opportunities") or response.get("missed_opps") or []
-            ),
-            "entities": ShunyaResponseNormalizer._normalize_entities(
-                response.get("entities") or response.get("extracted_entities") or {}
-            ),
-            "job_id": response.get("job_id") or response.get("task_id"),
-        }
-        
-        return normalized
+        return _extract_analysis(response)
     
     @staticmethod
     def _normalize_qualification(qualification: Any) -> Dict[str, Any]:
@@ -93,65 +276,32 @@ class ShunyaResponseNormalizer:
                 "budget_indicators": [],
             }
         
-        # Handle different formats for qualification_status
-        status = qualification.get("qualification_status") or qualification.get("status") or qualification.get("classification")
-        if isinstance(status, str):
-            status = status.lower().strip()
-        
-        # Normalize booking_status to canonical enum
-        booking_status_raw = qualification.get("booking_status") or qualification.get("appointment_status")
-        booking_status = normalize_booking_status(booking_status_raw)
-        
-        # DEBUG: Log raw Shunya values before normalization
-        logger.debug(
-            f"Shunya raw qualification data: "
-            f"qualification_status='{status}' (raw: '{qualification.get('qualification_status')}'), "
-            f"booking_status='{booking_status}' (raw: '{booking_status_raw}')",
-            extra={
-                "qualification_status_raw": qualification.get("qualification_status"),
-                "qualification_status_normalized": status,
-                "booking_status_raw": booking_status_raw,
-                "booking_status_normalized": booking_status,
-                "qualification_full": qualification
-            }
-        )
-        
+        normalized = _extract_qualification(qualification)
         # Compute call_outcome_category from qualification_status + booking_status
-        call_outcome_category = compute_call_outcome_category(status, booking_status)
-        
-        # DEBUG: Log computed call_outcome_category
-        logger.debug(
-            f"Computed call_outcome_category: '{call_outcome_category}' from "
-            f"qualification_status='{status}' + booking_status='{booking_status}'",
-            extra={
-                "call_outcome_category": call_outcome_category,
-                "qualification_status": status,
-                "booking_status": booking_status
-            }
+        normalized["call_outcome_category"] = compute_call_outcome_category(
+            normalized["qualification_status"], normalized["booking_status"]
         )
         
-        return {
-            "qualification_status": status,
-            "booking_status": booking_status,  # Canonical enum value
-            "call_outcome_category": call_outcome_category,  # Computed enum
-            "bant_scores": qualification.get("bant_scores") or {},
-            "overall_score": ShunyaResponseNormalizer._normalize_float(qualification.get("overall_score")),
-            "confidence_score": ShunyaResponseNormalizer._normalize_float(qualification.get("confidence_score")),
-            "decision_makers": ShunyaResponseNormalizer._normalize_list(qualification.get("decision_makers")),
-            "urgency_signals": ShunyaResponseNormalizer._normalize_list(qualification.get("urgency_signals")),
-            "budget_indicators": ShunyaResponseNormalizer._normalize_list(qualification.get("budget_indicators")),
-        }
+        if logger.logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Shunya qualification normalized: "
+                f"qualification_status='{normalized['qualification_status']}', "
+                f"booking_status='{normalized['booking_status']}', "
+                f"call_outcome_category='{normalized['call_outcome_category']}'",
+                extra={"qualification_full": qualification},
+            )
+        
+        return normalized
     
     @staticmethod
     def _normalize_objections(objections: Any) -> Dict[str, Any]:
         """Normalize objections response."""
+        if isinstance(objections, list):
+            return {
+                "objections": [ShunyaResponseNormalizer._normalize_objection_item(obj) for obj in objections],
+                "total_objections": len(objections),
+            }
         if not isinstance(objections, dict):
-            # If it's a list, convert to expected format
-            if isinstance(objections, list):
-                return {
-                    "objections": [ShunyaResponseNormalizer._normalize_objection_item(obj) for obj in objections],
-                    "total_objections": len(objections),
-                }
             return {
                 "objections": [],
                 "total_objections": 0,
@@ -175,39 +325,18 @@ class ShunyaResponseNormalizer:
     @staticmethod
     def _normalize_objection_item(obj: Any) -> Dict[str, Any]:
         """Normalize a single objection item."""
-        if isinstance(obj, str):
-            # Simple string objection
-            return {
-                "objection_text": obj,
-                "category_id": None,
-                "category_text": None,
-                "severity": "medium",
-                "overcome": False,
-                "timestamp": None,
-                "speaker_id": None,
-            }
-        elif isinstance(obj, dict):
-            return {
-                "objection_text": obj.get("objection_text") or obj.get("text") or obj.get("objection") or "",
-                "category_id": obj.get("category_id"),
-                "category_text": obj.get("category_text") or obj.get("category"),
-                "severity": (obj.get("severity") or "medium").lower(),
-                "overcome": bool(obj.get("overcome") or False),
-                "timestamp": obj.get("timestamp"),
-                "speaker_id": obj.get("speaker_id"),
-                "response_suggestions": ShunyaResponseNormalizer._normalize_list(obj.get("response_suggestions")),
-                "confidence_score": ShunyaResponseNormalizer._normalize_float(obj.get("confidence_score")),
-            }
-        else:
-            return {
-                "objection_text": str(obj),
-                "category_id": None,
-                "category_text": None,
-                "severity": "medium",
-                "overcome": False,
-                "timestamp": None,
-                "speaker_id": None,
-            }
+        if isinstance(obj, dict):
+            return _extract_objection(obj)
+        # Simple string (or other scalar) objection
+        return {
+            "objection_text": obj if isinstance(obj, str) else str(obj),
+            "category_id": None,
+            "category_text": None,
+            "severity": "medium",
+            "overcome": False,
+            "timestamp": None,
+            "speaker_id": None,
+        }
     
     @staticmethod
     def _normalize_compliance(compliance: Any) -> Dict[str, Any]:
@@ -221,42 +350,19 @@ class ShunyaResponseNormalizer:
                 "positive_behaviors": [],
                 "recommendations": [],
             }
-        
-        return {
-            "compliance_score": ShunyaResponseNormalizer._normalize_float(compliance.get("compliance_score")),
-            "stages_followed": ShunyaResponseNormalizer._normalize_list(compliance.get("stages_followed") or compliance.get("stages_completed")),
-            "stages_missed": ShunyaResponseNormalizer._normalize_list(compliance.get("stages_missed") or compliance.get("stages_not_completed")),
-            "violations": ShunyaResponseNormalizer._normalize_list(compliance.get("violations")),
-            "positive_behaviors": ShunyaResponseNormalizer._normalize_list(compliance.get("positive_behaviors")),
-            "recommendations": ShunyaResponseNormalizer._normalize_list(compliance.get("recommendations")),
-        }
+        return _extract_compliance(compliance)
     
     @staticmethod
     def _normalize_summary(summary: Any) -> Dict[str, Any]:
         """Normalize call/visit summary response."""
-        if isinstance(summary, str):
-            return {
-                "summary": summary,
-                "key_points": [],
-                "action_items": [],
-                "next_steps": [],
-                "confidence_score": None,
-            }
-        elif not isinstance(summary, dict):
-            return {
-                "summary": "",
-                "key_points": [],
-                "action_items": [],
-                "next_steps": [],
-                "confidence_score": None,
-            }
-        
+        if isinstance(summary, dict):
+            return _extract_summary(summary)
         return {
-            "summary": summary.get("summary") or summary.get("text") or "",
-            "key_points": ShunyaResponseNormalizer._normalize_list(summary.get("key_points") or summary.get("main_points")),
-            "action_items": ShunyaResponseNormalizer._normalize_list(summary.get("action_items") or summary.get("actions")),
-            "next_steps": ShunyaResponseNormalizer._normalize_list(summary.get("next_steps") or summary.get("follow_ups")),
-            "confidence_score": ShunyaResponseNormalizer._normalize_float(summary.get("confidence_score")),
+            "summary": summary if isinstance(summary, str) else "",
+            "key_points": [],
+            "action_items": [],
+            "next_steps": [],
+            "confidence_score": None,
         }
     
     @staticmethod
@@ -268,27 +374,16 @@ class ShunyaResponseNormalizer:
         normalized = []
         for action in actions:
             if isinstance(action, str):
-                # Normalize action type to canonical enum
-                action_type = normalize_action_type(action)
                 normalized.append({
                     "action": action,
-                    "action_type": action_type,  # Canonical enum value
+                    "action_type": _action_type(action),  # Canonical enum value
                     "due_at": None,
                     "priority": "medium",
                 })
             elif isinstance(action, dict):
-                # Extract action text
-                action_text = action.get("action") or action.get("text") or action.get("description") or ""
-                # Normalize action_type to canonical enum
-                action_type_raw = action.get("action_type") or action.get("type") or action_text
-                action_type = normalize_action_type(action_type_raw)
-                
-                normalized.append({
-                    "action": action_text,
-                    "action_type": action_type,  # Canonical enum value
-                    "due_at": action.get("due_at") or action.get("due_date"),
-                    "priority": (action.get("priority") or "medium").lower(),
-                })
+                item = _extract_pending_action(action)
+                item["action_type"] = _action_type(item["action_type"] or item["action"])
+                normalized.append(item)
         
         return normalized
     
@@ -301,27 +396,18 @@ class ShunyaResponseNormalizer:
         normalized = []
         for opp in opps:
             if isinstance(opp, str):
-                # Normalize missed opportunity type to canonical enum
-                opp_type = normalize_missed_opportunity_type(opp)
                 normalized.append({
                     "opportunity": opp,
-                    "missed_opportunity_type": opp_type,  # Canonical enum value
+                    "missed_opportunity_type": _missed_opportunity_type(opp),  # Canonical enum value
                     "severity": "medium",
                     "timestamp": None,
                 })
             elif isinstance(opp, dict):
-                # Extract opportunity text
-                opp_text = opp.get("opportunity") or opp.get("text") or opp.get("description") or ""
-                # Normalize missed_opportunity_type to canonical enum
-                opp_type_raw = opp.get("missed_opportunity_type") or opp.get("type") or opp_text
-                opp_type = normalize_missed_opportunity_type(opp_type_raw)
-                
-                normalized.append({
-                    "opportunity": opp_text,
-                    "missed_opportunity_type": opp_type,  # Canonical enum value
-                    "severity": (opp.get("severity") or "medium").lower(),
-                    "timestamp": opp.get("timestamp"),
-                })
+                item = _extract_missed_opportunity(opp)
+                item["missed_opportunity_type"] = _missed_opportunity_type(
+                    item["missed_opportunity_type"] or item["opportunity"]
+                )
+                normalized.append(item)
         
         return normalized
     
@@ -330,40 +416,20 @@ class ShunyaResponseNormalizer:
         """Normalize extracted entities (address, date, etc.)."""
         if not isinstance(entities, dict):
             return {}
-        
-        return {
-            "address": entities.get("address") or entities.get("property_address"),
-            "appointment_date": entities.get("appointment_date") or entities.get("scheduled_time") or entities.get("date"),
-            "scheduled_time": entities.get("scheduled_time") or entities.get("time"),
-            "name": entities.get("name") or entities.get("customer_name"),
-            "phone": entities.get("phone") or entities.get("phone_number"),
-            "email": entities.get("email"),
-        }
+        return _extract_entities(entities)
     
     @staticmethod
-    def _normalize_float(value: Any) -> Optional[float]:
-        """Safely convert to float."""
-        if value is None:
-            return None
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            if isinstance(value, str):
-                return float(value.strip())
-        except (ValueError, TypeError):
-            pass
-        return None
+    def _normalize_sentiment(response: Dict[str, Any]) -> Optional[float]:
+        """Top-level sentiment, falling back to sentiment_analysis.score."""
+        sentiment = response.get("sentiment_score") or response.get("sentiment")
+        if not sentiment:
+            sentiment_analysis = response.get("sentiment_analysis")
+            if isinstance(sentiment_analysis, dict):
+                sentiment = sentiment_analysis.get("score")
+        return _as_float(sentiment)
     
-    @staticmethod
-    def _normalize_list(value: Any) -> List:
-        """Safely convert to list."""
-        if value is None:
-            return []
-        if isinstance(value, list):
-            return value
-        if isinstance(value, (str, int, float)):
-            return [value]
-        return []
+    _normalize_float = staticmethod(_as_float)
+    _normalize_list = staticmethod(_as_list)
     
     @staticmethod
     def _empty_analysis() -> Dict[str, Any]:
@@ -417,13 +483,7 @@ class ShunyaResponseNormalizer:
                 "task_id": None,
             }
         
-        return {
-            "transcript_text": response.get("transcript_text") or response.get("transcript") or response.get("text") or "",
-            "speaker_labels": ShunyaResponseNormalizer._normalize_list(response.get("speaker_labels") or response.get("speakers") or response.get("diarization")),
-            "confidence_score": ShunyaResponseNormalizer._normalize_float(response.get("confidence_score") or response.get("confidence")),
-            "transcript_id": response.get("transcript_id"),
-            "task_id": response.get("task_id") or response.get("job_id"),
-        }
+        return _extract_transcript(response)
     
     @staticmethod
     def normalize_meeting_segmentation(response: Dict[str, Any]) -> Dict[str, Any]:
@@ -475,7 +535,7 @@ class ShunyaResponseNormalizer:
                 "key_points": part2_raw.get("key_points") or part2_raw.get("key_topics") or [],
                 "phase": normalize_meeting_phase(part2_raw.get("phase") or "proposal_close"),  # Canonical enum
             },
-            "segmentation_confidence": ShunyaResponseNormalizer._normalize_float(response.get("segmentation_confidence")),
+            "segmentation_confidence": _as_float(response.get("segmentation_confidence")),
             "transition_point": response.get("transition_point"),
             "transition_indicators": response.get("transition_indicators") or [],
             "meeting_structure_score": response.get("meeting_structure_score"),
@@ -489,6 +549,35 @@ class ShunyaResponseNormalizer:
         }
 
 
+def _section(normalize: Callable[[Any], Any], empty: Any) -> Callable[[Any], Any]:
+    """Missing or falsy sections normalize as empty (``value or {}``)."""
+    return lambda value: normalize(value or empty)
+
+
+_extract_sections = _compile_record(ShunyaCSRCallAnalysis, [
+    ("qualification", ("qualification", "lead_qualification"),
+     _section(ShunyaResponseNormalizer._normalize_qualification, {})),
+    ("objections", ("objections",), _section(ShunyaResponseNormalizer._normalize_objections, {})),
+    ("compliance", ("compliance", "sop_compliance"), _section(ShunyaResponseNormalizer._normalize_compliance, {})),
+    ("summary", ("summary", "call_summary"), _section(ShunyaResponseNormalizer._normalize_summary, {})),
+    ("pending_actions", ("pending_actions", "action_items", "next_steps"),
+     ShunyaResponseNormalizer._normalize_pending_actions),
+    ("missed_opportunities", ("missed_opportunities", "missed_opps"),
+     ShunyaResponseNormalizer._normalize_missed_opportunities),
+    ("entities", ("entities", "extracted_entities"), _section(ShunyaResponseNormalizer._normalize_entities, {})),
+    ("job_id", ("job_id", "task_id"), _as_is),
+], ignored=(
+    "sentiment_score",  # read by _normalize_sentiment (nested fallback)
+    "call_id", "analyzed_at", "confidence_score",
+))
+
+
+def _extract_analysis(response: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = _extract_sections(response)
+    normalized["sentiment_score"] = ShunyaResponseNormalizer._normalize_sentiment(response)
+    return normalized
+
+
 # Global normalizer instance
 shunya_normalizer = ShunyaResponseNormalizer()
 
@@ -2,6 +2,7 @@ import json
 import os
 from typing import Dict, Any, List, Optional
 import openai
+from app.services.llm_cache import llm_cache
 from app.services.transcript_analysis.processes.base_process import BaseAnalysisProcess
 
 class V0AnalysisProcess(BaseAnalysisProcess):
@@ -144,19 +145,30 @@ Roofing issue: {call_metadata.get('problem', 'Unknown')}
 
         transcript_text = transcript_data.get("text", "")
 
-        # Call OpenAI to analyze the transcript
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"{metadata_text}\n\nTRANSCRIPT:\n{transcript_text}"}
+            ],
+            "response_format": {"type": "json_object"},
+        }
+
+        # Call OpenAI to analyze the transcript (re-runs over the same transcript hit the LLM cache)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"{metadata_text}\n\nTRANSCRIPT:\n{transcript_text}"}
-                ],
-                response_format={"type": "json_object"}
+            content = llm_cache.complete(
+                "transcript_analysis",
+                request,
+                lambda r: self.client.chat.completions.create(**r),
+                tenant_id=call_metadata.get("company_id"),
             )
             
             # Parse the JSON response
-            result = json.loads(response.choices[0].message.content)
+            try:
+                result = json.loads(content)
+            except ValueError:
+                llm_cache.invalidate("transcript_analysis", request)
+                raise
             
             # Ensure the result has the expected structure
             self._validate_response(result)
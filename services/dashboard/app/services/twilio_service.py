@@ -1,20 +1,60 @@
 """
 Enhanced Twilio Service for SMS functionality
-Handles SMS sending with circuit breaker, retry logic, and phone number normalization
+Handles SMS sending with circuit breaker, retry logic, and phone number normalization.
+
+Batches (campaign nurture sends, manager alerts) go through `stream_batch` /
+`batch_send`: sends run concurrently on Twilio's async HTTP client, bounded
+by a semaphore and paced by per-sender-number and per-account token buckets
+so we stay inside Twilio's messages-per-second limits instead of queueing
+up 429s.
 """
 import os
 import asyncio
+import random
+import threading
 import time
 import hashlib
-from typing import List, Dict, Optional, Union, Any
+from typing import AsyncIterator, List, Dict, Optional, Union, Any
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException, TwilioException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
 from app.services.circuit_breaker import circuit_breaker_manager
 from app.obs.logging import get_logger
 import logging
 
 logger = get_logger(__name__)
 
+# HTTP statuses / Twilio error codes worth retrying
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+TOO_MANY_REQUESTS_CODE = 20429
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket pacing sends to `rate` per second (bursting to `burst`).
+
+    `reserve()` books the next slot and returns how long to wait for it, so
+    concurrent senders queue up fairly without holding a lock across awaits.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
 class TwilioService:
     """Enhanced service for handling SMS functionality via Twilio with circuit breaker and retry logic."""
     
@@ -30,6 +70,16 @@ class TwilioService:
         self.auth_token = auth_token or os.getenv("TWILIO_AUTH_TOKEN", "")
         self.from_number = os.getenv("TWILIO_FROM_NUMBER", "")
         self.callback_number = os.getenv("TWILIO_CALLBACK_NUMBER", "")
+        # Override for the api.twilio.com base URL (local stub servers in tests)
+        self.api_base_url = os.getenv("TWILIO_API_BASE_URL", "")
+        
+        # Batch send throughput: Twilio accepts ~1 msg/s per US long code
+        # (3/s toll-free, 100/s short code); the account limit caps the total
+        self.number_mps = float(os.getenv("TWILIO_NUMBER_MPS", "1"))
+        self.account_mps = float(os.getenv("TWILIO_ACCOUNT_MPS", "25"))
+        self.batch_concurrency = int(os.getenv("TWILIO_BATCH_CONCURRENCY", "10"))
+        self._number_buckets: Dict[str, AsyncTokenBucket] = {}
+        self._account_bucket = AsyncTokenBucket(self.account_mps)
         
         # Initialize Twilio client lazily (only when needed)
         self.client = None
@@ -48,7 +98,18 @@ class TwilioService:
             if not self.account_sid or not self.auth_token:
                 raise ValueError("Twilio credentials not configured. Please set TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN environment variables.")
             self.client = Client(self.account_sid, self.auth_token)
+            if self.api_base_url:
+                self.client.api.base_url = self.api_base_url
         return self.client
+    
+    def _create_async_client(self, http_client: AsyncTwilioHttpClient) -> Client:
+        """Twilio client on an aiohttp session (one per batch, bound to the running loop)."""
+        if not self.account_sid or not self.auth_token:
+            raise ValueError("Twilio credentials not configured. Please set TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN environment variables.")
+        client = Client(self.account_sid, self.auth_token, http_client=http_client)
+        if self.api_base_url:
+            client.api.base_url = self.api_base_url
+        return client
         
     async def send_sms(
         self, 
@@ -156,11 +217,105 @@ class TwilioService:
             "idempotency_key": idempotency_key
         }
     
+    async def _send_sms_internal_async(
+        self,
+        client: Client,
+        to: str,
+        body: str,
+        from_number: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict:
+        """Async counterpart of _send_sms_internal (called by circuit breaker)"""
+        to_number = self._normalize_phone_number(to)
+        
+        message = await client.messages.create_async(
+            to=to_number,
+            from_=from_number or self.from_number,
+            body=body
+        )
+        
+        return {
+            "status": "success",
+            "message_sid": message.sid,
+            "to": to_number,
+            "idempotency_key": idempotency_key
+        }
+    
     def _should_retry(self, exception: TwilioRestException) -> bool:
         """Determine if we should retry based on the exception"""
-        # Retry on temporary errors
-        retryable_codes = [429, 500, 502, 503, 504]  # Rate limit, server errors
-        return exception.code in retryable_codes
+        # Retry on temporary errors: rate limit (HTTP 429 / Twilio 20429) and server errors
+        return (
+            exception.status in RETRYABLE_STATUSES
+            or exception.code in RETRYABLE_STATUSES
+            or exception.code == TOO_MANY_REQUESTS_CODE
+        )
+    
+    async def _wait_for_send_slot(self, from_number: str) -> None:
+        """Pace a send against the sender number's and the account's MPS."""
+        bucket = self._number_buckets.get(from_number)
+        if bucket is None:
+            bucket = self._number_buckets[from_number] = AsyncTokenBucket(self.number_mps)
+        delay = max(bucket.reserve(), self._account_bucket.reserve())
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def _send_paced(
+        self,
+        client: Client,
+        to: str,
+        body: str,
+        from_number: str,
+        tenant_id: Optional[str],
+        max_retries: int,
+        retry_delay: float
+    ) -> Dict:
+        """One batch send: rate limited, retried with full jitter on 429/5xx."""
+        idempotency_key = self._generate_idempotency_key(to, body, tenant_id)
+        
+        for attempt in range(max_retries + 1):
+            await self._wait_for_send_slot(from_number)
+            try:
+                result = await self.circuit_breaker.call(
+                    self._send_sms_internal_async,
+                    client,
+                    to=to,
+                    body=body,
+                    from_number=from_number,
+                    idempotency_key=idempotency_key
+                )
+                result["attempts"] = attempt + 1
+                return result
+                
+            except TwilioRestException as e:
+                if attempt < max_retries and self._should_retry(e):
+                    delay = random.uniform(0, retry_delay * (2 ** attempt))
+                    logger.info(f"Twilio {e.status} sending SMS to {to}, retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.warning(f"Twilio error sending SMS to {to}, attempt {attempt + 1}: {str(e)}")
+                return {
+                    "status": "error",
+                    "error": str(e),
+                    "code": e.code,
+                    "to": to,
+                    "attempts": attempt + 1
+                }
+                
+            except Exception as e:
+                logger.error(f"Unexpected error sending SMS to {to}, attempt {attempt + 1}: {str(e)}")
+                return {
+                    "status": "error",
+                    "error": str(e),
+                    "to": to,
+                    "attempts": attempt + 1
+                }
+        
+        return {
+            "status": "error",
+            "error": "Max retries exceeded",
+            "to": to,
+            "attempts": max_retries + 1
+        }
     
     def _generate_idempotency_key(
         self, 
@@ -210,24 +365,91 @@ class TwilioService:
         Returns:
             dict: Status of the SMS delivery
         """
-        body = f"You have {unassigned_calls_count} unassigned call{'s' if unassigned_calls_count != 1 else ''} that need attention. Please log in to the dashboard to review."
-        return self.send_sms(to=manager_phone, body=body)
+        return self.send_sms(to=manager_phone, body=self.unassigned_calls_message(unassigned_calls_count))
     
-    def batch_send(self, recipients: List[str], body: str) -> List[Dict]:
+    @staticmethod
+    def unassigned_calls_message(unassigned_calls_count: int) -> str:
+        """Body of the unassigned-calls alert sent to sales managers."""
+        return f"You have {unassigned_calls_count} unassigned call{'s' if unassigned_calls_count != 1 else ''} that need attention. Please log in to the dashboard to review."
+    
+    async def stream_batch(
+        self,
+        recipients: List[str],
+        body: str,
+        from_number: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ) -> AsyncIterator[Dict]:
         """
-        Send the same message to multiple recipients.
+        Send the same message to multiple recipients, yielding each result as it completes.
+        
+        Results are send_sms-style dicts plus "index" (position in
+        `recipients`), so callers can persist MessageThread rows while the
+        rest of the batch is still in flight:
+        
+            async for result in twilio_service.stream_batch(phones, body, tenant_id=tenant_id):
+                if result["status"] == "success":
+                    db.add(MessageThread(..., message_sid=result["message_sid"]))
+        
+        Args:
+            recipients: List of phone numbers
+            body: Message content
+            from_number: Optional override for the from number
+            tenant_id: Tenant ID for isolation
+            concurrency: Max sends in flight (defaults to TWILIO_BATCH_CONCURRENCY)
+            max_retries: Retries per recipient on 429/5xx
+            retry_delay: Base delay for jittered exponential backoff
+        """
+        if not recipients:
+            return
+        sender = from_number or self.from_number
+        semaphore = asyncio.Semaphore(concurrency or self.batch_concurrency)
+        
+        async with AsyncTwilioHttpClient() as http_client:
+            client = self._create_async_client(http_client)
+            
+            async def send(index: int, to: str) -> Dict:
+                async with semaphore:
+                    result = await self._send_paced(client, to, body, sender, tenant_id, max_retries, retry_delay)
+                result["index"] = index
+                return result
+            
+            tasks = [asyncio.ensure_future(send(index, to)) for index, to in enumerate(recipients)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    async def batch_send(
+        self,
+        recipients: List[str],
+        body: str,
+        from_number: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Send the same message to multiple recipients concurrently.
         
         Args:
             recipients: List of phone numbers
             body: Message content
+            from_number: Optional override for the from number
+            tenant_id: Tenant ID for isolation
+            concurrency: Max sends in flight (defaults to TWILIO_BATCH_CONCURRENCY)
             
         Returns:
-            list: List of response dicts for each message
+            list: List of response dicts for each message, in recipient order
         """
-        results = []
-        for recipient in recipients:
-            result = self.send_sms(to=recipient, body=body)
-            results.append(result)
+        results = [None] * len(recipients)
+        async for result in self.stream_batch(
+            recipients, body, from_number=from_number, tenant_id=tenant_id, concurrency=concurrency
+        ):
+            results[result["index"]] = result
         return results
     
     def _normalize_phone_number(self, phone_number: str) -> str:
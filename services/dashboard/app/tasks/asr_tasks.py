@@ -1,8 +1,14 @@
 """
 ASR (Automatic Speech Recognition) background tasks
 """
+import asyncio
+from datetime import datetime
+
 from celery import current_task
 from app.celery_app import celery_app
+from app.database import SessionLocal
+from app.models.call import Call
+from app.services.transcript_analysis import TranscriptAnalyzer
 from app.services.uwc_client import UWCClient
 from app.core.pii_masking import PIISafeLogger
 import logging
@@ -65,3 +71,93 @@ def transcribe_with_retry(self, audio_url: str, call_id: str, tenant_id: str):
     except Exception as e:
         logger.error(f"Transcription retry failed for call {call_id}: {str(e)}")
         raise self.retry(countdown=60 * (2 ** self.request.retries))
+
+
+def extract_transcript_text(response: dict) -> str:
+    """Speaker-formatted transcript text from a UWC ASR response, falling back to the plain transcript."""
+    if 'results' in response and 'channels' in response['results']:
+        alternatives = response['results']['channels'][0]['alternatives']
+        if alternatives and 'paragraphs' in alternatives[0]:
+            return alternatives[0]['paragraphs']['transcript']
+        return alternatives[0].get('transcript', '')
+    return "Could not extract transcript text"
+
+
+@celery_app.task(bind=True, max_retries=2)
+def process_recording_audio(self, recording_id: str, audio_url: str):
+    """
+    Transcribe a mobile recording and attach the transcript to its call.
+
+    Replaces the /audio/upload BackgroundTask: the task opens its own
+    database session and reads/writes the recording's state through
+    mobile_recording_store, so any worker can pick it up and any API
+    process can serve /audio/status.
+
+    Args:
+        recording_id: ID returned by /audio/start-recording
+        audio_url: Uploaded audio file URL
+
+    Returns:
+        Dict with the final recording status
+    """
+    from app.services.mobile_recording_store import get_session, update_session
+
+    session_state = get_session(recording_id)
+    if session_state is None:
+        logger.warning(f"Recording session {recording_id} not found; skipping transcription")
+        return {"recording_id": recording_id, "status": "expired"}
+
+    company_id = session_state.get("company_id") or "default"
+    call_id = session_state.get("call_id")
+
+    try:
+        response = asyncio.run(UWCClient().transcribe_audio(
+            company_id=company_id,
+            request_id=f"mobile-{recording_id}",
+            audio_url=audio_url,
+            language="en-US",
+            model="nova-2"
+        ))
+        if not response or "results" not in response:
+            raise RuntimeError("UWC ASR returned invalid response format")
+    except Exception as e:
+        logger.error(f"UWC ASR failed for recording {recording_id}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=30 * (2 ** self.request.retries))
+        update_session(recording_id, status="error", error=f"Transcription failed: {str(e)}")
+        return {"recording_id": recording_id, "status": "error"}
+
+    transcript_text = extract_transcript_text(response)
+    fields = {"transcript": response, "formatted_transcript": transcript_text, "status": "completed"}
+    logger.info(f"UWC ASR transcription successful for recording {recording_id}")
+
+    if call_id:
+        db = SessionLocal()
+        try:
+            call = db.query(Call).filter(Call.call_id == call_id).first()
+            if call:
+                call.in_person_transcript = transcript_text
+                call.updated_at = datetime.utcnow()
+                db.commit()
+                logger.info(f"Database updated successfully for call ID {call_id}")
+
+                try:
+                    analysis_result = TranscriptAnalyzer(process_name="v0").analyze_and_store(call_id, db)
+                    if "error" in analysis_result:
+                        logger.error(f"Error analyzing transcript: {analysis_result['error']}")
+                except Exception as e:
+                    logger.error(f"Error in automatic transcript analysis: {e}", exc_info=True)
+            else:
+                logger.warning(f"Call with ID {call_id} not found in database")
+                fields["error"] = f"Call with ID {call_id} not found"
+        except Exception as db_error:
+            db.rollback()
+            logger.error(f"Database error for call ID {call_id}: {db_error}", exc_info=True)
+            fields["db_error"] = str(db_error)
+        finally:
+            db.close()
+    else:
+        logger.warning(f"No call_id provided for recording {recording_id}")
+
+    update_session(recording_id, **fields)
+    return {"recording_id": recording_id, "status": "completed"}
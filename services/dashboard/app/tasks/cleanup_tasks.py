@@ -4,6 +4,8 @@ Cleanup and maintenance background tasks
 from celery import current_task
 from app.celery_app import celery_app
 from app.core.pii_masking import PIISafeLogger
+from app.core.idempotency import cleanup_expired_idempotency_records
+from app.services.retention import get_retention_policy, purge_expired_rows
 import logging
 from datetime import datetime, timedelta
 
@@ -51,18 +53,33 @@ def cleanup_expired_sessions():
 @celery_app.task
 def cleanup_old_logs():
     """
-    Cleanup old log files and entries
+    Cleanup old log entries past their retention window (RAG query telemetry)
     """
     try:
         logger.info("Cleaning up old logs")
         
-        # Implementation for log cleanup
-        # This would clean up old log files, rotate logs, etc.
+        result = purge_expired_rows(get_retention_policy("rag_telemetry"))
         
         logger.info("Old logs cleanup completed")
-        return {"success": True, "cleaned_count": 0}
+        return {"success": True, "cleaned_count": result.rows_purged, **result.to_dict()}
         
     except Exception as e:
         logger.error(f"Log cleanup failed: {str(e)}")
         return {"success": False, "error": str(e)}
 
+@celery_app.task
+def cleanup_idempotency_records():
+    """
+    Cleanup expired request idempotency records (IdempotencyMiddleware audit trail)
+    """
+    try:
+        logger.info("Cleaning up expired idempotency records")
+        
+        cleaned_count = cleanup_expired_idempotency_records()
+        
+        logger.info("Expired idempotency records cleanup completed")
+        return {"success": True, "cleaned_count": cleaned_count}
+        
+    except Exception as e:
+        logger.error(f"Idempotency record cleanup failed: {str(e)}")
+        return {"success": False, "error": str(e)}
@@ -0,0 +1,92 @@
+"""
+Geocoding background tasks for bulk call geofence creation.
+"""
+import asyncio
+from typing import Optional
+
+from app.celery_app import celery_app
+from app.core.pii_masking import PIISafeLogger
+from app.database import SessionLocal
+from app.models.call import Call
+from app.services.geocoding_service import geocoding_service
+from app.services.geofence_service import GeofenceService
+
+logger = PIISafeLogger(__name__)
+
+# Calls geocoded (and committed) per progress step
+BULK_GEOCODE_CHUNK_SIZE = 25
+
+
+@celery_app.task(bind=True, max_retries=2)
+def bulk_geocode_calls(self, company_id: Optional[str] = None, limit: int = 100):
+    """
+    Geocode booked calls that have an address but no geofence yet.
+
+    Calls are processed in chunks: each chunk's unique addresses go through
+    GeocodingService.geocode_batch (cache first, then rate-limited providers),
+    geofence rows are upserted for the geocoded calls, and the chunk is
+    committed before progress is reported via the task state.
+
+    Args:
+        company_id: Optional tenant filter
+        limit: Max number of calls to geocode
+
+    Returns:
+        Dict with totals for geocoded and failed calls
+    """
+    db = SessionLocal()
+    geofence_service = GeofenceService(db)
+    try:
+        query = db.query(Call).filter(
+            Call.address.isnot(None),
+            Call.geofence.is_(None),
+            Call.booked.is_(True),
+            Call.cancelled.is_(False)
+        )
+        if company_id:
+            query = query.filter(Call.company_id == company_id)
+
+        calls = query.limit(limit).all()
+        total = len(calls)
+        geocoded = 0
+        failed = 0
+
+        logger.info(f"Starting bulk geocode of {total} calls (company: {company_id})")
+        self.update_state(state="PROGRESS", meta={"total": total, "processed": 0, "geocoded": 0, "failed": 0})
+
+        for start in range(0, total, BULK_GEOCODE_CHUNK_SIZE):
+            chunk = calls[start:start + BULK_GEOCODE_CHUNK_SIZE]
+            coordinates = asyncio.run(
+                geocoding_service.geocode_batch([call.address for call in chunk], company_id=company_id)
+            )
+
+            located = []
+            for call in chunk:
+                coords = coordinates.get(call.address)
+                if coords:
+                    located.append((call, coords[0], coords[1]))
+            geocoded += len(located)
+            failed += len(chunk) - len(located)
+
+            geofence_service.upsert_call_geofences(located)
+            db.commit()
+            self.update_state(
+                state="PROGRESS",
+                meta={"total": total, "processed": start + len(chunk), "geocoded": geocoded, "failed": failed}
+            )
+
+        logger.info(f"Bulk geocode complete: {geocoded} geocoded, {failed} failed (company: {company_id})")
+        return {
+            "success": True,
+            "total": total,
+            "processed": total,
+            "geocoded": geocoded,
+            "failed": failed,
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Unexpected error in bulk geocoding (company: {company_id}): {str(e)}")
+        raise self.retry(countdown=60 * (2 ** self.request.retries), exc=e)
+    finally:
+        db.close()
@@ -14,6 +14,7 @@ from app.core.pii_masking import PIISafeLogger
 from app.database import SessionLocal
 from app.models.contact_card import ContactCard
 from app.realtime.bus import emit
+from app.services.llm_cache import llm_cache
 
 logger = PIISafeLogger(__name__)
 
@@ -131,24 +132,28 @@ If the property is on the market say so and indicate that it is. if not say noth
 
 Address: {address}"""
 
-            # Execute with automatic key rotation and retry
-            def make_request(client):
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a property research assistant that extracts structured data from public sources. Always return results in the exact format specified.",
-                        },
-                        {"role": "user", "content": prompt.format(address=contact.address)},
-                    ],
-                    temperature=0.1,
-                )
-                return response
-            
-            response = manager.execute_with_retry(make_request, max_retries=len(manager.keys) + 1)
+            request = {
+                "model": "gpt-4o",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a property research assistant that extracts structured data from public sources. Always return results in the exact format specified.",
+                    },
+                    {"role": "user", "content": prompt.format(address=contact.address)},
+                ],
+                "temperature": 0.1,
+            }
             
-            raw_response = response.choices[0].message.content
+            # Execute with automatic key rotation and retry; Celery retries and
+            # repeat addresses are served from the LLM cache
+            raw_response = llm_cache.complete(
+                "property_intelligence",
+                request,
+                lambda r: manager.execute_with_retry(
+                    lambda client: client.chat.completions.create(**r), max_retries=len(manager.keys) + 1
+                ),
+                tenant_id=contact.company_id,
+            )
             logger.info(f"Received OpenAI response for contact {contact_card_id}")
             
         except Exception as e:
@@ -158,7 +163,11 @@ Address: {address}"""
         
         # Parse response
         try:
-            parsed_data = _parse_property_response(raw_response)
+            try:
+                parsed_data = _parse_property_response(raw_response)
+            except Exception:
+                llm_cache.invalidate("property_intelligence", request)
+                raise
             sources = parsed_data.get("sources", [])
             google_earth_url = parsed_data.get("google_earth_url")
             
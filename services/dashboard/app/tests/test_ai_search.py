@@ -20,6 +20,7 @@ from app.models.sales_rep import SalesRep
 from app.models.contact_card import ContactCard
 from app.models.enums import CallOutcomeCategory
 from app.config import settings
+from app.services.objection_index import index_call_analysis
 import json
 
 client = TestClient(app)
@@ -84,6 +85,9 @@ def create_test_call(
             analyzed_at=datetime.utcnow(),
         )
         db.add(analysis)
+        db.flush()
+        # ai_search filters objections through the call_objections index
+        index_call_analysis(db, analysis, call)
     
     db.commit()
     db.refresh(call)
@@ -574,6 +578,7 @@ from app.models.company import Company
 from app.models.sales_rep import SalesRep
 from app.models.contact_card import ContactCard
 from app.config import settings
+from app.services.objection_index import index_call_analysis
 import json
 
 client = TestClient(app)
@@ -638,6 +643,9 @@ def create_test_call(
             analyzed_at=datetime.utcnow(),
         )
         db.add(analysis)
+        db.flush()
+        # ai_search filters objections through the call_objections index
+        index_call_analysis(db, analysis, call)
     
     db.commit()
     db.refresh(call)
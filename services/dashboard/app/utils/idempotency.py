@@ -1,6 +1,103 @@
+"""
+Idempotency helpers for Shunya result processing.
 
+Natural keys let the same Shunya output be processed more than once (webhook
+and poller racing, retries) without creating duplicate Tasks or KeySignals:
 
+- Task.unique_key: hash of (source, description, contact_card_id)
+- KeySignal.unique_key: hash of (signal_type, title, contact_card_id)
+- ShunyaJob.processed_output_hash: hash of the normalized output payload
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 
 
+def _hash_parts(*parts: Any) -> str:
+    """SHA256 of the parts joined with '|' (enums by value, None as '')."""
+    normalized = []
+    for part in parts:
+        if part is None:
+            normalized.append("")
+        else:
+            normalized.append(str(getattr(part, "value", part)).strip().lower())
+    return hashlib.sha256("|".join(normalized).encode("utf-8")).hexdigest()
 
+
+def generate_task_unique_key(source: Any, description: str, contact_card_id: Optional[str]) -> str:
+    """Unique key for a Task created from (source, description, contact card)."""
+    return _hash_parts(source, description, contact_card_id)
+
+
+def generate_signal_unique_key(signal_type: Any, title: str, contact_card_id: Optional[str]) -> str:
+    """Unique key for a KeySignal created from (signal type, title, contact card)."""
+    return _hash_parts(signal_type, title, contact_card_id)
+
+
+def generate_output_payload_hash(output_payload: Dict[str, Any]) -> str:
+    """SHA256 of a normalized Shunya output, stable across key order."""
+    canonical = json.dumps(output_payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def task_exists_by_unique_key(db: Session, company_id: str, unique_key: str) -> bool:
+    """Check whether a Task with this unique key exists for the company."""
+    from app.models.task import Task
+
+    return db.query(Task.id).filter(
+        Task.company_id == company_id,
+        Task.unique_key == unique_key,
+    ).first() is not None
+
+
+def signal_exists_by_unique_key(db: Session, company_id: str, unique_key: str) -> bool:
+    """Check whether a KeySignal with this unique key exists for the company."""
+    from app.models.key_signal import KeySignal
+
+    return db.query(KeySignal.id).filter(
+        KeySignal.company_id == company_id,
+        KeySignal.unique_key == unique_key,
+    ).first() is not None
+
+
+def insert_missing_by_unique_key(
+    db: Session,
+    model: Any,
+    company_id: str,
+    rows: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Insert the rows whose unique_key the company doesn't have yet.
+
+    Replaces a per-row exists check + db.add with one ``unique_key IN (...)``
+    lookup and one multi-row INSERT, however many rows an analysis produced.
+    Rows repeating a key within the batch are inserted once.
+
+    Args:
+        db: Database session (the insert joins its transaction)
+        model: Mapped class with company_id and unique_key columns (Task, KeySignal)
+        company_id: Tenant the rows belong to
+        rows: Column dicts, each with "unique_key" (and "id" if callers need it)
+
+    Returns:
+        The rows actually inserted, in input order
+    """
+    candidates: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        candidates.setdefault(row["unique_key"], row)
+    if not candidates:
+        return []
+
+    existing = {
+        key for (key,) in db.query(model.unique_key).filter(
+            model.company_id == company_id,
+            model.unique_key.in_(list(candidates)),
+        )
+    }
+    new_rows = [row for key, row in candidates.items() if key not in existing]
+    if new_rows:
+        db.execute(insert(model), new_rows)
+    return new_rows
@@ -1,6 +1,35 @@
+"""
+Helpers for reading identifiers out of Shunya responses and job payloads.
 
+Shunya endpoints are not consistent about what they call the async job ID
+(``job_id``, ``task_id`` or ``transcript_id``, sometimes nested under
+``data``), so callers go through these instead of guessing.
+"""
+from typing import Any, Dict, Optional
 
+JOB_ID_KEYS = ("job_id", "task_id", "transcript_id", "id")
 
 
+def extract_shunya_job_id(response: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Return Shunya's job/task ID from an async-start response, if present."""
+    if not isinstance(response, dict):
+        return None
+    for container in (response, response.get("data")):
+        if not isinstance(container, dict):
+            continue
+        for key in JOB_ID_KEYS:
+            value = container.get(key)
+            if value not in (None, ""):
+                return str(value)
+    return None
 
 
+def extract_call_id_from_payload(payload: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Return the integer call_id from a ShunyaJob input payload, if present."""
+    if not isinstance(payload, dict):
+        return None
+    call_id = payload.get("call_id")
+    try:
+        return int(call_id) if call_id not in (None, "", 0) else None
+    except (TypeError, ValueError):
+        return None
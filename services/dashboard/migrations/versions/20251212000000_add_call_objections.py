@@ -0,0 +1,136 @@
+"""Add call_objections index table
+
+Revision ID: 20251212000000
+Revises: 20251211000000
+Create Date: 2025-12-12 00:00:00.000000
+
+Rows are backfilled here from existing call_analysis/recording_analyses
+objections JSON, so objection filters cover historical calls as soon as the
+queries switch to the index. scripts/backfill_call_objections.py rebuilds the
+index later if it ever drifts.
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251212000000'
+down_revision = '20251211000000'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def _objection_pairs(objections):
+    """(key, label) pairs from an objections JSON value; frozen copy of objection_index.extract_objections."""
+    if isinstance(objections, str):
+        # Some writers stored json.dumps(list) in the JSON column
+        try:
+            objections = json.loads(objections)
+        except ValueError:
+            return []
+    if not objections or not isinstance(objections, list):
+        return []
+    pairs = []
+    for objection in objections:
+        if isinstance(objection, str):
+            pairs.append((objection, objection.replace("_", " ").title()))
+        elif isinstance(objection, dict):
+            key = objection.get("type", "unknown")
+            pairs.append((key, objection.get("label") or key.replace("_", " ").title()))
+    return pairs
+
+
+def _backfill(call_objections):
+    bind = op.get_bind()
+    sources = (
+        (
+            "call_analysis_id",
+            """
+            SELECT ca.id, ca.tenant_id, ca.objections, ca.call_id, c.owner_id,
+                   COALESCE(c.created_at, ca.created_at) AS occurred_at
+            FROM call_analysis ca LEFT JOIN calls c ON c.call_id = ca.call_id
+            WHERE ca.objections IS NOT NULL AND ca.id > :last_id
+            ORDER BY ca.id LIMIT :limit
+            """,
+            lambda row: {"call_id": row.call_id},
+        ),
+        (
+            "recording_analysis_id",
+            """
+            SELECT ra.id, ra.company_id AS tenant_id, ra.objections, ra.recording_session_id,
+                   a.assigned_rep_id AS owner_id,
+                   COALESCE(a.scheduled_start, ra.analyzed_at) AS occurred_at
+            FROM recording_analyses ra LEFT JOIN appointments a ON a.id = ra.appointment_id
+            WHERE ra.objections IS NOT NULL AND ra.id > :last_id
+            ORDER BY ra.id LIMIT :limit
+            """,
+            lambda row: {"recording_session_id": row.recording_session_id},
+        ),
+    )
+    for fk_column, query, parent_columns in sources:
+        last_id = ""
+        while True:
+            batch = bind.execute(sa.text(query), {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).fetchall()
+            if not batch:
+                break
+            rows = [
+                {
+                    "tenant_id": row.tenant_id,
+                    fk_column: row.id,
+                    "owner_id": row.owner_id,
+                    "objection_key": key,
+                    "label": label,
+                    "occurred_at": row.occurred_at or datetime.utcnow(),
+                    **parent_columns(row),
+                }
+                for row in batch
+                for key, label in _objection_pairs(row.objections)
+            ]
+            if rows:
+                op.bulk_insert(call_objections, rows)
+            last_id = batch[-1].id
+
+
+def upgrade():
+    call_objections = op.create_table(
+        'call_objections',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.String(), nullable=False),
+        sa.Column('call_analysis_id', sa.String(), nullable=True),
+        sa.Column('recording_analysis_id', sa.String(), nullable=True),
+        sa.Column('call_id', sa.Integer(), nullable=True),
+        sa.Column('recording_session_id', sa.String(), nullable=True),
+        sa.Column('owner_id', sa.String(), nullable=True),
+        sa.Column('objection_key', sa.String(), nullable=False),
+        sa.Column('label', sa.String(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['call_analysis_id'], ['call_analysis.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recording_analysis_id'], ['recording_analyses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['call_id'], ['calls.call_id']),
+        sa.ForeignKeyConstraint(['recording_session_id'], ['recording_sessions.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_call_objections_call_analysis_id'), 'call_objections', ['call_analysis_id'], unique=False)
+    op.create_index(op.f('ix_call_objections_recording_analysis_id'), 'call_objections', ['recording_analysis_id'], unique=False)
+    op.create_index(op.f('ix_call_objections_call_id'), 'call_objections', ['call_id'], unique=False)
+    op.create_index('ix_call_objections_tenant_owner_occurred', 'call_objections', ['tenant_id', 'owner_id', 'occurred_at'], unique=False)
+    op.create_index('ix_call_objections_tenant_key_occurred', 'call_objections', ['tenant_id', 'objection_key', 'occurred_at'], unique=False)
+
+    _backfill(call_objections)
+
+
+def downgrade():
+    op.drop_index('ix_call_objections_tenant_key_occurred', table_name='call_objections')
+    op.drop_index('ix_call_objections_tenant_owner_occurred', table_name='call_objections')
+    op.drop_index(op.f('ix_call_objections_call_id'), table_name='call_objections')
+    op.drop_index(op.f('ix_call_objections_recording_analysis_id'), table_name='call_objections')
+    op.drop_index(op.f('ix_call_objections_call_analysis_id'), table_name='call_objections')
+    op.drop_table('call_objections')
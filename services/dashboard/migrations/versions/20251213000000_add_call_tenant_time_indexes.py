@@ -0,0 +1,97 @@
+"""Add composite and partial indexes for tenant time-range call queries
+
+Revision ID: 20251213000000
+Revises: 20251212000000
+Create Date: 2025-12-13 00:00:00.000000
+
+Matches the query shapes in MetricsService (CSR/sales rollups),
+LiveMetricsService (today/week/month KPIs) and the dashboard counters:
+
+    WHERE company_id = ? AND call_type = ? AND created_at >= ? AND created_at <= ?
+    WHERE company_id = ? AND owner_id = ? AND call_type = ? AND created_at ...
+    WHERE company_id = ? AND created_at >= ? AND bought = true   -> SUM(price_if_bought)
+    WHERE company_id = ? AND status IN ('in_progress', 'ringing')
+
+On PostgreSQL the indexes are built CONCURRENTLY so calls keeps taking
+writes during the upgrade.
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '20251213000000'
+down_revision = '20251212000000'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE_STATUS_PREDICATE = "status IN ('in_progress', 'ringing')"
+
+INDEXES = [
+    # MetricsService CSR/sales rollups (call_type stored by enum name)
+    ('ix_calls_company_call_type_created_at', ['company_id', 'call_type', 'created_at'], {}),
+    # Same, scoped to one CSR/rep (owner_id)
+    ('ix_calls_company_owner_call_type_created_at', ['company_id', 'owner_id', 'call_type', 'created_at'], {}),
+    # Revenue KPIs: only bought calls, price carried in the index for index-only scans
+    (
+        'ix_calls_company_created_at_bought',
+        ['company_id', 'created_at'],
+        {'postgresql_where': text('bought = true'), 'postgresql_include': ['price_if_bought']},
+    ),
+    # Active calls counter: a handful of rows per tenant at any time
+    (
+        'ix_calls_company_id_active',
+        ['company_id'],
+        {'postgresql_where': text(ACTIVE_STATUS_PREDICATE)},
+    ),
+]
+
+
+def index_exists(bind, index_name: str) -> bool:
+    """Check if an index exists in PostgreSQL."""
+    dialect = bind.dialect.name
+    if dialect == 'sqlite':
+        return False
+    result = bind.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :index_name)"
+        ),
+        {"index_name": index_name}
+    )
+    return result.scalar()
+
+
+def upgrade():
+    """Add tenant + time-range indexes on calls."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns, kwargs in INDEXES:
+                if not index_exists(bind, name):
+                    op.create_index(name, 'calls', columns, unique=False, postgresql_concurrently=True, **kwargs)
+    else:
+        # SQLite or other - partial/covering options are PostgreSQL-only
+        for name, columns, _ in INDEXES:
+            try:
+                op.create_index(name, 'calls', columns, unique=False)
+            except Exception:
+                pass
+
+
+def downgrade():
+    """Remove tenant + time-range indexes on calls."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _, _ in reversed(INDEXES):
+                op.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        for name, _, _ in reversed(INDEXES):
+            try:
+                op.drop_index(name, table_name='calls')
+            except Exception:
+                pass
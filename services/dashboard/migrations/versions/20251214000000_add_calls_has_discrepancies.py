@@ -0,0 +1,62 @@
+"""Add calls.has_discrepancies
+
+Revision ID: 20251214000000
+Revises: 20251213000000
+Create Date: 2025-12-14 00:00:00.000000
+
+Persists transcript_discrepancies["has_discrepancies"] so the dashboard can
+count it in SQL instead of loading and json.loads-ing every analysed call.
+Existing rows are backfilled in Python because transcript_discrepancies is a
+plain String column that may hold invalid JSON.
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = '20251214000000'
+down_revision = '20251213000000'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _has_discrepancies(raw) -> bool:
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return False
+    return isinstance(data, dict) and data.get("has_discrepancies") is True
+
+
+def upgrade():
+    op.add_column('calls', sa.Column('has_discrepancies', sa.Boolean(), nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            text(
+                "SELECT call_id, transcript_discrepancies FROM calls "
+                "WHERE call_id > :last_id AND transcript_discrepancies IS NOT NULL "
+                "ORDER BY call_id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        flagged = [{"call_id": row[0]} for row in rows if _has_discrepancies(row[1])]
+        if flagged:
+            bind.execute(
+                text("UPDATE calls SET has_discrepancies = true WHERE call_id = :call_id"),
+                flagged,
+            )
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    op.drop_column('calls', 'has_discrepancies')
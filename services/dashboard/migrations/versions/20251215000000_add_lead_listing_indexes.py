@@ -0,0 +1,97 @@
+"""Add keyset pagination and trigram search indexes for leads/appointments
+
+Revision ID: 20251215000000
+Revises: 20251214000000
+Create Date: 2025-12-15 00:00:00.000000
+
+- (company_id, created_at, id) on leads and (company_id, scheduled_start, id)
+  on appointments back the cursor pagination in GET /api/v1/leads and
+  GET /api/v1/appointments.
+- pg_trgm GIN indexes on contact_cards name and phone columns serve the
+  lead search ILIKE/LIKE '%term%' predicates (PostgreSQL only).
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '20251215000000'
+down_revision = '20251214000000'
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = [
+    ('ix_leads_company_created_at_id', 'leads', ['company_id', 'created_at', 'id']),
+    ('ix_appointments_company_scheduled_start_id', 'appointments', ['company_id', 'scheduled_start', 'id']),
+]
+
+TRIGRAM_INDEXES = [
+    ('ix_contact_cards_first_name_trgm', 'first_name'),
+    ('ix_contact_cards_last_name_trgm', 'last_name'),
+    ('ix_contact_cards_primary_phone_trgm', 'primary_phone'),
+    ('ix_contact_cards_secondary_phone_trgm', 'secondary_phone'),
+]
+
+
+def index_exists(bind, index_name: str) -> bool:
+    """Check if an index exists in PostgreSQL."""
+    dialect = bind.dialect.name
+    if dialect == 'sqlite':
+        return False
+    result = bind.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :index_name)"
+        ),
+        {"index_name": index_name}
+    )
+    return result.scalar()
+
+
+def upgrade():
+    """Add keyset and trigram search indexes."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'postgresql':
+        op.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        with op.get_context().autocommit_block():
+            for name, table, columns in KEYSET_INDEXES:
+                if not index_exists(bind, name):
+                    op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+            for name, column in TRIGRAM_INDEXES:
+                if not index_exists(bind, name):
+                    op.create_index(
+                        name,
+                        'contact_cards',
+                        [column],
+                        unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops'},
+                        postgresql_concurrently=True,
+                    )
+    else:
+        # SQLite or other - no trigram support, keyset indexes only
+        for name, table, columns in KEYSET_INDEXES:
+            try:
+                op.create_index(name, table, columns, unique=False)
+            except Exception:
+                pass
+
+
+def downgrade():
+    """Remove keyset and trigram search indexes (pg_trgm is left installed)."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _ in reversed(TRIGRAM_INDEXES):
+                op.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            for name, _, _ in reversed(KEYSET_INDEXES):
+                op.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        for name, table, _ in reversed(KEYSET_INDEXES):
+            try:
+                op.drop_index(name, table_name=table)
+            except Exception:
+                pass
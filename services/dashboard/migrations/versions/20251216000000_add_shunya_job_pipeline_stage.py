@@ -0,0 +1,55 @@
+"""Add pipeline stage tracking to shunya_jobs
+
+Revision ID: 20251216000000
+Revises: 20251215000000
+Create Date: 2025-12-16 00:00:00.000000
+
+CSR call jobs now move through TRANSCRIBING -> ANALYZING -> PERSISTING ->
+COMPLETED, each step triggered by a Shunya webhook or poll:
+- shunya_jobs.pipeline_stage: current stage (NULL for single-step jobs)
+- shunya_jobs.stage_started_at: when the current stage was entered
+- shunya_jobs.stage_timings: seconds spent in each finished stage
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20251216000000'
+down_revision = '20251215000000'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    sa.Column('pipeline_stage', sa.String(length=12), nullable=True),
+    sa.Column('stage_started_at', sa.DateTime(), nullable=True),
+    sa.Column('stage_timings', sa.JSON(), nullable=True, comment='Seconds spent in each completed pipeline stage'),
+]
+
+
+def _existing_columns(table_name: str):
+    inspector = inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return None
+    return {col['name'] for col in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    """Add pipeline stage columns to shunya_jobs (if the table exists)."""
+    existing = _existing_columns('shunya_jobs')
+    if existing is None:
+        return
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column('shunya_jobs', column.copy())
+
+
+def downgrade():
+    """Remove pipeline stage columns from shunya_jobs."""
+    existing = _existing_columns('shunya_jobs')
+    if existing is None:
+        return
+    for column in reversed(COLUMNS):
+        if column.name in existing:
+            op.drop_column('shunya_jobs', column.name)
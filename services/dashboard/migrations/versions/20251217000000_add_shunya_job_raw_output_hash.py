@@ -0,0 +1,48 @@
+"""Add raw_output_hash to shunya_jobs
+
+Revision ID: 20251217000000
+Revises: 20251216000000
+Create Date: 2025-12-17 00:00:00.000000
+
+shunya_jobs.raw_output_hash: SHA256 of the raw Shunya response that
+output_payload was normalized from, so the same response delivered again
+(webhook and poller) reuses output_payload instead of normalizing it again.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20251217000000'
+down_revision = '20251216000000'
+branch_labels = None
+depends_on = None
+
+
+def _existing_columns(table_name: str):
+    inspector = inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return None
+    return {col['name'] for col in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    """Add raw_output_hash to shunya_jobs (if the table exists)."""
+    existing = _existing_columns('shunya_jobs')
+    if existing is None or 'raw_output_hash' in existing:
+        return
+    op.add_column(
+        'shunya_jobs',
+        sa.Column(
+            'raw_output_hash', sa.String(), nullable=True,
+            comment='SHA256 hash of the raw Shunya response output_payload was normalized from',
+        ),
+    )
+
+
+def downgrade():
+    """Remove raw_output_hash from shunya_jobs."""
+    existing = _existing_columns('shunya_jobs')
+    if existing is None or 'raw_output_hash' not in existing:
+        return
+    op.drop_column('shunya_jobs', 'raw_output_hash')
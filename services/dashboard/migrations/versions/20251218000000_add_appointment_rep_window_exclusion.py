@@ -0,0 +1,124 @@
+"""Enforce non-overlapping rep appointments with a tstzrange exclusion constraint
+
+Revision ID: 20251218000000
+Revises: 20251217000000
+Create Date: 2025-12-18 00:00:00.000000
+
+- appointments.double_booking_allowed: set when a CSR assigns with
+  allow_double_booking; such appointments are exempt from the constraint.
+- appointments.rep_window (PostgreSQL only): generated tstzrange
+  [scheduled_start, COALESCE(scheduled_end, scheduled_start + 1 hour)), with
+  the naive timestamps read as UTC.
+- ex_appointments_rep_window (PostgreSQL only): EXCLUDE USING gist
+  (assigned_rep_id WITH =, rep_window WITH &&) over scheduled/confirmed,
+  non-exempt appointments. Its GiST index also serves availability queries.
+
+Existing overlaps would block the constraint, so the later appointment of
+each overlapping pair is marked double_booking_allowed first.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect, text
+
+# revision identifiers, used by Alembic.
+revision = '20251218000000'
+down_revision = '20251217000000'
+branch_labels = None
+depends_on = None
+
+
+CONSTRAINT_NAME = 'ex_appointments_rep_window'
+
+BLOCKING_STATUSES = ('scheduled', 'confirmed')
+
+
+def _existing_columns(table_name: str):
+    inspector = inspect(op.get_bind())
+    if table_name not in inspector.get_table_names():
+        return None
+    return {col['name'] for col in inspector.get_columns(table_name)}
+
+
+def _blocking_predicate(bind) -> str:
+    """
+    IMMUTABLE "status IN (...)" for scheduled/confirmed appointments.
+
+    Migration 20251110120000 created status as the native enum
+    appointment_status (lowercase labels), while the model writes names
+    (native_enum=False), so a varchar column may hold either case. An
+    enum::text cast is only STABLE, which index predicates reject, so enum
+    columns are compared against enum literals.
+    """
+    data_type, udt_name = bind.execute(text(
+        "SELECT data_type, udt_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'appointments' AND column_name = 'status'"
+    )).one()
+    if data_type == 'USER-DEFINED':
+        labels = bind.execute(text(
+            "SELECT e.enumlabel FROM pg_enum e JOIN pg_type t ON t.oid = e.enumtypid "
+            "WHERE t.typname = :name ORDER BY e.enumsortorder"
+        ), {"name": udt_name}).scalars()
+        literals = [f"'{label}'::{udt_name}" for label in labels if label.lower() in BLOCKING_STATUSES]
+    else:
+        literals = [f"'{status}'" for status in BLOCKING_STATUSES + tuple(s.upper() for s in BLOCKING_STATUSES)]
+    return f"status IN ({', '.join(literals)})"
+
+
+def upgrade():
+    """Add double_booking_allowed, and on PostgreSQL rep_window + exclusion constraint."""
+    existing = _existing_columns('appointments')
+    if existing is None:
+        return
+    if 'double_booking_allowed' not in existing:
+        op.add_column(
+            'appointments',
+            sa.Column(
+                'double_booking_allowed', sa.Boolean(), nullable=False, server_default=sa.false(),
+                comment='Assigned with allow_double_booking; exempt from the rep overlap constraint',
+            ),
+        )
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or 'rep_window' in existing:
+        return
+
+    blocking = _blocking_predicate(bind)
+    op.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    op.execute(text("""
+        ALTER TABLE appointments ADD COLUMN rep_window tstzrange GENERATED ALWAYS AS (
+            tstzrange(
+                scheduled_start AT TIME ZONE 'UTC',
+                GREATEST(COALESCE(scheduled_end, scheduled_start + interval '1 hour'), scheduled_start) AT TIME ZONE 'UTC',
+                '[)'
+            )
+        ) STORED
+    """))
+    op.execute(text(f"""
+        UPDATE appointments later SET double_booking_allowed = true
+        WHERE later.assigned_rep_id IS NOT NULL AND later.{blocking}
+          AND EXISTS (
+            SELECT 1 FROM appointments earlier
+            WHERE earlier.assigned_rep_id = later.assigned_rep_id
+              AND earlier.{blocking}
+              AND NOT earlier.double_booking_allowed
+              AND (earlier.scheduled_start, earlier.id) < (later.scheduled_start, later.id)
+              AND earlier.rep_window && later.rep_window
+          )
+    """))
+    op.execute(text(f"""
+        ALTER TABLE appointments ADD CONSTRAINT {CONSTRAINT_NAME}
+        EXCLUDE USING gist (assigned_rep_id WITH =, rep_window WITH &&)
+        WHERE (assigned_rep_id IS NOT NULL AND NOT double_booking_allowed AND {blocking})
+    """))
+
+
+def downgrade():
+    """Drop the exclusion constraint, rep_window and double_booking_allowed (btree_gist is left installed)."""
+    existing = _existing_columns('appointments')
+    if existing is None:
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(text(f"ALTER TABLE appointments DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}"))
+        op.execute(text("ALTER TABLE appointments DROP COLUMN IF EXISTS rep_window"))
+    if 'double_booking_allowed' in existing:
+        op.drop_column('appointments', 'double_booking_allowed')
@@ -0,0 +1,139 @@
+"""Add geofences and geofence_events tables
+
+Revision ID: 20251219000000
+Revises: 20251218000000
+Create Date: 2025-12-19 00:00:00.000000
+
+- geofences: one circle per call (previously Call.geofence JSON and the
+  SalesRep.active_geofences list), with its bounding box in
+  min/max_lat/lng columns.
+- ix_geofences_rep_active_bbox: btree (rep_id, active, min_lat, max_lat)
+  for the portable bounding-box lookup.
+- ix_geofences_bbox_gist (PostgreSQL only): GiST index on
+  box(point(min_lng, min_lat), point(max_lng, max_lat)), used by the
+  ``&&`` clause GeofenceService adds on PostgreSQL.
+- geofence_events: entry/exit log for batched mobile ingestion.
+
+Existing Call.geofence values are copied into geofences on PostgreSQL.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect, text
+
+# revision identifiers, used by Alembic.
+revision = '20251219000000'
+down_revision = '20251218000000'
+branch_labels = None
+depends_on = None
+
+
+METERS_PER_DEGREE_LAT = 111320.0
+
+
+def _has_table(table_name: str) -> bool:
+    return table_name in inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_table('geofences'):
+        op.create_table(
+            'geofences',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('company_id', sa.String(), nullable=True),
+            sa.Column('call_id', sa.Integer(), nullable=False),
+            sa.Column('rep_id', sa.String(), nullable=True),
+            sa.Column('latitude', sa.Float(), nullable=False),
+            sa.Column('longitude', sa.Float(), nullable=False),
+            sa.Column('radius_m', sa.Float(), nullable=False),
+            sa.Column('address', sa.String(), nullable=True),
+            sa.Column('min_lat', sa.Float(), nullable=False),
+            sa.Column('max_lat', sa.Float(), nullable=False),
+            sa.Column('min_lng', sa.Float(), nullable=False),
+            sa.Column('max_lng', sa.Float(), nullable=False),
+            sa.Column('active', sa.Boolean(), nullable=False, server_default=sa.true()),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+            sa.ForeignKeyConstraint(['call_id'], ['calls.call_id']),
+            sa.ForeignKeyConstraint(['rep_id'], ['sales_reps.user_id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('call_id'),
+        )
+        op.create_index(op.f('ix_geofences_company_id'), 'geofences', ['company_id'], unique=False)
+        op.create_index(
+            'ix_geofences_rep_active_bbox', 'geofences', ['rep_id', 'active', 'min_lat', 'max_lat'], unique=False
+        )
+
+    if not _has_table('geofence_events'):
+        op.create_table(
+            'geofence_events',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('company_id', sa.String(), nullable=True),
+            sa.Column('rep_id', sa.String(), nullable=False),
+            sa.Column('geofence_id', sa.String(), nullable=True),
+            sa.Column('call_id', sa.Integer(), nullable=False),
+            sa.Column('event_type', sa.String(length=8), nullable=False),
+            sa.Column('occurred_at', sa.DateTime(), nullable=False),
+            sa.Column('source', sa.String(length=8), nullable=False, server_default='client'),
+            sa.Column('latitude', sa.Float(), nullable=True),
+            sa.Column('longitude', sa.Float(), nullable=True),
+            sa.Column('battery_percentage', sa.Float(), nullable=True),
+            sa.Column('is_charging', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+            sa.ForeignKeyConstraint(['rep_id'], ['sales_reps.user_id']),
+            sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id']),
+            sa.ForeignKeyConstraint(['call_id'], ['calls.call_id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_geofence_events_company_id'), 'geofence_events', ['company_id'], unique=False)
+        op.create_index(
+            'ix_geofence_events_rep_geofence_occurred', 'geofence_events',
+            ['rep_id', 'geofence_id', 'occurred_at'], unique=False,
+        )
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_geofences_bbox_gist ON geofences
+        USING gist (box(point(min_lng, min_lat), point(max_lng, max_lat)))
+    """))
+    op.execute(text(f"""
+        INSERT INTO geofences (
+            id, company_id, call_id, rep_id, latitude, longitude, radius_m, address,
+            min_lat, max_lat, min_lng, max_lng, active, created_at, updated_at
+        )
+        SELECT
+            md5(random()::text || clock_timestamp()::text || c.call_id::text)::uuid::text,
+            c.company_id, c.call_id, c.assigned_rep_id, g.lat, g.lng, g.radius, c.geofence->>'address',
+            g.lat - g.radius / {METERS_PER_DEGREE_LAT},
+            g.lat + g.radius / {METERS_PER_DEGREE_LAT},
+            g.lng - g.radius / ({METERS_PER_DEGREE_LAT} * cos(radians(g.lat))),
+            g.lng + g.radius / ({METERS_PER_DEGREE_LAT} * cos(radians(g.lat))),
+            COALESCE(c.booked, false) AND NOT COALESCE(c.cancelled, false),
+            now(), now()
+        FROM calls c
+        CROSS JOIN LATERAL (
+            SELECT
+                (c.geofence->>'latitude')::float AS lat,
+                (c.geofence->>'longitude')::float AS lng,
+                COALESCE((c.geofence->>'radius')::float, 250) AS radius
+        ) g
+        WHERE c.geofence IS NOT NULL
+          AND c.geofence->>'latitude' IS NOT NULL
+          AND c.geofence->>'longitude' IS NOT NULL
+        ON CONFLICT (call_id) DO NOTHING
+    """))
+
+
+def downgrade():
+    op.execute(text("DROP INDEX IF EXISTS ix_geofences_bbox_gist"))
+    if _has_table('geofence_events'):
+        op.drop_index('ix_geofence_events_rep_geofence_occurred', table_name='geofence_events')
+        op.drop_index(op.f('ix_geofence_events_company_id'), table_name='geofence_events')
+        op.drop_table('geofence_events')
+    if _has_table('geofences'):
+        op.drop_index('ix_geofences_rep_active_bbox', table_name='geofences')
+        op.drop_index(op.f('ix_geofences_company_id'), table_name='geofences')
+        op.drop_table('geofences')
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Backfill the call_objections index from existing call_analysis and
+recording_analyses objection JSON.
+
+Safe to re-run: each batch replaces the index rows of the analyses it covers.
+
+Usage:
+    python scripts/backfill_call_objections.py [--batch-size 500]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Import all models to ensure relationships are loaded
+from app.models import (  # noqa: F401
+    appointment, audit_log, call, call_analysis, call_objection, call_transcript, company,
+    contact_card, event_log, followup_draft, key_signal, lead, lead_status_history, onboarding,
+    personal_clone_job, rag_document, rag_query, recording_analysis, recording_session,
+    recording_transcript, rep_assignment_history, rep_shift, sales_manager, sales_rep,
+    scheduled_call, service, sop_compliance_result, task, transcript_analysis, user,
+)
+from app.services.objection_index import BACKFILL_BATCH_SIZE, backfill_objection_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the call_objections index")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+
+    totals = backfill_objection_index(batch_size=args.batch_size)
+    print(f"✓ Indexed {totals['call_rows']} objections from {totals['call_analyses']} call analyses")
+    print(f"✓ Indexed {totals['recording_rows']} objections from {totals['recording_analyses']} recording analyses")
+
+
+if __name__ == "__main__":
+    main()
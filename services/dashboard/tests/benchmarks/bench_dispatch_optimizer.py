@@ -0,0 +1,82 @@
+"""
+Batch dispatch optimizer benchmark.
+
+Builds a synthetic day (appointments scattered over a metro area at
+1-2 hour slots, reps with staggered shifts, home bases and a few existing
+bookings) and times app.services.dispatch_optimizer.optimize_dispatch,
+reporting the greedy and final drive time and how many appointments were
+placed.
+
+Usage:
+    python -m tests.benchmarks.bench_dispatch_optimizer
+    python -m tests.benchmarks.bench_dispatch_optimizer --appointments 400 --reps 80 --max-seconds 1
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.services.dispatch_optimizer import DispatchRep, DispatchStop, haversine_matrix, optimize_dispatch
+
+# Dallas-Fort Worth sized service area
+CENTER = (32.85, -96.95)
+SPREAD_DEGREES = 0.35
+DAY = datetime(2025, 6, 2, 12)  # 07:00 CDT in UTC
+
+
+def _point(rng: random.Random):
+    return CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES), CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+
+
+def synthetic_day(appointments: int, reps: int, seed: int):
+    rng = random.Random(seed)
+    stops = []
+    for i in range(appointments):
+        start = DAY + timedelta(minutes=30 * rng.randrange(2, 22))
+        lat, lng = _point(rng)
+        stops.append(DispatchStop(f"appt_{i}", start, start + timedelta(minutes=rng.choice([60, 90, 120])), lat, lng))
+
+    dispatch_reps = []
+    for i in range(reps):
+        shift_start = DAY + timedelta(hours=rng.choice([0, 1, 2]))
+        rep = DispatchRep(f"rep_{i}", shift_start, shift_start + timedelta(hours=rng.choice([8, 10])), origin=_point(rng))
+        if rng.random() < 0.3:
+            start = shift_start + timedelta(hours=rng.randrange(1, 6))
+            rep.booked.append(DispatchStop(f"booked_{i}", start, start + timedelta(hours=1), *_point(rng)))
+        dispatch_reps.append(rep)
+    return stops, dispatch_reps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--appointments", type=int, default=200)
+    parser.add_argument("--reps", type=int, default=50)
+    parser.add_argument("--max-seconds", type=float, default=0.5, help="Local search budget")
+    parser.add_argument("--speed-kmh", type=float, default=40.0)
+    parser.add_argument("--road-factor", type=float, default=1.3)
+    parser.add_argument("--runs", type=int, default=5, help="Different synthetic days")
+    args = parser.parse_args()
+
+    points = [_point(random.Random(0)) for _ in range(args.appointments + args.reps)]
+    start = time.perf_counter()
+    haversine_matrix(points, points)
+    print(f"distance matrix {len(points)}x{len(points)}: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    print(f"{'seed':>4}{'placed':>10}{'greedy min':>12}{'final min':>11}{'moves':>7}{'ms':>9}")
+    elapsed = []
+    for seed in range(args.runs):
+        stops, reps = synthetic_day(args.appointments, args.reps, seed)
+        plan = optimize_dispatch(
+            stops, reps, speed_kmh=args.speed_kmh, road_factor=args.road_factor, max_seconds=args.max_seconds,
+        )
+        elapsed.append(plan.elapsed_ms)
+        print(
+            f"{seed:>4}{len(plan.assignments):>6}/{len(stops):<3}{plan.greedy_drive_minutes:>12.0f}"
+            f"{plan.total_drive_minutes:>11.0f}{plan.moves:>7}{plan.elapsed_ms:>9.1f}"
+        )
+    print(f"median {statistics.median(elapsed):.1f}ms, max {max(elapsed):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
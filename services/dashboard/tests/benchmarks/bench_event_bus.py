@@ -0,0 +1,128 @@
+"""
+Event bus throughput benchmark.
+
+Compares per-event ``emit`` (one pipelined round trip per event) against
+``emit_many`` and ``BufferedEventEmitter`` (one round trip per batch) from a
+single worker.
+
+By default Redis is simulated in-process with a fixed per-round-trip latency
+so results are reproducible without a server; pass --redis-url to run against
+a real instance. With EVENT_STREAM_ENABLED each batch also appends to the
+tenant replay streams, which costs one extra round trip.
+
+Usage:
+    python -m tests.benchmarks.bench_event_bus
+    python -m tests.benchmarks.bench_event_bus --events 20000 --rtt-ms 0.5
+    python -m tests.benchmarks.bench_event_bus --redis-url redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import time
+
+from app.realtime.bus import BufferedEventEmitter, EventBus
+
+
+class SimulatedRedis:
+    """Pub/sub stand-in that sleeps ``rtt`` seconds per round trip."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def publish(self, channel, message):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+        return 0
+
+    def pipeline(self, transaction=True):
+        return _SimulatedPipeline(self)
+
+
+class _SimulatedPipeline:
+    def __init__(self, client: SimulatedRedis):
+        self.client = client
+        self.commands = 0
+
+    def publish(self, channel, message):
+        self.commands += 1
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.commands += 1
+
+    def execute(self, raise_on_error=True):
+        self.client.round_trips += 1
+        time.sleep(self.client.rtt)
+        return [f"{int(time.time() * 1000)}-{i}" for i in range(self.commands)]
+
+
+def _make_bus(args) -> EventBus:
+    if args.redis_url:
+        return EventBus(redis_url=args.redis_url)
+    bus = EventBus.__new__(EventBus)
+    bus.redis_url = None
+    bus._redis_client = SimulatedRedis(args.rtt_ms / 1000.0)
+    return bus
+
+
+def _event(i: int) -> dict:
+    return {
+        "event_name": "call.analysis.completed",
+        "payload": {"call_id": i, "objections": ["price"], "score": 0.8},
+        "tenant_id": "bench_tenant",
+        "user_id": "bench_user",
+        "lead_id": f"lead_{i % 50}",
+    }
+
+
+def bench_emit(bus: EventBus, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        bus.emit(**_event(i))
+    return time.perf_counter() - started
+
+
+def bench_emit_many(bus: EventBus, n: int, batch_size: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, n, batch_size):
+        bus.emit_many(_event(i) for i in range(offset, min(offset + batch_size, n)))
+    return time.perf_counter() - started
+
+
+def bench_buffered(bus: EventBus, n: int, batch_size: int) -> float:
+    async def run():
+        emitter = BufferedEventEmitter(bus, max_batch_size=batch_size, flush_interval=0.01)
+        await emitter.start()
+        started = time.perf_counter()
+        for i in range(n):
+            await emitter.emit(**_event(i))
+        await emitter.stop()
+        return time.perf_counter() - started
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="simulated Redis round trip")
+    parser.add_argument("--redis-url", default=None, help="benchmark a real Redis instead")
+    args = parser.parse_args()
+
+    target = args.redis_url or f"simulated redis (rtt={args.rtt_ms}ms)"
+    print(f"{args.events} events, batch size {args.batch_size}, {target}")
+
+    for label, run in (
+        ("emit", lambda bus: bench_emit(bus, args.events)),
+        ("emit_many", lambda bus: bench_emit_many(bus, args.events, args.batch_size)),
+        ("buffered", lambda bus: bench_buffered(bus, args.events, args.batch_size)),
+    ):
+        bus = _make_bus(args)
+        elapsed = run(bus)
+        round_trips = getattr(bus.redis_client, "round_trips", None)
+        extra = f", {round_trips} round trips" if round_trips is not None else ""
+        print(f"  {label:<10} {args.events / elapsed:>10.0f} events/sec ({elapsed:.3f}s{extra})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Lead listing pagination benchmark.
+
+Seeds one large tenant (plus a second tenant as noise) and times the
+GET /api/v1/leads query shapes:
+
+- ``offset``: ORDER BY created_at DESC OFFSET n LIMIT 50, plus COUNT(*)
+  (the previous implementation), at increasing depths
+- ``keyset``: the same page reached with a cursor (no count)
+- ``search``: name and phone-digit search, first page
+
+Runs on in-memory SQLite by default. Point --database-url at a scratch
+PostgreSQL database (migrated to head, so the pg_trgm indexes exist) to
+measure the trigram indexes too; the tables are created and dropped.
+
+Usage:
+    python -m tests.benchmarks.bench_lead_listing
+    python -m tests.benchmarks.bench_lead_listing --leads 200000
+    python -m tests.benchmarks.bench_lead_listing --database-url postgresql://localhost/otto_bench
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import apply_keyset, encode_cursor
+from app.database import Base
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.lead import Lead, LeadSource, LeadStatus, PoolStatus
+from app.routes.leads import _lead_search_filter
+from tests.db import register_models
+
+register_models()
+
+TENANT = "bench_tenant"
+NOISE_TENANT = "bench_noise"
+PAGE_SIZE = 50
+FIRST_NAMES = ("Jane", "Omar", "Priya", "Luis", "Mei", "Tom", "Ada", "Kofi")
+BATCH = 5000
+
+
+def seed(session, leads: int):
+    session.add_all([Company(id=TENANT, name="Bench Co"), Company(id=NOISE_TENANT, name="Noise Co")])
+    session.commit()
+    start = datetime(2025, 1, 1)
+    for offset in range(0, leads, BATCH):
+        cards, rows = [], []
+        for i in range(offset, min(offset + BATCH, leads)):
+            tenant = NOISE_TENANT if i % 10 == 0 else TENANT
+            card_id = f"card_{i}"
+            cards.append({
+                "id": card_id, "company_id": tenant, "primary_phone": f"+1555{i:07d}",
+                "first_name": FIRST_NAMES[i % len(FIRST_NAMES)], "last_name": f"Smith{i}",
+                "created_at": start, "updated_at": start,
+            })
+            rows.append({
+                "id": f"lead_{i:08d}", "company_id": tenant, "contact_card_id": card_id,
+                "status": LeadStatus.NEW, "source": LeadSource.UNKNOWN, "pool_status": PoolStatus.IN_POOL,
+                "created_at": start + timedelta(minutes=i // 3), "updated_at": start,
+            })
+        session.execute(insert(ContactCard), cards)
+        session.execute(insert(Lead), rows)
+    session.commit()
+
+
+def _base_query(session):
+    return session.query(Lead).join(ContactCard).filter(Lead.company_id == TENANT)
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def bench_depths(session, leads: int, repeat: int):
+    tenant_leads = _base_query(session).count()
+    for fraction in (0.0, 0.5, 0.95):
+        depth = int(tenant_leads * fraction) // PAGE_SIZE * PAGE_SIZE
+
+        def offset_page():
+            query = _base_query(session)
+            query.count()
+            query.order_by(Lead.created_at.desc()).offset(depth).limit(PAGE_SIZE).all()
+
+        # Cursor of the row just before this page, as the previous page would return
+        cursor = None
+        if depth:
+            previous = _base_query(session).order_by(Lead.created_at.desc(), Lead.id.desc()).offset(depth - 1).first()
+            cursor = encode_cursor(previous.created_at, previous.id)
+
+        def keyset_page():
+            apply_keyset(_base_query(session), Lead.created_at, Lead.id, cursor).limit(PAGE_SIZE + 1).all()
+
+        print(
+            f"  depth {depth:>8}  offset+count {timed(offset_page, repeat):>9.2f}ms"
+            f"  keyset {timed(keyset_page, repeat):>9.2f}ms"
+        )
+
+
+def bench_search(session, repeat: int):
+    for term in ("Priya", "smith1234", "(555) 000-12"):
+        def search_page():
+            query = _base_query(session).filter(_lead_search_filter(term))
+            apply_keyset(query, Lead.created_at, Lead.id, None).limit(PAGE_SIZE + 1).all()
+
+        print(f"  search {term!r:<16} {timed(search_page, repeat):>9.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--leads", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    tables = [Company.__table__, ContactCard.__table__, Lead.__table__]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    try:
+        started = time.perf_counter()
+        seed(session, args.leads)
+        print(f"{args.leads} leads seeded on {engine.dialect.name} in {time.perf_counter() - started:.1f}s, page size {PAGE_SIZE}")
+        bench_depths(session, args.leads, args.repeat)
+        bench_search(session, args.repeat)
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine, tables=tables)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Structured logging throughput benchmark.
+
+Measures log lines per second with PII redaction on, for:
+
+- ``sync``: StructuredFormatter on a StreamHandler in the calling thread
+  (the previous setup)
+- ``queue``: NonBlockingQueueHandler + QueueListener; the reported rate is
+  what the calling thread sees, followed by the time to drain the queue
+- ``sampled``: the queue setup with the benchmark logger sampled at
+  --sample-rate
+
+It also compares the legacy four-pass redactor with the combined pattern.
+Output goes to os.devnull; --write-latency-us simulates a blocking log sink
+(container stdout pipe, log shipper) with a sleep per write.
+
+Usage:
+    python -m tests.benchmarks.bench_logging
+    python -m tests.benchmarks.bench_logging --lines 100000 --sample-rate 0.1
+    python -m tests.benchmarks.bench_logging --write-latency-us 0
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+
+from app.obs.logging import (
+    LogSamplingFilter,
+    NonBlockingQueueHandler,
+    PIIRedactor,
+    StructuredFormatter,
+)
+
+MESSAGES = (
+    "CallRail call.completed webhook for 555-123-4567 from jane.doe@example.com",
+    "Event published: call.analysis.completed",
+    "Missed call from (555) 987-6543 queued for recovery",
+    "Task completed: app.tasks.analysis_tasks.analyze_call",
+)
+
+LEGACY_PATTERNS = [
+    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+    re.compile(r'\(\d{3}\)\s*\d{3}[-.]?\d{4}'),
+    re.compile(r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{3,4}'),
+]
+LEGACY_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+
+class SlowStream:
+    """File wrapper that blocks for ``latency`` seconds on each write."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def legacy_redact(message: str) -> str:
+    for pattern in LEGACY_PATTERNS:
+        message = pattern.sub('[REDACTED_PHONE]', message)
+    return LEGACY_EMAIL.sub('[REDACTED_EMAIL]', message)
+
+
+def bench_redaction(n: int):
+    redactor = PIIRedactor(enabled=True)
+    results = {}
+    for label, redact in (("legacy", legacy_redact), ("combined", redactor.redact)):
+        started = time.perf_counter()
+        for i in range(n):
+            redact(MESSAGES[i % len(MESSAGES)])
+        results[label] = time.perf_counter() - started
+    return results
+
+
+def _fresh_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _log_lines(logger: logging.Logger, n: int):
+    for i in range(n):
+        logger.info(
+            MESSAGES[i % len(MESSAGES)],
+            extra={"tenant_id": "bench_tenant", "trace_id": f"trace-{i}", "route": "/api/v1/calls"},
+        )
+
+
+def bench_sync(n: int, stream) -> float:
+    logger = _fresh_logger("bench.logging.sync")
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(StructuredFormatter(redact_pii=True))
+    logger.addHandler(handler)
+
+    started = time.perf_counter()
+    _log_lines(logger, n)
+    return time.perf_counter() - started
+
+
+def bench_queue(n: int, stream, sample_rate: float = 1.0):
+    logger = _fresh_logger("bench.logging.queue")
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(StructuredFormatter(redact_pii=True))
+    queue_handler = NonBlockingQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(LogSamplingFilter({"bench.logging": sample_rate}))
+    listener = logging.handlers.QueueListener(queue_handler.queue, handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+
+    started = time.perf_counter()
+    _log_lines(logger, n)
+    caller = time.perf_counter() - started
+    listener.stop()
+    return caller, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--write-latency-us", type=float, default=50, help="simulated sink latency per line")
+    args = parser.parse_args()
+
+    print(f"{args.lines} log lines, PII redaction on, {args.write_latency_us:g}us per write")
+
+    redaction = bench_redaction(args.lines)
+    for label, elapsed in redaction.items():
+        print(f"  redact/{label:<9} {args.lines / elapsed:>10.0f} msgs/sec ({elapsed:.3f}s)")
+
+    with open(os.devnull, "w") as devnull:
+        sink = SlowStream(devnull, args.write_latency_us / 1e6)
+        elapsed = bench_sync(args.lines, sink)
+        print(f"  {'sync':<16} {args.lines / elapsed:>10.0f} lines/sec ({elapsed:.3f}s)")
+
+        caller, total = bench_queue(args.lines, sink)
+        print(f"  {'queue':<16} {args.lines / caller:>10.0f} lines/sec in caller ({caller:.3f}s, drained in {total:.3f}s)")
+
+        caller, total = bench_queue(args.lines, sink, args.sample_rate)
+        label = f"sampled@{args.sample_rate:g}"
+        print(f"  {label:<16} {args.lines / caller:>10.0f} lines/sec in caller ({caller:.3f}s, drained in {total:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
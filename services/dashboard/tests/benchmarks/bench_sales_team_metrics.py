@@ -0,0 +1,138 @@
+"""
+Sales team metrics benchmark.
+
+Seeds a tenant with N sales reps and compares MetricsService.get_sales_team_metrics
+(one grouped query) against the per-rep pattern it replaced: one
+get_sales_rep_overview_metrics call plus a user lookup per rep. Reports SQL
+statement counts and wall time for each.
+
+Usage:
+    python -m tests.benchmarks.bench_sales_team_metrics
+    python -m tests.benchmarks.bench_sales_team_metrics --reps 50 --appointments-per-rep 60
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.company import Company
+from app.models.lead import Lead
+from app.models.recording_analysis import RecordingAnalysis
+from app.models.recording_session import RecordingSession
+from app.models.sales_rep import SalesRep
+from app.models.user import User
+from app.services.metrics_service import MetricsService
+from tests.db import register_models
+
+register_models()
+
+TENANT = "bench_company"
+OUTCOMES = ["won", "lost", "pending", None]
+
+
+def seed(db, reps: int, appointments_per_rep: int, now: datetime):
+    rng = random.Random(42)
+    db.add(Company(id=TENANT, name="Bench Roofing"))
+    for r in range(reps):
+        rep_id = f"rep_{r:03d}"
+        db.add(User(id=rep_id, name=f"Rep {r}", email=f"{rep_id}@bench.test", username=rep_id, company_id=TENANT))
+        db.add(SalesRep(user_id=rep_id, company_id=TENANT))
+        for a in range(appointments_per_rep):
+            apt_id = f"{rep_id}_apt_{a}"
+            status = rng.choice([AppointmentStatus.COMPLETED, AppointmentStatus.COMPLETED, AppointmentStatus.SCHEDULED])
+            db.add(Appointment(
+                id=apt_id,
+                lead_id=f"lead_{r}_{a % 10}",
+                company_id=TENANT,
+                assigned_rep_id=rep_id,
+                scheduled_start=now - timedelta(days=rng.randint(0, 29), hours=rng.randint(0, 23)),
+                status=status,
+            ))
+            if status == AppointmentStatus.COMPLETED:
+                db.add(RecordingAnalysis(
+                    id=f"{apt_id}_analysis",
+                    recording_session_id=f"{apt_id}_session",
+                    company_id=TENANT,
+                    appointment_id=apt_id,
+                    outcome=rng.choice(OUTCOMES),
+                    sop_compliance_score=rng.uniform(4, 10),
+                    sentiment_score=rng.random(),
+                    objections=[{"type": "price"}] * rng.randint(0, 3),
+                    meeting_segments=[{"phase": "rapport"}, {"phase": "proposal"}],
+                ))
+    db.commit()
+
+
+async def per_rep_team_metrics(service: MetricsService, date_from, date_to):
+    """
+    The pre-aggregation shape: one overview call and one name lookup per rep.
+    
+    Overview failures are tolerated so the queries issued before the failure
+    are still counted.
+    """
+    reps = service.db.query(SalesRep).filter(SalesRep.company_id == TENANT).all()
+    for rep in reps:
+        try:
+            await service.get_sales_rep_overview_metrics(
+                tenant_id=TENANT, rep_id=rep.user_id, date_from=date_from, date_to=date_to
+            )
+        except ValueError:
+            pass
+        service.db.query(User).filter(User.id == rep.user_id).first()
+
+
+def measure(engine, run, repeat: int):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        elapsed = (time.perf_counter() - started) / repeat
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return len(statements) // repeat, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reps", type=int, default=50)
+    parser.add_argument("--appointments-per-rep", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine,
+        tables=[m.__table__ for m in (
+            Company, User, SalesRep, Appointment, RecordingAnalysis, RecordingSession, Lead
+        )],
+    )
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    seed(db, args.reps, args.appointments_per_rep, now)
+
+    service = MetricsService(db)
+    date_from, date_to = now - timedelta(days=30), now + timedelta(minutes=1)
+
+    print(f"{args.reps} reps x {args.appointments_per_rep} appointments (sqlite, avg of {args.repeat} runs)")
+    for label, coro in (
+        ("grouped", lambda: service.get_sales_team_metrics(tenant_id=TENANT, date_from=date_from, date_to=date_to)),
+        ("per-rep", lambda: per_rep_team_metrics(service, date_from, date_to)),
+    ):
+        queries, elapsed = measure(engine, lambda: asyncio.run(coro()), args.repeat)
+        print(f"  {label:<8} {queries:>5} queries  {elapsed * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
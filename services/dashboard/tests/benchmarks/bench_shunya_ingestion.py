@@ -0,0 +1,324 @@
+"""
+Shunya ingestion throughput benchmark and replay harness.
+
+Replays CSR calls through the real ingestion code and reports sustained
+calls per minute, per-stage latency percentiles and SQL statements per call:
+
+    process_csr_call -> UWCClient -> fake UWC server (aiohttp, local port)
+    signed POST /api/v1/shunya/webhook -> ShunyaJobService -> advance_csr_call
+    -> shunya_response_normalizer -> domain writes (transcript, analysis,
+    lead status, tasks, key signals)
+
+Each call gets two webhooks (transcription done, analysis done), delivered
+--shunya-ms after the step was submitted, the way Shunya would. Stage
+latencies come from ShunyaJob.stage_timings; "submit" and "*_webhook" are
+the wall time of our own handlers.
+
+Payloads cycle through synthetic shapes (canonical keys, legacy aliases,
+sparse) unless --payloads points at a directory of recorded JSON files, each
+{"transcript": {...}, "analysis": {...}} as returned by Shunya.
+
+Runs offline: SQLite by default, or --database-url for a scratch PostgreSQL
+database (all tables are created and dropped). Redis locks are replaced by an
+in-process lock, Celery poll scheduling is disabled since every completion
+is delivered as a webhook, and property scrapes are not enqueued.
+
+Usage:
+    python -m tests.benchmarks.bench_shunya_ingestion
+    python -m tests.benchmarks.bench_shunya_ingestion --calls 2000 --concurrency 32
+    python -m tests.benchmarks.bench_shunya_ingestion --payloads recordings/shunya
+    python -m tests.benchmarks.bench_shunya_ingestion --database-url postgresql://localhost/otto_bench
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from aiohttp import web
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base, get_db
+from app.models.call import Call
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.lead import Lead, LeadSource, LeadStatus, PoolStatus
+from app.models.shunya_job import ShunyaJob
+from app.obs.query_profiler import finish_query_profile, install_query_profiler, start_query_profile
+from app.routes import shunya_webhook
+from app.services import property_intelligence_service
+from app.services import shunya_integration_service as integration_module
+from app.services.redis_lock_service import redis_lock_service
+from app.services.shunya_integration_service import ShunyaIntegrationService
+from app.services.uwc_client import get_uwc_client
+from tests.db import register_models
+
+register_models()
+
+TENANT = "bench_tenant"
+WEBHOOK_SECRET = "bench-webhook-secret"
+STAGES = ("submit", "transcribing", "transcription_webhook", "analyzing", "persisting", "analysis_webhook", "total")
+
+SYNTHETIC_PAYLOADS = [
+    {   # Canonical keys
+        "transcript": {"transcript_text": "Hi, I'd like a quote for a roof replacement. My address is 12 Oak St.",
+                       "speaker_labels": [{"speaker": "customer", "start": 0.0}], "confidence_score": 0.94},
+        "analysis": {
+            "qualification": {"qualification_status": "hot", "booking_status": "not_booked", "overall_score": 0.82},
+            "objections": {"objections": [{"objection_text": "price", "category": "price"}]},
+            "compliance": {"stages_followed": ["greeting", "discovery"], "stages_missed": ["close"], "compliance_score": 0.66},
+            "summary": {"summary": "Customer wants a roof replacement quote.", "key_points": ["roof", "quote"]},
+            "sentiment_score": 0.7,
+            "pending_actions": [{"action": "Send quote", "due_at": "2025-06-03T17:00:00"}, {"action": "Call back Friday"}],
+            "entities": {"address": "12 Oak St"},
+        },
+    },
+    {   # Legacy aliases
+        "transcript": {"transcript": "Calling about gutter repair, can someone come out next week?", "confidence": "0.88"},
+        "analysis": {
+            "lead_qualification": {"status": "Warm", "appointment_status": "not_booked"},
+            "objections": {"objections": ["timing", "spouse", "budget"]},
+            "sop_compliance": {"stages_followed": ["greeting"], "compliance_score": "0.4"},
+            "call_summary": {"summary": "Gutter repair inquiry."},
+            "sentiment": 0.2,
+            "action_items": ["Schedule inspection", "Email brochure", "Check financing"],
+            "missed_opps": ["Gutter guards upsell"],
+        },
+    },
+    {   # Sparse
+        "transcript": {"text": "Wrong number, sorry."},
+        "analysis": {"qualification": {"qualification_status": "unqualified"}},
+    },
+]
+
+
+def load_payloads(directory):
+    if not directory:
+        return SYNTHETIC_PAYLOADS
+    payloads = [json.loads(path.read_text()) for path in sorted(Path(directory).glob("*.json"))]
+    if not payloads:
+        raise SystemExit(f"No *.json payloads in {directory}")
+    return payloads
+
+
+class FakeUWC:
+    """Shunya transcription/analysis endpoints backed by replay payloads."""
+
+    def __init__(self, payloads, http_latency: float):
+        self.payloads = payloads
+        self.http_latency = http_latency
+        self.requests = 0
+
+    def payload_for(self, call_id: int):
+        return self.payloads[call_id % len(self.payloads)]
+
+    async def _respond(self, body):
+        self.requests += 1
+        if self.http_latency:
+            await asyncio.sleep(self.http_latency)
+        return web.json_response(body)
+
+    async def transcribe(self, request):
+        call_id = int((await request.json())["call_id"])
+        return await self._respond({"success": True, "task_id": f"tx-{call_id}", "transcript_id": call_id})
+
+    async def transcript(self, request):
+        call_id = int(request.match_info["call_id"])
+        return await self._respond(dict(self.payload_for(call_id)["transcript"], task_id=f"tx-{call_id}"))
+
+    async def start_analysis(self, request):
+        call_id = int(request.match_info["call_id"])
+        return await self._respond({"success": True, "job_id": f"an-{call_id}"})
+
+    async def complete_analysis(self, request):
+        call_id = int(request.match_info["call_id"])
+        return await self._respond(dict(self.payload_for(call_id)["analysis"], job_id=f"an-{call_id}"))
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/api/v1/transcription/transcribe", self.transcribe)
+        app.router.add_get("/api/v1/transcription/transcript/{call_id}", self.transcript)
+        app.router.add_post("/api/v1/analysis/start/{call_id}", self.start_analysis)
+        app.router.add_get("/api/v1/analysis/complete/{call_id}", self.complete_analysis)
+        return app
+
+
+class LocalLocks:
+    """In-process stand-in for redis_lock_service (one worker process)."""
+
+    def __init__(self):
+        self.locks = defaultdict(asyncio.Lock)
+
+    async def acquire_lock(self, lock_key, tenant_id, timeout=300, **kwargs):
+        await self.locks[(tenant_id, lock_key)].acquire()
+        return "local"
+
+    async def release_lock(self, lock_key, tenant_id, lock_token):
+        self.locks[(tenant_id, lock_key)].release()
+        return True
+
+
+def seed(session, calls: int):
+    session.add(Company(id=TENANT, name="Bench Co"))
+    session.commit()
+    cards, leads, rows = [], [], []
+    for i in range(1, calls + 1):
+        cards.append({"id": f"card_{i}", "company_id": TENANT, "primary_phone": f"+1555{i:07d}"})
+        leads.append({
+            "id": f"lead_{i}", "company_id": TENANT, "contact_card_id": f"card_{i}",
+            "status": LeadStatus.NEW, "source": LeadSource.UNKNOWN, "pool_status": PoolStatus.IN_POOL,
+        })
+        rows.append({"call_id": i, "company_id": TENANT, "contact_card_id": f"card_{i}", "lead_id": f"lead_{i}"})
+    session.execute(insert(ContactCard), cards)
+    session.execute(insert(Lead), leads)
+    session.execute(insert(Call), rows)
+    session.commit()
+
+
+def signed_webhook(shunya_job_id: str):
+    body = json.dumps({"shunya_job_id": shunya_job_id, "status": "completed", "company_id": TENANT}).encode()
+    timestamp = str(int(time.time() * 1000))
+    signature = hmac.new(WEBHOOK_SECRET.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    headers = {"X-Shunya-Signature": signature, "X-Shunya-Timestamp": timestamp, "Content-Type": "application/json"}
+    return body, headers
+
+
+async def ingest(call_id, service, client, shunya_latency, latencies, statements):
+    stats, token = start_query_profile("bench:shunya_ingestion")
+    started = time.perf_counter()
+    result = await service.process_csr_call(call_id, f"https://audio.example/{call_id}.mp3", TENANT)
+    latencies["submit"].append(time.perf_counter() - started)
+    if not result.get("success"):
+        raise RuntimeError(f"call {call_id}: {result}")
+
+    for step, shunya_job_id in (("transcription", f"tx-{call_id}"), ("analysis", f"an-{call_id}")):
+        await asyncio.sleep(shunya_latency)  # Shunya working on the step
+        body, headers = signed_webhook(shunya_job_id)
+        step_started = time.perf_counter()
+        response = await client.post("/api/v1/shunya/webhook", content=body, headers=headers)
+        latencies[f"{step}_webhook"].append(time.perf_counter() - step_started)
+        if response.status_code != 200 or response.json()["data"].get("success") is False:
+            raise RuntimeError(f"call {call_id} {step} webhook: {response.status_code} {response.text}")
+
+    finish_query_profile(stats, token)
+    statements.append(stats.statements)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def report(latencies, statements, calls, elapsed, uwc_requests):
+    print(f"{calls} calls in {elapsed:.2f}s: {calls / elapsed * 60:,.0f} calls/min, {uwc_requests} UWC requests")
+    print(f"  {'stage':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        values = latencies.get(stage)
+        if values:
+            cells = [percentile(values, f) * 1000 for f in (0.5, 0.95, 0.99)] + [max(values) * 1000]
+            print(f"  {stage:<22}" + "".join(f"{cell:>10.1f}" for cell in cells))
+    print(
+        f"  SQL statements per call: p50 {percentile(statements, 0.5)}"
+        f"  p95 {percentile(statements, 0.95)}  max {max(statements)}"
+    )
+
+
+async def run(args, Session):
+    fake = FakeUWC(load_payloads(args.payloads), args.http_ms / 1000)
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    uwc = get_uwc_client()
+    uwc.base_url, uwc.api_key, uwc.jwt_secret, uwc.hmac_secret = f"http://127.0.0.1:{port}", "bench", None, None
+
+    api = FastAPI()
+    api.include_router(shunya_webhook.router)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api.dependency_overrides[get_db] = bench_db
+
+    service = ShunyaIntegrationService()
+    latencies, statements = defaultdict(list), []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(call_id, client):
+        async with semaphore:
+            await ingest(call_id, service, client, args.shunya_ms / 1000, latencies, statements)
+
+    try:
+        async with httpx.AsyncClient(app=api, base_url="http://bench") as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(bounded(call_id, client) for call_id in range(1, args.calls + 1)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    session = Session()
+    for (timings,) in session.query(ShunyaJob.stage_timings):
+        for stage, seconds in (timings or {}).items():
+            latencies[stage].append(seconds)
+    session.close()
+    report(latencies, statements, args.calls, elapsed, fake.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--shunya-ms", type=float, default=20, help="Delay before each completion webhook")
+    parser.add_argument("--http-ms", type=float, default=2, help="Fake UWC response latency")
+    parser.add_argument("--payloads", help="Directory of recorded {transcript, analysis} JSON payloads")
+    parser.add_argument("--database-url", help="Scratch database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    settings.UWC_HMAC_SECRET = WEBHOOK_SECRET
+    install_query_profiler()
+
+    workdir = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite:///{os.path.join(workdir.name, 'bench.db')}"
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    integration_module.SessionLocal = Session
+    ShunyaIntegrationService._schedule_poll = lambda self, job_id, countdown: None
+    property_intelligence_service.scrape_property_intelligence.delay = lambda *args, **kwargs: None
+    locks = LocalLocks()
+    redis_lock_service.acquire_lock = locks.acquire_lock
+    redis_lock_service.release_lock = locks.release_lock
+
+    try:
+        session = Session()
+        seed(session, args.calls)
+        session.close()
+        print(f"Replaying {args.calls} calls on {engine.dialect.name}, concurrency {args.concurrency}")
+        asyncio.run(run(args, Session))
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Shunya response normalizer micro-benchmark.
+
+Times ShunyaResponseNormalizer over a corpus of real-shaped payloads:
+contract-shaped analyses, legacy aliases, sparse/malformed responses and
+large analyses (dozens of objections, actions and missed opportunities),
+plus transcripts and meeting segmentations.
+
+"first delivery" is what the webhook/poller pay per result before domain
+writes (raw hash + normalize + idempotency check); "re-delivery" is the same
+result arriving again for a job that already succeeded, which
+ShunyaJobService.normalize_output answers from the ShunyaJob.
+
+Usage:
+    python -m tests.benchmarks.bench_shunya_normalizer
+    python -m tests.benchmarks.bench_shunya_normalizer --rounds 20000
+"""
+import argparse
+import copy
+import time
+
+from app.models.shunya_job import ShunyaJob, ShunyaJobStatus
+from app.services.shunya_job_service import shunya_job_service
+from app.services.shunya_response_normalizer import shunya_normalizer
+from tests.db import register_models
+
+register_models()
+
+CONTRACT_ANALYSIS = {
+    "job_id": "an-3070",
+    "call_id": 3070,
+    "qualification": {
+        "qualification_status": "Qualified", "booking_status": "booked",
+        "bant_scores": {"budget": 0.8, "authority": 1.0, "need": 0.9, "timeline": 0.6},
+        "overall_score": 0.82, "confidence_score": 0.9,
+        "decision_makers": ["homeowner", "spouse"], "urgency_signals": ["active leak"],
+        "budget_indicators": ["financing"],
+    },
+    "objections": {
+        "objections": [
+            {"objection_text": "Price is higher than the other quote", "objection_label": "price",
+             "severity": "High", "overcome": True, "timestamp": "00:03:12", "speaker_id": "customer"},
+            {"objection_text": "Need to talk to my wife", "objection_label": "spouse", "severity": "medium"},
+        ],
+        "total_objections": 2, "severity_breakdown": {"high": 1, "medium": 1},
+    },
+    "compliance": {
+        "stages_followed": ["greeting", "discovery", "agenda"], "stages_missed": ["close"],
+        "compliance_score": 0.75, "recommendations": ["Ask for the appointment"],
+    },
+    "summary": {"summary": "Homeowner with an active roof leak booked an inspection.",
+                "key_points": ["leak", "insurance"], "next_steps": ["inspection Tuesday"], "confidence": 0.88},
+    "sentiment_score": 0.64,
+    "pending_actions": [
+        {"action": "Send inspection confirmation", "action_type": "send_quote", "priority": "High",
+         "due_at": "2025-06-03T17:00:00Z"},
+        {"action": "Follow up tomorrow", "action_type": "follow up tomorrow"},
+    ],
+    "missed_opportunities": [
+        {"opportunity_text": "Did not mention gutter guards", "opportunity_type": "upsell", "severity": "low"},
+    ],
+    "entities": {"address": "12 Oak St, Austin, TX", "phone_number": "+15125550100",
+                 "person_name": "Dana Smith", "appointment_date": "2025-06-03", "scheduled_time": "10:00"},
+}
+
+LEGACY_ANALYSIS = {
+    "task_id": "tx-88",
+    "lead_qualification": {"status": " WARM ", "appointment_status": "not booked"},
+    "objections": ["timing", "spouse", {"text": "too expensive", "category": "price"}],
+    "sop_compliance": {"stages_completed": ["greeting"], "stages_not_completed": ["close"], "compliance_score": "0.4"},
+    "call_summary": "Gutter repair inquiry, wants a callback next week.",
+    "sentiment": "0.2",
+    "action_items": ["Schedule inspection", "Email brochure", {"text": "Check financing", "type": "callback"}],
+    "missed_opps": ["Gutter guards upsell", {"description": "No referral ask", "type": "referral"}],
+    "extracted_entities": {"property_address": "9 Elm Rd", "customer_name": "Lee", "phone": "+15125550111"},
+}
+
+SPARSE_ANALYSIS = {"qualification": {"qualification_status": "unqualified"}, "objections": None, "summary": 42}
+
+
+def _large_analysis(items: int):
+    analysis = copy.deepcopy(CONTRACT_ANALYSIS)
+    analysis["objections"]["objections"] *= items // 2
+    analysis["pending_actions"] *= items // 2
+    analysis["missed_opportunities"] *= items
+    return analysis
+
+
+TRANSCRIPT = {"transcript_text": "Hi, I have a leak over the kitchen. " * 40, "task_id": "tx-3070",
+              "speaker_labels": [{"speaker": "customer", "start": i * 4.0} for i in range(40)], "confidence": 0.93}
+
+SEGMENTATION = {
+    "success": True, "call_id": 3070,
+    "part1": {"start_time": 0, "end_time": 240, "duration": 240, "content": "Rapport and agenda", "key_points": ["roof age"]},
+    "part2": {"start_time": 240, "end_time": 420, "duration": 180, "summary": "Proposal", "key_topics": ["price"]},
+    "segmentation_confidence": 0.8, "transition_point": 240, "call_type": "sales_appointment",
+}
+
+CORPUS = [
+    ("analysis: contract shape", shunya_normalizer.normalize_complete_analysis, CONTRACT_ANALYSIS),
+    ("analysis: legacy aliases", shunya_normalizer.normalize_complete_analysis, LEGACY_ANALYSIS),
+    ("analysis: sparse", shunya_normalizer.normalize_complete_analysis, SPARSE_ANALYSIS),
+    ("analysis: 40 items", shunya_normalizer.normalize_complete_analysis, _large_analysis(40)),
+    ("transcript", shunya_normalizer.normalize_transcript_response, TRANSCRIPT),
+    ("meeting segmentation", shunya_normalizer.normalize_meeting_segmentation, SEGMENTATION),
+]
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'payload':<28}{'normalize us':>14}{'first delivery us':>20}{'re-delivery us':>17}")
+    for name, normalize, payload in CORPUS:
+        running = ShunyaJob(job_status=ShunyaJobStatus.RUNNING)
+
+        def first_delivery():
+            output, raw_hash = shunya_job_service.normalize_output(running, payload, normalize)
+            shunya_job_service.should_process(None, running, output, raw_hash)
+
+        done = ShunyaJob(job_status=ShunyaJobStatus.SUCCEEDED)
+        done.output_payload, done.raw_output_hash = shunya_job_service.normalize_output(done, payload, normalize)
+
+        def redelivery():
+            output, raw_hash = shunya_job_service.normalize_output(done, payload, normalize)
+            assert not shunya_job_service.should_process(None, done, output, raw_hash)
+
+        fresh = _time(lambda: normalize(payload), args.rounds)
+        first = _time(first_delivery, args.rounds)
+        repeat = _time(redelivery, args.rounds)
+        print(f"{name:<28}{fresh:>14.1f}{first:>20.1f}{repeat:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,42 @@
+"""
+Shared pytest fixtures.
+"""
+import pytest
 
+
+@pytest.fixture
+def sqlite_db():
+    """
+    Session on a fresh in-memory SQLite database with every table created.
+
+    The engine uses a StaticPool, so code that opens its own sessions (Celery
+    tasks, TestClient threads) sees the same data through
+    sessionmaker(bind=sqlite_db.get_bind()).
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+    from tests.db import register_models
+
+    register_models()
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert how many SQL statements a block may run, to catch N+1 regressions:
+
+        def test_team_metrics(query_budget, client):
+            with query_budget(3):
+                client.get("/api/v1/metrics/sales/team")
+    """
+    from app.obs.query_profiler import assert_max_queries
+    return assert_max_queries
@@ -0,0 +1,15 @@
+"""
+Database helpers shared by the test suite and the benchmarks.
+"""
+
+
+def register_models():
+    """Import every model module so Base.metadata knows all tables, as init_db does."""
+    from app.models import (  # noqa: F401
+        appointment, audit_log, call, call_analysis, call_objection, call_transcript, company,
+        contact_card, event_log, followup_draft, geocode_cache, geofence, key_signal, lead,
+        lead_status_history, onboarding, personal_clone_job, rag_document, rag_query,
+        recording_analysis, recording_session, recording_transcript, rep_assignment_history,
+        rep_shift, sales_manager, sales_rep, scheduled_call, service, shunya_job,
+        sop_compliance_result, task, transcript_analysis, user,
+    )
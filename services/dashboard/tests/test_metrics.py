@@ -61,12 +61,11 @@ class TestHTTPMetrics:
         assert 'status="201"' in metrics_text
         assert 'status="404"' in metrics_text
     
-    def test_route_normalization(self):
-        """Test that routes are normalized for metrics."""
-        # Record requests with dynamic segments
-        record_http_request("/users/123", "GET", 200, 100.0)
-        record_http_request("/users/456", "GET", 200, 100.0)
-        record_http_request("/calls/abc-def-ghi", "GET", 200, 100.0)
+    def test_route_template_labels(self):
+        """Test that routes are labeled by their template, not the raw path."""
+        # The middleware passes the matched route template
+        record_http_request("/users/{user_id}", "GET", 200, 100.0)
+        record_http_request("/calls/{call_id}", "GET", 200, 100.0)
         
         # Get metrics response
         client = TestClient(app)
@@ -75,9 +74,9 @@ class TestHTTPMetrics:
         assert response.status_code == 200
         metrics_text = response.text
         
-        # Check that routes are normalized
-        assert 'route="/users/{id}"' in metrics_text
-        assert 'route="/calls/{uuid}"' in metrics_text
+        # Check that templates are used as labels
+        assert 'route="/users/{user_id}"' in metrics_text
+        assert 'route="/calls/{call_id}"' in metrics_text
 
 
 class TestWorkerMetrics:
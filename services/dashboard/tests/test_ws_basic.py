@@ -156,7 +156,8 @@ class TestEventBus:
         # Mock Redis client
         mock_redis_client = MagicMock()
         mock_redis_client.ping.return_value = True
-        mock_redis_client.publish.return_value = 1
+        mock_pipeline = mock_redis_client.pipeline.return_value
+        mock_pipeline.execute.return_value = [1, 1]
         mock_redis.return_value = mock_redis_client
         
         event_bus = EventBus("redis://localhost:6379/0")
@@ -170,7 +171,8 @@ class TestEventBus:
         )
         
         assert success is True
-        mock_redis_client.publish.assert_called()
+        mock_pipeline.publish.assert_called()
+        mock_pipeline.execute.assert_called()
     
     @patch('redis.from_url')
     def test_event_emission_large_payload(self, mock_redis):
@@ -180,7 +182,8 @@ class TestEventBus:
         # Mock Redis client
         mock_redis_client = MagicMock()
         mock_redis_client.ping.return_value = True
-        mock_redis_client.publish.return_value = 1
+        mock_pipeline = mock_redis_client.pipeline.return_value
+        mock_pipeline.execute.return_value = [1]
         mock_redis.return_value = mock_redis_client
         
         event_bus = EventBus("redis://localhost:6379/0")
@@ -198,10 +201,10 @@ class TestEventBus:
         assert success is True
         
         # Verify publish was called
-        mock_redis_client.publish.assert_called()
+        mock_pipeline.publish.assert_called()
         
         # Get the published message
-        published_args = mock_redis_client.publish.call_args[0]
+        published_args = mock_pipeline.publish.call_args[0]
         published_message = json.loads(published_args[1])
         
         # Should be truncated with pointer
@@ -0,0 +1,156 @@
+"""
+Unit tests for rep double-booking checks and dispatcher availability.
+"""
+import asyncio
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.lead import Lead
+from app.models.rep_shift import RepShift, ShiftStatus
+from app.models.sales_rep import SalesRep
+from app.routes.appointments import AppointmentUpdateBody, update_appointment
+from app.services.appointment_dispatch_service import AppointmentDispatchError, AppointmentDispatchService
+
+TENANT = "company_1"
+DAY = date(2025, 6, 2)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add_all([
+        Company(id=TENANT, name="Roofing Co", timezone="America/New_York"),
+        ContactCard(id="card_1", company_id=TENANT, primary_phone="+15550000001"),
+        Lead(id="lead_1", company_id=TENANT, contact_card_id="card_1"),
+        SalesRep(user_id="rep_a", company_id=TENANT, default_shift_start=time(8), default_shift_end=time(17)),
+        SalesRep(user_id="rep_b", company_id=TENANT),
+        SalesRep(user_id="rep_off", company_id=TENANT),
+        RepShift(rep_id="rep_off", company_id=TENANT, shift_date=DAY, status=ShiftStatus.OFF),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def _appointment(db, appointment_id, start_hour, end_hour=None, rep_id=None, **kwargs):
+    # Times are naive UTC; 2025-06-02 is EDT (UTC-4)
+    appt = Appointment(
+        id=appointment_id, lead_id="lead_1", company_id=TENANT, assigned_rep_id=rep_id,
+        scheduled_start=datetime(2025, 6, 2, start_hour),
+        scheduled_end=datetime(2025, 6, 2, end_hour) if end_hour else None,
+        **kwargs,
+    )
+    db.add(appt)
+    db.commit()
+    return appt
+
+
+def _assign(db, appointment_id, rep_id, **kwargs):
+    return asyncio.run(AppointmentDispatchService(db).assign_appointment_to_rep(
+        tenant_id=TENANT, appointment_id=appointment_id, rep_id=rep_id, actor_id="csr_1", **kwargs
+    ))
+
+
+def test_overlapping_assignment_is_rejected(db):
+    _appointment(db, "booked", 14, rep_id="rep_a")  # no end: blocks 14:00-15:00
+    _appointment(db, "overlaps", 14, 16)
+    _appointment(db, "after", 15, 16)
+    _appointment(db, "cancelled", 14, 15, rep_id="rep_a", status=AppointmentStatus.CANCELLED)
+
+    with pytest.raises(AppointmentDispatchError, match="booked"):
+        _assign(db, "overlaps", "rep_a")
+
+    assert _assign(db, "after", "rep_a").assigned_rep_id == "rep_a"
+    assert db.get(Appointment, "overlaps").assigned_rep_id is None
+
+
+def test_allowed_double_booking_is_exempt(db):
+    _appointment(db, "first", 14, 15, rep_id="rep_a")
+    _appointment(db, "override", 14, 15)
+    _appointment(db, "third", 14, 15)
+
+    assert _assign(db, "override", "rep_a", allow_double_booking=True).double_booking_allowed is True
+
+    # Only "first" still blocks the slot
+    with pytest.raises(AppointmentDispatchError, match="first"):
+        _assign(db, "third", "rep_a")
+
+
+def _patch(db, appointment_id, **changes):
+    request = SimpleNamespace(state=SimpleNamespace(tenant_id=TENANT, user_id="csr_1", user_role="csr", trace_id=None))
+    return asyncio.run(update_appointment(
+        request=request, appointment_id=appointment_id, payload=AppointmentUpdateBody(**changes), db=db,
+    ))
+
+
+def test_overlapping_patch_is_a_conflict(db):
+    _appointment(db, "booked", 14, 15, rep_id="rep_a")
+    _appointment(db, "moved", 16, 17, rep_id="rep_a")
+
+    with pytest.raises(HTTPException) as exc:
+        _patch(db, "moved", scheduled_start=datetime(2025, 6, 2, 14, 30))
+
+    assert exc.value.status_code == 409
+    assert exc.value.detail["details"]["conflicting_appointment_id"] == "booked"
+    assert db.get(Appointment, "moved").scheduled_start == datetime(2025, 6, 2, 16)
+
+    # Cancelling frees the slot
+    _patch(db, "booked", status=AppointmentStatus.CANCELLED)
+    assert _patch(db, "moved", scheduled_start=datetime(2025, 6, 2, 14, 30)).data.appointment.id == "moved"
+
+
+def test_exclusion_violation_on_patch_is_a_conflict(db):
+    _appointment(db, "moved", 16, 17)
+    # What PostgreSQL raises when a concurrent write took the slot first
+    violation = IntegrityError("UPDATE appointments", {}, SimpleNamespace(pgcode="23P01"))
+
+    with patch.object(db, "commit", side_effect=violation), pytest.raises(HTTPException) as exc:
+        _patch(db, "moved", assigned_rep_id="rep_a")
+
+    assert exc.value.status_code == 409
+    assert exc.value.detail["details"] == {"rep_id": "rep_a", "conflicting_appointment_id": None}
+    assert db.get(Appointment, "moved").assigned_rep_id is None
+
+
+def test_availability_for_all_reps_in_three_queries(db, query_budget):
+    _appointment(db, "a1", 13, 14, rep_id="rep_a")  # 09:00-10:00 EDT
+    _appointment(db, "a2", 15, rep_id="rep_a")  # 11:00-12:00 EDT (default duration)
+    _appointment(db, "a3", 16, 17, rep_id="rep_a", status=AppointmentStatus.CANCELLED)
+    _appointment(db, "b1", 10, 12, rep_id="rep_b")  # 06:00-08:00 EDT, overlaps shift start
+
+    with query_budget(3):
+        availability = AppointmentDispatchService(db).get_rep_availability(tenant_id=TENANT, day=DAY)
+
+    by_rep = {entry["rep_id"]: entry for entry in availability}
+    assert set(by_rep) == {"rep_a", "rep_b", "rep_off"}
+
+    rep_a = by_rep["rep_a"]
+    assert (rep_a["shift_start"], rep_a["shift_end"]) == (datetime(2025, 6, 2, 12), datetime(2025, 6, 2, 21))
+    assert [b["appointment_id"] for b in rep_a["busy"]] == ["a1", "a2"]
+    assert [(w["start"].hour, w["end"].hour) for w in rep_a["free_windows"]] == [(12, 13), (14, 15), (16, 21)]
+
+    # Default 07:00-20:00 EDT shift, first hour already booked
+    assert [(w["start"], w["end"]) for w in by_rep["rep_b"]["free_windows"]] == [
+        (datetime(2025, 6, 2, 12), datetime(2025, 6, 3, 0))
+    ]
+
+    assert by_rep["rep_off"]["shift_start"] is None and by_rep["rep_off"]["free_windows"] == []
+
+
+def test_availability_filters_reps_and_short_windows(db):
+    _appointment(db, "a1", 13, 14, rep_id="rep_a")
+    _appointment(db, "a2", 14, 16, rep_id="rep_a")
+
+    availability = AppointmentDispatchService(db).get_rep_availability(
+        tenant_id=TENANT, day=DAY, rep_ids=["rep_a"], min_window_minutes=90,
+    )
+
+    # The one-hour gap before a1 is dropped
+    assert [entry["rep_id"] for entry in availability] == ["rep_a"]
+    assert [(w["start"].hour, w["end"].hour) for w in availability[0]["free_windows"]] == [(16, 21)]
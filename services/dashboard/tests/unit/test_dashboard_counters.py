@@ -0,0 +1,71 @@
+"""
+Unit tests for the single-query dashboard counters in app.routes.backend.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.models.call import Call
+from app.models.company import Company
+from app.routes import backend
+from app.routes.backend import _dashboard_counters, get_dashboard_metrics
+
+TENANT = "company_1"
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add_all([Company(id=TENANT, name="Roofing Co"), Company(id="other", name="Other Co")])
+    sqlite_db.add_all([
+        Call(company_id=TENANT, booked=True, still_deciding=True, bought=False, cancelled=False),
+        Call(company_id=TENANT, booked=True, bought=False, still_deciding=False, cancelled=False),
+        Call(company_id=TENANT, bought=True, cancelled=False, has_discrepancies=True),
+        Call(company_id=TENANT, missed_call=True, cancelled=False),
+        Call(company_id=TENANT, cancelled=True),
+        Call(company_id=TENANT, booked=True, bought=False, reason_for_lost_sale="budget", price_if_bought=1200.0),
+        Call(company_id=TENANT, booked=True, bought=False, reason_for_lost_sale="competitor"),
+        Call(company_id=TENANT, still_deciding=True, has_discrepancies=False),
+        Call(company_id="other", booked=True, still_deciding=True, has_discrepancies=True),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def test_counters_computed_in_one_statement(db, query_budget):
+    with query_budget(1):
+        metrics = _dashboard_counters(db, TENANT)
+
+    assert metrics == {
+        "still_deciding": 1,
+        "awaiting_quote": 1,
+        "purchased_service": 1,
+        "missed_calls": 1,
+        "cancelled_appointments": 1,
+        "discrepancies": 1,
+        "lost_quotes": {"total": 2, "value_lost": 1200.0},
+        "still_deciding_count": 2,
+    }
+
+
+def test_route_serves_cached_counters_per_tenant(db):
+    request = SimpleNamespace(state=SimpleNamespace(tenant_id=TENANT, user_id="u1", user_role="manager"))
+    cache = {}
+
+    def get_cache(key, tenant_id=None):
+        return cache.get((tenant_id, key))
+
+    def set_cache(key, value, ttl=3600, tenant_id=None):
+        cache[(tenant_id, key)] = value
+        return True
+
+    with patch.object(backend.redis_service, "get_cache", side_effect=get_cache), \
+         patch.object(backend.redis_service, "set_cache", side_effect=set_cache), \
+         patch.object(backend, "_dashboard_counters", wraps=_dashboard_counters) as counters:
+        first = asyncio.run(get_dashboard_metrics(company_id=TENANT, request=request, db=db))
+        second = asyncio.run(get_dashboard_metrics(company_id=TENANT, request=request, db=db))
+
+    assert first == second
+    assert counters.call_count == 1
+    assert list(cache) == [(TENANT, backend.DASHBOARD_METRICS_CACHE_KEY)]
@@ -0,0 +1,139 @@
+"""
+Unit tests for the batch dispatch optimizer and its preview service.
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.call_analysis import CallAnalysis
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.enums import BookingStatus
+from app.models.lead import Lead
+from app.models.sales_rep import SalesRep
+from app.services.appointment_dispatch_service import AppointmentDispatchService
+from app.services.dispatch_optimizer import DispatchRep, DispatchStop, haversine_matrix, optimize_dispatch
+
+NINE = datetime(2025, 6, 2, 13)  # 09:00 EDT
+NORTH, SOUTH = (33.0, -97.0), (32.5, -97.0)  # ~55 km apart
+
+
+def _stop(stop_id, hour, point, minutes=60):
+    start = NINE + timedelta(hours=hour)
+    return DispatchStop(stop_id, start, start + timedelta(minutes=minutes), *point)
+
+
+def _rep(rep_id, origin=None, booked=()):
+    return DispatchRep(rep_id, NINE - timedelta(hours=1), NINE + timedelta(hours=9), list(booked), origin)
+
+
+def _optimize(stops, reps, max_seconds=1.0):
+    return optimize_dispatch(stops, reps, speed_kmh=60, road_factor=1.0, max_seconds=max_seconds)
+
+
+def test_haversine_matrix_matches_known_distance():
+    dallas, austin = (32.7767, -96.7970), (30.2672, -97.7431)
+    (to_self, to_austin), = haversine_matrix([dallas], [dallas, austin])
+    assert to_self == pytest.approx(0.0, abs=1e-6)
+    assert to_austin == pytest.approx(293, abs=2)
+
+
+def test_stops_go_to_the_nearest_rep():
+    plan = _optimize(
+        [_stop("n1", 0, NORTH), _stop("s1", 0, SOUTH), _stop("n2", 2, NORTH), _stop("s2", 2, SOUTH)],
+        [_rep("north", origin=NORTH), _rep("south", origin=SOUTH)],
+    )
+    assert plan.assignments == {"n1": "north", "s1": "south", "n2": "north", "s2": "south"}
+    assert plan.total_drive_minutes == pytest.approx(0.0, abs=1e-6)
+
+
+def test_local_search_fixes_a_greedy_choice():
+    # Greedy gives the 09:00 stop to the north rep (11 km vs 44 km), which
+    # leaves the south rep driving 55 km to the overlapping 09:30 north stop
+    near_north = (32.9, -97.0)
+    plan = _optimize(
+        [_stop("first", 0, near_north), _stop("second", 0.5, NORTH)],
+        [_rep("north", origin=NORTH), _rep("south", origin=SOUTH)],
+    )
+
+    assert plan.greedy_drive_minutes == pytest.approx(11 + 55, abs=1)
+    assert plan.assignments == {"first": "south", "second": "north"}
+    assert plan.total_drive_minutes == pytest.approx(44, abs=1)
+    assert plan.moves == 1
+
+
+def test_respects_shift_windows_bookings_and_drive_time():
+    plan = _optimize(
+        [
+            _stop("too_late", 12, NORTH),  # after every shift
+            _stop("clash", 1, NORTH),  # same slot as the booking
+            _stop("tight", 1.5, SOUTH, minutes=30),  # 55 minutes away, only 30 after the booking
+        ],
+        [_rep("a", booked=[_stop("booked", 1, NORTH, minutes=30)])],
+    )
+    assert plan.assignments == {}
+    assert plan.unassigned == {"too_late": "no_available_rep", "clash": "no_available_rep", "tight": "no_available_rep"}
+
+
+def test_200_appointments_50_reps_within_a_second():
+    from tests.benchmarks.bench_dispatch_optimizer import synthetic_day
+
+    stops, reps = synthetic_day(200, 50, seed=0)
+    plan = optimize_dispatch(stops, reps, speed_kmh=40, road_factor=1.3, max_seconds=0.5)
+
+    assert plan.elapsed_ms < 1000
+    assert plan.total_drive_minutes <= plan.greedy_drive_minutes
+    assert len(plan.assignments) + len(plan.unassigned) == 200
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add_all([
+        Company(id="company_1", name="Roofing Co", timezone="America/New_York"),
+        ContactCard(id="card_1", company_id="company_1", primary_phone="+15550000001"),
+        Lead(id="lead_1", company_id="company_1", contact_card_id="card_1"),
+        Lead(id="lead_2", company_id="company_1", contact_card_id="card_1"),
+        SalesRep(user_id="north", company_id="company_1", default_shift_start=time(8), default_shift_end=time(18)),
+        SalesRep(user_id="south", company_id="company_1", default_shift_start=time(8), default_shift_end=time(18)),
+        Call(call_id=1, company_id="company_1", lead_id="lead_2"),
+        CallAnalysis(id="analysis_1", call_id=1, tenant_id="company_1", uwc_job_id="job_1",
+                     booking_status=BookingStatus.NOT_BOOKED, analyzed_at=datetime(2025, 6, 1)),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def test_preview_proposes_without_writing(db):
+    def add(appointment_id, hour, point, lead_id="lead_1", rep_id=None):
+        db.add(Appointment(
+            id=appointment_id, lead_id=lead_id, company_id="company_1", assigned_rep_id=rep_id,
+            scheduled_start=NINE + timedelta(hours=hour), geo_lat=point[0] if point else None,
+            geo_lng=point[1] if point else None,
+        ))
+
+    add("north_booked", 0, NORTH, rep_id="north")
+    add("south_booked", 0, SOUTH, rep_id="south")
+    add("n1", 2, NORTH)
+    add("s1", 2, SOUTH)
+    add("nowhere", 3, None)
+    add("unbooked", 4, NORTH, lead_id="lead_2")
+    add("tomorrow", 24, NORTH)
+    db.commit()
+
+    preview = asyncio.run(AppointmentDispatchService(db).preview_batch_dispatch(
+        tenant_id="company_1", day=date(2025, 6, 2),
+    ))
+
+    assert {(a["appointment_id"], a["rep_id"]) for a in preview["assignments"]} == {("n1", "north"), ("s1", "south")}
+    assert preview["unassigned"] == [
+        {"appointment_id": "nowhere", "reason": "no_location"},
+        {"appointment_id": "unbooked", "reason": "not_booked"},
+    ]
+    assert {r["rep_id"]: r["appointment_ids"] for r in preview["routes"]} == {
+        "north": ["north_booked", "n1"], "south": ["south_booked", "s1"],
+    }
+    assert preview["total_drive_minutes"] == 0
+    assert db.get(Appointment, "n1").assigned_rep_id is None
@@ -0,0 +1,127 @@
+"""
+Statement budgets for the read paths most prone to N+1 regressions:
+AI search, contact cards and the lead/appointment listings.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.deps.ai_internal_auth import AIInternalContext
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.call_analysis import CallAnalysis
+from app.models.call_transcript import CallTranscript
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.lead import Lead
+from app.routes.ai_search import search_calls
+from app.routes.appointments import list_appointments
+from app.routes.leads import list_leads
+from app.schemas.ai_search import AISearchFilters, AISearchRequest
+from app.services.contact_card_assembler import contact_card_assembler
+
+TENANT = "company_1"
+NOW = datetime.utcnow()
+DAY = datetime(2025, 6, 2)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add_all([
+        Company(id=TENANT, name="Roofing Co"),
+        ContactCard(id="card_1", company_id=TENANT, primary_phone="+15550000000"),
+        Lead(id="lead_1", company_id=TENANT, contact_card_id="card_1"),
+        Appointment(
+            id="appt_1", lead_id="lead_1", company_id=TENANT, contact_card_id="card_1",
+            scheduled_start=NOW + timedelta(days=1),
+        ),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def _add_calls(db, count):
+    """Calls on card_1, alternating with and without a lead, each with a transcript and analysis."""
+    start = db.query(Call).count()
+    for call_id in range(start + 1, start + count + 1):
+        db.add(Call(
+            call_id=call_id, company_id=TENANT, contact_card_id="card_1",
+            lead_id="lead_1" if call_id % 2 else None, created_at=NOW - timedelta(minutes=call_id),
+        ))
+        db.flush()
+        db.add_all([
+            CallTranscript(
+                id=f"tr_{call_id}", call_id=call_id, tenant_id=TENANT, uwc_job_id=f"job_{call_id}",
+                transcript_text="Hello",
+            ),
+            CallAnalysis(
+                id=f"an_{call_id}", call_id=call_id, tenant_id=TENANT, uwc_job_id=f"job_{call_id}",
+                objections=["price"], analyzed_at=NOW,
+            ),
+        ])
+    db.commit()
+
+
+def _request():
+    return SimpleNamespace(state=SimpleNamespace(tenant_id=TENANT, user_id="mgr", user_role="manager"))
+
+
+def test_ai_search_runs_a_fixed_number_of_statements(db, query_budget):
+    _add_calls(db, 10)
+
+    # count, page, aggregates
+    with query_budget(3):
+        result = search_calls(
+            AISearchRequest(filters=AISearchFilters()),
+            ctx=AIInternalContext(company_id=TENANT, token="test"),
+            db=db,
+        )
+
+    assert len(result.calls) == 10
+    assert {c.appointment_id for c in result.calls} == {"appt_1", None}
+    assert result.aggregates.calls_with_objections == 10
+
+
+def test_contact_card_statements_do_not_grow_with_calls(db, query_budget):
+    _add_calls(db, 1)
+    contact = db.get(ContactCard, "card_1")
+    with query_budget(40) as few:
+        contact_card_assembler.assemble_contact_card(db=db, contact=contact, company_id=TENANT)
+
+    _add_calls(db, 9)
+    db.expire_all()
+    contact = db.get(ContactCard, "card_1")
+    with query_budget(40) as many:
+        card = contact_card_assembler.assemble_contact_card(db=db, contact=contact, company_id=TENANT)
+
+    assert len(card.bottom_section.call_recordings) == 10
+    assert all(c.transcript and c.analysis for c in card.bottom_section.call_recordings)
+    assert many.statements == few.statements
+
+
+def test_listings_stay_within_budget(db, query_budget):
+    for i in range(2, 12):
+        db.add(Lead(id=f"lead_{i}", company_id=TENANT, contact_card_id="card_1"))
+        db.add(Appointment(
+            id=f"appt_{i}", lead_id=f"lead_{i}", company_id=TENANT, contact_card_id="card_1",
+            scheduled_start=DAY + timedelta(minutes=i),
+        ))
+    db.commit()
+
+    # total, leads page, contact cards
+    with query_budget(3):
+        leads = asyncio.run(list_leads(
+            request=_request(), db=db, status=None, rep_id=None, source=None, date_from=None,
+            date_to=None, search=None, limit=50, offset=0, cursor=None, include_total=True,
+        )).data
+    # appointments page, total, contact cards, leads, pending task counts
+    with query_budget(5):
+        appointments = asyncio.run(list_appointments(
+            request=_request(), db=db, rep_id=None, date=DAY.strftime("%Y-%m-%d"),
+            status=None, outcome=None, limit=None, cursor=None,
+        )).data
+
+    assert leads["total"] == 11
+    assert appointments.total == 10
@@ -0,0 +1,94 @@
+"""
+Unit tests for pipelined EventBus publishing and the buffered emitter.
+"""
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.realtime.bus import BufferedEventEmitter, EventBus
+
+
+@pytest.fixture(autouse=True)
+def streams_disabled():
+    with patch("app.realtime.bus.settings.EVENT_STREAM_ENABLED", False):
+        yield
+
+
+def _make_bus(replies=None):
+    bus = EventBus.__new__(EventBus)
+    bus.redis_url = None
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+    pipe.execute.side_effect = lambda raise_on_error=True: replies.pop(0) if replies else [1] * pipe.publish.call_count
+    bus._redis_client = client
+    return bus, client, pipe
+
+
+def test_emit_publishes_all_channels_in_one_round_trip():
+    bus, client, pipe = _make_bus()
+
+    assert bus.emit("lead.updated", {"x": 1}, tenant_id="t1", user_id="u1", lead_id="l1") is True
+
+    client.pipeline.assert_called_once_with(transaction=False)
+    channels = [c.args[0] for c in pipe.publish.call_args_list]
+    assert channels == ["tenant:t1:events", "user:u1:tasks", "lead:l1:timeline"]
+    assert pipe.execute.call_count == 1
+    client.publish.assert_not_called()
+
+
+def test_emit_many_reports_per_event_results():
+    replies = [[1, 1, RuntimeError("boom")]]
+    bus, client, pipe = _make_bus(replies)
+
+    results = bus.emit_many([
+        {"event_name": "a.b", "payload": {}, "tenant_id": "t1", "lead_id": "l1"},
+        {"event_name": "c.d", "payload": {}, "tenant_id": "t2"},
+    ])
+
+    # First event reached its tenant channel; second event's only channel failed
+    assert results == [True, False]
+    assert pipe.execute.call_count == 1
+    envelope = json.loads(pipe.publish.call_args_list[0].args[1])
+    assert envelope["event"] == "a.b"
+
+
+def test_emit_many_without_redis_returns_false():
+    bus = EventBus.__new__(EventBus)
+    bus._redis_client = None
+
+    assert bus.emit_many([{"event_name": "a.b", "payload": {}, "tenant_id": "t1"}]) == [False]
+
+
+def test_buffered_emitter_flushes_on_size_and_stop():
+    bus = MagicMock()
+    bus.emit_many.side_effect = lambda batch: [True] * len(batch)
+
+    async def run():
+        emitter = BufferedEventEmitter(bus, max_batch_size=3, flush_interval=60)
+        await emitter.start()
+        for i in range(4):
+            await emitter.emit("a.b", {"i": i}, tenant_id="t1")
+        await emitter.stop()
+
+    asyncio.run(run())
+
+    batch_sizes = [len(c.args[0]) for c in bus.emit_many.call_args_list]
+    assert batch_sizes == [3, 1]
+
+
+def test_buffered_emitter_flushes_on_interval():
+    bus = MagicMock()
+    bus.emit_many.side_effect = lambda batch: [True] * len(batch)
+
+    async def run():
+        emitter = BufferedEventEmitter(bus, max_batch_size=100, flush_interval=0.01)
+        await emitter.start()
+        await emitter.emit("a.b", {}, tenant_id="t1")
+        await asyncio.sleep(0.05)
+        flushed = bus.emit_many.call_count
+        await emitter.stop()
+        return flushed
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,118 @@
+"""
+Unit tests for the per-tenant event stream and WebSocketHub resume_from replay.
+"""
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+from app.realtime.bus import EventBus, event_stream_key, stream_id_key
+from app.realtime.hub import WebSocketConnection, WebSocketHub
+
+
+class FakeStreamRedis:
+    """Async XRANGE over an in-memory list of (id, fields) entries."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    async def xrange(self, name, min="-", max="+", count=None):
+        low = None if min == "-" else stream_id_key(min)
+        matched = [e for e in self.entries if low is None or stream_id_key(e[0]) >= low]
+        return matched[:count] if count else matched
+
+
+def _entry(stream_id, channels, event):
+    return (stream_id, {"channels": ",".join(channels), "message": json.dumps({"event": event})})
+
+
+def _make_hub(entries):
+    hub = WebSocketHub()
+    hub._redis_client = FakeStreamRedis(entries)
+    connection = WebSocketConnection(MagicMock(), "conn-1", "t1", "u1", "trace")
+    hub.connections["conn-1"] = connection
+    return hub, connection
+
+
+def _drain(connection):
+    messages = []
+    while not connection.message_queue.empty():
+        messages.append(connection.message_queue.get_nowait())
+    return messages
+
+
+def test_emit_appends_to_tenant_stream_and_tags_stream_id():
+    bus = EventBus.__new__(EventBus)
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+    pipe.execute.side_effect = [["1700000000000-0"], [1]]
+    bus._redis_client = client
+
+    assert bus.emit("lead.updated", {"x": 1}, tenant_id="t1") is True
+
+    name, fields = pipe.xadd.call_args.args
+    assert name == event_stream_key("t1")
+    assert fields["channels"] == "tenant:t1:events"
+    assert pipe.xadd.call_args.kwargs["approximate"] is True
+    published = json.loads(pipe.publish.call_args.args[1])
+    assert published["stream_id"] == "1700000000000-0"
+    assert published["event"] == "lead.updated"
+
+
+def test_resume_replays_only_missed_events_for_channel():
+    entries = [
+        _entry("100-0", ["tenant:t1:events"], "old"),
+        _entry("101-0", ["tenant:t1:events", "user:u2:tasks"], "missed"),
+        _entry("102-0", ["user:u2:tasks"], "other-channel"),
+        _entry("103-0", ["tenant:t1:events"], "missed-2"),
+    ]
+    hub, connection = _make_hub(entries)
+
+    async def run():
+        await hub.subscribe_to_channel("conn-1", "tenant:t1:events", resume_from="100-0")
+        # Live copies arriving during replay: one duplicate, one new
+        await hub._distribute_message("tenant:t1:events", {"event": "missed-2", "stream_id": "103-0"})
+        await hub._distribute_message("tenant:t1:events", {"event": "live", "stream_id": "104-0"})
+        return await hub.replay_channel("conn-1", "tenant:t1:events", "100-0")
+
+    result = asyncio.run(run())
+
+    events = [m.get("event") for m in _drain(connection) if "event" in m]
+    assert events == ["missed", "missed-2", "live"]
+    assert result["replayed"] == 2
+    assert result["truncated"] is False
+    assert result["stream_id"] == "103-0"
+    assert connection.replay_buffers == {}
+
+
+def test_resume_from_trimmed_cursor_is_truncated():
+    hub, connection = _make_hub([_entry("200-0", ["tenant:t1:events"], "a")])
+
+    result = asyncio.run(hub.replay_channel("conn-1", "tenant:t1:events", "100-0"))
+
+    assert result["truncated"] is True
+    assert result["replayed"] == 1
+
+
+def test_replay_limit_marks_truncated():
+    entries = [_entry(f"{100 + i}-0", ["tenant:t1:events"], str(i)) for i in range(5)]
+    hub, connection = _make_hub(entries)
+
+    with patch("app.realtime.hub.settings.EVENT_STREAM_REPLAY_LIMIT", 2):
+        result = asyncio.run(hub.replay_channel("conn-1", "tenant:t1:events", "100-0"))
+
+    assert result["replayed"] == 2
+    assert result["truncated"] is True
+
+
+def test_invalid_cursor_releases_held_messages():
+    hub, connection = _make_hub([])
+
+    async def run():
+        await hub.subscribe_to_channel("conn-1", "tenant:t1:events", resume_from="garbage")
+        await hub._distribute_message("tenant:t1:events", {"event": "live", "stream_id": "5-0"})
+        return await hub.replay_channel("conn-1", "tenant:t1:events", "garbage")
+
+    result = asyncio.run(run())
+
+    assert result["truncated"] is True
+    assert [m.get("event") for m in _drain(connection) if "event" in m] == ["live"]
@@ -0,0 +1,113 @@
+"""
+Unit tests for the geocoding cache and batch geocoder.
+
+Provider calls and the geocode_cache table are patched out so these run
+without network or database access.
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from app.services.geocoding_service import GeocodingService, _LRUCache, _RateLimiter
+
+
+class TestNormalizeAddress:
+    def test_formatting_variants_share_key(self):
+        a = GeocodingService.normalize_address("123 Main St., Austin,TX  78701")
+        b = GeocodingService.normalize_address("  123 main st , austin, tx 78701 ")
+        assert a == b == "123 main st, austin, tx 78701"
+
+    def test_empty_address(self):
+        assert GeocodingService.normalize_address(None) == ""
+        assert GeocodingService.normalize_address("   ") == ""
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = _LRUCache(max_size=2)
+        cache.set("a", (1.0, 1.0))
+        cache.set("b", (2.0, 2.0))
+        cache.get("a")
+        cache.set("c", (3.0, 3.0))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == (1.0, 1.0)
+        assert len(cache) == 2
+
+
+class TestRateLimiter:
+    def test_reserve_spaces_requests(self):
+        limiter = _RateLimiter(qps=10)
+        delays = [limiter.reserve() for _ in range(3)]
+
+        assert delays[0] == 0
+        assert 0.09 < delays[1] <= 0.1
+        assert 0.19 < delays[2] <= 0.2
+
+
+class TestGeocodeBatch:
+    def test_cache_hits_skip_providers_and_duplicates_geocoded_once(self):
+        service = GeocodingService()
+        service._memory_cache.clear()
+        cached_key = service.normalize_address("1 Cached Rd, Austin TX")
+
+        provider = AsyncMock(return_value=((30.0, -97.0), "nominatim"))
+        with patch.object(service, "_lookup_cached", return_value={cached_key: (1.0, 2.0)}), \
+                patch.object(service, "_store_cached") as store, \
+                patch.object(service, "_geocode_uncached_async", provider):
+            result = asyncio.run(service.geocode_batch([
+                "1 Cached Rd, Austin TX",
+                "2 New St, Austin TX",
+                "2 new st., austin tx",
+            ]))
+
+        assert result["1 Cached Rd, Austin TX"] == (1.0, 2.0)
+        assert result["2 New St, Austin TX"] == (30.0, -97.0)
+        assert result["2 new st., austin tx"] == (30.0, -97.0)
+        assert provider.await_count == 1
+        store.assert_called_once_with({"2 new st, austin tx": ((30.0, -97.0), "nominatim")})
+
+    def test_failed_lookups_are_not_cached(self):
+        service = GeocodingService()
+
+        with patch.object(service, "_lookup_cached", return_value={}), \
+                patch.object(service, "_store_cached") as store, \
+                patch.object(service, "_geocode_uncached_async", AsyncMock(return_value=None)):
+            result = asyncio.run(service.geocode_batch(["Nowhere"]))
+
+        assert result == {"Nowhere": None}
+        store.assert_not_called()
+
+
+class TestCacheTierWrites:
+    def test_batch_hits_are_counted_in_one_update(self):
+        from sqlalchemy import create_engine, event
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+
+        from app.models.geocode_cache import GeocodeCache
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        GeocodeCache.__table__.create(engine)
+        session_factory = sessionmaker(bind=engine)
+        db = session_factory()
+        db.add_all([
+            GeocodeCache(normalized_address=f"{i} main st", latitude=30.0 + i, longitude=-97.0, provider="google")
+            for i in range(3)
+        ])
+        db.commit()
+
+        updates = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statement.startswith("UPDATE") and updates.append(statement))
+
+        service = GeocodingService()
+        service._memory_cache.set("0 main st", (30.0, -97.0))
+        with patch("app.database.SessionLocal", session_factory), \
+                patch.object(service, "_geocode_uncached_async", AsyncMock(return_value=None)):
+            result = asyncio.run(service.geocode_batch(["0 Main St", "1 Main St", "2 Main St", "9 Nowhere"]))
+
+        assert result["1 Main St"] == (31.0, -97.0)
+        assert len(updates) == 1
+        db.expire_all()
+        assert sorted(row.hit_count for row in db.query(GeocodeCache)) == [1, 1, 1]
+        db.close()
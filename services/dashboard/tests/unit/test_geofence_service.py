@@ -0,0 +1,142 @@
+"""
+Unit tests for geofence storage, point resolution and batched event ingestion.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from app.models.call import Call
+from app.models.company import Company
+from app.models.geofence import Geofence, GeofenceEvent
+from app.models.sales_rep import SalesRep
+from app.routes.mobile_routes.location_geofence_stuff import log_geofence_event
+from app.services.geofence_service import GeofenceService
+
+HOME = (30.2672, -97.7431)
+NEIGHBOR = (30.2690, -97.7431)  # ~200 m north: inside a 250 m fence
+ACROSS_TOWN = (30.3500, -97.7000)
+T0 = datetime(2025, 6, 2, 14)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add_all([
+        Company(id="company_1", name="Roofing Co"),
+        SalesRep(user_id="rep_1", company_id="company_1"),
+        SalesRep(user_id="rep_2", company_id="company_1"),
+        Call(call_id=1, company_id="company_1", assigned_rep_id="rep_1", address="1 Home St", booked=True),
+        Call(call_id=2, company_id="company_1", assigned_rep_id="rep_1", address="2 Far Rd", booked=True),
+        Call(call_id=3, company_id="company_1", assigned_rep_id="rep_2", address="1 Home St", booked=True),
+        Call(call_id=4, company_id="company_1", assigned_rep_id="rep_1", address="4 Gone Ln", booked=True, cancelled=True),
+    ])
+    sqlite_db.commit()
+    calls = {c.call_id: c for c in sqlite_db.query(Call)}
+    GeofenceService(sqlite_db).upsert_call_geofences([
+        (calls[1], *HOME), (calls[2], *ACROSS_TOWN), (calls[3], *HOME), (calls[4], *HOME),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def test_resolve_matches_only_the_reps_active_geofences(db):
+    service = GeofenceService(db)
+
+    at_home, nearby, far, nowhere = service.resolve("rep_1", [HOME, NEIGHBOR, ACROSS_TOWN, (30.0, -97.0)])
+
+    # Call 3 is rep_2's and call 4 is cancelled
+    assert [g.call_id for g in at_home] == [1]
+    assert [g.call_id for g in nearby] == [1]
+    assert [g.call_id for g in far] == [2]
+    assert nowhere == []
+    assert db.get(Call, 1).geofence["radius"] == 250
+
+
+def test_sync_rep_follows_reassignment_without_touching_rep_rows(db):
+    db.query(Call).filter(Call.call_id == 3).update({Call.assigned_rep_id: "rep_1"})
+    service = GeofenceService(db)
+
+    assert service.sync_rep("rep_1") == 3
+    service.sync_rep("rep_2")
+    db.commit()
+
+    assert sorted(g.call_id for g in service.active_for_rep("rep_1")) == [1, 2, 3]
+    assert service.active_for_rep("rep_2") == []
+    assert db.get(SalesRep, "rep_1").active_geofences is None
+
+
+def test_samples_become_entry_and_exit_events(db, query_budget):
+    samples = [
+        {"timestamp": T0 + timedelta(minutes=m), "latitude": lat, "longitude": lng, "battery_percentage": 80}
+        for m, (lat, lng) in enumerate([ACROSS_TOWN] * 5 + [HOME] * 40 + [NEIGHBOR] * 5 + [(30.0, -97.0)] * 10)
+    ]
+
+    with query_budget(8):
+        result = GeofenceService(db).ingest_events("company_1", "rep_1", samples)
+
+    assert result["received"] == 60
+    assert [(e["call_id"], e["event_type"]) for e in result["events"]] == [
+        (2, "entry"), (2, "exit"), (1, "entry"), (1, "exit"),
+    ]
+    home = db.get(Call, 1)
+    assert home.geofence_entry_1_ts == T0 + timedelta(minutes=5)
+    assert home.geofence_exit_1_ts == T0 + timedelta(minutes=50)
+    assert home.geofence_time_1_m == 45
+    assert home.battery_at_geofence_entry == 80
+    assert db.query(GeofenceEvent).filter(GeofenceEvent.source == "server").count() == 4
+
+
+def test_state_carries_across_batches_and_client_events(db):
+    service = GeofenceService(db)
+    service.ingest_events("company_1", "rep_1", [{"timestamp": T0, "latitude": HOME[0], "longitude": HOME[1]}])
+
+    # Still inside: no new event; then the device reports the exit itself
+    result = service.ingest_events("company_1", "rep_1", [
+        {"timestamp": T0 + timedelta(minutes=1), "latitude": NEIGHBOR[0], "longitude": NEIGHBOR[1]},
+        {"timestamp": T0 + timedelta(minutes=30), "event_type": "exit", "call_id": 1},
+    ])
+    assert [(e["event_type"], e["source"]) for e in result["events"]] == [("exit", "client")]
+
+    # A later sample at home is a fresh entry
+    result = service.ingest_events("company_1", "rep_1", [
+        {"timestamp": T0 + timedelta(minutes=40), "latitude": HOME[0], "longitude": HOME[1]},
+    ])
+    assert [e["event_type"] for e in result["events"]] == ["entry"]
+    assert db.get(Call, 1).geofence_entry_count == 2
+    assert db.query(Geofence).count() == 4
+
+
+def test_only_the_reps_own_geofences_in_the_tenant_count(db):
+    db.add_all([Company(id="company_2", name="Other Co"), Call(call_id=5, company_id="company_2", assigned_rep_id="rep_1", booked=True)])
+    db.flush()
+    GeofenceService(db).upsert_call_geofences([(db.get(Call, 5), *HOME)])
+    db.commit()
+    service = GeofenceService(db)
+
+    result = service.ingest_events("company_1", "rep_1", [
+        {"timestamp": T0, "event_type": "entry", "call_id": 3},  # rep_2's
+        {"timestamp": T0, "event_type": "entry", "call_id": 5},  # another tenant's
+        {"timestamp": T0 + timedelta(minutes=1), "latitude": HOME[0], "longitude": HOME[1]},
+    ])
+
+    assert [(e["call_id"], e["source"]) for e in result["events"]] == [(1, "server")]
+    assert not db.get(Call, 3).geofence_entry_count and not db.get(Call, 5).geofence_entry_count
+    assert sorted(g.call_id for g in service.active_for_rep("rep_1", tenant_id="company_1")) == [1, 2]
+
+
+def test_single_event_route_takes_offset_timestamps_and_rejects_unknown_geofences(db):
+    def log(call_id, timestamp):
+        return asyncio.run(log_geofence_event(
+            request=SimpleNamespace(state=SimpleNamespace(user_id="rep_1", user_role="sales_rep")),
+            data={"event_type": "entry", "call_id": call_id, "rep_id": "rep_1", "timestamp": timestamp},
+            background_tasks=BackgroundTasks(), tenant_id="company_1", db=db,
+        ))
+
+    assert log(1, "2025-06-02T10:00:00-04:00")["timestamp"] == "2025-06-02T14:00:00"
+    assert db.get(Call, 1).geofence_entry_1_ts == T0
+
+    with pytest.raises(HTTPException) as exc:
+        log(3, "2025-06-02T14:00:00Z")  # rep_2's call
+    assert exc.value.status_code == 404
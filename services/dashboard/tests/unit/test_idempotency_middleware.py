@@ -0,0 +1,143 @@
+"""
+Unit tests for the Redis fast path in IdempotencyMiddleware.
+
+Uses an in-memory stand-in for redis.asyncio and patches out the
+Postgres audit write so no external services are needed.
+"""
+import asyncio
+import json
+from unittest.mock import patch
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.idempotency import IdempotencyMiddleware
+
+
+class FakeAsyncRedis:
+    """Minimal async Redis supporting SET NX/EX, GET and DELETE."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+def _make_request(key="idem-key-123456"):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/things",
+        "headers": [(b"idempotency-key", key.encode())],
+        "query_string": b"",
+        "state": {"tenant_id": "tenant_1"},
+    }
+    return Request(scope)
+
+
+def _make_middleware():
+    middleware = IdempotencyMiddleware(redis_url=None, poll_interval_seconds=0.01)
+    middleware.redis_client = FakeAsyncRedis()
+    return middleware
+
+
+@patch("app.core.idempotency._persist_idempotency_record")
+def test_duplicate_replays_cached_response(persist):
+    middleware = _make_middleware()
+    calls = []
+
+    async def call_next(request):
+        calls.append(request)
+        return JSONResponse({"id": len(calls)}, status_code=201)
+
+    async def run():
+        first = await middleware(_make_request(), call_next)
+        second = await middleware(_make_request(), call_next)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert first.status_code == second.status_code == 201
+    assert json.loads(second.body) == {"id": 1}
+
+
+@patch("app.core.idempotency._persist_idempotency_record")
+def test_concurrent_duplicate_waits_for_first(persist):
+    middleware = _make_middleware()
+    calls = []
+
+    async def slow_call_next(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return JSONResponse({"ok": True})
+
+    async def run():
+        return await asyncio.gather(
+            middleware(_make_request(), slow_call_next),
+            middleware(_make_request(), slow_call_next),
+        )
+
+    responses = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [200, 200]
+
+
+@patch("app.core.idempotency._persist_idempotency_record")
+def test_server_error_releases_key(persist):
+    middleware = _make_middleware()
+    statuses = iter([500, 200])
+
+    async def call_next(request):
+        return JSONResponse({}, status_code=next(statuses))
+
+    async def run():
+        first = await middleware(_make_request(), call_next)
+        second = await middleware(_make_request(), call_next)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert (first.status_code, second.status_code) == (500, 200)
+    assert persist.call_count == 1
+    assert persist.call_args.args[5] == 200
+
+
+@patch("app.core.idempotency._persist_idempotency_record")
+def test_redis_failure_after_handler_does_not_rerun_it(persist):
+    import redis
+
+    middleware = _make_middleware()
+    fake = middleware.redis_client
+    reserve = fake.set
+
+    async def set_then_fail(key, value, nx=False, ex=None):
+        if nx:
+            return await reserve(key, value, nx=nx, ex=ex)
+        raise redis.ConnectionError("connection lost")
+
+    fake.set = set_then_fail
+    calls = []
+
+    async def call_next(request):
+        calls.append(request)
+        return JSONResponse({"id": len(calls)}, status_code=201)
+
+    with patch.object(middleware, "_handle_with_database") as database_path:
+        response = asyncio.run(middleware(_make_request(), call_next))
+
+    assert len(calls) == 1
+    assert response.status_code == 201
+    database_path.assert_not_called()
+    assert persist.call_count == 1
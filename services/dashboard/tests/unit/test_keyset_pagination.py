@@ -0,0 +1,112 @@
+"""
+Unit tests for cursor (keyset) pagination on lead and appointment listings.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.appointment import Appointment
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.lead import Lead
+from app.models.task import Task, TaskAssignee, TaskSource
+from app.routes.appointments import list_appointments
+from app.routes.leads import list_leads
+
+TENANT = "company_1"
+DAY = datetime(2025, 6, 2)
+
+
+def _request():
+    return SimpleNamespace(state=SimpleNamespace(tenant_id=TENANT, user_id="mgr", user_role="manager"))
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add(Company(id=TENANT, name="Roofing Co"))
+    for i in range(7):
+        card = ContactCard(
+            id=f"card_{i}", company_id=TENANT, primary_phone=f"+1555000000{i}",
+            first_name="Jane" if i % 2 else "Omar", last_name=f"Doe{i}",
+        )
+        # Leads 2 and 3 share a created_at so the id tiebreak matters
+        created_at = DAY - timedelta(hours=2 if i == 3 else i)
+        sqlite_db.add_all([card, Lead(id=f"lead_{i}", company_id=TENANT, contact_card_id=card.id, created_at=created_at)])
+    for i in range(5):
+        sqlite_db.add(Appointment(
+            id=f"appt_{i}", lead_id=f"lead_{i}", company_id=TENANT,
+            scheduled_start=DAY + timedelta(hours=9 + i // 2),
+        ))
+        sqlite_db.add(Task(
+            company_id=TENANT, appointment_id=f"appt_{i}", description="Call back",
+            assigned_to=TaskAssignee.REP, source=TaskSource.MANUAL,
+        ))
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def _list_leads(db, **params):
+    kwargs = dict(
+        status=None, rep_id=None, source=None, date_from=None, date_to=None, search=None,
+        limit=50, offset=0, cursor=None, include_total=True,
+    )
+    kwargs.update(params)
+    return asyncio.run(list_leads(request=_request(), db=db, **kwargs)).data
+
+
+def _list_appointments(db, **params):
+    kwargs = dict(rep_id=None, date=DAY.strftime("%Y-%m-%d"), status=None, outcome=None, limit=None, cursor=None)
+    kwargs.update(params)
+    return asyncio.run(list_appointments(request=_request(), db=db, **kwargs)).data
+
+
+def test_cursor_round_trip():
+    ts = datetime(2025, 6, 2, 10, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(ts, "lead_1")) == (ts, "lead_1")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_lead_pages_follow_created_at_then_id(db):
+    seen, cursor = [], None
+    while True:
+        page = _list_leads(db, limit=3, cursor=cursor)
+        assert page["total"] == 7
+        seen += [item["lead_id"] for item in page["leads"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["lead_0", "lead_1", "lead_3", "lead_2", "lead_4", "lead_5", "lead_6"]
+
+
+def test_lead_search_matches_names_and_phone_digits(db):
+    by_name = _list_leads(db, search="doe4", include_total=False)
+    by_phone = _list_leads(db, search="(555) 000-0005")
+
+    assert [item["lead_id"] for item in by_name["leads"]] == ["lead_4"]
+    assert by_name["total"] is None
+    assert [item["lead_id"] for item in by_phone["leads"]] == ["lead_5"]
+
+
+def test_invalid_cursor_is_rejected(db):
+    with pytest.raises(HTTPException) as exc:
+        _list_leads(db, cursor="garbage")
+    assert exc.value.status_code == 400
+
+
+def test_appointment_pages_batch_pending_task_counts(db, query_budget):
+    first = _list_appointments(db, limit=2)
+    # appointments, contact cards, leads, pending task counts
+    with query_budget(4):
+        second = _list_appointments(db, limit=2, cursor=first.next_cursor)
+    everything = _list_appointments(db)
+
+    assert [a.appointment_id for a in first.appointments] == ["appt_0", "appt_1"]
+    assert [a.appointment_id for a in second.appointments] == ["appt_2", "appt_3"]
+    assert first.total == 5 and everything.total == 5 and everything.next_cursor is None
+    assert all(a.pending_tasks_count == 1 for a in everything.appointments)
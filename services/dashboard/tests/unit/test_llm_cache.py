@@ -0,0 +1,109 @@
+"""
+Unit tests for the content-addressed LLM response cache.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.llm_cache import LLMResponseCache
+
+REQUEST = {
+    "model": "gpt-4o",
+    "messages": [{"role": "user", "content": "Summarize this transcript"}],
+    "response_format": {"type": "json_object"},
+}
+
+
+def completion(content, total_tokens=120):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=total_tokens),
+    )
+
+
+def tokens_saved(tenant_id):
+    return REGISTRY.get_sample_value(
+        "llm_tokens_saved_total", {"tenant_id": tenant_id, "model": "gpt-4o"}
+    ) or 0
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # No REDIS_URL in tests, so the disk tier serves every hit
+    return LLMResponseCache(disk_dir=str(tmp_path), disk_max_entries=3)
+
+
+def test_identical_requests_are_served_from_cache(cache):
+    send = Mock(return_value=completion('{"ok": true}'))
+    saved_before = tokens_saved("tenant_cache")
+
+    first = cache.complete("transcript_analysis", REQUEST, send, tenant_id="tenant_cache")
+    # Key order and dict identity don't matter, only content
+    second = cache.complete("transcript_analysis", dict(reversed(list(REQUEST.items()))), send, tenant_id="tenant_cache")
+
+    assert first == second == '{"ok": true}'
+    send.assert_called_once_with(REQUEST)
+    assert tokens_saved("tenant_cache") - saved_before == 120
+
+    # A fresh cache instance reads the same disk entry (e.g. after a restart)
+    fresh = LLMResponseCache(disk_dir=cache.disk_dir)
+    assert fresh.complete("transcript_analysis", REQUEST, send) == '{"ok": true}'
+    assert send.call_count == 1
+
+
+def test_changed_inputs_opt_out_and_expiry_miss(cache):
+    send = Mock(side_effect=lambda r: completion(f"reply {send.call_count}"))
+    cache.complete("transcript_analysis", REQUEST, send)
+
+    cache.complete("transcript_analysis", {**REQUEST, "temperature": 0.7}, send)
+    cache.complete("property_intelligence", REQUEST, send)  # Use cases don't share entries
+    assert cache.complete("transcript_analysis", REQUEST, send, cache=False) == "reply 4"
+    assert send.call_count == 4
+
+    with patch("app.services.llm_cache.time.time", return_value=4_000_000_000):
+        assert cache.complete("transcript_analysis", REQUEST, send) == "reply 5"
+
+
+def test_invalidate_forces_a_new_request(cache):
+    send = Mock(side_effect=[completion("not json"), completion('{"ok": true}')])
+    cache.complete("transcript_analysis", REQUEST, send)
+
+    cache.invalidate("transcript_analysis", REQUEST)
+
+    assert cache.complete("transcript_analysis", REQUEST, send) == '{"ok": true}'
+    assert send.call_count == 2
+
+
+def test_async_completion_and_disk_pruning(cache, tmp_path):
+    send = AsyncMock(side_effect=lambda r: completion(r["messages"][0]["content"].upper()))
+
+    async def run():
+        for i in range(5):
+            request = {**REQUEST, "messages": [{"role": "user", "content": f"prompt {i}"}]}
+            assert await cache.acomplete("call_insights", request, send) == f"PROMPT {i}"
+        return await cache.acomplete("call_insights", {**REQUEST, "messages": [{"role": "user", "content": "prompt 0"}]}, send)
+
+    assert asyncio.run(run()) == "PROMPT 0"
+    assert send.await_count == 5
+
+    assert cache.prune_disk() == 2
+    assert len(list(tmp_path.glob("*.json"))) == 3
+
+
+def test_disk_tier_requires_a_private_directory(tmp_path):
+    send = Mock(return_value=completion('{"ok": true}'))
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+
+    LLMResponseCache(disk_dir=str(shared)).complete("transcript_analysis", REQUEST, send)
+    assert list(shared.iterdir()) == []
+
+    # Missing directories are created owner-only
+    private = tmp_path / "private"
+    LLMResponseCache(disk_dir=str(private)).complete("transcript_analysis", REQUEST, send)
+    assert private.stat().st_mode & 0o777 == 0o700
+    assert len(list(private.glob("*.json"))) == 1
@@ -0,0 +1,82 @@
+"""
+Unit tests for the structured logging pipeline: combined PII redaction,
+per-logger sampling and the queue-based handler.
+"""
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from app.obs.logging import (
+    LogSamplingFilter,
+    NonBlockingQueueHandler,
+    PIIRedactor,
+    StructuredFormatter,
+    parse_sample_rates,
+)
+
+
+def _record(name="app.realtime.bus", level=logging.INFO, msg="event"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_redacts_phones_and_emails_in_one_pass():
+    redactor = PIIRedactor(enabled=True)
+
+    message = "Call from 555-123-4567 / (555) 987-6543 / +44 7911 123 456, reply to jane.doe@example.com"
+
+    assert redactor.redact(message) == (
+        "Call from [REDACTED_PHONE] / [REDACTED_PHONE] / [REDACTED_PHONE], reply to [REDACTED_EMAIL]"
+    )
+    assert redactor.redact("Task completed: analyze_call") == "Task completed: analyze_call"
+    assert PIIRedactor(enabled=False).redact("555-123-4567") == "555-123-4567"
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("app.realtime=0.1, app.routes.sms_handler=2,bad") == {
+        "app.realtime": 0.1,
+        "app.routes.sms_handler": 1.0,
+    }
+    assert parse_sample_rates("") == {}
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings():
+    sampler = LogSamplingFilter({"app.realtime": 0.0, "app.realtime.hub": 1.0})
+
+    assert sampler.filter(_record("app.realtime.bus")) is False
+    assert sampler.filter(_record("app.realtime.hub")) is True
+    assert sampler.filter(_record("app.routes.calls")) is True
+    assert sampler.filter(_record("app.realtime.bus", level=logging.WARNING)) is True
+
+
+def test_queue_handler_formats_on_listener_thread():
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(StructuredFormatter(redact_pii=True))
+    queue_handler = NonBlockingQueueHandler(queue.SimpleQueue())
+    listener = logging.handlers.QueueListener(queue_handler.queue, target)
+
+    logger = logging.getLogger("test.log_pipeline")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler)
+
+    listener.start()
+    try:
+        payload = {"phone": "555-123-4567"}
+        logger.info("Webhook payload %s", payload, extra={"tenant_id": "t1"})
+        payload["phone"] = "changed"
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            logger.exception("Processing failed")
+    finally:
+        listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "Webhook payload {'phone': '[REDACTED_PHONE]'}"
+    assert first["tenant_id"] == "t1"
+    assert second["error_type"] == "ValueError"
+    assert "bad input" in second["stack_trace"]
@@ -0,0 +1,86 @@
+"""
+Unit tests for Prometheus label bounding and multiprocess registry selection.
+"""
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from app.obs import metrics as metrics_module
+from app.obs.metrics import (
+    OVERFLOW_LABEL,
+    UNMATCHED_ROUTE,
+    LabelCardinalityGuard,
+    channel_template,
+    collect_registry,
+    route_template,
+)
+from app.obs.middleware import ObservabilityMiddleware
+
+
+def test_guard_folds_values_beyond_limit():
+    guard = LabelCardinalityGuard(max_values=2)
+
+    assert guard.bound("llm_tokens_total", "tenant_id", "t1") == "t1"
+    assert guard.bound("llm_tokens_total", "tenant_id", "t2") == "t2"
+    assert guard.bound("llm_tokens_total", "tenant_id", "t3") == OVERFLOW_LABEL
+    # Values already admitted keep their own series
+    assert guard.bound("llm_tokens_total", "tenant_id", "t1") == "t1"
+    # Limits are tracked per (metric, label)
+    assert guard.bound("asr_minutes_total", "tenant_id", "t3") == "t3"
+
+
+def test_tenant_labels_overflow_into_single_series():
+    guard = LabelCardinalityGuard(max_values=1)
+    with patch.object(metrics_module, "label_guard", guard):
+        metrics_module.record_asr_minutes("tenant-a", 1.0)
+        metrics_module.record_asr_minutes("tenant-b", 2.0)
+        metrics_module.record_asr_minutes("tenant-c", 3.0)
+
+    overflow = REGISTRY.get_sample_value("asr_minutes_total", {"tenant_id": OVERFLOW_LABEL})
+    assert overflow is not None and overflow >= 5.0
+    assert REGISTRY.get_sample_value("asr_minutes_total", {"tenant_id": "tenant-c"}) is None
+
+
+def test_channel_template_collapses_entity_ids():
+    assert channel_template("tenant:abc123:events") == "tenant:{id}:events"
+    assert channel_template("user:u_9:tasks") == "user:{id}:tasks"
+    assert channel_template("lead:42:timeline") == "lead:{id}:timeline"
+    assert channel_template("system") == "system"
+
+
+def test_route_template_from_scope():
+    class Route:
+        path = "/api/v1/calls/{call_id}"
+
+    assert route_template({"route": Route()}) == "/api/v1/calls/{call_id}"
+    assert route_template({"route": Route(), "root_path": "/mobile"}) == "/mobile/api/v1/calls/{call_id}"
+    assert route_template({}) == UNMATCHED_ROUTE
+
+
+def test_middleware_records_matched_template():
+    app = FastAPI()
+    app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    with patch("app.obs.middleware.record_http_request") as record:
+        client = TestClient(app)
+        client.get("/items/123")
+        client.get("/nope/456")
+
+    routes = [call.kwargs["route"] for call in record.call_args_list]
+    assert routes == ["/items/{item_id}", UNMATCHED_ROUTE]
+
+
+def test_collect_registry_aggregates_in_multiprocess_mode(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    assert collect_registry() is REGISTRY
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    registry = collect_registry()
+    assert isinstance(registry, CollectorRegistry)
+    assert registry is not REGISTRY
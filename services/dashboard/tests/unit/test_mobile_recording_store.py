@@ -0,0 +1,108 @@
+"""
+Unit tests for shared mobile recording session state and the audio processing task.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.models.call import Call
+from app.models.company import Company
+from app.routes.mobile_routes.audio_routes import _get_session_or_404
+from app.services import mobile_recording_store
+from app.tasks.asr_tasks import process_recording_audio
+
+UWC_RESPONSE = {
+    "results": {
+        "channels": [{"alternatives": [{
+            "transcript": "hello there",
+            "paragraphs": {"transcript": "Speaker 0: hello there"},
+        }]}],
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def local_store():
+    mobile_recording_store._local_sessions.clear()
+    yield
+    mobile_recording_store._local_sessions.clear()
+
+
+@pytest.fixture
+def session_factory(sqlite_db):
+    sqlite_db.add_all([
+        Company(id="company_1", name="Roofing Co"),
+        Call(call_id=1, company_id="company_1", address="1 Home St"),
+    ])
+    sqlite_db.commit()
+    return sessionmaker(bind=sqlite_db.get_bind())
+
+
+def test_sessions_are_json_safe_and_expire():
+    created = datetime(2025, 6, 2, 14)
+    mobile_recording_store.create_session("rec_1", {"status": "pending", "created_at": created})
+
+    updated = mobile_recording_store.update_session("rec_1", status="processing")
+    assert updated == {"status": "processing", "created_at": created.isoformat()}
+    assert mobile_recording_store.get_session("rec_1") == updated
+
+    with patch("app.services.mobile_recording_store.time.monotonic", return_value=1e12):
+        assert mobile_recording_store.get_session("rec_1") is None
+        assert mobile_recording_store.update_session("rec_1", status="completed") is None
+    assert "rec_1" not in mobile_recording_store._local_sessions
+
+
+def test_sessions_are_only_visible_to_their_tenant():
+    mobile_recording_store.create_session("rec_1", {"status": "pending", "company_id": "company_1"})
+    mobile_recording_store.create_session("rec_unowned", {"status": "pending", "company_id": None})
+
+    def request(tenant_id):
+        return SimpleNamespace(state=SimpleNamespace(tenant_id=tenant_id))
+
+    assert _get_session_or_404(request("company_1"), "rec_1")["status"] == "pending"
+    for tenant_id, recording_id in [("company_2", "rec_1"), (None, "rec_1"), ("company_1", "rec_unowned")]:
+        with pytest.raises(HTTPException) as exc:
+            _get_session_or_404(request(tenant_id), recording_id)
+        assert exc.value.status_code == 404
+
+
+def test_task_stores_transcript_and_updates_call_with_its_own_session(session_factory):
+    mobile_recording_store.create_session("rec_1", {"status": "processing", "call_id": 1, "company_id": "company_1"})
+
+    with patch("app.tasks.asr_tasks.SessionLocal", session_factory), \
+            patch("app.tasks.asr_tasks.UWCClient") as client, \
+            patch("app.tasks.asr_tasks.TranscriptAnalyzer") as analyzer:
+        client.return_value.transcribe_audio = AsyncMock(return_value=UWC_RESPONSE)
+        analyzer.return_value.analyze_and_store.return_value = {}
+        result = process_recording_audio.apply(args=("rec_1", "https://bucket/audio.wav")).get()
+
+    assert result == {"recording_id": "rec_1", "status": "completed"}
+    assert client.return_value.transcribe_audio.call_args.kwargs["company_id"] == "company_1"
+    state = mobile_recording_store.get_session("rec_1")
+    assert state["status"] == "completed"
+    assert state["formatted_transcript"] == "Speaker 0: hello there"
+    assert state["transcript"] == UWC_RESPONSE
+
+    db = session_factory()
+    assert db.get(Call, 1).in_person_transcript == "Speaker 0: hello there"
+    db.close()
+
+
+def test_task_records_error_after_final_retry(session_factory):
+    mobile_recording_store.create_session("rec_1", {"status": "processing", "call_id": 1})
+
+    with patch("app.tasks.asr_tasks.SessionLocal", session_factory), \
+            patch("app.tasks.asr_tasks.UWCClient") as client, \
+            patch.object(process_recording_audio, "max_retries", 0):
+        client.return_value.transcribe_audio = AsyncMock(side_effect=RuntimeError("asr down"))
+        result = process_recording_audio.apply(args=("rec_1", "https://bucket/audio.wav")).get()
+
+    assert result["status"] == "error"
+    state = mobile_recording_store.get_session("rec_1")
+    assert state["status"] == "error"
+    assert "asr down" in state["error"]
+    assert process_recording_audio.apply(args=("missing", "url")).get()["status"] == "expired"
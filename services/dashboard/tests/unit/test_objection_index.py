@@ -0,0 +1,156 @@
+"""
+Unit tests for the call_objections index and the objection queries using it.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.call_analysis import CallAnalysis
+from app.models.call_objection import CallObjection
+from app.models.enums import CallType
+from app.models.recording_analysis import RecordingAnalysis
+from app.services.metrics_service import MetricsService
+from app.services.objection_index import (
+    backfill_objection_index,
+    extract_objections,
+    index_call_analysis,
+    index_recording_analysis,
+)
+
+TENANT = "company_1"
+CSR = "csr_1"
+NOW = datetime(2025, 6, 1)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db
+
+
+@pytest.fixture
+def session_factory(sqlite_db):
+    return sessionmaker(bind=sqlite_db.get_bind())
+
+
+def _call_with_analysis(db, call_id, objections, owner_id=CSR, days_ago=1, index=True):
+    call = Call(
+        call_id=call_id,
+        company_id=TENANT,
+        call_type=CallType.CSR_CALL.value,
+        owner_id=owner_id,
+        created_at=NOW - timedelta(days=days_ago),
+    )
+    analysis = CallAnalysis(
+        id=f"analysis_{call_id}",
+        call_id=call_id,
+        tenant_id=TENANT,
+        uwc_job_id=f"job_{call_id}",
+        objections=objections,
+    )
+    db.add_all([call, analysis])
+    db.flush()
+    if index:
+        index_call_analysis(db, analysis, call)
+    db.commit()
+
+
+def _service(db):
+    return MetricsService(db)
+
+
+def test_extract_objections_handles_strings_dicts_and_junk():
+    assert extract_objections(["need_spouse", {"type": "price", "label": "Too pricey"}, {"label": "x"}, 3]) == [
+        ("need_spouse", "Need Spouse"),
+        ("price", "Too pricey"),
+        ("unknown", "x"),
+    ]
+    assert extract_objections(None) == []
+    assert extract_objections({"price": 1}) == []
+
+
+def test_reindexing_replaces_rows(db):
+    _call_with_analysis(db, 1, ["price", "timing"])
+    analysis = db.query(CallAnalysis).one()
+    analysis.objections = ["price"]
+    index_call_analysis(db, analysis)
+    db.commit()
+
+    rows = db.query(CallObjection).all()
+    assert [(r.objection_key, r.owner_id, r.call_id) for r in rows] == [("price", CSR, 1)]
+
+
+def test_recording_analysis_rows_use_appointment_rep(db):
+    apt = Appointment(
+        id="apt_1", lead_id="lead_1", company_id=TENANT,
+        assigned_rep_id="rep_1", scheduled_start=NOW,
+    )
+    analysis = RecordingAnalysis(
+        id="ra_1", recording_session_id="session_1", company_id=TENANT,
+        appointment_id="apt_1", objections=[{"type": "price"}],
+    )
+    db.add_all([apt, analysis])
+    db.flush()
+
+    assert index_recording_analysis(db, analysis) == 1
+    row = db.query(CallObjection).one()
+    assert (row.owner_id, row.occurred_at, row.recording_session_id) == ("rep_1", NOW, "session_1")
+
+
+def test_backfill_indexes_existing_json(db, session_factory):
+    for call_id in range(1, 6):
+        _call_with_analysis(db, call_id, ["price", {"type": "timing"}], index=False)
+
+    totals = backfill_objection_index(session_factory=session_factory, batch_size=2)
+    rerun = backfill_objection_index(session_factory=session_factory, batch_size=2)
+
+    assert totals["call_analyses"] == 5
+    assert totals["call_rows"] == rerun["call_rows"] == 10
+    assert db.query(CallObjection).count() == 10
+
+
+def test_top_objections_grouped_from_index(db):
+    _call_with_analysis(db, 1, ["price", {"type": "timing", "label": "Bad Timing"}])
+    _call_with_analysis(db, 2, ["price"])
+    _call_with_analysis(db, 3, [])
+    _call_with_analysis(db, 4, ["price"], owner_id="someone_else")
+    _call_with_analysis(db, 5, ["price"], days_ago=60)
+
+    result = asyncio.run(_service(db).get_csr_top_objections(
+        tenant_id=TENANT, csr_user_id=CSR, date_from=NOW - timedelta(days=30), date_to=NOW
+    ))
+
+    assert result.total_calls_considered == 3
+    assert [(o.objection_key, o.occurrence_count) for o in result.top_objections] == [("price", 2), ("timing", 1)]
+    assert result.top_objections[1].label == "Bad Timing"
+    assert result.top_objections[0].occurrence_rate == pytest.approx(2 / 3)
+
+
+def test_objection_calls_and_self_search(db):
+    _call_with_analysis(db, 1, ["need_spouse"], days_ago=2)
+    _call_with_analysis(db, 2, ["price"], days_ago=1)
+    _call_with_analysis(db, 3, ["need spouse approval"])
+    service = _service(db)
+
+    calls = asyncio.run(service.get_csr_objection_calls(
+        tenant_id=TENANT, csr_user_id=CSR, objection_key="need_spouse",
+        date_from=NOW - timedelta(days=30), date_to=NOW
+    ))
+    assert [item.call_id for item in calls.items] == [1]
+
+    page = asyncio.run(service.get_csr_calls_by_objection_self(
+        csr_user_id=CSR, tenant_id=TENANT, objection="Spouse",
+        date_from=NOW - timedelta(days=30), date_to=NOW, page=1, page_size=1
+    ))
+    assert page.total == 2
+    assert [item.call_id for item in page.items] == [3]
+
+    # "need_spouse" is not contained in "need spouse" ("_" is not a wildcard)
+    page = asyncio.run(service.get_csr_calls_by_objection_self(
+        csr_user_id=CSR, tenant_id=TENANT, objection="need spouse",
+        date_from=NOW - timedelta(days=30), date_to=NOW
+    ))
+    assert [item.call_id for item in page.items] == [3]
@@ -0,0 +1,103 @@
+"""
+Unit tests for the ASGI observability middleware.
+"""
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.obs.middleware import ObservabilityMiddleware, record_stage_timing
+
+
+class FakeAuthMiddleware:
+    """Stands in for TenantContextMiddleware reporting its auth cost."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            record_stage_timing(scope, "auth", 2.5)
+        await self.app(scope, receive, send)
+
+
+def _make_app(span_sample_rate=1.0):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(FakeAuthMiddleware)
+    app.add_middleware(ObservabilityMiddleware, span_sample_rate=span_sample_rate)
+    return app
+
+
+@pytest.fixture
+def recorded():
+    with patch("app.obs.middleware.record_http_request") as record_request, \
+         patch("app.obs.middleware.record_http_stage_timings") as record_stages, \
+         patch("app.obs.middleware.log_request") as log_request:
+        yield record_request, record_stages, log_request
+
+
+def test_records_status_route_and_stage_timings(recorded):
+    record_request, record_stages, _ = recorded
+    client = TestClient(_make_app())
+
+    response = client.get("/items/7", headers={"X-Request-Id": "trace-123"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-Id"] == "trace-123"
+    kwargs = record_request.call_args.kwargs
+    assert (kwargs["route"], kwargs["method"], kwargs["status_code"]) == ("/items/{item_id}", "GET", 200)
+
+    route, timings = record_stages.call_args.args
+    assert route == "/items/{item_id}"
+    assert timings["auth"] == 2.5
+    assert set(timings) == {"auth", "handler", "response"}
+    assert all(value >= 0 for value in timings.values())
+
+
+def test_streaming_response_passes_through_with_byte_count(recorded):
+    _, _, log_request = recorded
+    client = TestClient(_make_app())
+
+    response = client.get("/stream")
+
+    assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+    assert log_request.call_args.kwargs["response_bytes"] == len(response.content)
+
+
+def test_unhandled_error_recorded_as_500(recorded):
+    record_request, _, _ = recorded
+    client = TestClient(_make_app(), raise_server_exceptions=False)
+
+    response = client.get("/boom")
+
+    assert response.status_code == 500
+    assert record_request.call_args.kwargs["status_code"] == 500
+
+
+def test_unsampled_requests_skip_span_creation(recorded):
+    record_request, _, _ = recorded
+    client = TestClient(_make_app(span_sample_rate=0.0))
+
+    with patch("app.obs.middleware.tracer") as tracer:
+        client.get("/items/1")
+
+    tracer.start_as_current_span.assert_not_called()
+    record_request.assert_called_once()
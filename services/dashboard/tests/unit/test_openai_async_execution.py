@@ -0,0 +1,148 @@
+"""
+Unit tests for OpenAIClientManager's async execution path.
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.openai_client_manager import OpenAIClientManager, TokenBucket, parse_reset_duration
+
+
+class FakeRawResponse:
+    def __init__(self, value, headers=None):
+        self.value = value
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def manager():
+    with patch.object(OpenAIClientManager, "_load_api_keys", return_value=["sk-key-a-0000000", "sk-key-b-0000000"]):
+        yield OpenAIClientManager(max_concurrency_per_key=2)
+
+
+def test_identical_requests_coalesce_into_one_call(manager):
+    calls = []
+
+    async def make_request(client, prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return FakeRawResponse(prompt.upper())
+
+    async def run():
+        return await asyncio.gather(*[
+            manager.aexecute_with_retry(make_request, 3, "hello", coalesce_key="same") for _ in range(5)
+        ], manager.aexecute_with_retry(make_request, 3, "other", coalesce_key="different"))
+
+    results = asyncio.run(run())
+
+    assert sorted(calls) == ["hello", "other"]
+    assert [r.value for r in results] == ["HELLO"] * 5 + ["OTHER"]
+    assert len({id(r) for r in results[:5]}) == 1
+    assert manager._inflight == {}
+
+
+def test_cancelled_caller_hands_coalesced_request_to_waiters(manager):
+    calls = []
+
+    async def make_request(client, prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.02)
+        return FakeRawResponse(prompt.upper())
+
+    async def run():
+        first = asyncio.ensure_future(manager.aexecute_with_retry(make_request, 3, "hello", coalesce_key="same"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(manager.aexecute_with_retry(make_request, 3, "hello", coalesce_key="same"))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        result = await second
+
+        # Once every caller is cancelled the request itself is cancelled
+        third = asyncio.ensure_future(manager.aexecute_with_retry(make_request, 3, "bye", coalesce_key="other"))
+        await asyncio.sleep(0.005)
+        third.cancel()
+        await asyncio.sleep(0)
+        return first, result, third
+
+    first, result, third = asyncio.run(run())
+
+    assert first.cancelled() and third.cancelled()
+    assert result.value == "HELLO"
+    assert calls == ["hello", "bye"]
+    assert manager._inflight == {}
+
+
+def test_concurrency_is_capped_per_key(manager):
+    in_flight = {"sk-key-a-0000000": 0, "sk-key-b-0000000": 0}
+    peak = dict(in_flight)
+
+    async def make_request(client):
+        in_flight[client.api_key] += 1
+        peak[client.api_key] = max(peak[client.api_key], in_flight[client.api_key])
+        await asyncio.sleep(0.01)
+        in_flight[client.api_key] -= 1
+        return FakeRawResponse("ok")
+
+    async def run():
+        await asyncio.gather(*[manager.aexecute_with_retry(make_request) for _ in range(12)])
+
+    asyncio.run(run())
+
+    assert peak == {"sk-key-a-0000000": 2, "sk-key-b-0000000": 2}
+    assert sum(manager.key_states[k]["success_count"] for k in manager.keys) == 12
+
+
+def test_exhausted_key_is_skipped_until_its_bucket_refills(manager):
+    used = []
+    exhausted = {
+        "x-ratelimit-limit-requests": "60", "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "1m",
+        "x-ratelimit-limit-tokens": "10000", "x-ratelimit-remaining-tokens": "9000",
+        "x-ratelimit-reset-tokens": "6m0s",
+    }
+
+    async def make_request(client):
+        used.append(client.api_key)
+        return FakeRawResponse("ok", headers=exhausted if len(used) == 1 else {})
+
+    async def run():
+        for _ in range(3):
+            await manager.aexecute_with_retry(make_request)
+
+    asyncio.run(run())
+
+    # Round robin would alternate a, b, a; key a reported no remaining requests
+    assert used == ["sk-key-a-0000000", "sk-key-b-0000000", "sk-key-b-0000000"]
+    assert manager.token_buckets["sk-key-a-0000000"].capacity == 10000
+    assert manager.get_stats()["keys"]["sk-key-a-0...0000"]["tokens_available"] == pytest.approx(9000, abs=50)
+
+
+def test_rate_limit_rotates_key_without_blocking_the_loop(manager):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    rate_limited = RateLimitError(
+        "slow down", response=httpx.Response(429, request=request), body=None
+    )
+    make_request = AsyncMock(side_effect=[rate_limited, FakeRawResponse("ok")])
+
+    with patch("app.services.openai_client_manager.asyncio.sleep", AsyncMock()) as sleep:
+        result = asyncio.run(manager.aexecute_with_retry(make_request))
+
+    assert result.value == "ok"
+    assert [c.args for c in sleep.await_args_list if c.args != (0,)] == [(1,)]
+    first_key, second_key = (c.args[0].api_key for c in make_request.call_args_list)
+    assert first_key != second_key
+    assert manager.get_stats()["keys"]["sk-key-a-0...0000"]["rate_limited"] is True
+
+
+def test_token_bucket_and_reset_parsing():
+    assert parse_reset_duration("6m0s") == 360
+    assert parse_reset_duration("120ms") == pytest.approx(0.12)
+    assert parse_reset_duration(None) is None
+
+    bucket = TokenBucket()
+    assert bucket.wait_time(10 ** 9) == 0  # Unlimited until a response reports the limit
+    bucket.observe(limit=600, remaining=0, reset_seconds=None)
+    assert bucket.wait_time(10) == pytest.approx(1.0, rel=0.05)
@@ -0,0 +1,112 @@
+"""
+Unit tests for the per-request SQL profiler and query budgets.
+"""
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.obs import query_profiler
+from app.obs.middleware import ObservabilityMiddleware
+from app.obs.query_profiler import (
+    finish_query_profile,
+    install_query_profiler,
+    normalize_statement,
+    parse_query_budgets,
+    start_query_profile,
+)
+
+
+@pytest.fixture
+def engine():
+    install_query_profiler()
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO items (id) VALUES (1), (2), (3)"))
+    return engine
+
+
+def _n_plus_one(engine, n):
+    with engine.connect() as conn:
+        for i in range(n):
+            conn.execute(text("SELECT id FROM items WHERE id = :id"), {"id": i}).all()
+
+
+def test_normalize_statement_groups_expanded_in_lists():
+    assert normalize_statement("SELECT *\n  FROM calls WHERE id IN (?, ?, ?)") == (
+        "SELECT * FROM calls WHERE id IN (...)"
+    )
+    assert normalize_statement("SELECT * FROM calls WHERE id IN (%(id_1_1)s, %(id_1_2)s)") == (
+        "SELECT * FROM calls WHERE id IN (...)"
+    )
+
+
+def test_parse_query_budgets():
+    assert parse_query_budgets("/api/v1/calls/{call_id}=5, task:app.tasks.x=100") == {
+        "/api/v1/calls/{call_id}": 5,
+        "task:app.tasks.x": 100,
+    }
+
+
+def test_profile_counts_statements_and_logs_over_budget(engine):
+    stats, token = start_query_profile("/items")
+    _n_plus_one(engine, 4)
+
+    with patch.object(query_profiler, "_budgets", {"/items": 3}), \
+         patch.object(query_profiler, "record_db_query_profile") as record, \
+         patch.object(query_profiler.logger, "warning") as warning:
+        finish_query_profile(stats, token)
+
+    assert stats.statements == 4
+    [(statement, entry)] = stats.top_statements()
+    assert statement == "SELECT id FROM items WHERE id = ?"
+    assert entry.count == 4
+    assert record.call_args.args[:2] == ("/items", 4)
+    assert record.call_args.args[4] is True
+    assert "Query budget exceeded for /items: 4 > 3" in warning.call_args.args[0]
+
+
+def test_statements_outside_a_profile_are_not_collected(engine):
+    stats, token = start_query_profile("/items")
+    finish_query_profile(stats, token)
+    _n_plus_one(engine, 2)
+
+    assert stats.statements == 0
+
+
+def test_middleware_profiles_request_by_route_template(engine):
+    app = FastAPI()
+    app.add_middleware(ObservabilityMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        _n_plus_one(engine, 3)
+        return {"id": item_id}
+
+    with patch("app.obs.middleware.finish_query_profile", wraps=finish_query_profile) as finish:
+        TestClient(app).get("/items/1")
+
+    stats = finish.call_args.args[0]
+    assert stats.scope == "/items/{item_id}"
+    assert stats.statements == 3
+
+    # Disabled profiler: no per-request profile at all
+    with patch("app.obs.middleware.settings.DB_PROFILER_ENABLED", False), \
+         patch("app.obs.middleware.start_query_profile") as start:
+        TestClient(app).get("/items/1")
+    start.assert_not_called()
+
+
+def test_query_budget_fixture_fails_on_n_plus_one(engine, query_budget):
+    with query_budget(3):
+        _n_plus_one(engine, 3)
+
+    with pytest.raises(AssertionError, match="at most 2 SQL statements, got 5"):
+        with query_budget(2):
+            _n_plus_one(engine, 5)
@@ -0,0 +1,97 @@
+"""
+Unit tests for the chunked retention purge engine.
+
+Runs against an in-memory SQLite table; cursor storage falls back to the
+per-process dict when Redis is unavailable.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.services import retention
+from app.services.retention import RetentionPolicy, purge_expired_rows
+
+NOW = datetime(2025, 6, 1)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE purge_rows (id INTEGER PRIMARY KEY, created_at TIMESTAMP)"))
+        # ids 1-25 expired, 26-30 fresh
+        for i in range(1, 31):
+            age = timedelta(days=40) if i <= 25 else timedelta(days=1)
+            conn.execute(
+                text("INSERT INTO purge_rows (id, created_at) VALUES (:id, :ts)"),
+                {"id": i, "ts": NOW - age},
+            )
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def local_cursors():
+    with patch("app.services.redis_service.redis_service.is_available", return_value=False):
+        retention._local_cursors.clear()
+        yield retention._local_cursors
+
+
+def _policy(**overrides):
+    values = dict(
+        name="purge_rows",
+        table="purge_rows",
+        timestamp_column="created_at",
+        retention=timedelta(days=30),
+        batch_size=10,
+        sleep_seconds=0,
+        max_seconds=None,
+    )
+    values.update(overrides)
+    return RetentionPolicy(**values)
+
+
+def _remaining_ids(session_factory):
+    db = session_factory()
+    try:
+        return [row[0] for row in db.execute(text("SELECT id FROM purge_rows ORDER BY id"))]
+    finally:
+        db.close()
+
+
+def test_purges_expired_rows_in_batches(session_factory):
+    result = purge_expired_rows(_policy(), session_factory=session_factory, now=NOW)
+
+    assert result.rows_purged == 25
+    assert result.batches == 3
+    assert result.completed is True
+    assert _remaining_ids(session_factory) == list(range(26, 31))
+
+
+def test_budget_stops_run_and_next_run_resumes_from_cursor(session_factory, local_cursors):
+    first = purge_expired_rows(_policy(max_batches=1), session_factory=session_factory, now=NOW)
+
+    assert first.rows_purged == 10
+    assert first.completed is False
+    assert local_cursors["purge_rows"] == 10
+
+    second = purge_expired_rows(_policy(), session_factory=session_factory, now=NOW)
+
+    assert second.rows_purged == 15
+    assert second.completed is True
+    assert "purge_rows" not in local_cursors
+    assert _remaining_ids(session_factory) == list(range(26, 31))
+
+
+def test_records_metrics(session_factory):
+    with patch("app.services.retention.record_retention_purge") as record:
+        purge_expired_rows(_policy(), session_factory=session_factory, now=NOW)
+
+    table, rows, duration_ms = record.call_args.args
+    assert (table, rows) == ("purge_rows", 25)
+    assert duration_ms >= 0
@@ -0,0 +1,112 @@
+"""
+Unit tests for the set-based MetricsService.get_sales_team_metrics.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.company import Company
+from app.models.recording_analysis import RecordingAnalysis
+from app.models.sales_rep import SalesRep
+from app.models.user import User
+from app.services.metrics_service import MetricsService
+
+TENANT = "company_1"
+NOW = datetime(2025, 6, 1)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add(Company(id=TENANT, name="Roofing Co"))
+    for rep_id, name in (("rep_a", "Alice"), ("rep_b", "Bob"), ("rep_c", "Cara")):
+        sqlite_db.add(User(id=rep_id, name=name, email=f"{rep_id}@x.com", username=rep_id, company_id=TENANT))
+        sqlite_db.add(SalesRep(user_id=rep_id, company_id=TENANT))
+    return sqlite_db
+
+
+def _appointment(db, apt_id, rep_id, status, days_ago=1, company_id=TENANT):
+    db.add(Appointment(
+        id=apt_id,
+        lead_id="lead_1",
+        company_id=company_id,
+        assigned_rep_id=rep_id,
+        scheduled_start=NOW - timedelta(days=days_ago),
+        status=status,
+    ))
+
+
+def _analysis(db, analysis_id, apt_id, **fields):
+    db.add(RecordingAnalysis(
+        id=analysis_id,
+        recording_session_id=f"session_{analysis_id}",
+        company_id=TENANT,
+        appointment_id=apt_id,
+        **fields,
+    ))
+
+
+def _team_metrics(db):
+    return asyncio.run(MetricsService(db).get_sales_team_metrics(
+        tenant_id=TENANT, date_from=NOW - timedelta(days=30), date_to=NOW
+    ))
+
+
+def test_per_rep_aggregates_and_team_rollup(db):
+    _appointment(db, "a1", "rep_a", AppointmentStatus.COMPLETED)
+    _appointment(db, "a2", "rep_a", AppointmentStatus.COMPLETED)
+    _appointment(db, "a3", "rep_a", AppointmentStatus.SCHEDULED)
+    _appointment(db, "b1", "rep_b", AppointmentStatus.COMPLETED)
+    _appointment(db, "old", "rep_b", AppointmentStatus.COMPLETED, days_ago=90)
+    _analysis(db, "x1", "a1", outcome=" Won ", sop_compliance_score=8.0, sentiment_score=0.8,
+              objections=[{"type": "price"}, {"type": "timing"}],
+              meeting_segments=[{"phase": "rapport"}, {"phase": "close"}])
+    _analysis(db, "x2", "a2", outcome="lost", sop_compliance_score=6.0, sentiment_score=0.4)
+    _analysis(db, "y1", "b1", outcome="won", sop_compliance_score=10.0, objections=[{"type": "price"}])
+    db.commit()
+
+    metrics = _team_metrics(db)
+
+    reps = {rep.rep_id: rep for rep in metrics.reps}
+    assert [r.rep_id for r in metrics.reps] == ["rep_a", "rep_b", "rep_c"]
+    assert reps["rep_a"].rep_name == "Alice"
+    assert (reps["rep_a"].total_appointments, reps["rep_a"].completed_appointments, reps["rep_a"].won_appointments) == (3, 2, 1)
+    assert reps["rep_a"].win_rate == 0.5
+    assert reps["rep_a"].avg_compliance_score == 7.0
+    assert (reps["rep_b"].total_appointments, reps["rep_b"].won_appointments) == (1, 1)
+    assert reps["rep_c"].total_appointments == 0
+    assert reps["rep_c"].win_rate is None
+
+    assert metrics.total_appointments == 4
+    assert metrics.completed_appointments == 3
+    assert metrics.team_win_rate == pytest.approx(2 / 3)
+    assert metrics.avg_compliance_score == pytest.approx(8.0)
+    assert metrics.avg_sentiment_score == pytest.approx(0.6)
+    assert metrics.avg_objections_per_appointment == pytest.approx(3 / 4)
+    assert metrics.avg_meeting_structure_score == 1.0
+
+
+def test_other_tenants_are_excluded(db):
+    _appointment(db, "a1", "rep_a", AppointmentStatus.COMPLETED)
+    _appointment(db, "z1", "rep_a", AppointmentStatus.COMPLETED, company_id="company_2")
+    db.commit()
+
+    metrics = _team_metrics(db)
+
+    assert metrics.total_appointments == 1
+
+
+def test_query_count_does_not_grow_with_reps(db, query_budget):
+    for i in range(20):
+        rep_id = f"rep_extra_{i}"
+        db.add(User(id=rep_id, name=rep_id, email=f"{rep_id}@x.com", username=rep_id, company_id=TENANT))
+        db.add(SalesRep(user_id=rep_id, company_id=TENANT))
+        _appointment(db, f"apt_{i}", rep_id, AppointmentStatus.COMPLETED)
+    db.commit()
+
+    with query_budget(2) as stats:
+        metrics = _team_metrics(db)
+
+    assert len(metrics.reps) == 23
+    assert stats.statements == 2
@@ -0,0 +1,98 @@
+"""
+Unit tests for bulk, idempotent Task/KeySignal creation from Shunya analyses.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.company import Company
+from app.models.contact_card import ContactCard
+from app.models.key_signal import KeySignal
+from app.models.lead import Lead
+from app.models.task import Task, TaskAssignee, TaskSource
+from app.services import shunya_integration_service as integration_module
+from app.services.shunya_integration_service import ShunyaIntegrationService
+from app.utils.idempotency import generate_task_unique_key, insert_missing_by_unique_key
+
+TENANT = "company_1"
+ACTIONS = ["Send quote", "Call back Friday", "Request roof photos", "Send quote"]
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add_all([
+        Company(id=TENANT, name="Roofing Co"),
+        ContactCard(id="card_1", company_id=TENANT, primary_phone="+15550000001"),
+        Lead(id="lead_1", company_id=TENANT, contact_card_id="card_1"),
+        Appointment(
+            id="appt_1", lead_id="lead_1", company_id=TENANT, contact_card_id="card_1",
+            scheduled_start=datetime(2025, 6, 2, 9),
+        ),
+        Call(call_id=1, company_id=TENANT, contact_card_id="card_1", lead_id="lead_1"),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.fixture
+def events(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(integration_module, "emit", lambda event_name, payload, **kwargs: emitted.append((event_name, payload)))
+    return emitted
+
+
+def _task_row(description):
+    return {
+        "company_id": TENANT, "contact_card_id": "card_1", "description": description,
+        "assigned_to": TaskAssignee.CSR, "source": TaskSource.SHUNYA,
+        "unique_key": generate_task_unique_key(TaskSource.SHUNYA, description, "card_1"),
+    }
+
+
+def test_insert_missing_skips_existing_and_repeated_keys(db, query_budget):
+    insert_missing_by_unique_key(db, Task, TENANT, [_task_row("Send quote")])
+
+    with query_budget(2):
+        created = insert_missing_by_unique_key(db, Task, TENANT, [_task_row(text) for text in ACTIONS])
+
+    assert [row["description"] for row in created] == ["Call back Friday", "Request roof photos"]
+    assert db.query(Task).count() == 3
+
+
+def test_call_analysis_creates_actions_once_with_one_event(db, events):
+    service = ShunyaIntegrationService()
+    analysis = {
+        "pending_actions": [{"action": text} for text in ACTIONS],
+        "urgency_signals": ["leak in kitchen"],
+        "objections": {"objections": [{"objection_text": t} for t in ("price", "timing", "spouse")]},
+    }
+    call = db.query(Call).one()
+
+    # Same actions re-delivered under a new Shunya job (e.g. a re-analysis)
+    for job_id in ("an-1", "an-2"):
+        asyncio.run(service._process_shunya_analysis_for_call(
+            db, call, TENANT, dict(analysis, job_id=job_id), transcript_text=""
+        ))
+        db.commit()
+
+    assert db.query(Task).count() == 3
+    assert db.query(KeySignal).count() == 2
+    created = [payload for name, payload in events if name == "shunya.actions.created"]
+    assert len(created) == 1
+    assert len(created[0]["task_ids"]) == 3 and len(created[0]["signal_ids"]) == 2
+    assert created[0]["call_id"] == 1
+
+
+def test_visit_signals_are_bulk_inserted(db):
+    service = ShunyaIntegrationService()
+    appt = db.query(Appointment).one()
+    analysis = {"missed_opportunities": ["Gutter upsell", "Financing", "Warranty", "Skylight"]}
+
+    first = asyncio.run(service._create_key_signals_from_visit_analysis(db, appt, TENANT, analysis))
+    again = asyncio.run(service._create_key_signals_from_visit_analysis(db, appt, TENANT, analysis))
+
+    assert len(first) == 3 and again == []
+    assert {s.appointment_id for s in db.query(KeySignal)} == {"appt_1"}
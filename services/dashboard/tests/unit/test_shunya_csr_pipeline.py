@@ -0,0 +1,183 @@
+"""
+Unit tests for the staged Shunya CSR call pipeline (ShunyaJob state machine).
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.call import Call
+from app.models.call_analysis import CallAnalysis
+from app.models.call_transcript import CallTranscript
+from app.models.company import Company
+from app.models.shunya_job import ShunyaJob, ShunyaJobStatus, ShunyaPipelineStage
+from app.services import shunya_integration_service as integration_module
+from app.services.redis_lock_service import redis_lock_service
+from app.services.shunya_integration_service import ShunyaIntegrationService
+
+TENANT = "company_1"
+CALL_ID = 42
+
+
+class FakeUWC:
+    """Shunya client whose async steps complete immediately."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail_transcript = False
+        self.analysis_start = {"success": True, "job_id": "an-1"}
+
+    async def _make_request(self, method, path, company_id, request_id, payload=None):
+        self.calls.append(path)
+        return {"success": True, "task_id": "tx-1", "transcript_id": 7}
+
+    async def get_transcript(self, company_id, request_id, call_id):
+        self.calls.append("get_transcript")
+        if self.fail_transcript:
+            raise ConnectionError("Shunya unavailable")
+        return {"transcript_text": "Hi, I need a roof quote", "confidence_score": 0.93}
+
+    async def start_analysis(self, company_id, request_id, call_id):
+        self.calls.append("start_analysis")
+        return self.analysis_start
+
+    async def get_complete_analysis(self, company_id, request_id, call_id):
+        self.calls.append("get_complete_analysis")
+        return {"summary": {"summary": "Customer wants a quote"}, "qualification": {"qualification_status": "warm"}}
+
+
+@pytest.fixture
+def pipeline(monkeypatch, sqlite_db):
+    sqlite_db.add_all([Company(id=TENANT, name="Roofing Co"), Call(call_id=CALL_ID, company_id=TENANT)])
+    sqlite_db.commit()
+    Session = sessionmaker(bind=sqlite_db.get_bind())
+
+    async def acquire_lock(lock_key, tenant_id, timeout=300):
+        return "token"
+
+    async def release_lock(lock_key, tenant_id, lock_token):
+        return True
+
+    monkeypatch.setattr(integration_module, "SessionLocal", Session)
+    monkeypatch.setattr(redis_lock_service, "acquire_lock", acquire_lock)
+    monkeypatch.setattr(redis_lock_service, "release_lock", release_lock)
+
+    service = ShunyaIntegrationService()
+    service.uwc_client = FakeUWC()
+    service.polls = []
+    service._schedule_poll = lambda job_id, countdown: service.polls.append(job_id)
+    return service, Session
+
+
+def _job(Session, job_id):
+    session = Session()
+    try:
+        return session.query(ShunyaJob).filter(ShunyaJob.id == job_id).one()
+    finally:
+        session.close()
+
+
+def test_pipeline_advances_one_stage_per_completion(pipeline):
+    service, Session = pipeline
+
+    started = asyncio.run(service.process_csr_call(CALL_ID, "https://audio/1.mp3", TENANT))
+    job_id = started["job_id"]
+    job = _job(Session, job_id)
+    assert started["stage"] == "transcribing"
+    assert job.pipeline_stage == ShunyaPipelineStage.TRANSCRIBING
+    assert job.job_status == ShunyaJobStatus.RUNNING
+    assert job.shunya_job_id == "tx-1"
+    # Nothing past submission happens until Shunya reports completion
+    assert service.uwc_client.calls == ["/api/v1/transcription/transcribe"]
+
+    # Transcription webhook/poll -> transcript stored, analysis started
+    assert asyncio.run(service.advance_csr_call(job_id))["status"] == "analyzing"
+    job = _job(Session, job_id)
+    assert job.pipeline_stage == ShunyaPipelineStage.ANALYZING
+    assert job.shunya_job_id == "an-1"
+    assert set(job.stage_timings) == {"transcribing"}
+
+    # Analysis webhook/poll -> analysis persisted, job completed
+    outcome = asyncio.run(service.advance_csr_call(job_id))
+    job = _job(Session, job_id)
+    assert outcome["status"] == "succeeded"
+    assert job.job_status == ShunyaJobStatus.SUCCEEDED
+    assert job.pipeline_stage == ShunyaPipelineStage.COMPLETED
+    assert set(job.stage_timings) == {"transcribing", "analyzing", "persisting", "total"}
+    assert service.polls == [job_id, job_id]
+
+    session = Session()
+    assert session.query(CallTranscript).filter_by(call_id=CALL_ID).one().transcript_text == "Hi, I need a roof quote"
+    assert session.query(CallAnalysis).filter_by(call_id=CALL_ID).count() == 1
+    session.close()
+
+    # A duplicate completion is a no-op
+    assert asyncio.run(service.advance_csr_call(job_id))["status"] == "already_complete"
+    assert service.uwc_client.calls.count("get_complete_analysis") == 1
+
+
+def test_duplicate_trigger_joins_running_job(pipeline):
+    service, _ = pipeline
+
+    first = asyncio.run(service.process_csr_call(CALL_ID, "https://audio/1.mp3", TENANT))
+    second = asyncio.run(service.process_csr_call(CALL_ID, "https://audio/1.mp3", TENANT))
+
+    assert second["already_running"] is True
+    assert second["job_id"] == first["job_id"]
+
+
+def test_failed_step_is_retried_from_the_same_stage(pipeline):
+    service, Session = pipeline
+    job_id = asyncio.run(service.process_csr_call(CALL_ID, "https://audio/1.mp3", TENANT))["job_id"]
+    service.uwc_client.fail_transcript = True
+
+    outcome = asyncio.run(service.advance_csr_call(job_id))
+    job = _job(Session, job_id)
+
+    assert outcome["status"] == "retrying"
+    assert job.job_status == ShunyaJobStatus.PENDING
+    assert job.pipeline_stage == ShunyaPipelineStage.TRANSCRIBING
+    assert service.polls == [job_id, job_id]
+
+
+@pytest.mark.parametrize("analysis_start,error", [
+    ({"success": False, "message": "call not found"}, "Analysis start failed"),
+    ({"success": True}, "Analysis start returned no job id"),
+])
+def test_rejected_analysis_start_does_not_enter_analyzing(pipeline, analysis_start, error):
+    service, Session = pipeline
+    job_id = asyncio.run(service.process_csr_call(CALL_ID, "https://audio/1.mp3", TENANT))["job_id"]
+    service.uwc_client.analysis_start = analysis_start
+
+    outcome = asyncio.run(service.advance_csr_call(job_id))
+    job = _job(Session, job_id)
+
+    assert outcome["status"] == "retrying"
+    assert job.job_status == ShunyaJobStatus.PENDING
+    assert job.pipeline_stage == ShunyaPipelineStage.TRANSCRIBING
+    assert job.error_message == error
+    assert "get_complete_analysis" not in service.uwc_client.calls
+
+
+def test_stage_timings_accumulate_elapsed_seconds(pipeline):
+    from app.services.shunya_job_service import shunya_job_service
+
+    _, Session = pipeline
+    session = Session()
+    job = ShunyaJob(
+        company_id=TENANT, job_type="csr_call", call_id=CALL_ID,
+        pipeline_stage=ShunyaPipelineStage.ANALYZING,
+        stage_started_at=datetime.utcnow() - timedelta(seconds=30),
+        created_at=datetime.utcnow() - timedelta(seconds=90),
+        stage_timings={"transcribing": 60.0},
+    )
+    session.add(job)
+    session.commit()
+
+    shunya_job_service.enter_stage(session, job, ShunyaPipelineStage.COMPLETED)
+
+    assert 30 <= job.stage_timings["analyzing"] < 31
+    assert 90 <= job.stage_timings["total"] < 91
+    assert job.stage_timings["transcribing"] == 60.0
+    session.close()
@@ -0,0 +1,94 @@
+"""
+Unit tests for the compiled Shunya response normalizer and per-job memoization.
+"""
+import pytest
+from pydantic import BaseModel
+
+from app.models.shunya_job import ShunyaJob, ShunyaJobStatus
+from app.services import shunya_response_normalizer as normalizer_module
+from app.services.shunya_job_service import shunya_job_service
+from app.services.shunya_response_normalizer import shunya_normalizer
+from tests.db import register_models
+
+register_models()  # ShunyaJob's relationships resolve against every mapper
+
+
+def test_legacy_aliases_and_defaults():
+    normalized = shunya_normalizer.normalize_complete_analysis({
+        "task_id": "tx-1",
+        "lead_qualification": {"status": " WARM ", "appointment_status": "booked"},
+        "objections": ["timing", {"text": "too expensive", "category": "price", "severity": "HIGH"}],
+        "sop_compliance": {"stages_completed": ["greeting"], "compliance_score": "0.4"},
+        "call_summary": "Gutter repair inquiry",
+        "sentiment_analysis": {"score": "0.2"},
+        "action_items": ["Call back", {"text": "Send quote", "priority": "High"}],
+    })
+
+    assert normalized["job_id"] == "tx-1"
+    assert normalized["qualification"]["qualification_status"] == "warm"
+    assert normalized["qualification"]["booking_status"] == "booked"
+    assert normalized["objections"]["total_objections"] == 2
+    assert normalized["objections"]["objections"][1]["category_text"] == "price"
+    assert normalized["objections"]["objections"][1]["severity"] == "high"
+    assert normalized["compliance"]["stages_followed"] == ["greeting"]
+    assert normalized["compliance"]["compliance_score"] == 0.4
+    assert normalized["summary"]["summary"] == "Gutter repair inquiry"
+    assert normalized["sentiment_score"] == 0.2
+    assert [a["action"] for a in normalized["pending_actions"]] == ["Call back", "Send quote"]
+    assert normalized["pending_actions"][1]["priority"] == "high"
+    assert normalized["missed_opportunities"] == [] and normalized["entities"]["address"] is None
+
+
+def test_contract_field_names_are_read():
+    normalized = shunya_normalizer.normalize_complete_analysis({
+        "objections": {"objections": [{"objection_text": "price", "objection_label": "price"}]},
+        "summary": {"summary": "ok", "confidence": 0.9},
+        "missed_opportunities": [{"opportunity_text": "No upsell", "opportunity_type": "upsell"}],
+        "entities": {"person_name": "Dana", "phone_number": "+15125550100"},
+    })
+
+    assert normalized["objections"]["objections"][0]["category_text"] == "price"
+    assert normalized["summary"]["confidence_score"] == 0.9
+    assert normalized["missed_opportunities"][0]["opportunity"] == "No upsell"
+    assert normalized["entities"]["name"] == "Dana"
+    assert normalized["entities"]["phone"] == "+15125550100"
+
+
+def test_unmapped_contract_field_fails_compilation():
+    class Contract(BaseModel):
+        summary: str = None
+        brand_new_field: str = None
+
+    with pytest.raises(RuntimeError, match="brand_new_field"):
+        normalizer_module._compile_record(Contract, [("summary", ("summary",), normalizer_module._as_text)])
+
+
+def test_redelivered_output_reuses_stored_normalization():
+    raw = {"qualification": {"qualification_status": "hot"}, "job_id": "an-1"}
+    job = ShunyaJob(job_status=ShunyaJobStatus.RUNNING)
+    normalized, raw_hash = shunya_job_service.normalize_output(job, raw, shunya_normalizer.normalize_complete_analysis)
+    job.job_status, job.output_payload, job.raw_output_hash = ShunyaJobStatus.SUCCEEDED, normalized, raw_hash
+
+    def fail(_):
+        raise AssertionError("re-normalized a memoized output")
+
+    again, again_hash = shunya_job_service.normalize_output(job, dict(raw), fail)
+
+    assert again is normalized and again_hash == raw_hash
+    assert shunya_job_service.should_process(None, job, again, again_hash) is False
+
+    changed, changed_hash = shunya_job_service.normalize_output(
+        job, dict(raw, job_id="an-2"), shunya_normalizer.normalize_complete_analysis
+    )
+    assert changed_hash != raw_hash and changed["job_id"] == "an-2"
+
+
+def test_first_truthy_source_key_wins():
+    extract = normalizer_module._compile_record(None, [
+        ("status", ("status", "legacy_status"), normalizer_module._as_status),
+        ("notes", ("notes", "comments"), normalizer_module._as_is),
+    ])
+
+    assert extract({"status": "", "legacy_status": " HOT "}) == {"status": "hot", "notes": None}
+    # Nothing truthy: the last source key's value is kept
+    assert extract({"notes": None, "comments": []})["notes"] == []
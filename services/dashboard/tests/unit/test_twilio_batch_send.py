@@ -0,0 +1,121 @@
+"""
+Unit tests for TwilioService batch sending against a local stub Twilio API.
+"""
+import asyncio
+
+from aiohttp import web
+
+from app.services.twilio_service import AsyncTokenBucket, TwilioService
+
+RATE_LIMITED = "+15550000002"
+INVALID = "+15550000009"
+
+
+class StubTwilio:
+    """Minimal Messages.json endpoint: 429s a number once, rejects another."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._throttled = set()
+
+    async def create_message(self, request):
+        form = await request.post()
+        to = form["To"]
+        self.requests.append(to)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        if to == RATE_LIMITED and to not in self._throttled:
+            self._throttled.add(to)
+            return web.json_response({"code": 20429, "message": "Too Many Requests", "status": 429}, status=429)
+        if to == INVALID:
+            return web.json_response({"code": 21211, "message": "Invalid 'To' Phone Number", "status": 400}, status=400)
+        return web.json_response({
+            "sid": f"SM{len(self.requests):032d}",
+            "account_sid": request.match_info["account_sid"],
+            "to": to,
+            "from": form["From"],
+            "body": form["Body"],
+            "status": "queued",
+        }, status=201)
+
+
+async def _run_batch(recipients, concurrency=None, number_mps=0):
+    stub = StubTwilio()
+    app = web.Application()
+    app.router.add_post("/2010-04-01/Accounts/{account_sid}/Messages.json", stub.create_message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    service = TwilioService(account_sid="ACtest", auth_token="token")
+    service.api_base_url = f"http://127.0.0.1:{port}"
+    service.from_number = "+15551110000"
+    service.number_mps = number_mps
+    service._account_bucket = AsyncTokenBucket(0)
+    try:
+        streamed = []
+        async for result in service.stream_batch(
+            recipients, "Your estimate is ready", tenant_id="t1", concurrency=concurrency, retry_delay=0.01
+        ):
+            streamed.append(result)
+        return stub, streamed
+    finally:
+        await runner.cleanup()
+
+
+def test_batch_streams_results_with_bounded_concurrency():
+    recipients = [f"+1555000{i:04d}" for i in range(10, 22)]
+
+    stub, streamed = asyncio.run(_run_batch(recipients, concurrency=4))
+
+    assert sorted(r["index"] for r in streamed) == list(range(12))
+    assert all(r["status"] == "success" and r["message_sid"].startswith("SM") for r in streamed)
+    assert stub.max_in_flight == 4
+
+
+def test_rate_limited_send_is_retried_and_errors_are_reported():
+    recipients = ["+15550000001", RATE_LIMITED, INVALID]
+
+    stub, streamed = asyncio.run(_run_batch(recipients))
+    by_to = {r["to"]: r for r in streamed}
+
+    assert by_to[RATE_LIMITED]["status"] == "success"
+    assert by_to[RATE_LIMITED]["attempts"] == 2
+    assert by_to[INVALID]["status"] == "error"
+    assert by_to[INVALID]["code"] == 21211
+    assert by_to[INVALID]["attempts"] == 1
+    assert stub.requests.count(RATE_LIMITED) == 2
+
+
+def test_batch_send_returns_results_in_recipient_order():
+    service = TwilioService(account_sid="ACtest", auth_token="token")
+
+    async def fake_stream(recipients, body, **kwargs):
+        for index in reversed(range(len(recipients))):
+            yield {"status": "success", "to": recipients[index], "index": index}
+
+    service.stream_batch = fake_stream
+    results = asyncio.run(service.batch_send(["+15550000001", "+15550000003"], "hi"))
+
+    assert [r["to"] for r in results] == ["+15550000001", "+15550000003"]
+
+
+def test_token_bucket_paces_sends_per_number():
+    bucket = AsyncTokenBucket(rate=10, burst=1)
+
+    delays = [bucket.reserve() for _ in range(3)]
+
+    assert delays[0] == 0
+    assert 0.09 < delays[1] <= 0.1
+    assert 0.19 < delays[2] <= 0.2
+